@@ -0,0 +1,74 @@
+"""
+Measure the startup cost of the Plugins and of the Tcl commands: the lazy registration used by the app against
+importing every module up front. Each case runs in a fresh interpreter so nothing is already imported.
+
+Usage, from the FlatCAM folder:
+    python Utils/startup_benchmark.py [-runs N]
+"""
+
+import os
+import subprocess
+import sys
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+CASES = {
+    'plugins_lazy': """
+import appPlugins
+""",
+    'plugins_eager': """
+import importlib, appPlugins
+for spec in appPlugins.PLUGINS:
+    if spec.is_available():
+        importlib.import_module('appPlugins.' + spec.module)
+""",
+    'tcl_lazy': """
+import types, logging, tclCommands
+app = types.SimpleNamespace(log=logging.getLogger('base'))
+tclCommands.register_all_commands(app, {})
+""",
+    'tcl_eager': """
+import importlib, tclCommands
+for name in tclCommands.__all__:
+    importlib.import_module('tclCommands.' + name)
+""",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+%s
+print(time.perf_counter() - _start)
+"""
+
+
+def run_case(code):
+    result = subprocess.run([sys.executable, '-c', TIMER % code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr else 'failed'
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def main(runs=5):
+    for name, code in CASES.items():
+        timings = []
+        error = None
+        for __ in range(runs):
+            duration, error = run_case(code)
+            if duration is None:
+                break
+            timings.append(duration)
+
+        if error is not None:
+            print("%-15s failed: %s" % (name, error))
+        else:
+            print("%-15s median %8.1f ms   min %8.1f ms" %
+                  (name, statistics.median(timings) * 1000, min(timings) * 1000))
+
+
+if __name__ == '__main__':
+    n_runs = 5
+    if '-runs' in sys.argv:
+        n_runs = int(sys.argv[sys.argv.index('-runs') + 1])
+    main(n_runs)
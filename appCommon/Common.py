@@ -20,7 +20,8 @@ from appTool import AppTool
 
 from copy import deepcopy
 import collections
-from datetime import datetime
+import threading
+import time
 
 import numpy as np
 # from voronoi import Voronoi
@@ -890,6 +891,26 @@ class ExclusionAreas(QtCore.QObject):
 
 
 class AppLogging:
+    """
+    The App log when the messages are also shown in the Tcl Shell (verbose log level 2).
+
+    The messages are kept as records: the time, the level, the message and its arguments. They are formatted only when
+    they are shown, as in the Python logging (e.g. self.log.warning("Line ignored (%d): %s", line_num, line)).
+    The messages with the same text that come faster than RATE_LIMIT in a RATE_PERIOD are counted instead of being
+    shown and a single message with the count is shown at the end of the period.
+    The Tcl Shell is updated by a timer, with all the messages since the last update, and the most recent records are
+    kept in a ring buffer.
+    """
+
+    # number of messages with the same text shown in a period; the rest are counted
+    RATE_LIMIT = 20
+    # in seconds
+    RATE_PERIOD = 1.0
+    # number of the most recent records kept in memory
+    RING_SIZE = 5000
+    # the Tcl Shell update interval, in milliseconds
+    SHELL_INTERVAL = 200
+
     def __init__(self, app, log_level):
         self.app = app
 
@@ -903,57 +924,122 @@ class AppLogging:
 
         self._log_level = log_level
 
+        self._lock = threading.Lock()
+        # the most recent records: (time, level, message, arguments)
+        self.records = collections.deque(maxlen=self.RING_SIZE)
+        # the records not yet shown in the Tcl Shell
+        self._shell_pending = []
+        # for each (level, message): [start of the period, messages in the period, messages not shown]
+        self._rates = {}
+
+        # the timer lives in the GUI thread; the messages can come from any thread
+        self.shell_timer = QtCore.QTimer()
+        self.shell_timer.setInterval(self.SHELL_INTERVAL)
+        self.shell_timer.timeout.connect(self.flush)
+        if self._log_level != 0:
+            self.shell_timer.start()
+
     @property
     def log_level(self):
         return self._log_level
 
     @log_level.setter
     def log_level(self, val):
-        self._log = val if val in [0, 1, 2] else 0
+        self._log_level = val if val in [0, 1, 2] else 0
 
-    def info(self, msg):
+    def _record(self, level, msg, args):
         if self._log_level == 0:
             return
-        # current date now
-        date = str(datetime.today()).rpartition('.')[0]
-        date = ''.join(c for c in date if c not in ':-')
-        date = date.replace(' ', '_')
 
-        self._log.info(msg=msg)
-        self.app.inform_shell.emit('[log]INFO %s ***\t%s' % (date, msg))
+        now = time.time()
+        key = (level, msg if isinstance(msg, str) else str(msg))
+        summary = None
+        with self._lock:
+            rate = self._rates.get(key)
+            if rate is None or now - rate[0] >= self.RATE_PERIOD:
+                if rate is not None and rate[2]:
+                    summary = self._summary(now, key, rate[2])
+                self._rates[key] = [now, 1, 0]
+            elif rate[1] < self.RATE_LIMIT:
+                rate[1] += 1
+            else:
+                rate[2] += 1
+                return
 
-    def debug(self, msg):
-        if self._log_level == 0:
-            return
-        # current date now
-        date = str(datetime.today()).rpartition('.')[0]
-        date = ''.join(c for c in date if c not in ':-')
-        date = date.replace(' ', '_')
+            record = (now, level, msg, args)
+            self.records.append(record)
+            self._shell_pending.append(record)
 
-        self._log.debug(msg=msg)
-        self.app.inform_shell.emit('[log]DEBUG %s ***\t%s' % (date, msg))
+        if summary is not None:
+            getattr(self._log, summary[1])(summary[2], *summary[3])
+        getattr(self._log, level)(msg, *args)
 
-    def warning(self, msg):
-        if self._log_level == 0:
-            return
-        # current date now
-        date = str(datetime.today()).rpartition('.')[0]
-        date = ''.join(c for c in date if c not in ':-')
-        date = date.replace(' ', '_')
+    def _summary(self, now, key, count):
+        # the record that replaces the messages that were not shown; called with the lock held
+        record = (now, key[0], "The previous message was repeated %d more times: %s", (count, key[1]))
+        self.records.append(record)
+        self._shell_pending.append(record)
+        return record
 
-        self._log.warning(msg=msg)
-        self.app.inform_shell.emit('[log]WARNING %s ***\t%s' % (date, msg))
+    def flush(self):
+        """
+        Show in the Tcl Shell the messages logged since the last call, with one signal emit.
+        Called by the timer, in the GUI thread.
 
-    def error(self, msg):
-        if self._log_level == 0:
-            return
-        # current date now
-        date = str(datetime.today()).rpartition('.')[0]
-        date = ''.join(c for c in date if c not in ':-')
-        date = date.replace(' ', '_')
+        :return:    None
+        """
+        now = time.time()
+        summaries = []
+        with self._lock:
+            # the periods that ended; their counted messages are reported and their entries are dropped
+            for key, rate in list(self._rates.items()):
+                if now - rate[0] >= self.RATE_PERIOD:
+                    if rate[2]:
+                        summaries.append(self._summary(now, key, rate[2]))
+                    del self._rates[key]
+            pending, self._shell_pending = self._shell_pending, []
+
+        for summary in summaries:
+            getattr(self._log, summary[1])(summary[2], *summary[3])
+        if pending:
+            self.app.inform_shell.emit('\n'.join(self.format_record(record) for record in pending))
+
+    @staticmethod
+    def format_record(record):
+        """
+        :param record:  tuple (time, level, message, arguments)
+        :return:        the text of the record as shown in the Tcl Shell
+        """
+        created, level, msg, args = record
+        try:
+            text = str(msg) % args if args else str(msg)
+        except (TypeError, ValueError):
+            text = '%s %s' % (str(msg), str(args))
+        date = time.strftime('%Y%m%d_%H%M%S', time.localtime(created))
+        return '[log]%s %s ***\t%s' % (level.upper(), date, text)
+
+    def recent(self, count=None):
+        """
+        :param count:   number of records; None for all the records in the ring buffer
+        :return:        list with the text of the most recent records
+        """
+        with self._lock:
+            records = list(self.records)
+        if count is not None:
+            records = records[-count:]
+        return [self.format_record(record) for record in records]
+
+    def info(self, msg, *args):
+        self._record('info', msg, args)
+
+    def debug(self, msg, *args):
+        self._record('debug', msg, args)
+
+    def warning(self, msg, *args):
+        self._record('warning', msg, args)
 
-        self._log.error(msg=msg)
-        self.app.inform_shell.emit('[log]ERROR %s ***\t%s' % (date, msg))
+    def error(self, msg, *args):
+        self._record('error', msg, args)
 
 
 def farthest_point(origin, points_list):
@@ -0,0 +1,387 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
+
+# Piece table used by the large text viewer. The text is never held as one string: it is a list of pieces, each one a
+# slice of a read-only buffer. The buffers are the chunks the text was loaded from (e.g. the segments of a CNCJob
+# machine code) and the inserted texts. The positions of the line ends are indexed for each buffer, so finding a line
+# or the line of a position does not scan the text.
+
+import re
+
+import numpy as np
+
+# maximum number of edits kept for undo
+UNDO_LIMIT = 1000
+# number of characters searched at once
+SEARCH_CHUNK = 1024 * 1024
+
+
+def newline_index(text: str) -> np.ndarray:
+    """
+    :param text:    string
+    :return:        the positions of the '\\n' characters in the text, as a sorted Numpy array
+    """
+    if text.isascii():
+        # for ASCII text the character positions are the byte positions
+        return np.flatnonzero(np.frombuffer(text.encode('ascii'), dtype=np.uint8) == 10)
+    return np.fromiter((m.start() for m in re.finditer('\n', text)), dtype=np.int64)
+
+
+class PieceTable:
+    """
+    Editable text made of pieces of read-only buffers, with an index of the lines.
+    Positions are character offsets from the start of the text; lines are counted from 0.
+    """
+
+    def __init__(self, chunks=None):
+        """
+        :param chunks:  iterable of strings, the initial text
+        """
+        self.buffers = []
+        # the positions of the '\n' in each buffer
+        self.newlines = []
+        # each piece is a tuple: (buffer index, start in the buffer, length)
+        self.pieces = []
+
+        self.undo_stack = []
+        self.redo_stack = []
+        self.modified = False
+        # (buffer index, end position) of the last insert; typing at that position extends the same buffer
+        self._typing = None
+
+        # caches rebuilt after each edit: the start position and the number of lines before each piece
+        self._starts = None
+        self._lines_before = None
+        self._length = 0
+        self._line_count = 1
+
+        if chunks is not None:
+            self.load(chunks)
+
+    # #################################################################################################################
+    # Loading and reading
+    # #################################################################################################################
+    def load(self, chunks):
+        """
+        Replace the text. The undo history is cleared.
+
+        :param chunks:  iterable of strings
+        :return:        None
+        """
+        self.buffers = []
+        self.newlines = []
+        self.pieces = []
+        for chunk in chunks:
+            if chunk:
+                self.pieces.append((self._add_buffer(chunk), 0, len(chunk)))
+        self.undo_stack = []
+        self.redo_stack = []
+        self.modified = False
+        self._typing = None
+        self._update()
+
+    def _add_buffer(self, text):
+        self.buffers.append(text)
+        self.newlines.append(newline_index(text))
+        return len(self.buffers) - 1
+
+    def _count_newlines(self, buf, start, stop):
+        # number of '\n' in buffer[start:stop]
+        nl = self.newlines[buf]
+        return int(np.searchsorted(nl, stop) - np.searchsorted(nl, start))
+
+    def _update(self):
+        starts = np.zeros(len(self.pieces) + 1, dtype=np.int64)
+        lines_before = np.zeros(len(self.pieces) + 1, dtype=np.int64)
+        for idx, (buf, start, length) in enumerate(self.pieces):
+            starts[idx + 1] = starts[idx] + length
+            lines_before[idx + 1] = lines_before[idx] + self._count_newlines(buf, start, start + length)
+        self._starts = starts
+        self._lines_before = lines_before
+        self._length = int(starts[-1])
+        self._line_count = int(lines_before[-1]) + 1
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def line_count(self) -> int:
+        """
+        :return:    the number of lines; a text that ends with '\\n' has an empty last line
+        """
+        return self._line_count
+
+    def chunks(self, start=0, end=None):
+        """
+        :param start:   start position
+        :param end:     end position, not included; None for the end of the text
+        :return:        generator of the text between the positions, one string for each piece
+        """
+        end = self._length if end is None else min(end, self._length)
+        if start >= end:
+            return
+        idx = self._piece_at(start)
+        while idx < len(self.pieces) and self._starts[idx] < end:
+            buf, p_start, length = self.pieces[idx]
+            piece_pos = int(self._starts[idx])
+            lo = max(start - piece_pos, 0)
+            hi = min(end - piece_pos, length)
+            yield self.buffers[buf][p_start + lo:p_start + hi]
+            idx += 1
+
+    def text(self, start=0, end=None) -> str:
+        """
+        :param start:   start position
+        :param end:     end position, not included; None for the end of the text
+        :return:        the text between the positions
+        """
+        return ''.join(self.chunks(start, end))
+
+    def _piece_at(self, pos):
+        # index of the piece that holds the position; len(self.pieces) for the end of the text
+        if pos >= self._length:
+            return len(self.pieces)
+        return int(np.searchsorted(self._starts, pos, side='right')) - 1
+
+    # #################################################################################################################
+    # Lines
+    # #################################################################################################################
+    def line_start(self, line: int) -> int:
+        """
+        :param line:    line number
+        :return:        the position of the first character of the line
+        """
+        if line <= 0:
+            return 0
+        if line >= self._line_count:
+            return self._length
+
+        # the piece that holds the (line - 1)th '\n'
+        idx = int(np.searchsorted(self._lines_before, line, side='left')) - 1
+        buf, p_start, length = self.pieces[idx]
+        nl = self.newlines[buf]
+        first = int(np.searchsorted(nl, p_start))
+        nl_pos = int(nl[first + line - 1 - int(self._lines_before[idx])])
+        return int(self._starts[idx]) + nl_pos - p_start + 1
+
+    def line_end(self, line: int) -> int:
+        """
+        :param line:    line number
+        :return:        the position of the end of the line, without the '\\n'
+        """
+        if line >= self._line_count - 1:
+            return self._length
+        return self.line_start(line + 1) - 1
+
+    def line(self, line: int) -> str:
+        """
+        :param line:    line number
+        :return:        the text of the line, without the '\\n'
+        """
+        return self.text(self.line_start(line), self.line_end(line))
+
+    def lines(self, first: int, count: int) -> list:
+        """
+        :param first:   number of the first line
+        :param count:   number of lines
+        :return:        list with the text of the lines, without the '\\n'
+        """
+        first = max(first, 0)
+        last = min(first + count, self._line_count)
+        if first >= last:
+            return []
+        return self.text(self.line_start(first), self.line_end(last - 1)).split('\n')
+
+    def line_of(self, pos: int) -> int:
+        """
+        :param pos:     position in the text
+        :return:        the number of the line that holds the position
+        """
+        if pos <= 0:
+            return 0
+        if pos >= self._length:
+            return self._line_count - 1
+        idx = self._piece_at(pos)
+        buf, p_start, length = self.pieces[idx]
+        offset = pos - int(self._starts[idx])
+        return int(self._lines_before[idx]) + self._count_newlines(buf, p_start, p_start + offset)
+
+    # #################################################################################################################
+    # Search
+    # #################################################################################################################
+    def find(self, needle: str, start=0, end=None, case_sensitive=True) -> int:
+        """
+        :param needle:          the string searched
+        :param start:           position where the search starts
+        :param end:             position where the search ends; None for the end of the text
+        :param case_sensitive:  if False the case of the letters is ignored
+        :return:                position of the first match or -1
+        """
+        if not needle:
+            return -1
+        if not case_sensitive:
+            needle = needle.lower()
+        end = self._length if end is None else min(end, self._length)
+
+        # the text is searched in windows; consecutive windows overlap so the matches between them are found
+        overlap = len(needle) - 1
+        pos = max(start, 0)
+        while pos < end:
+            window_end = min(pos + SEARCH_CHUNK + overlap, end)
+            window = self.text(pos, window_end)
+            if not case_sensitive:
+                window = window.lower()
+            found = window.find(needle)
+            if found != -1:
+                return pos + found
+            if window_end == end:
+                break
+            pos += SEARCH_CHUNK
+        return -1
+
+    def rfind(self, needle: str, start=0, end=None, case_sensitive=True) -> int:
+        """
+        :param needle:          the string searched
+        :param start:           position where the search ends
+        :param end:             position where the search starts, going backwards; None for the end of the text
+        :param case_sensitive:  if False the case of the letters is ignored
+        :return:                position of the last match or -1
+        """
+        if not needle:
+            return -1
+        if not case_sensitive:
+            needle = needle.lower()
+        start = max(start, 0)
+        overlap = len(needle) - 1
+        pos = self._length if end is None else min(end, self._length)
+        while pos > start:
+            window_start = max(pos - SEARCH_CHUNK - overlap, start)
+            window = self.text(window_start, pos)
+            if not case_sensitive:
+                window = window.lower()
+            found = window.rfind(needle)
+            if found != -1:
+                return window_start + found
+            if window_start == start:
+                break
+            pos -= SEARCH_CHUNK
+        return -1
+
+    # #################################################################################################################
+    # Editing
+    # #################################################################################################################
+    def _split(self, pos):
+        # make a piece start at the position; return the index of that piece
+        idx = self._piece_at(pos)
+        if idx >= len(self.pieces):
+            return idx
+        offset = pos - int(self._starts[idx])
+        if offset == 0:
+            return idx
+        buf, p_start, length = self.pieces[idx]
+        self.pieces[idx:idx + 1] = [(buf, p_start, offset), (buf, p_start + offset, length - offset)]
+        self._update()
+        return idx + 1
+
+    def _save_undo(self):
+        self.undo_stack.append(list(self.pieces))
+        if len(self.undo_stack) > UNDO_LIMIT:
+            del self.undo_stack[0]
+        self.redo_stack = []
+        self.modified = True
+
+    def replace(self, pos: int, length: int, text: str):
+        """
+        Replace a part of the text. Used for all the edits.
+
+        :param pos:     start position of the replaced text
+        :param length:  number of characters replaced; 0 to insert
+        :param text:    the new text; empty to delete
+        :return:        None
+        """
+        pos = min(max(pos, 0), self._length)
+        length = min(max(length, 0), self._length - pos)
+        if length == 0 and not text:
+            return
+
+        self._save_undo()
+        if length == 0 and self._typing is not None and self._typing[1] == pos and pos > 0:
+            # the text is typed after the previous insert: the buffer of the previous insert is extended
+            buf = self._typing[0]
+            idx = self._piece_at(pos - 1)
+            p_buf, p_start, p_length = self.pieces[idx]
+            if p_buf == buf and p_start + p_length == len(self.buffers[buf]):
+                extra = newline_index(text) + len(self.buffers[buf])
+                self.buffers[buf] += text
+                self.newlines[buf] = np.concatenate((self.newlines[buf], extra))
+                self.pieces[idx] = (buf, p_start, p_length + len(text))
+                self._typing = (buf, pos + len(text))
+                self._update()
+                return
+
+        first = self._split(pos)
+        last = self._split(pos + length)
+        if text:
+            buf = self._add_buffer(text)
+            self.pieces[first:last] = [(buf, 0, len(text))]
+            self._typing = (buf, pos + len(text))
+        else:
+            self.pieces[first:last] = []
+            self._typing = None
+        self._update()
+
+    def insert(self, pos: int, text: str):
+        self.replace(pos, 0, text)
+
+    def delete(self, pos: int, length: int):
+        self.replace(pos, length, '')
+
+    def replace_all(self, old: str, new: str, case_sensitive=True) -> int:
+        """
+        Replace all the occurrences of a string.
+
+        :param old:             the string replaced
+        :param new:             the new string
+        :param case_sensitive:  if False the case of the letters is ignored
+        :return:                number of replaced occurrences
+        """
+        if not old:
+            return 0
+        pattern = re.compile(re.escape(old), 0 if case_sensitive else re.IGNORECASE)
+        new_text, count = pattern.subn(new.replace('\\', r'\\'), self.text())
+        if count:
+            self._save_undo()
+            self._typing = None
+            self.pieces = [(self._add_buffer(new_text), 0, len(new_text))] if new_text else []
+            self._update()
+        return count
+
+    def undo(self) -> bool:
+        """
+        :return:    True if an edit was undone
+        """
+        if not self.undo_stack:
+            return False
+        self.redo_stack.append(self.pieces)
+        self.pieces = self.undo_stack.pop()
+        self.modified = True
+        self._typing = None
+        self._update()
+        return True
+
+    def redo(self) -> bool:
+        """
+        :return:    True if an edit was redone
+        """
+        if not self.redo_stack:
+            return False
+        self.undo_stack.append(self.pieces)
+        self.pieces = self.redo_stack.pop()
+        self.modified = True
+        self._typing = None
+        self._update()
+        return True
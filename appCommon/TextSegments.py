@@ -0,0 +1,166 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
+
+# Storage for large texts, like the machine code of a CNCJob object. The text is kept as a list of segments that are
+# never joined in memory; above a size threshold the segments are moved to a temporary file. The text is written to a
+# file or read back chunk by chunk.
+
+import os
+import tempfile
+import threading
+from io import StringIO
+
+# number of characters kept in memory before the segments are moved to a temporary file
+SPILL_SIZE = 64 * 1024 * 1024
+# number of characters read at once from the temporary file
+CHUNK_SIZE = 1024 * 1024
+
+
+class TextSegments:
+    """
+    A text made of segments. Appending a segment does not copy the text already stored.
+    """
+
+    def __init__(self, segments=None, spill_size=SPILL_SIZE, chunk_size=CHUNK_SIZE):
+        """
+        :param segments:    iterable of strings, the initial text
+        :param spill_size:  number of characters kept in memory; above it the segments are moved to a temporary file.
+                            None keeps everything in memory
+        :param chunk_size:  number of characters read at once from the temporary file
+        """
+        self.spill_size = spill_size
+        self.chunk_size = chunk_size
+
+        self.segments = []
+        # number of characters in the segments that are in memory
+        self.mem_size = 0
+        # number of characters in the temporary file
+        self.spilled_size = 0
+        self.spill_file = None
+        self._lock = threading.Lock()
+
+        if segments is not None:
+            self.extend(segments)
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        :param value:   a string, a StringIO, a TextSegments or None
+        :return:        a TextSegments with the same text; a TextSegments value is returned as it is
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, StringIO):
+            value = value.getvalue()
+        return cls([value] if value else None)
+
+    def append(self, text: str):
+        """
+        Add a segment at the end of the text.
+
+        :param text:    string
+        :return:        None
+        """
+        if not text:
+            return
+        with self._lock:
+            self.segments.append(text)
+            self.mem_size += len(text)
+            if self.spill_size is not None and self.mem_size > self.spill_size:
+                self._spill()
+
+    def extend(self, segments):
+        for text in segments:
+            self.append(text)
+
+    def _spill(self):
+        # move the segments in memory at the end of the temporary file
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
+        self.spill_file.seek(0, os.SEEK_END)
+        for text in self.segments:
+            self.spill_file.write(text)
+        self.spilled_size += self.mem_size
+        self.segments = []
+        self.mem_size = 0
+
+    def chunks(self):
+        """
+        :return:    generator of the text, chunk by chunk: first the content of the temporary file, in chunks of
+                    chunk_size characters, then the segments in memory
+        """
+        # the text is the one at the time of the call: the segments in memory and the size of the temporary file are
+        # taken together, so the segments spilled to the file by a later append() are not read twice
+        with self._lock:
+            spill_file = self.spill_file
+            spilled_size = self.spilled_size
+            segments = list(self.segments)
+            if spill_file is not None:
+                spill_file.flush()
+        if spill_file is not None:
+            position = 0
+            remaining = spilled_size
+            while remaining > 0:
+                with self._lock:
+                    if spill_file.closed:
+                        return
+                    spill_file.seek(position)
+                    data = spill_file.read(min(self.chunk_size, remaining))
+                    position = spill_file.tell()
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        yield from segments
+
+    def write_to(self, file_handle):
+        """
+        Write the text to an open file, chunk by chunk.
+
+        :param file_handle: file opened in text mode
+        :return:            None
+        """
+        for data in self.chunks():
+            file_handle.write(data)
+
+    def getvalue(self) -> str:
+        """
+        :return:    the whole text as one string
+        """
+        return ''.join(self.chunks())
+
+    @property
+    def spilled(self) -> bool:
+        return self.spill_file is not None
+
+    def close(self):
+        """
+        Drop the text and delete the temporary file.
+
+        :return:    None
+        """
+        with self._lock:
+            if self.spill_file is not None:
+                self.spill_file.close()
+                self.spill_file = None
+            self.segments = []
+            self.mem_size = 0
+            self.spilled_size = 0
+
+    def __len__(self):
+        return self.mem_size + self.spilled_size
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __str__(self):
+        return self.getvalue()
+
+    def __getstate__(self):
+        # the temporary file and the lock can't be copied or pickled; the text is
+        return {'text': self.getvalue(), 'spill_size': self.spill_size, 'chunk_size': self.chunk_size}
+
+    def __setstate__(self, state):
+        self.__init__([state['text']], spill_size=state['spill_size'], chunk_size=state['chunk_size'])
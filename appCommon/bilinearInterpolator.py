@@ -1,6 +1,5 @@
 
 # import csv
-import math
 import numpy as np
 
 
@@ -14,39 +13,42 @@ class bilinearInterpolator:
         return self._probedGrid
 
     """
-    Constructor takes a file with a .csv extension and creates an evenly-spaced 'ideal' grid from the data points.
+    Constructor takes a file with a .csv extension (or an array of (x, y, z) points) and creates an evenly-spaced
+    'ideal' grid from the data points.
     This is done to get around any floating point errors that may exist in the data
     """
     def __init__(self, pointsFile):
         
         self.pointsFile = pointsFile
-        self.points = np.loadtxt(self.pointsFile, delimiter=',')
+        if isinstance(pointsFile, str):
+            self.points = np.loadtxt(self.pointsFile, delimiter=',')
+        else:
+            self.points = np.asarray(pointsFile, dtype=float).reshape(-1, 3)
 
         self.xMin, self.xMax, self.xSpacing, self.xCount = self._axisParams(0)
         self.yMin, self.yMax, self.ySpacing, self.yCount = self._axisParams(1)
 
-        # generate ideal grid to match actually probed points -- this is due to floating-point error issues
-        idealGrid = ([
-            [(x, y) for x in np.linspace(self.xMin, self.xMax, self.xCount, True)]
-            for y in np.linspace(self.yMin, self.yMax, self.yCount, True)
-            ])
-
-        self._probedGrid = [[0] * self.yCount for i in range(0, self.xCount)]
-
-        # align ideal grid indices with probed data points
-        for rowIndex, row in enumerate(idealGrid):
-            for colIndex, idealPoint in enumerate(row):
-                minSqDist = math.inf
-                for probed in self.points:
-                    # find closest point in ideal grid that corresponds to actual tested point
-                    # put z value in correct index
-                    sqDist = pow(probed[0] - idealPoint[0], 2) + pow(probed[1] - idealPoint[1], 2)
-                    if sqDist <= minSqDist:
-                        minSqDist = sqDist
-                        indexX = rowIndex
-                        indexY = colIndex
-                        closestProbed = probed
-                self.probedGrid[indexY][indexX] = closestProbed
+        # align the ideal grid with the probed points -- this is due to floating-point error issues
+        # each probed point is snapped to the closest node of the ideal grid; when more points snap to the same node
+        # the closest one is kept
+        ix = np.clip(np.rint((self.points[:, 0] - self.xMin) / self.xSpacing), 0, self.xCount - 1).astype(int)
+        iy = np.clip(np.rint((self.points[:, 1] - self.yMin) / self.ySpacing), 0, self.yCount - 1).astype(int)
+        sqDist = (self.points[:, 0] - (self.xMin + ix * self.xSpacing)) ** 2 + \
+                 (self.points[:, 1] - (self.yMin + iy * self.ySpacing)) ** 2
+        # with repeated indexes the last assignment wins so the closest points are assigned last
+        order = np.argsort(-sqDist, kind='stable')
+
+        self._probedGrid = np.full((self.xCount, self.yCount, 3), np.nan)
+        self._probedGrid[ix[order], iy[order]] = self.points[order]
+
+        # the nodes without a snapped point (irregular grids) get the closest probed point
+        missX, missY = np.nonzero(np.isnan(self._probedGrid[:, :, 0]))
+        for start in range(0, len(missX), 1024):
+            nodeX = self.xMin + missX[start:start + 1024] * self.xSpacing
+            nodeY = self.yMin + missY[start:start + 1024] * self.ySpacing
+            nodeDist = (self.points[None, :, 0] - nodeX[:, None]) ** 2 + (self.points[None, :, 1] - nodeY[:, None]) ** 2
+            closest = np.argmin(nodeDist, axis=1)
+            self._probedGrid[missX[start:start + 1024], missY[start:start + 1024]] = self.points[closest]
 
     def Interpolate(self, point):
         """
@@ -55,72 +57,59 @@ class bilinearInterpolator:
         NOTE: If one axis is outside the grid, linear interpolation is used instead.
         If both axes are outside of the grid, the z-value of the closest corner of the grid is returned.
         """
-        lin = False
-
-        if point[0] < self.xMin:
-            ix1 = 0
-            lin = True
-        elif point[0] > self.xMax:
-            ix1 = self.xCount-1
-            lin = True
-        else:
-            ix1 = math.floor((point[0] - self.xMin)/self.xSpacing)
-            ix2 = math.ceil((point[0] - self.xMin)/self.xSpacing)
-
-        def interpolatePoint(p1, p2, pt, axis):
-            return (p2[2]*(pt[axis] - p1[axis]) + p1[2]*(p2[axis] - pt[axis]))/(p2[axis] - p1[axis])
-
-        if point[1] < self.yMin:
-            if lin:
-                return self.probedGrid[ix1][0][2]
-            return interpolatePoint(self.probedGrid[ix1][0], self.probedGrid[ix2][0], point, 0)
-        elif point[1] > self.yMax:           
-            if lin:
-                return self.probedGrid[ix1][self.yCount - 1][2]
-            return interpolatePoint(
-                self.probedGrid[ix1][self.yCount - 1], self.probedGrid[ix2][self.yCount - 1], point, 0)
-        else:
-            iy1 = math.floor((point[1] - self.yMin)/self.ySpacing)
-            iy2 = math.ceil((point[1] - self.yMin)/self.ySpacing)
-            # if x was at an extrema, but y was not, perform linear interpolation on x axis
-            if lin:
-                return interpolatePoint(self.probedGrid[ix1][iy1], self.probedGrid[ix1][iy2], point, 1)
+        return float(self.interpolate_many([(point[0], point[1])])[0])
+
+    def interpolate_many(self, points):
+        """
+        Vectorized version of Interpolate(). Evaluates the z-value of many points at once.
+
+        :param points:  Numpy array of shape (N, 2) holding the (x, y) coordinates of the points
+        :return:        Numpy array of shape (N,) with the interpolated z-values
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        grid = self.probedGrid
+        px = points[:, 0]
+        py = points[:, 1]
+
+        # outside the grid the indexes are clamped on the border therefore the two indexes are the same and
+        # the interpolation degrades into a linear interpolation (one axis outside) or the corner value (both outside)
+        fx = np.clip((px - self.xMin) / self.xSpacing, 0, self.xCount - 1)
+        fy = np.clip((py - self.yMin) / self.ySpacing, 0, self.yCount - 1)
+        ix1 = np.floor(fx).astype(int)
+        ix2 = np.ceil(fx).astype(int)
+        iy1 = np.floor(fy).astype(int)
+        iy2 = np.ceil(fy).astype(int)
 
         def specialDiv(a, b):
-            if b == 0:
-                return 0.5
-            else:
-                return a/b      
-
-        x1 = self.probedGrid[ix1][iy1][0]
-        x2 = self.probedGrid[ix2][iy1][0]
-        y1 = self.probedGrid[ix2][iy1][1]
-        y2 = self.probedGrid[ix2][iy2][1]
-
-        Q11 = self.probedGrid[ix1][iy1][2]
-        Q12 = self.probedGrid[ix1][iy2][2]
-        Q21 = self.probedGrid[ix2][iy1][2]
-        Q22 = self.probedGrid[ix2][iy2][2]
-
-        r1 = specialDiv(point[0]-x1, x2-x1)*Q21 + specialDiv(x2-point[0], x2-x1)*Q11
-        r2 = specialDiv(point[0]-x1, x2-x1)*Q22 + specialDiv(x2-point[0], x2-x1)*Q12
-        p = specialDiv(point[1]-y1, y2-y1)*r2 + specialDiv(y2-point[1], y2-y1)*r1
-            
-        return p
+            safe_b = np.where(b == 0, 1.0, b)
+            return np.where(b == 0, 0.5, a / safe_b)
+
+        x1 = grid[ix1, iy1, 0]
+        x2 = grid[ix2, iy1, 0]
+        y1 = grid[ix2, iy1, 1]
+        y2 = grid[ix2, iy2, 1]
+
+        Q11 = grid[ix1, iy1, 2]
+        Q12 = grid[ix1, iy2, 2]
+        Q21 = grid[ix2, iy1, 2]
+        Q22 = grid[ix2, iy2, 2]
+
+        wx2 = specialDiv(px - x1, x2 - x1)
+        wx1 = specialDiv(x2 - px, x2 - x1)
+        r1 = wx2 * Q21 + wx1 * Q11
+        r2 = wx2 * Q22 + wx1 * Q12
+        return specialDiv(py - y1, y2 - y1) * r2 + specialDiv(y2 - py, y2 - y1) * r1
 
     # Returns the min, max, spacing and size of one axis of the 2D grid
     def _axisParams(self, sortAxis):
-        # sort the set and eliminate the previous, unsorted set
-        srtSet = sorted(self.points, key=lambda x: x[sortAxis])
+        srtSet = np.sort(self.points[:, sortAxis])
 
-        dists = []
-        for item0, item1 in zip(srtSet[:(len(srtSet)-2)], srtSet[1:]):
-            dists.append(float(item1[sortAxis]) - float(item0[sortAxis]))
-        axisSpacing = max(dists)
+        # the spacing is the largest gap between consecutive coordinates on this axis
+        axisSpacing = float(np.max(np.diff(srtSet)))
 
         # add an extra one for axisCount to account for the starting point
-        axisMin = float(min(srtSet, key=lambda x: x[sortAxis])[sortAxis])
-        axisMax = float(max(srtSet, key=lambda x: x[sortAxis])[sortAxis])
+        axisMin = float(srtSet[0])
+        axisMax = float(srtSet[-1])
         axisRange = axisMax - axisMin
         axisCount = round((axisRange/axisSpacing) + 1)
 
@@ -0,0 +1,911 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
+
+# The core of the application, without the GUI: the options, the objects of the project, the objects collection and
+# the Tcl commands. The App (appMain.py) builds the GUI on top of it: it makes its objects with init_new_object(),
+# opens the Gerber and Excellon files with gerber_file_init() and excellon_file_init() and registers the Tcl commands
+# with setup_tcl_commands(). AppCore runs the same code alone, with a QCoreApplication or with no Qt event loop at
+# all; it is used by the headless mode (appHeadless.py).
+#
+# The objects of AppCore are the parser and camlib objects (Gerber, Excellon, Geometry, CNCjob). The isolation, the
+# GCode generation and the GCode export are methods of these classes (Gerber.isolate(), Geometry.generatecncjob(),
+# CNCjob.export_gcode()) so the Tcl commands run the same code in the App and in the core.
+
+import os
+import re
+import sys
+import time
+import logging
+import tkinter
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+from copy import deepcopy
+from functools import partial
+
+from PyQt6 import QtCore
+
+from appPool import WorkerPool
+import camlib
+from camlib import Geometry, CNCjob, ParseError
+from appCommon.Common import ExclusionAreas
+from appParsers.ParseGerber import Gerber
+from appParsers.ParseExcellon import Excellon
+from appPreProcessor import load_preprocessors
+from defaults import AppDefaults, AppOptions
+import tclCommands
+from tclCommands.TclCommand import TclCommand
+
+import gettext
+import appTranslation as fcTranslate
+import builtins
+
+fcTranslate.apply_language('strings')
+if '_' not in builtins.__dict__:
+    _ = gettext.gettext
+
+log = logging.getLogger('base')
+
+# the version is part of the preferences file name
+VERSION = "Unstable"
+VERSION_DATE = "2023/6/31"
+
+# marks a class that had no 'app' class attribute of its own
+_missing = object()
+
+# makes the Tcl puts function return its text instead of printing it to stdout
+TCL_PUTS = '''
+    rename puts original_puts
+    proc puts {args} {
+        if {[llength $args] == 1} {
+            return "[lindex $args 0]"
+        } else {
+            eval original_puts $args
+        }
+    }
+    '''
+
+
+def load_options(defaults_path, version, beta, inform, user_defaults=True):
+    """
+    Make the application defaults (the Preferences) and the options of the project, a copy of the defaults.
+
+    :param defaults_path:   path of the file where the Preferences of the user are saved
+    :param version:         the application version
+    :param beta:            True for a beta version
+    :param inform:          signal used to show the messages
+    :param user_defaults:   if True the Preferences of the user are loaded, else the factory defaults are used
+    :return:                a (defaults, options) tuple
+    """
+    defaults = AppDefaults(beta=beta, version=version)
+    if user_defaults:
+        defaults.load(filename=defaults_path, inform=inform)
+
+    options = AppOptions(version=version)
+    for def_key, def_val in defaults.items():
+        options[def_key] = deepcopy(def_val)
+
+    return defaults, options
+
+
+def copy_object_options(options, obj, kind):
+    """
+    Copy the application options related to an object to the options of the object.
+
+    The key names in the options dictionary are not random: they have to have in name first the type of the object
+    (geometry, excellon, cncjob and gerber), the 'kind', followed by an underline. The kind and the underline are
+    stripped from the key: "excellon_toolchange" becomes "toolchange" in obj.obj_options.
+
+    :param options: the application options
+    :param obj:     the new object
+    :param kind:    the kind of the object
+    :return:        None
+    """
+    for option in options:
+        if option.find(kind + "_") == 0:
+            oname = option[len(kind) + 1:]
+            obj.obj_options[oname] = options[option]
+
+    # add some of the FlatCAM Tools related properties
+    # it is done like this to preserve some kind of order in the keys
+    if kind == 'excellon':
+        for option in options:
+            if option.find('tools_drill_') == 0:
+                obj.obj_options[option] = options[option]
+    if kind == 'gerber':
+        for option in options:
+            if option.find('tools_iso_') == 0:
+                obj.obj_options[option] = options[option]
+
+    # the milling options should be inherited by all manufacturing objects
+    if kind in ['excellon', 'gerber', 'geometry', 'cncjob']:
+        for option in options:
+            if option.find('tools_mill_') == 0:
+                obj.obj_options[option] = options[option]
+        for option in options:
+            if option.find('tools_') == 0:
+                obj.obj_options[option] = options[option]
+
+
+def init_new_object(app, obj, kind, name, initialize):
+    """
+    Make a new object ready to be added to the project: its options are copied from the application options, the
+    initialize function fills it, its units are converted to the application units and its bounds are stored in its
+    options.
+
+    :param app:         the App or the core
+    :param obj:         the new object
+    :param kind:        the kind of object. One of 'gerber', 'excellon', 'cncjob', 'geometry', 'script' and 'document'
+    :param name:        name of the object
+    :param initialize:  function that fills the object. It is called with 2 parameters: the new object and the App.
+    :return:            the value returned by initialize() or the string 'fail'
+    """
+    t0 = time.time()  # Debug
+
+    copy_object_options(app.options, obj, kind)
+
+    # Initialize as per user request
+    # User must take care to implement initialize
+    # in a thread-safe way as is likely that we
+    # have been invoked in a separate thread.
+    t1 = time.time()
+    app.log.debug("%f seconds before initialize()." % (t1 - t0))
+
+    try:
+        return_value = initialize(obj, app)
+    except Exception as e:
+        msg = '[ERROR_NOTCL] %s' % _("An internal error has occurred. See shell.\n")
+        msg += _("Object ({kind}) failed because: {error} \n\n").format(kind=kind, error=str(e))
+        msg += traceback.format_exc()
+        app.inform.emit(msg)
+        return "fail"
+
+    t2 = time.time()
+    msg = "%s %s. %f seconds executing initialize()." % (_("New object with name:"), name, (t2 - t1))
+    app.log.debug(msg)
+    app.inform_shell.emit(msg)
+
+    if return_value == 'fail':
+        app.log.debug("Object (%s) parsing and/or geometry creation failed." % kind)
+        return "fail"
+
+    # ############################################################################################################
+    # Check units and convert if necessary
+    # This condition CAN be true because initialize() can change obj.units
+    # ############################################################################################################
+    if app.options["units"].upper() != obj.units.upper():
+        app.inform.emit('%s: %s' % (_("Converting units to "), app.options["units"]))
+        obj.convert_units(app.options["units"])
+        t3 = time.time()
+        app.log.debug("%f seconds converting units." % (t3 - t2))
+
+    # ############################################################################################################
+    # Create the bounding box for the object and then add the results to the obj.obj_options
+    # But not for Scripts or for Documents
+    # ############################################################################################################
+    if kind != 'document' and kind != 'script':
+        try:
+            xmin, ymin, xmax, ymax = obj.bounds()
+            obj.obj_options['xmin'] = xmin
+            obj.obj_options['ymin'] = ymin
+            obj.obj_options['xmax'] = xmax
+            obj.obj_options['ymax'] = ymax
+        except Exception as e:
+            app.log.error("init_new_object() -> The object has no bounds properties. %s" % str(e))
+            return "fail"
+
+    return return_value
+
+
+def unique_object_name(name, names):
+    """
+    :param name:    name of a new object
+    :param names:   the names in use
+    :return:        the name, changed until it is not in use: a number at its end is incremented, else '_1' is added
+    """
+    while name in names:
+        match = re.search(r'(.*[^\d])?(\d+)$', name)
+        if match:
+            name = (match.group(1) or '') + str(int(match.group(2)) + 1)
+        else:
+            name += "_1"
+    return name
+
+
+def gerber_file_init(filename):
+    """
+    :param filename:    path to a Gerber file
+    :return:            the initialize function of new_object() that parses the file into the new Gerber object
+    """
+    def obj_init(gerber_obj, app_obj):
+        # Opening the file happens here
+        try:
+            parse_ret_val = gerber_obj.parse_file(filename)
+        except IOError:
+            app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open file"), filename))
+            return "fail"
+        except ParseError as parse_err:
+            app_obj.inform.emit('[ERROR_NOTCL] %s: %s. %s' % (_("Failed to parse file"), filename, str(parse_err)))
+            app_obj.log.error(str(parse_err))
+            return "fail"
+        except Exception as e:
+            app_obj.log.error("App.open_gerber() --> %s" % str(e))
+            msg = '[ERROR] %s' % _("An internal error has occurred. See shell.\n")
+            msg += traceback.format_exc()
+            app_obj.inform.emit(msg)
+            return "fail"
+
+        if gerber_obj.is_empty():
+            app_obj.inform.emit('[ERROR_NOTCL] %s' %
+                                _("Object is not Gerber file or empty. Aborting object creation."))
+            return "fail"
+
+        if parse_ret_val:
+            return parse_ret_val
+
+    return obj_init
+
+
+def excellon_file_init(filename):
+    """
+    :param filename:    path to an Excellon file
+    :return:            the initialize function of new_object() that parses the file into the new Excellon object
+    """
+    def obj_init(excellon_obj, app_obj):
+        # populate excellon_obj.tools dict
+        try:
+            ret = excellon_obj.parse_file(filename=filename)
+            if ret == "fail":
+                app_obj.log.debug("Excellon parsing failed.")
+                app_obj.inform.emit('[ERROR_NOTCL] %s' % _("This is not Excellon file."))
+                return "fail"
+        except IOError:
+            app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Cannot open file"), filename))
+            app_obj.log.debug("Could not open Excellon object.")
+            return "fail"
+        except Exception:
+            msg = '[ERROR_NOTCL] %s' % _("An internal error has occurred. See shell.\n")
+            msg += traceback.format_exc()
+            app_obj.inform.emit(msg)
+            return "fail"
+
+        # populate excellon_obj.solid_geometry list
+        ret = excellon_obj.create_geometry()
+        if ret == 'fail':
+            app_obj.log.debug("Could not create geometry for Excellon object.")
+            return "fail"
+
+        for tool in excellon_obj.tools:
+            if excellon_obj.tools[tool]['solid_geometry']:
+                return
+        app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("No geometry found in file"), filename))
+        return "fail"
+
+    return obj_init
+
+
+def export_gerber_code(app, obj, obj_name, file_handle=None):
+    """
+    Make the Gerber file of a Gerber object, in the format set in the Gerber export preferences.
+
+    :param app:         the App or the core
+    :param obj:         the Gerber object
+    :param obj_name:    name of the object, written in the file header
+    :param file_handle: if not None, the Gerber code is written in chunks to this open file and it is not returned
+    :return:            the Gerber code (empty when it is written to the file_handle)
+    """
+    # updated units
+    g_units = app.options["gerber_exp_units"]
+    g_whole = app.options["gerber_exp_integer"]
+    g_fract = app.options["gerber_exp_decimals"]
+    g_zeros = app.options["gerber_exp_zeros"]
+
+    fc_units = app.app_units.upper()
+    if fc_units == 'MM':
+        factor = 1 if g_units == 'MM' else 0.03937
+    else:
+        factor = 25.4 if g_units == 'MM' else 1
+
+    if not obj.tools:
+        raise ValueError("Gerber Object is empty: no apertures.")
+
+    time_str = "{:%A, %d %B %Y at %H:%M}".format(datetime.now())
+
+    header = 'G04*\n'
+    header += 'G04 RS-274X GERBER GENERATED BY FLATCAM v%s - www.flatcam.org - Version Date: %s*\n' % \
+              (str(app.version), str(app.version_date))
+
+    header += 'G04 Filename: %s*' % str(obj_name) + '\n'
+    header += 'G04 Created on : %s*' % time_str + '\n'
+    header += '%%FS%sAX%s%sY%s%s*%%\n' % (g_zeros, g_whole, g_fract, g_whole, g_fract)
+    header += "%MO{units}*%\n".format(units=g_units)
+
+    for apid in obj.tools:
+        if obj.tools[apid]['type'] == 'C':
+            header += "%ADD{apid}{type},{size}*%\n".format(
+                apid=str(apid),
+                type='C',
+                size=(factor * obj.tools[apid]['size'])
+            )
+        elif obj.tools[apid]['type'] == 'R':
+            header += "%ADD{apid}{type},{width}X{height}*%\n".format(
+                apid=str(apid),
+                type='R',
+                width=(factor * obj.tools[apid]['width']),
+                height=(factor * obj.tools[apid]['height'])
+            )
+        elif obj.tools[apid]['type'] == 'O':
+            header += "%ADD{apid}{type},{width}X{height}*%\n".format(
+                apid=str(apid),
+                type='O',
+                width=(factor * obj.tools[apid]['width']),
+                height=(factor * obj.tools[apid]['height'])
+            )
+
+    header += '\n'
+
+    # obsolete units but some software may need it
+    if g_units == 'IN':
+        header += 'G70*\n'
+    else:
+        header += 'G71*\n'
+
+    # Absolute Mode
+    header += 'G90*\n'
+
+    header += 'G01*\n'
+    # positive polarity
+    header += '%LPD*%\n'
+
+    footer = 'M02*\n'
+
+    if file_handle is not None:
+        file_handle.write(header)
+        obj.export_gerber(g_whole, g_fract, g_zeros=g_zeros, factor=factor, file_handle=file_handle)
+        file_handle.write(footer)
+        return ''
+    return header + obj.export_gerber(g_whole, g_fract, g_zeros=g_zeros, factor=factor) + footer
+
+
+def export_excellon_code(app, obj, obj_name, file_handle=None):
+    """
+    Make the Excellon file of an Excellon object, in the format set in the Excellon export preferences.
+
+    :param app:         the App or the core
+    :param obj:         the Excellon object
+    :param obj_name:    name of the object, written in the file header
+    :param file_handle: if not None, the Excellon code is written in chunks to this open file and it is not returned
+    :return:            the Excellon code (empty when it is written to the file_handle)
+    """
+    format_exc = ';FILE_FORMAT=%d:%d\n' % (app.options["excellon_exp_integer"],
+                                           app.options["excellon_exp_decimals"]
+                                           )
+
+    # updated units
+    e_units = app.options["excellon_exp_units"]
+    e_whole = app.options["excellon_exp_integer"]
+    e_fract = app.options["excellon_exp_decimals"]
+    e_zeros = app.options["excellon_exp_zeros"]
+    e_format = app.options["excellon_exp_format"]
+    slot_type = app.options["excellon_exp_slot_type"]
+
+    fc_units = app.app_units.upper()
+    if fc_units == 'MM':
+        factor = 1 if e_units == 'METRIC' else 0.03937
+    else:
+        factor = 25.4 if e_units == 'METRIC' else 1
+
+    if not any(tool_dict.get('drills') or tool_dict.get('slots') for tool_dict in obj.tools.values()):
+        raise ValueError("Excellon Object is empty.")
+
+    time_str = "{:%A, %d %B %Y at %H:%M}".format(datetime.now())
+
+    header = 'M48\n'
+    header += ';EXCELLON GENERATED BY FLATCAM v%s - www.flatcam.org - Version Date: %s\n' % \
+              (str(app.version), str(app.version_date))
+
+    header += ';Filename: %s' % str(obj_name) + '\n'
+    header += ';Created on : %s' % time_str + '\n'
+
+    if e_format == 'dec':
+        export_args = {'factor': factor, 'slot_type': slot_type}
+        header += e_units + '\n'
+    else:
+        zeros = 'LZ' if e_zeros == 'LZ' else 'TZ'
+        export_args = {'form': 'ndec', 'e_zeros': zeros, 'factor': factor, 'slot_type': slot_type}
+        header += '%s,%s\n' % (e_units, zeros)
+        header += format_exc
+
+    for tool in obj.tools:
+        header += "T{tool}F00S00C{:.{dec}f}\n".format(float(obj.tools[tool]['tooldia']) * factor,
+                                                      tool=str(tool),
+                                                      dec=2 if e_units == 'METRIC' else 4)
+    header += '%\n'
+    footer = 'M30\n'
+
+    if file_handle is not None:
+        file_handle.write(header)
+        obj.export_excellon(e_whole, e_fract, file_handle=file_handle, **export_args)
+        file_handle.write(footer)
+        return ''
+    has_slots, excellon_code = obj.export_excellon(e_whole, e_fract, **export_args)
+    return header + excellon_code + footer
+
+
+def shellvar_commands(shellvar):
+    """
+    :param shellvar:    the value of the --shellvar command line argument, comma separated values like: 1,'C:\\path',23
+    :return:            the Tcl commands that set the variables shellvar_0, shellvar_1, ... to the values
+    """
+    commands = []
+    command_tcl = 0
+    for cnt, i in enumerate(shellvar.split(',')):
+        if i is not None:
+            # noinspection PyBroadException
+            try:
+                command_tcl = eval(i)
+            except Exception:
+                command_tcl = i
+
+        command_tcl_formatted = 'set shellvar_{nr} "{cmd}"'.format(cmd=str(command_tcl), nr=str(cnt))
+
+        # if there are Windows paths then replace the path separator with a Unix like one
+        if sys.platform == 'win32':
+            command_tcl_formatted = command_tcl_formatted.replace('\\', '/')
+        commands.append(command_tcl_formatted)
+    return commands
+
+
+def setup_tcl_commands(tcl, app, commands, command_call=None):
+    """
+    Add the FlatCAM Tcl commands to a Tcl interpreter.
+
+    :param tcl:             the Tcl interpreter
+    :param app:             the App or the core; it runs the commands
+    :param commands:        dictionary of the commands; it is filled by tclCommands.register_all_commands()
+    :param command_call:    function that makes the Python function run by the interpreter for a command name; by
+                            default the command runs directly
+    :return:                None
+    """
+    # Import/overwrite tcl commands as objects of TclCommand descendants
+    tclCommands.register_all_commands(app, commands)
+
+    # Add commands to the tcl interpreter
+    for cmd in commands:
+        tcl.createcommand(cmd, command_call(cmd) if command_call is not None else commands[cmd]['fcn'])
+
+    # Make the tcl puts function return instead of print to stdout
+    tcl.eval(TCL_PUTS)
+
+
+class CoreProcessContainer:
+    """
+    Takes the place of the App process container (the activity shown in the status bar); it only logs the activity.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @contextmanager
+    def new(self, descr):
+        self.app.log.debug("%s" % descr)
+        yield self
+
+    def new_text(self, *args, **kwargs):
+        pass
+
+    def update_view_text(self, *args, **kwargs):
+        pass
+
+    def done(self, *args, **kwargs):
+        pass
+
+
+class CoreExclusionAreas:
+    """
+    No exclusion areas: the travel moves go straight to their destination.
+    """
+
+    travel_coordinates = ExclusionAreas.travel_coordinates
+
+    def __init__(self, app):
+        self.app = app
+        self.exclusion_areas_storage = []
+
+    def clear_shapes(self):
+        self.exclusion_areas_storage.clear()
+
+
+class CoreCollection:
+    """
+    The objects of the project, by name. The App shows them in the Project tab (ObjectCollection).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.name_index = {}
+
+    def append(self, obj):
+        # Prevent same name
+        name = unique_object_name(obj.obj_options["name"], self.name_index)
+        obj.obj_options["name"] = name
+        self.name_index[name] = obj
+
+        # the App makes the machine code of a new CNCJob object when it builds its UI
+        if obj.kind == 'cncjob':
+            obj.make_source_file()
+
+    def get_by_name(self, name, isCaseSensitive=None):
+        if isCaseSensitive is None or isCaseSensitive is True:
+            return self.name_index.get(name)
+
+        folded_name = str(name).casefold()
+        for obj_name, obj in self.name_index.items():
+            if obj_name.casefold() == folded_name:
+                return obj
+        return None
+
+    def get_names(self):
+        return list(self.name_index.keys())
+
+    def get_list(self):
+        return list(self.name_index.values())
+
+    def delete_by_name(self, name, select_project=True):
+        self.name_index.pop(name, None)
+
+    def delete_all(self):
+        self.name_index.clear()
+
+
+class CoreShell:
+    """
+    The Tcl interpreter of the core. Takes the place of the App Tcl Shell for the Tcl commands: the errors are raised
+    as TclErrorException and logged.
+    """
+
+    class TclErrorException(Exception):
+        pass
+
+    def __init__(self, app):
+        self.app = app
+        self.tcl = tkinter.Tcl()
+
+    def raise_tcl_error(self, text):
+        raise self.TclErrorException(text)
+
+    def raise_tcl_unknown_error(self, unknown_exception):
+        raise unknown_exception
+
+    def display_tcl_error(self, error, error_info=None):
+        self.app.log.error("%s" % str(error))
+
+    def open_processing(self, *args, **kwargs):
+        pass
+
+    def close_processing(self, *args, **kwargs):
+        pass
+
+
+class AppCore(QtCore.QObject):
+    """
+    The application core without the GUI. It holds what the parsers, camlib and the Tcl commands need from the App:
+    the options, the preprocessors, the logger, the messages, the objects collection, the Tcl interpreter, the
+    multiprocessing Pool and the abort flag.
+    """
+
+    # the messages; they go to the log, the level is in the message prefix, like '[ERROR_NOTCL] text'
+    inform = QtCore.pyqtSignal([str], [str, bool])
+    inform_shell = QtCore.pyqtSignal([str], [str, bool])
+    inform_no_echo = QtCore.pyqtSignal(str)
+
+    use_3d_engine = False
+    plotcanvas = None
+
+    # the classes that read the App from their 'app' class attribute
+    obj_classes = (Gerber, Excellon, Geometry, CNCjob)
+
+    # the parser and camlib classes that are made for each kind of object; they take the place of the App objects
+    kind_classes = {
+        'gerber':   Gerber,
+        'excellon': Excellon,
+        'geometry': Geometry,
+        'cncjob':   CNCjob
+    }
+
+    def __init__(self, data_path=None, user_defaults=True, pool_processes=None):
+        """
+
+        :param data_path:       folder of the preferences and of the user preprocessors; by default the FlatCAM data
+                                folder of the user
+        :param user_defaults:   if True the preferences saved by FlatCAM are used, else the factory defaults
+        :param pool_processes:  number of processes of the Pool; by default the 'global_process_number' preference
+        """
+        super().__init__()
+
+        self.log = log
+        self.version = VERSION
+        self.version_date = VERSION_DATE
+
+        if data_path is None:
+            if sys.platform == 'win32':
+                data_path = os.path.join(os.getenv('appdata'), 'FlatCAM')
+            else:
+                data_path = os.path.expanduser('~') + '/.FlatCAM'
+        self.data_path = data_path
+
+        self.inform[str].connect(self.on_inform)
+        self.inform[str, bool].connect(self.on_inform)
+        self.inform_shell[str].connect(self.on_inform)
+        self.inform_shell[str, bool].connect(self.on_inform)
+        self.inform_no_echo.connect(self.on_inform)
+
+        self.abort_flag = False
+        self.proc_container = CoreProcessContainer(self)
+        self.exc_areas = CoreExclusionAreas(self)
+
+        self.defaults, self.options = load_options(self.defaults_path(), version=self.version, beta=True,
+                                                   inform=self.inform,
+                                                   user_defaults=user_defaults and os.path.isfile(self.defaults_path()))
+        # no GUI so no theme
+        self.options["global_theme"] = 'default'
+
+        self.app_units = self.options["units"]
+        self.decimals = int(self.options['units_precision'])
+
+        self.preprocessors = load_preprocessors(self)
+
+        self._pool = None
+        self.pool_processes = pool_processes if pool_processes else int(self.options["global_process_number"])
+
+        # what the Tcl commands use from the App
+        self.collection = CoreCollection(self)
+        self.app_obj = self
+        self.f_handlers = self
+        self.shell = CoreShell(self)
+        self.project_filename = None
+
+        self.tcl_commands_storage = {}
+        setup_tcl_commands(self.shell.tcl, self, self.tcl_commands_storage,
+                           command_call=lambda cmd: partial(self._tcl_call, cmd))
+        self._tcl_error = None
+
+    def defaults_path(self):
+        return os.path.join(self.data_path, 'current_defaults_%s.FlatConfig' % str(self.version))
+
+    @contextmanager
+    def app_context(self):
+        """
+        Make the parsers and camlib use this core as their App and switch off the GUI events processing, for the
+        duration of a job. The previous App and GUI events state are restored at the end, so the core can run in a
+        process that has an App or another core.
+
+        :return: None
+        """
+        prev_apps = [(cls, cls.__dict__.get('app', _missing)) for cls in self.obj_classes]
+        prev_gui_events = camlib.GUI_EVENTS
+
+        for cls in self.obj_classes:
+            cls.app = self
+        camlib.set_gui_events(False)
+        try:
+            yield self
+        finally:
+            for cls, prev_app in prev_apps:
+                if prev_app is _missing:
+                    del cls.app
+                else:
+                    cls.app = prev_app
+            camlib.set_gui_events(prev_gui_events)
+
+    @property
+    def pool(self):
+        # the Pool processes are started only if a job needs them
+        if self._pool is None:
+            self._pool = WorkerPool(processes=self.pool_processes)
+        return self._pool
+
+    def close(self):
+        """
+        Stop the Pool processes.
+
+        :return: None
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def on_inform(self, msg, echo=True):
+        if msg.startswith('[ERROR'):
+            self.log.error(msg)
+        elif msg.startswith('[WARNING'):
+            self.log.warning(msg)
+        else:
+            self.log.info(msg)
+
+    def dec_format(self, val, dec=None):
+        """
+        Returns a formatted float value with a certain number of decimals
+        """
+        dec_nr = dec if dec is not None else self.decimals
+
+        return float('%.*f' % (dec_nr, float(val)))
+
+    # ###############################################################################################################
+    # ########################################## Objects ############################################################
+    # ###############################################################################################################
+    def new_object(self, kind, name, initialize, plot=False, autoselected=True, callback=None, callback_params=None):
+        """
+        Same as AppObject.new_object() of the App but the object is a parser or camlib object and it is added to the
+        collection of the core.
+
+        :param kind:            The kind of object to create. One of 'gerber', 'excellon', 'cncjob' and 'geometry'
+        :param name:            Name for the object
+        :param initialize:      Function to run after creation of the object but before it is added to the collection.
+                                It is called with 2 parameters: the new object and the core.
+        :param plot:            Not used; there is nothing to plot on
+        :param autoselected:    Not used; there is no selection
+        :param callback:        a method that is launched after the object is created
+        :param callback_params: a list of parameters for the parameter: callback
+        :return:                Either the object or the string 'fail'
+        """
+        with self.app_context():
+            if kind == 'gerber':
+                obj = Gerber(steps_per_circle=self.options["gerber_circle_steps"])
+            elif kind == 'excellon':
+                obj = Excellon(excellon_circle_steps=self.options["excellon_circle_steps"])
+                obj.default_data = {}
+            elif kind == 'geometry':
+                obj = Geometry(geo_steps_per_circle=int(self.options["geometry_circle_steps"]))
+            elif kind == 'cncjob':
+                obj = CNCjob(units=self.app_units, steps_per_circle=int(self.options["cncjob_steps_per_circle"]))
+            else:
+                raise ValueError('%s: %s' % (_("Unknown object type"), kind))
+
+            obj.app = self
+            obj.kind = kind
+            obj.units = self.options["units"]
+            obj.obj_options = {'name': name}
+
+            return_value = init_new_object(self, obj, kind, name, initialize)
+            if return_value == 'fail':
+                return "fail"
+
+        self.collection.append(obj)
+        if callback is not None:
+            callback(*(callback_params or []))
+
+        if return_value == "defective":
+            return "defective"
+        return obj
+
+    def open_gerber(self, filename, outname=None, plot=False, from_tcl=False):
+        """
+        Parse a Gerber file into a Gerber object of the collection. The Tcl command open_gerber runs this.
+
+        :param filename:    path to the Gerber file
+        :param outname:     name of the object; by default the file name
+        :param plot:        Not used
+        :param from_tcl:    Not used
+        :return:            the Gerber object
+        """
+        name = outname or os.path.basename(filename)
+        ret_val = self.new_object('gerber', name, gerber_file_init(filename))
+        if ret_val == 'fail':
+            raise ValueError('%s: %s' % (_('Open Gerber failed. Probable not a Gerber file.'), filename))
+        return ret_val
+
+    def open_excellon(self, filename, outname=None, plot=False, from_tcl=False):
+        """
+        Parse an Excellon file into an Excellon object of the collection. The Tcl command open_excellon runs this.
+
+        :param filename:    path to the Excellon file
+        :param outname:     name of the object; by default the file name
+        :param plot:        Not used
+        :param from_tcl:    Not used
+        :return:            the Excellon object
+        """
+        name = outname or os.path.basename(filename)
+        ret_val = self.new_object('excellon', name, excellon_file_init(filename))
+        if ret_val == 'fail':
+            raise ValueError('%s: %s' % (_('Open Excellon file failed. Probable not an Excellon file.'), filename))
+        return ret_val
+
+    def export_gerber(self, obj_name, filename, local_use=None, use_thread=True):
+        """
+        Save a Gerber object of the collection to a Gerber file. The Tcl command export_gerber runs this.
+
+        :param obj_name:    name of the Gerber object
+        :param filename:    path to the Gerber file
+        :param local_use:   if not None, the Gerber object whose Gerber code is returned instead of being saved
+        :param use_thread:  Not used
+        :return:            'fail' when the export failed; the Gerber code for local_use
+        """
+        obj = self.collection.get_by_name(str(obj_name)) if local_use is None else local_use
+        if obj is None or obj.kind != 'gerber':
+            self.inform.emit('[ERROR_NOTCL] %s' % _("Failed. Only Gerber objects can be saved as Gerber files..."))
+            return 'fail'
+
+        return self._export_code(export_gerber_code, obj, obj_name, filename, local_use, _("Gerber file exported to"))
+
+    def export_excellon(self, obj_name, filename, local_use=None, use_thread=True):
+        """
+        Save an Excellon object of the collection to an Excellon file. The Tcl command export_excellon runs this.
+
+        :param obj_name:    name of the Excellon object
+        :param filename:    path to the Excellon file
+        :param local_use:   if not None, the Excellon object whose Excellon code is returned instead of being saved
+        :param use_thread:  Not used
+        :return:            'fail' when the export failed; the Excellon code for local_use
+        """
+        obj = self.collection.get_by_name(str(obj_name)) if local_use is None else local_use
+        if obj is None or obj.kind != 'excellon':
+            self.inform.emit('[ERROR_NOTCL] %s' %
+                             _("Failed. Only Excellon objects can be saved as Excellon files..."))
+            return 'fail'
+
+        return self._export_code(export_excellon_code, obj, obj_name, filename, local_use,
+                                 _("Excellon file exported to"))
+
+    def _export_code(self, make_code, obj, obj_name, filename, local_use, success_msg):
+        try:
+            if local_use is not None:
+                return make_code(self, obj, obj_name)
+            # the file is replaced only when the whole export succeeded
+            with camlib.atomic_file(filename) as fp:
+                make_code(self, obj, obj_name, file_handle=fp)
+        except Exception as e:
+            self.log.error("AppCore.%s() --> %s" % (make_code.__name__, str(e)))
+            self.inform.emit('[ERROR_NOTCL] %s' % _('Could not export.'))
+            return 'fail'
+        self.inform.emit('[success] %s: %s' % (success_msg, filename))
+
+    # ###############################################################################################################
+    # ########################################## Tcl commands #######################################################
+    # ###############################################################################################################
+    def run_command(self, command, *args):
+        """
+        Run a Tcl command of the App Shell with its arguments as they are typed in the Shell. The command runs in the
+        calling thread, also the commands that the App runs in the worker thread.
+
+        :param command:     name of the command, like 'drillcncjob'
+        :param args:        arguments of the command, like 'obj_name', '-drillz', '-1.8'
+        :return:            what the command returns
+        """
+        try:
+            lazy_command = self.tcl_commands_storage[command]['fcn']
+        except KeyError:
+            raise ValueError('%s: %s' % (_("Unknown command"), command))
+
+        with self.app_context():
+            ret_val = TclCommand.execute_wrapper(lazy_command.load(), *[str(a) for a in args])
+        if ret_val == 'fail':
+            raise CoreShell.TclErrorException('%s: %s' % (command, _("Failed.")))
+        return ret_val
+
+    def exec_command(self, text):
+        """
+        Evaluate a Tcl script made of the commands of the App Shell.
+
+        :param text:    the Tcl script
+        :return:        the result of the script
+        """
+        self._tcl_error = None
+        try:
+            return self.shell.tcl.eval(text)
+        except tkinter.TclError:
+            # raise the error of the command that failed instead of the Tcl error
+            if self._tcl_error is not None:
+                raise self._tcl_error
+            raise
+
+    def _tcl_call(self, command, *args):
+        try:
+            return self.run_command(command, *args)
+        except Exception as err:
+            self._tcl_error = err
+            # the text of the error is the result of the failed script, like in the App Shell
+            self.shell.tcl.call('error', str(err))
@@ -5,7 +5,7 @@
 # MIT Licence                                              #
 # ##########################################################
 
-from camlib import distance, arc, AppRTreeStorage
+from camlib import distance, arc, AppRTreeStorage, linear_array_offsets
 
 from PyQt6 import QtCore, QtWidgets, QtGui
 from PyQt6.QtCore import Qt
@@ -662,31 +662,19 @@ class DrillArray(FCShapeTool):
                 dx = data[0]
                 dy = data[1]
 
-            geo_list = []
-            geo = None
             self.points = [dx, dy]
 
-            for item in range(self.drill_array_size):
-                if self.drill_axis == 'X':
-                    geo = self.util_shape(((dx + (self.drill_pitch * item)), dy))
-                if self.drill_axis == 'Y':
-                    geo = self.util_shape((dx, (dy + (self.drill_pitch * item))))
-                if self.drill_axis == 'A':
-                    x_adj = self.drill_pitch * math.cos(math.radians(self.drill_linear_angle))
-                    y_adj = self.drill_pitch * math.sin(math.radians(self.drill_linear_angle))
-                    geo = self.util_shape(
-                        ((dx + (x_adj * item)), (dy + (y_adj * item)))
-                    )
-
-                if static is None or static is False:
-                    geo_list.append(translate(geo, xoff=(dx - self.last_dx), yoff=(dy - self.last_dy)))
-                else:
-                    geo_list.append(geo)
+            # the drill shape is made once and it is drawn at each of the array positions
+            geo = self.util_shape((dx, dy))
+            if static is None or static is False:
+                geo = translate(geo, xoff=(dx - self.last_dx), yoff=(dy - self.last_dy))
             # self.origin = data
 
             self.last_dx = dx
             self.last_dy = dy
-            return DrawToolUtilityShape(geo_list)
+            return DrawToolUtilityShape(
+                geo, offsets=linear_array_offsets(self.drill_array_size, self.drill_pitch, self.drill_axis,
+                                                  self.drill_linear_angle))
         elif self.drill_array == 'circular':  # 'Circular'
             if data[0] is None and data[1] is None:
                 cdx = self.draw_app.snap_x
@@ -2540,7 +2528,7 @@ class CopyEditorExc(FCShapeTool):
                 self.ui.array_type_radio.get_value() == 'circular':
             del self.util_geo.geo[-1]
 
-        self.geometry = [DrawToolShape(deepcopy(shp)) for shp in self.util_geo.geo]
+        self.geometry = [DrawToolShape(deepcopy(shp)) for shp in self.util_geo.instances()]
 
         for sel_dia in self.selected_dia_list:
             self.current_storage = self.draw_app.storage_dict[sel_dia]
@@ -2667,28 +2655,16 @@ class CopyEditorExc(FCShapeTool):
             dx = pos[0]
             dy = pos[1]
 
-        geo_list = []
         self.points = [(dx, dy)]
 
-        for item in range(array_size):
-            if axis == 'X':
-                new_pos = ((dx + (pitch * item)), dy)
-            elif axis == 'Y':
-                new_pos = (dx, (dy + (pitch * item)))
-            else:  # 'A'
-                x_adj = pitch * math.cos(math.radians(linear_angle))
-                y_adj = pitch * math.sin(math.radians(linear_angle))
-                new_pos = ((dx + (x_adj * item)), (dy + (y_adj * item)))
-
-            for g in self.draw_app.get_selected():
-                if static is None or static is False:
-                    geo_list.append(translate(g.geo, xoff=new_pos[0], yoff=new_pos[1]))
-                else:
-                    geo_list.append(g.geo)
-        return DrawToolUtilityShape(geo_list)
+        # the selected shapes are drawn at each of the array positions
+        offsets = linear_array_offsets(array_size, pitch, axis, linear_angle)
+        if static is None or static is False:
+            offsets = offsets + (dx, dy)
+
+        return DrawToolUtilityShape([g.geo for g in self.draw_app.get_selected()], offsets=offsets)
 
     def dd_geo(self, pos):
-        trans_geo = []
         array_2d_type = self.ui.placement_radio.get_value()
 
         rows = self.ui.rows.get_value()
@@ -2722,27 +2698,25 @@ class CopyEditorExc(FCShapeTool):
 
         xmin, ymin, xmax, ymax = geo_bounds(geo_source)
 
-        currentx = pos[0]
-        currenty = pos[1]
-
-        def translate_recursion(geom):
+        def flatten_recursion(geom):
             if type(geom) == list:
                 geoms = []
                 for local_geom in geom:
-                    res_geo = translate_recursion(local_geom)
-                    try:
-                        geoms += res_geo
-                    except TypeError:
-                        geoms.append(res_geo)
+                    geoms += flatten_recursion(local_geom)
                 return geoms
             else:
-                return translate(geom, xoff=currentx, yoff=currenty)
+                return [geom]
+
+        currentx = pos[0]
+        currenty = pos[1]
 
+        # the selected shapes are drawn at each of the array positions
+        offsets = []
         for row in range(rows):
             currentx = pos[0]
 
             for col in range(columns):
-                trans_geo += translate_recursion(geo_source)
+                offsets.append((currentx, currenty))
                 if array_2d_type == 's':  # 'spacing'
                     currentx += (xmax - xmin + spacing_columns)
                 else:   # 'offset'
@@ -2753,7 +2727,7 @@ class CopyEditorExc(FCShapeTool):
             else:   # 'offset;
                 currenty = pos[1] + off_y * (row + 1)    # because 'row' starts from 0 we increment by 1
 
-        return DrawToolUtilityShape(trans_geo)
+        return DrawToolUtilityShape(flatten_recursion(geo_source), offsets=np.array(offsets))
 
     def circular_geo(self, pos):
         if pos[0] is None and pos[1] is None:
@@ -4908,6 +4882,7 @@ class AppExcEditor(QtCore.QObject):
 
     def draw_utility_geometry(self, geo):
         # Add the new utility shape
+        offsets = getattr(geo, 'offsets', None)
 
         if isinstance(geo.geo, (MultiLineString, MultiPolygon)):
             util_geo = geo.geo.geoms
@@ -4924,7 +4899,8 @@ class AppExcEditor(QtCore.QObject):
                             color=self.get_draw_color(),
                             update=False,
                             layer=0,
-                            tolerance=None
+                            tolerance=None,
+                            offsets=offsets
                         )
                 else:
                     self.tool_shape.add(
@@ -4932,14 +4908,16 @@ class AppExcEditor(QtCore.QObject):
                         color=self.get_draw_color(),
                         update=False,
                         layer=0,
-                        tolerance=None)
+                        tolerance=None,
+                        offsets=offsets)
         except TypeError:
             self.tool_shape.add(
                 shape=util_geo,
                 color=self.get_draw_color(),
                 update=False,
                 layer=0,
-                tolerance=None)
+                tolerance=None,
+                offsets=offsets)
         # print(self.tool_shape.data)
         self.tool_shape.redraw()
 
@@ -10,7 +10,8 @@ from PyQt6.QtCore import Qt
 
 from appEditors.appTextEditor import AppTextEditor
 from appObjects.CNCJobObject import CNCJobObject
-from appGUI.GUIElements import FCTextArea, FCEntry, FCButton, FCTable, GLay, FCLabel
+from appGUI.GUIElements import FCTextArea, FCEntry, FCButton, FCTable, GLay, FCLabel, FCLargeTextArea
+from appCommon.TextSegments import TextSegments
 
 # from io import StringIO
 
@@ -71,14 +72,7 @@ class AppGCodeEditor(QtCore.QObject):
         # #############################################################################################################
         self.ui.gcode_editor_tab = AppTextEditor(app=self.app, plain_text=True)
         self.edit_area = self.ui.gcode_editor_tab.code_editor
-
-        # add the Exit Editor action to the context menu
-        QtGui.QIcon(self.app.resource_location + '/power16.png'), _("Exit Editor")
-        self.edit_area.add_action_to_context_menu(text=_("Exit Editor"),
-                                                  shortcut=_("Ctrl+S"),
-                                                  icon=QtGui.QIcon(self.app.resource_location + '/power16.png'),
-                                                  callback=self.app.on_editing_finished,
-                                                  separator='before')
+        self.add_exit_action()
 
         # add the tab if it was closed
         self.app.ui.plot_tab_area.addTab(self.ui.gcode_editor_tab, '%s' % _("Code Editor"))
@@ -126,6 +120,32 @@ class AppGCodeEditor(QtCore.QObject):
         app_mode = self.app.options["global_app_level"]
         self.change_level(app_mode)
 
+    def add_exit_action(self):
+        """
+        Add the Exit Editor action to the context menu of the edit area.
+
+        :return:
+        :rtype:
+        """
+        self.edit_area.add_action_to_context_menu(text=_("Exit Editor"),
+                                                  shortcut=_("Ctrl+S"),
+                                                  icon=QtGui.QIcon(self.app.resource_location + '/power16.png'),
+                                                  callback=self.app.on_editing_finished,
+                                                  separator='before')
+
+    def on_text_loaded(self):
+        """
+        The text editor switches to the large text area for the code with many lines; the edit area is updated.
+
+        :return:
+        :rtype:
+        """
+        if self.edit_area is not self.ui.gcode_editor_tab.code_editor:
+            self.edit_area = self.ui.gcode_editor_tab.code_editor
+            # the large text area is kept by the text editor; the action is added only once
+            if not [act for act in self.edit_area.menu.actions() if act.text().startswith(_("Exit Editor"))]:
+                self.add_exit_action()
+
     def build_ui(self):
         """
 
@@ -409,6 +429,10 @@ class AppGCodeEditor(QtCore.QObject):
         for idx in sel_indexes:
             sel_rows.add(idx.row())
 
+        if isinstance(self.edit_area, FCLargeTextArea):
+            self.select_rows_code_large(sel_rows, t_table)
+            return
+
         if 0 in sel_rows:
             self.edit_area.selectAll()
             return
@@ -459,18 +483,8 @@ class AppGCodeEditor(QtCore.QObject):
             if row not in [0, 1, 2]:
                 tool_no = int(t_table.item(row, 0).text())
 
-                text_to_be_found = None
-                if self.gcode_obj.obj_options['type'].lower() == 'geometry':
-                    text_to_be_found = self.gcode_obj.tools[tool_no]['gcode']
-                elif self.gcode_obj.obj_options['type'].lower() == 'excellon':
-                    tool_dia = self.app.dec_format(float(t_table.item(row, 1).text()), dec=self.decimals)
-                    for tool_id in self.gcode_obj.tools:
-                        tool_d = self.gcode_obj.tools[tool_id]['tooldia']
-                        if self.app.dec_format(tool_d, dec=self.decimals) == tool_dia:
-                            text_to_be_found = self.gcode_obj.tools[tool_id]['gcode']
-                    if text_to_be_found is None:
-                        continue
-                else:
+                text_to_be_found = self.get_row_gcode(t_table, row, tool_no)
+                if text_to_be_found is None:
                     continue
 
                 text_list = [x for x in text_to_be_found.split("\n") if x != '']
@@ -564,6 +578,87 @@ class AppGCodeEditor(QtCore.QObject):
 
         self.edit_area.setExtraSelections(sel_list)
 
+    def get_row_gcode(self, t_table, row, tool_no):
+        """
+
+        :param t_table:     the tools table
+        :param row:         row in the tools table
+        :param tool_no:     the tool number in the row
+        :return:            the GCode of the tool in the row or None
+        :rtype:             str | None
+        """
+        text_to_be_found = None
+        if self.gcode_obj.obj_options['type'].lower() == 'geometry':
+            text_to_be_found = self.gcode_obj.tools[tool_no]['gcode']
+        elif self.gcode_obj.obj_options['type'].lower() == 'excellon':
+            tool_dia = self.app.dec_format(float(t_table.item(row, 1).text()), dec=self.decimals)
+            for tool_id in self.gcode_obj.tools:
+                tool_d = self.gcode_obj.tools[tool_id]['tooldia']
+                if self.app.dec_format(tool_d, dec=self.decimals) == tool_dia:
+                    text_to_be_found = self.gcode_obj.tools[tool_id]['gcode']
+        return text_to_be_found
+
+    def select_rows_code_large(self, sel_rows, t_table):
+        """
+        Same as on_row_selection_change() but for the large text area: the code is found with the searches of the
+        text area model, without moving a text cursor through the text.
+
+        :param sel_rows:    set of the selected rows in the tools table
+        :param t_table:     the tools table
+        :return:
+        :rtype:
+        """
+        model = self.edit_area.model
+
+        if 0 in sel_rows:
+            self.edit_area.selectAll()
+            return
+
+        # the header and the start code: from their first line to the last occurrence of their last line
+        for row, text_to_be_found in ((1, self.gcode_obj.gc_header), (2, self.gcode_obj.gc_start)):
+            text_list = [x for x in text_to_be_found.split("\n") if x != '']
+            if row not in sel_rows or not text_list:
+                continue
+            start_sel = model.find(text_list[0])
+            if start_sel == -1:
+                continue
+            end_sel = model.rfind(text_list[-1], start_sel)
+            end_sel = start_sel + len(text_list[0]) if end_sel == -1 else end_sel + len(text_list[-1])
+            self.edit_area.select_range(start_sel, end_sel)
+
+        sel_list = []
+        for row in sel_rows:
+            # those are special rows treated before so we except them
+            if row in [0, 1, 2]:
+                continue
+            tool_no = int(t_table.item(row, 0).text())
+            text_to_be_found = self.get_row_gcode(t_table, row, tool_no)
+            if text_to_be_found is None:
+                continue
+            text_list = [x for x in text_to_be_found.split("\n") if x != '']
+            if not text_list:
+                continue
+
+            tool_pos = model.find('T%d' % tool_no)
+            start_sel = model.find(text_list[0], max(tool_pos, 0))
+            if start_sel == -1:
+                # maybe the text start is deleted in editing
+                continue
+
+            end_sel = len(model)
+            if tool_pos != -1:
+                # the code of the tool ends before the next tool change (M6) or at the end of the text
+                m6_pos = model.find('M6', start_sel + len(text_list[0]))
+                if m6_pos != -1:
+                    last_line_pos = model.rfind(text_list[-1], start_sel, m6_pos + 1)
+                    if last_line_pos != -1:
+                        end_sel = last_line_pos + len(text_list[-1])
+
+            self.edit_area.select_range(start_sel, end_sel)
+            sel_list.append((start_sel, end_sel))
+
+        self.edit_area.set_marked_ranges(sel_list)
+
     def on_toggle_all_rows(self):
         """
 
@@ -587,8 +682,11 @@ class AppGCodeEditor(QtCore.QObject):
 
         if len(sel_rows) == t_table.rowCount():
             t_table.clearSelection()
-            my_text_cursor = self.edit_area.textCursor()
-            my_text_cursor.clearSelection()
+            if isinstance(self.edit_area, FCLargeTextArea):
+                self.edit_area.set_cursor(self.edit_area.cursor_pos)
+            else:
+                my_text_cursor = self.edit_area.textCursor()
+                my_text_cursor.clearSelection()
         else:
             t_table.selectAll()
 
@@ -654,14 +752,12 @@ class AppGCodeEditor(QtCore.QObject):
         :rtype:
         """
         text = self.ui.prepend_text.toPlainText() + '\n'
-        my_text_cursor = self.edit_area.textCursor()
-        my_text_cursor.insertText(text)
+        self.edit_area.insertPlainText(text)
 
     def insert_code_snippet_2(self):
 
         text = self.ui.append_text.toPlainText() + '\n'
-        my_text_cursor = self.edit_area.textCursor()
-        my_text_cursor.insertText(text)
+        self.edit_area.insertPlainText(text)
 
     def edit_fcgcode(self, cnc_obj):
         """
@@ -674,13 +770,15 @@ class AppGCodeEditor(QtCore.QObject):
         assert isinstance(cnc_obj, CNCJobObject)
         self.gcode_obj = cnc_obj
 
-        gcode_text = self.gcode_obj.source_file
+        # the code is loaded in segments, it is not joined in one string
+        gcode_text = self.gcode_obj.source_segments
 
         self.set_editor_ui()
         self.build_ui()
 
         # then append the text from GCode to the text editor
         self.ui.gcode_editor_tab.load_text(gcode_text, move_to_start=True, clear_text=True)
+        self.on_text_loaded()
         self.app.inform.emit('[success] %s...' % _('Loaded Machine Code into Code Editor'))
 
     def update_fcgcode(self, edited_obj):
@@ -689,7 +787,7 @@ class AppGCodeEditor(QtCore.QObject):
         :return:
         :rtype:
         """
-        my_gcode = self.ui.gcode_editor_tab.code_editor.toPlainText()
+        my_gcode = TextSegments(self.ui.gcode_editor_tab.text_chunks())
         self.gcode_obj.source_file = my_gcode
         self.deactivate()
 
@@ -714,6 +812,7 @@ class AppGCodeEditor(QtCore.QObject):
                 stream = QtCore.QTextStream(file)
                 self.code_edited = stream.readAll()
                 self.ui.gcode_editor_tab.load_text(self.code_edited, move_to_start=True, clear_text=True)
+                self.on_text_loaded()
                 file.close()
 
     def activate(self):
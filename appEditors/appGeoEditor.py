@@ -16,7 +16,8 @@ from PyQt6.QtCore import Qt
 # import inspect
 import math
 
-from camlib import distance, arc, three_point_circle, Geometry, AppRTreeStorage, flatten_shapely_geometry
+from camlib import distance, arc, three_point_circle, Geometry, AppRTreeStorage, flatten_shapely_geometry, \
+    linear_array_offsets
 from appGUI.GUIElements import FCLabel, GLay, FCDoubleSpinner, FCTree, FCButton, FCFrame, FCCheckBox, FCEntry, \
     FCTextEdit
 from appGUI.VisPyVisuals import ShapeCollection
@@ -1460,6 +1461,7 @@ class AppGeoEditor(QtCore.QObject):
 
     def draw_utility_geometry(self, geo):
         # Add the new utility shape
+        offsets = getattr(geo, 'offsets', None)
         try:
             # this case is for the Font Parse
             w_geo = list(geo.geo.geoms) if isinstance(geo.geo, (MultiPolygon, MultiLineString)) else list(geo.geo)
@@ -1471,7 +1473,8 @@ class AppGeoEditor(QtCore.QObject):
                             color=self.get_draw_color(),
                             update=False,
                             layer=0,
-                            tolerance=None
+                            tolerance=None,
+                            offsets=offsets
                         )
                 elif type(el) == MultiLineString:
                     for linestring in el.geoms:
@@ -1480,7 +1483,8 @@ class AppGeoEditor(QtCore.QObject):
                             color=self.get_draw_color(),
                             update=False,
                             layer=0,
-                            tolerance=None
+                            tolerance=None,
+                            offsets=offsets
                         )
                 else:
                     self.tool_shape.add(
@@ -1488,12 +1492,13 @@ class AppGeoEditor(QtCore.QObject):
                         color=(self.get_draw_color()),
                         update=False,
                         layer=0,
-                        tolerance=None
+                        tolerance=None,
+                        offsets=offsets
                     )
         except TypeError:
             self.tool_shape.add(
                 shape=geo.geo, color=self.get_draw_color(),
-                update=False, layer=0, tolerance=None)
+                update=False, layer=0, tolerance=None, offsets=offsets)
         except AttributeError:
             pass
 
@@ -1961,6 +1966,7 @@ class AppGeoEditor(QtCore.QObject):
                         new_geo = linemerge(new_geo)
                     new_solid_geometry.append(new_geo)
                 fcgeometry.solid_geometry = flatten_shapely_geometry(new_solid_geometry)
+                fcgeometry.invalidate_bounds()
 
                 try:
                     bounds = fcgeometry.bounds()
@@ -2888,10 +2894,24 @@ class DrawToolUtilityShape(DrawToolShape):
     point is clicked and the final geometry is created.
     """
 
-    def __init__(self, geo: (BaseGeometry, list)):
+    def __init__(self, geo: (BaseGeometry, list), offsets=None):
         super(DrawToolUtilityShape, self).__init__(geo=geo)
         self.utility = True
 
+        # when not None, the geometry is drawn at each of these (x, y) offsets (instanced drawing)
+        self.offsets = offsets
+
+    def instances(self) -> list:
+        """
+        The geometry copied at each of the offsets.
+
+        :return:    list of Shapely geometries
+        """
+        geo_list = self.geo if isinstance(self.geo, list) else [self.geo]
+        if self.offsets is None:
+            return geo_list
+        return [translate(geo, xoff=off_x, yoff=off_y) for off_x, off_y in self.offsets for geo in geo_list]
+
 
 class DrawTool(object):
     """
@@ -4953,7 +4973,7 @@ class FCCopy(FCShapeTool):
         if self.copy_tool.ui.mode_radio.get_value() == 'a' and \
                 self.copy_tool.ui.array_type_radio.get_value() == 'circular':
             del self.util_geo.geo[-1]
-        self.geometry = [DrawToolShape(deepcopy(shp)) for shp in self.util_geo.geo]
+        self.geometry = [DrawToolShape(deepcopy(shp)) for shp in self.util_geo.instances()]
 
         self.complete = True
         self.origin = None
@@ -5044,29 +5064,16 @@ class FCCopy(FCShapeTool):
             dx = pos[0]
             dy = pos[1]
 
-        geo_list = []
         self.points = [(dx, dy)]
 
-        for item in range(array_size):
-            if axis == 'X':
-                new_pos = ((dx + (pitch * item)), dy)
-            elif axis == 'Y':
-                new_pos = (dx, (dy + (pitch * item)))
-            else:  # 'A'
-                x_adj = pitch * math.cos(math.radians(linear_angle))
-                y_adj = pitch * math.sin(math.radians(linear_angle))
-                new_pos = ((dx + (x_adj * item)), (dy + (y_adj * item)))
-
-            for g in self.draw_app.get_selected():
-                if static is None or static is False:
-                    geo_list.append(translate(g.geo, xoff=new_pos[0], yoff=new_pos[1]))
-                else:
-                    geo_list.append(g.geo)
+        # the selected shapes are drawn at each of the array positions
+        offsets = linear_array_offsets(array_size, pitch, axis, linear_angle)
+        if static is None or static is False:
+            offsets = offsets + (dx, dy)
 
-        return DrawToolUtilityShape(geo_list)
+        return DrawToolUtilityShape([g.geo for g in self.draw_app.get_selected()], offsets=offsets)
 
     def dd_geo(self, pos):
-        trans_geo = []
         array_2d_type = self.copy_tool.ui.placement_radio.get_value()
 
         rows = self.copy_tool.ui.rows.get_value()
@@ -5100,27 +5107,25 @@ class FCCopy(FCShapeTool):
 
         xmin, ymin, xmax, ymax = geo_bounds(geo_source)
 
-        currentx = pos[0]
-        currenty = pos[1]
-
-        def translate_recursion(geom):
+        def flatten_recursion(geom):
             if type(geom) == list:
                 geoms = []
                 for local_geom in geom:
-                    res_geo = translate_recursion(local_geom)
-                    try:
-                        geoms += res_geo
-                    except TypeError:
-                        geoms.append(res_geo)
+                    geoms += flatten_recursion(local_geom)
                 return geoms
             else:
-                return translate(geom, xoff=currentx, yoff=currenty)
+                return [geom]
+
+        currentx = pos[0]
+        currenty = pos[1]
 
+        # the selected shapes are drawn at each of the array positions
+        offsets = []
         for row in range(rows):
             currentx = pos[0]
 
             for col in range(columns):
-                trans_geo += translate_recursion(geo_source)
+                offsets.append((currentx, currenty))
                 if array_2d_type == 's':  # 'spacing'
                     currentx += (xmax - xmin + spacing_columns)
                 else:   # 'offset'
@@ -5131,7 +5136,7 @@ class FCCopy(FCShapeTool):
             else:   # 'offset;
                 currenty = pos[1] + off_y * (row + 1)    # because 'row' starts from 0 we increment by 1
 
-        return DrawToolUtilityShape(trans_geo)
+        return DrawToolUtilityShape(flatten_recursion(geo_source), offsets=np.array(offsets))
 
     def circular_geo(self, pos):
         if pos[0] is None and pos[1] is None:
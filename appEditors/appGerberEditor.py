@@ -7,7 +7,7 @@
 
 from appEditors.grb_plugins.GrbCommon import DrawToolUtilityShape, DrawToolShape, DrawTool, ShapeToolEditorGrb
 
-from camlib import distance, arc, three_point_circle, flatten_shapely_geometry
+from camlib import distance, arc, three_point_circle, flatten_shapely_geometry, linear_array_offsets
 from appGUI.GUIElements import *
 
 from appTool import AppTool
@@ -605,42 +605,24 @@ class PadArrayEditorGrb(ShapeToolEditorGrb):
                 dx = data[0]
                 dy = data[1]
 
-            geo_el_list = []
-            geo_el = {}
             self.points = [dx, dy]
 
-            for item in range(self.pad_array_size):
-                if self.pad_array_dir == 'X':
-                    geo_el = self.util_shape(((dx + (self.pad_pitch * item)), dy))
-                if self.pad_array_dir == 'Y':
-                    geo_el = self.util_shape((dx, (dy + (self.pad_pitch * item))))
-                if self.pad_array_dir == 'A':
-                    x_adj = self.pad_pitch * math.cos(math.radians(self.pad_linear_angle))
-                    y_adj = self.pad_pitch * math.sin(math.radians(self.pad_linear_angle))
-                    geo_el = self.util_shape(
-                        ((dx + (x_adj * item)), (dy + (y_adj * item)))
-                    )
-
-                if static is None or static is False:
-                    new_geo_el = {}
-
-                    if 'solid' in geo_el:
-                        new_geo_el['solid'] = translate(
-                            geo_el['solid'], xoff=(dx - self.last_dx), yoff=(dy - self.last_dy)
-                        )
-                    if 'follow' in geo_el:
-                        new_geo_el['follow'] = translate(
-                            geo_el['follow'], xoff=(dx - self.last_dx), yoff=(dy - self.last_dy)
-                        )
-                    geo_el_list.append(new_geo_el)
-
-                else:
-                    geo_el_list.append(geo_el)
+            # the pad is made once and it is drawn at each of the array positions
+            geo_el = self.util_shape((dx, dy))
+            if geo_el is None:
+                return
+            if static is None or static is False:
+                geo_el = {
+                    key: translate(geo_el[key], xoff=(dx - self.last_dx), yoff=(dy - self.last_dy))
+                    for key in ('solid', 'follow') if key in geo_el
+                }
             # self.origin = data
 
             self.last_dx = dx
             self.last_dy = dy
-            return DrawToolUtilityShape(geo_el_list)
+            return DrawToolUtilityShape(
+                [geo_el], offsets=linear_array_offsets(self.pad_array_size, self.pad_pitch, self.pad_array_dir,
+                                                       self.pad_linear_angle))
         elif self.array_type == 'circular':  # 'Circular'
             if data[0] is None and data[1] is None:
                 cdx = self.draw_app.x
@@ -6101,6 +6083,7 @@ class AppGerberEditor(QtCore.QObject):
     def draw_utility_geometry(self, geo_shape):
         # it's a DrawToolShape therefore it stores his geometry in the geo attribute
         geometry = geo_shape.geo
+        offsets = getattr(geo_shape, 'offsets', None)
 
         try:
             for el in geometry:
@@ -6109,7 +6092,7 @@ class AppGerberEditor(QtCore.QObject):
                 self.tool_shape.add(
                     shape=geometric_data, color=self.get_draw_color(),
                     # face_color=self.app.options['global_alt_sel_fill'],
-                    update=False, layer=0, tolerance=None
+                    update=False, layer=0, tolerance=None, offsets=offsets
                 )
         except TypeError:
             geometric_data = geometry['solid']
@@ -6118,7 +6101,7 @@ class AppGerberEditor(QtCore.QObject):
                 shape=geometric_data,
                 color=self.get_draw_color(),
                 # face_color=self.app.options['global_alt_sel_fill'],
-                update=False, layer=0, tolerance=None
+                update=False, layer=0, tolerance=None, offsets=offsets
             )
 
         self.tool_shape.redraw()
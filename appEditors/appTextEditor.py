@@ -7,13 +7,14 @@
 
 from PyQt6 import QtPrintSupport, QtWidgets, QtCore, QtGui
 from appGUI.GUIElements import FCFileSaveDialog, FCEntry, FCTextAreaExtended, FCTextAreaLineNumber, FCButton, \
-    FCCheckBox, FCMessageBox
+    FCCheckBox, FCMessageBox, FCLargeTextArea
 
 from reportlab.platypus import SimpleDocTemplate, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch, mm
 
 # from io import StringIO
+from itertools import chain
 
 import gettext
 import appTranslation as fcTranslate
@@ -77,6 +78,11 @@ class AppTextEditor(QtWidgets.QWidget):
 
         self.code_editor.setStyleSheet(stylesheet)
 
+        # the text area used for the texts with more lines than set in Preferences; created when first needed
+        self.plain_editor = self.code_editor
+        self.large_editor = None
+        self.large_mode = False
+
         if text:
             self.code_editor.setPlainText(text)
 
@@ -200,18 +206,84 @@ class AppTextEditor(QtWidgets.QWidget):
         self.buttonSave.setStyleSheet("QToolButton {color: red;}")
         self.buttonSave.setIcon(QtGui.QIcon(self.app.resource_location + '/save_as_red.png'))
 
+    def set_large_mode(self, enable):
+        """
+        Show the text in the large text area, that paints only the visible lines, or in the usual text area.
+
+        :param enable:  True to use the large text area
+        :return:        None
+        """
+        if enable == self.large_mode:
+            return
+
+        if enable:
+            if self.large_editor is None:
+                self.large_editor = FCLargeTextArea(theme=self.app.options['global_theme'])
+                self.work_editor_layout.addWidget(self.large_editor, 0, 0, 1, 5)
+            self.plain_editor.clear()
+            self.editor_class.hide()
+            self.large_editor.show()
+            self.code_editor = self.large_editor
+        else:
+            self.large_editor.clear()
+            self.large_editor.hide()
+            self.editor_class.show()
+            self.code_editor = self.plain_editor
+        self.large_mode = enable
+
+        # printing needs a QTextDocument with the whole text
+        self.buttonPrint.setVisible(not enable)
+        self.buttonPreview.setVisible(not enable)
+
+    def text_chunks(self):
+        """
+        :return:    iterable of strings, the text in the editor; in the large mode the text is not joined
+        """
+        if self.large_mode:
+            return self.code_editor.chunks()
+        return [self.code_editor.toPlainText()]
+
     def load_text(self, text, move_to_start=False, move_to_end=False, clear_text=True, as_html=False):
+        """
+        :param text:            the text to be loaded: a string or an object with a chunks() method, like TextSegments
+        :param move_to_start:   move the cursor at the start of the text
+        :param move_to_end:     move the cursor at the end of the text
+        :param clear_text:      clear the previous text
+        :param as_html:         the text is HTML
+        :return:                None
+        """
         try:
             self.code_editor.textChanged.disconnect()
         except (AttributeError, TypeError):
             pass
+
+        chunks = iter(text.chunks()) if hasattr(text, 'chunks') else iter([text])
+        if self.plain_text and as_html is False:
+            # the texts with many lines are shown in the large text area; the chunks are read only until the text is
+            # known to be large, the rest of them are read by the large text area as it loads them
+            max_lines = self.app.options['global_large_text_lines']
+            head = []
+            line_count = 0
+            if max_lines > 0:
+                for chunk in chunks:
+                    head.append(chunk)
+                    line_count += chunk.count('\n') if chunk else 0
+                    if line_count > max_lines:
+                        break
+            chunks = chain(head, chunks)
+            self.set_large_mode(0 < max_lines < line_count)
+        if not self.large_mode and hasattr(text, 'chunks'):
+            text = ''.join(chunks)
+
         if clear_text:
             # first clear previous text in text editor (if any)
             self.code_editor.clear()
 
         self.code_editor.setReadOnly(False)
         try:
-            if as_html is False:
+            if self.large_mode:
+                self.code_editor.load_chunks(chunks)
+            elif as_html is False:
                 self.code_editor.setPlainText(text)
             else:
                 if isinstance(self.code_editor, QtWidgets.QTextEdit):
@@ -245,7 +317,7 @@ class AppTextEditor(QtWidgets.QWidget):
             if file.open(QtCore.QIODevice.OpenModeFlag.ReadOnly):
                 stream = QtCore.QTextStream(file)
                 self.code_edited = stream.readAll()
-                self.code_editor.setPlainText(self.code_edited)
+                self.load_text(self.code_edited, move_to_start=True)
                 file.close()
 
     def handleSaveGCode(self, name=None, filt=None, callback=None):
@@ -283,8 +355,8 @@ class AppTextEditor(QtWidgets.QWidget):
             return
         else:
             try:
-                my_gcode = self.code_editor.toPlainText()
                 if filename.rpartition('.')[2].lower() == 'pdf':
+                    my_gcode = self.code_editor.toPlainText()
                     page_size = (
                         self.app.plotcanvas.pagesize_dict[self.app.options['global_workspaceT']][0] * mm,
                         self.app.plotcanvas.pagesize_dict[self.app.options['global_workspaceT']][1] * mm
@@ -325,8 +397,8 @@ class AppTextEditor(QtWidgets.QWidget):
                     )
                 else:
                     with open(filename, 'w') as f:
-                        for line in my_gcode:
-                            f.write(line)
+                        for chunk in self.text_chunks():
+                            f.write(chunk)
                 self.buttonSave.setStyleSheet("")
                 self.buttonSave.setIcon(QtGui.QIcon(self.app.resource_location + '/save_as.png'))
             except FileNotFoundError:
@@ -380,6 +452,14 @@ class AppTextEditor(QtWidgets.QWidget):
         old = self.entryFind.get_value()
         new = self.entryReplace.get_value()
 
+        if self.large_mode:
+            if self.sel_all_cb.isChecked():
+                self.code_editor.replace_all(str(old), new)
+                self.code_editor.moveCursor(QtGui.QTextCursor.MoveOperation.Start)
+            elif self.code_editor.has_selection():
+                self.code_editor.insertPlainText(new)
+            return
+
         if self.sel_all_cb.isChecked():
             while True:
                 cursor = self.code_editor.textCursor()
@@ -406,6 +486,11 @@ class AppTextEditor(QtWidgets.QWidget):
             cursor.endEditBlock()
 
     def on_text_changed(self, txt):
+        if self.large_mode:
+            # only the occurrences in the visible lines are highlighted
+            self.code_editor.set_find_highlight(str(txt))
+            return
+
         extra_sel_list = []
         flags = QtGui.QTextDocument.FindFlag.FindCaseSensitively
         self.code_editor.moveCursor(QtGui.QTextCursor.MoveOperation.Start)
@@ -5,6 +5,7 @@
 
 from PyQt6.QtCore import Qt
 from shapely import MultiLineString, Polygon
+from shapely.affinity import translate
 
 import numpy as np
 
@@ -77,10 +78,27 @@ class DrawToolUtilityShape(DrawToolShape):
     point is clicked and the final geometry is created.
     """
 
-    def __init__(self, geo=None):
+    def __init__(self, geo=None, offsets=None):
         super(DrawToolUtilityShape, self).__init__(geo=geo)
         self.utility = True
 
+        # when not None, the geometry is drawn at each of these (x, y) offsets (instanced drawing)
+        self.offsets = offsets
+
+    def instances(self) -> list:
+        """
+        The geometry elements copied at each of the offsets.
+
+        :return:    list of dicts with the 'solid' and 'follow' keys
+        """
+        geo_list = self.geo if isinstance(self.geo, list) else [self.geo]
+        if self.offsets is None:
+            return geo_list
+        return [
+            {key: translate(geo, xoff=off_x, yoff=off_y) for key, geo in geo_el.items()}
+            for off_x, off_y in self.offsets for geo_el in geo_list
+        ]
+
 
 class DrawTool(object):
     """
@@ -24,6 +24,8 @@ import sys
 import inspect
 from typing import Callable
 
+from appCommon.PieceTable import PieceTable
+
 import gettext
 import appTranslation as fcTranslate
 import builtins
@@ -5570,6 +5572,689 @@ class FCTextAreaLineNumber(QtWidgets.QFrame):
         self.edit.setLineWrapMode(mode)
 
 
+class FCLargeTextArea(QtWidgets.QAbstractScrollArea):
+    """
+    Text area for large texts, like the machine code of a CNCJob with millions of lines.
+    The text is held in a PieceTable and only the visible lines are read, highlighted and painted; the scrolling is done
+    in lines. Edits are done in the PieceTable, without copying the text.
+    It has the methods of the QPlainTextEdit that are used by the AppTextEditor.
+    """
+    textChanged = QtCore.pyqtSignal()
+    cursorPositionChanged = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None, theme='default', highlight_rules=None):
+        super().__init__(parent)
+
+        self.theme = theme if theme else 'default'
+        self.model = PieceTable()
+
+        self.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.setFrameStyle(QtWidgets.QFrame.Shape.NoFrame)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+
+        self.read_only = False
+        # kept for compatibility with FCPlainTextAreaExtended; there is no completer
+        self.completer_enable = False
+
+        # the cursor and the selection are positions in the text
+        self.cursor_pos = 0
+        self.anchor_pos = 0
+        # the column kept when the cursor moves up and down
+        self.goal_column = None
+
+        # the occurrences of this text are highlighted in the visible lines
+        self.find_text = ''
+        # list of (start, end) positions of text that is underlined
+        self.marked_ranges = []
+        # the longest line painted so far, in characters; sets the range of the horizontal scrollbar
+        self.max_columns = 0
+
+        # the highlighting rules of the FCTextAreaLineNumber; they are applied only to the visible lines
+        if highlight_rules is None:
+            self.highlighter = FCTextAreaLineNumber.PlainTextEdit.MyHighlighter(parent=self, theme=self.theme)
+            highlight_rules = self.highlighter.highlightingRules
+        self.highlight_rules = highlight_rules
+
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+        # create the context menu
+        self.menu = QtWidgets.QMenu()
+
+        self.undo_action = QAction('%s\t%s' % (_("Undo"), _('Ctrl+Z')), self)
+        self.menu.addAction(self.undo_action)
+        self.undo_action.triggered.connect(self.undo)
+
+        self.redo_action = QAction('%s\t%s' % (_("Redo"), _('Ctrl+Y')), self)
+        self.menu.addAction(self.redo_action)
+        self.redo_action.triggered.connect(self.redo)
+
+        self.menu.addSeparator()
+
+        self.cut_action = QAction('%s\t%s' % (_("Cut"), _('Ctrl+X')), self)
+        self.menu.addAction(self.cut_action)
+        self.cut_action.triggered.connect(self.cut_text)
+
+        self.copy_action = QAction('%s\t%s' % (_("Copy"), _('Ctrl+C')), self)
+        self.menu.addAction(self.copy_action)
+        self.copy_action.triggered.connect(self.copy_text)
+
+        self.paste_action = QAction('%s\t%s' % (_("Paste"), _('Ctrl+V')), self)
+        self.menu.addAction(self.paste_action)
+        self.paste_action.triggered.connect(self.paste_text)
+
+        self.delete_action = QAction('%s\t%s' % (_("Delete"), _('Del')), self)
+        self.menu.addAction(self.delete_action)
+        self.delete_action.triggered.connect(self.delete_text)
+
+        self.menu.addSeparator()
+
+        self.sel_all_action = QAction('%s\t%s' % (_("Select All"), _('Ctrl+A')), self)
+        self.menu.addAction(self.sel_all_action)
+        self.sel_all_action.triggered.connect(self.selectAll)
+
+        self.goto_action = QAction('%s\t%s' % (_("Go to Line"), _('Ctrl+G')), self)
+        self.menu.addAction(self.goto_action)
+        self.goto_action.triggered.connect(self.on_goto_line)
+
+    # #################################################################################################################
+    # Text
+    # #################################################################################################################
+    def setPlainText(self, text):
+        self.load_chunks([text] if text else [])
+
+    def load_chunks(self, chunks):
+        """
+        Replace the text. The chunks are kept as they are, they are not joined.
+
+        :param chunks:  iterable of strings, e.g. the chunks of a TextSegments object
+        :return:        None
+        """
+        self.model.load(chunks)
+        self.cursor_pos = 0
+        self.anchor_pos = 0
+        self.goal_column = None
+        self.marked_ranges = []
+        self.max_columns = 0
+        self.verticalScrollBar().setValue(0)
+        self.horizontalScrollBar().setValue(0)
+        self._text_changed()
+
+    def toPlainText(self):
+        return self.model.text()
+
+    def chunks(self):
+        """
+        :return:    generator of the text, piece by piece; used to save the text without joining it
+        """
+        return self.model.chunks()
+
+    def clear(self):
+        self.load_chunks([])
+
+    def setReadOnly(self, val):
+        self.read_only = bool(val)
+
+    def isReadOnly(self):
+        return self.read_only
+
+    def isModified(self):
+        return self.model.modified
+
+    def set_model_data(self, keyword_list):
+        # there is no completer
+        pass
+
+    def set_value(self, val):
+        self.setPlainText(val)
+
+    def get_value(self):
+        return self.toPlainText()
+
+    def line_count(self):
+        return self.model.line_count()
+
+    # #################################################################################################################
+    # Cursor and selection
+    # #################################################################################################################
+    def selection_range(self):
+        """
+        :return:    (start, end) positions of the selection; they are equal when there is no selection
+        """
+        return min(self.cursor_pos, self.anchor_pos), max(self.cursor_pos, self.anchor_pos)
+
+    def has_selection(self):
+        return self.cursor_pos != self.anchor_pos
+
+    def selectedText(self):
+        start, end = self.selection_range()
+        return self.model.text(start, end)
+
+    def set_cursor(self, pos, keep_anchor=False, keep_column=False):
+        """
+        Move the cursor.
+
+        :param pos:             the new position of the cursor
+        :param keep_anchor:     if True the selection is extended to the new position
+        :param keep_column:     if True the column used by the up and down moves is kept
+        :return:                None
+        """
+        self.cursor_pos = min(max(pos, 0), len(self.model))
+        if not keep_anchor:
+            self.anchor_pos = self.cursor_pos
+        if not keep_column:
+            self.goal_column = None
+        self.ensure_visible(self.cursor_pos)
+        self.viewport().update()
+        self.cursorPositionChanged.emit()
+
+    def select_range(self, start, end):
+        """
+        Select the text between two positions and scroll to it.
+
+        :param start:   start position
+        :param end:     end position
+        :return:        None
+        """
+        self.anchor_pos = min(max(start, 0), len(self.model))
+        self.set_cursor(end, keep_anchor=True)
+        self.ensure_visible(self.anchor_pos)
+
+    def selectAll(self):
+        self.anchor_pos = 0
+        self.cursor_pos = len(self.model)
+        self.viewport().update()
+        self.cursorPositionChanged.emit()
+
+    def set_marked_ranges(self, ranges):
+        """
+        :param ranges:  list of (start, end) positions of the text to be underlined
+        :return:        None
+        """
+        self.marked_ranges = list(ranges)
+        self.viewport().update()
+
+    def set_find_highlight(self, text):
+        """
+        :param text:    the occurrences of this text are highlighted; empty string to remove the highlight
+        :return:        None
+        """
+        self.find_text = text
+        self.viewport().update()
+
+    def moveCursor(self, operation, mode=QTextCursor.MoveMode.MoveAnchor):
+        keep_anchor = mode == QTextCursor.MoveMode.KeepAnchor
+        line = self.model.line_of(self.cursor_pos)
+        ops = QTextCursor.MoveOperation
+        if operation == ops.Start:
+            self.set_cursor(0, keep_anchor)
+        elif operation == ops.End:
+            self.set_cursor(len(self.model), keep_anchor)
+        elif operation in (ops.StartOfLine, ops.StartOfBlock):
+            self.set_cursor(self.model.line_start(line), keep_anchor)
+        elif operation in (ops.EndOfLine, ops.EndOfBlock):
+            self.set_cursor(self.model.line_end(line), keep_anchor)
+        elif operation in (ops.Left, ops.PreviousCharacter):
+            self.set_cursor(self.cursor_pos - 1, keep_anchor)
+        elif operation in (ops.Right, ops.NextCharacter):
+            self.set_cursor(self.cursor_pos + 1, keep_anchor)
+        elif operation in (ops.Up, ops.PreviousBlock):
+            self._move_lines(-1, keep_anchor)
+        elif operation in (ops.Down, ops.NextBlock):
+            self._move_lines(1, keep_anchor)
+
+    def _move_lines(self, count, keep_anchor):
+        line = self.model.line_of(self.cursor_pos)
+        if self.goal_column is None:
+            self.goal_column = self.cursor_pos - self.model.line_start(line)
+        new_line = min(max(line + count, 0), self.model.line_count() - 1)
+        start = self.model.line_start(new_line)
+        pos = min(start + self.goal_column, self.model.line_end(new_line))
+        self.set_cursor(pos, keep_anchor, keep_column=True)
+
+    def goto_line(self, line):
+        """
+        Move the cursor to the start of a line and scroll the line in the middle of the view.
+
+        :param line:    line number, starting from 1
+        :return:        None
+        """
+        line = min(max(int(line) - 1, 0), self.model.line_count() - 1)
+        self.verticalScrollBar().setValue(line - self._visible_lines() // 2)
+        self.set_cursor(self.model.line_start(line))
+
+    def on_goto_line(self):
+        dia_box = FCInputSpinner(title=_("Go to Line"), text='%s:' % _("Line"), min=1,
+                                 max=self.model.line_count(), decimals=0, step=1,
+                                 init_val=self.model.line_of(self.cursor_pos) + 1)
+        val, ok = dia_box.get_value()
+        if ok:
+            self.goto_line(val)
+
+    def find(self, text, flags=None):
+        """
+        Search the text starting from the cursor and select the found occurrence.
+
+        :param text:    the string searched
+        :param flags:   QtGui.QTextDocument.FindFlag; FindCaseSensitively and FindBackward are used
+        :return:        True if the text was found
+        """
+        find_flags = QtGui.QTextDocument.FindFlag
+        case_sensitive = flags is not None and bool(flags & find_flags.FindCaseSensitively)
+        start, end = self.selection_range()
+        if flags is not None and flags & find_flags.FindBackward:
+            found = self.model.rfind(text, 0, start, case_sensitive=case_sensitive)
+        else:
+            found = self.model.find(text, end, case_sensitive=case_sensitive)
+        if found == -1:
+            return False
+        self.select_range(found, found + len(text))
+        return True
+
+    # #################################################################################################################
+    # Editing
+    # #################################################################################################################
+    def insertPlainText(self, text):
+        """
+        Replace the selection, or insert at the cursor, the text.
+
+        :param text:    string
+        :return:        None
+        """
+        if self.read_only:
+            return
+        start, end = self.selection_range()
+        self.model.replace(start, end - start, text)
+        self.anchor_pos = self.cursor_pos = start + len(text)
+        self.goal_column = None
+        self._text_changed()
+
+    def replace_all(self, old, new, case_sensitive=True):
+        """
+        :param old:             the string replaced
+        :param new:             the new string
+        :param case_sensitive:  if False the case of the letters is ignored
+        :return:                number of replaced occurrences
+        """
+        if self.read_only:
+            return 0
+        count = self.model.replace_all(old, new, case_sensitive=case_sensitive)
+        if count:
+            self.anchor_pos = self.cursor_pos = min(self.cursor_pos, len(self.model))
+            self._text_changed()
+        return count
+
+    def _delete(self, forward):
+        if self.read_only:
+            return
+        start, end = self.selection_range()
+        if start == end:
+            if forward:
+                end = min(end + 1, len(self.model))
+            else:
+                start = max(start - 1, 0)
+        if start != end:
+            self.model.delete(start, end - start)
+            self.anchor_pos = self.cursor_pos = start
+            self.goal_column = None
+            self._text_changed()
+
+    def undo(self):
+        if not self.read_only and self.model.undo():
+            self.anchor_pos = self.cursor_pos = min(self.cursor_pos, len(self.model))
+            self._text_changed()
+
+    def redo(self):
+        if not self.read_only and self.model.redo():
+            self.anchor_pos = self.cursor_pos = min(self.cursor_pos, len(self.model))
+            self._text_changed()
+
+    def cut_text(self):
+        self.copy_text()
+        if self.has_selection():
+            self._delete(forward=True)
+
+    def copy_text(self):
+        if self.has_selection():
+            clipboard = QtWidgets.QApplication.clipboard()
+            clipboard.clear()
+            clipboard.setText(self.selectedText())
+
+    def paste_text(self):
+        self.insertPlainText(QtWidgets.QApplication.clipboard().text())
+
+    def delete_text(self):
+        self._delete(forward=True)
+
+    def add_action_to_context_menu(self, text, shortcut='', icon=None, callback=lambda: None, separator=None):
+        if separator == 'before':
+            self.menu.addSeparator()
+
+        if icon is None:
+            new_action = QAction('%s\t%s' % (text, shortcut), self)
+        else:
+            new_action = QAction(icon, '%s\t%s' % (text, shortcut), self)
+        self.menu.addAction(new_action)
+        new_action.triggered.connect(lambda: callback())
+
+        if separator == 'after':
+            self.menu.addSeparator()
+
+    def _text_changed(self):
+        self._update_scrollbars()
+        self.ensure_visible(self.cursor_pos)
+        self.viewport().update()
+        self.textChanged.emit()
+        self.cursorPositionChanged.emit()
+
+    # #################################################################################################################
+    # Layout
+    # #################################################################################################################
+    def _line_height(self):
+        return self.fontMetrics().lineSpacing()
+
+    def _char_width(self):
+        return self.fontMetrics().horizontalAdvance('0')
+
+    def _visible_lines(self):
+        return max(self.viewport().height() // self._line_height(), 1)
+
+    def _gutter_width(self):
+        # three spaces added to the width of the largest line number, as in the FCTextAreaLineNumber
+        return self.fontMetrics().horizontalAdvance(' %d  ' % self.model.line_count())
+
+    def _text_x(self):
+        # x of the first column of the text
+        return self._gutter_width() + 4 - self.horizontalScrollBar().value()
+
+    def _update_scrollbars(self):
+        visible = self._visible_lines()
+        v_bar = self.verticalScrollBar()
+        v_bar.setRange(0, max(self.model.line_count() - visible, 0))
+        v_bar.setPageStep(visible)
+        v_bar.setSingleStep(1)
+
+        h_bar = self.horizontalScrollBar()
+        text_width = self.viewport().width() - self._gutter_width() - 4
+        h_bar.setRange(0, max((self.max_columns + 1) * self._char_width() - text_width, 0))
+        h_bar.setPageStep(max(text_width, 1))
+        h_bar.setSingleStep(self._char_width())
+
+    def ensure_visible(self, pos):
+        """
+        Scroll so the position is visible.
+
+        :param pos:     position in the text
+        :return:        None
+        """
+        line = self.model.line_of(pos)
+        v_bar = self.verticalScrollBar()
+        visible = self._visible_lines()
+        if line < v_bar.value():
+            v_bar.setValue(line)
+        elif line >= v_bar.value() + visible:
+            v_bar.setValue(line - visible + 1)
+
+        column = pos - self.model.line_start(line)
+        if column > self.max_columns:
+            self.max_columns = column
+            self._update_scrollbars()
+        h_bar = self.horizontalScrollBar()
+        x = column * self._char_width()
+        text_width = self.viewport().width() - self._gutter_width() - 4
+        if x < h_bar.value():
+            h_bar.setValue(x)
+        elif x > h_bar.value() + text_width - self._char_width():
+            h_bar.setValue(x - text_width + self._char_width())
+
+    def position_at(self, point):
+        """
+        :param point:   QPoint in the viewport
+        :return:        the position in the text that is the closest to the point
+        """
+        line = self.verticalScrollBar().value() + max(point.y(), 0) // self._line_height()
+        line = min(line, self.model.line_count() - 1)
+        start = self.model.line_start(line)
+        column = max(round((point.x() - self._text_x()) / self._char_width()), 0)
+        return min(start + column, self.model.line_end(line))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    # #################################################################################################################
+    # Painting
+    # #################################################################################################################
+    def _line_formats(self, text):
+        # list of (start, end, QTextCharFormat) runs; as in MyHighlighter.highlightBlock() the first rules win
+        formats = [None] * len(text)
+        for expression, fmt in self.highlight_rules[::-1]:
+            matches = expression.globalMatch(text)
+            while matches.hasNext():
+                match = matches.next()
+                start = match.capturedStart(0)
+                length = match.capturedLength(0)
+                formats[start:start + length] = [fmt] * length
+
+        runs = []
+        run_start = 0
+        for idx in range(1, len(text) + 1):
+            if idx == len(text) or formats[idx] is not formats[run_start]:
+                runs.append((run_start, idx, formats[run_start]))
+                run_start = idx
+        return runs
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self.viewport())
+        palette = self.palette()
+        font_metrics = self.fontMetrics()
+        line_height = self._line_height()
+        char_width = self._char_width()
+        gutter = self._gutter_width()
+        text_x = self._text_x()
+        width = self.viewport().width()
+
+        painter.fillRect(event.rect(), palette.base())
+
+        first = self.verticalScrollBar().value()
+        lines = self.model.lines(first, self._visible_lines() + 1)
+        # only the visible columns are highlighted and painted
+        last_column = (self.horizontalScrollBar().value() + width) // char_width + 1
+
+        cursor_line = self.model.line_of(self.cursor_pos)
+        sel_start, sel_end = self.selection_range()
+        default_pen = palette.text().color()
+        normal_font = QtGui.QFont(self.font())
+        bold_font = QtGui.QFont(self.font())
+        bold_font.setBold(True)
+
+        painter.setClipRect(QtCore.QRect(gutter, 0, width - gutter, self.viewport().height()))
+        line_start = self.model.line_start(first)
+        max_columns = self.max_columns
+        for idx, line_text in enumerate(lines):
+            line_no = first + idx
+            top = idx * line_height
+            line_end = line_start + len(line_text)
+            max_columns = max(max_columns, len(line_text))
+            shown = line_text[:last_column].replace('\t', ' ')
+
+            if line_no == cursor_line:
+                painter.fillRect(QtCore.QRect(gutter, top, width - gutter, line_height), palette.alternateBase())
+
+            # selection; the end of line is selected when the selection continues on the next line
+            s_col = max(sel_start, line_start) - line_start
+            e_col = min(sel_end, line_end + 1) - line_start
+            if e_col > s_col:
+                painter.fillRect(QtCore.QRect(text_x + s_col * char_width, top, (e_col - s_col) * char_width,
+                                              line_height), palette.highlight())
+
+            # occurrences of the searched text
+            if self.find_text:
+                found = shown.find(self.find_text)
+                while found != -1:
+                    painter.fillRect(QtCore.QRect(text_x + found * char_width, top,
+                                                  len(self.find_text) * char_width, line_height),
+                                     QtCore.Qt.GlobalColor.yellow)
+                    found = shown.find(self.find_text, found + len(self.find_text))
+
+            baseline = top + font_metrics.ascent()
+            for run_start, run_end, fmt in self._line_formats(shown):
+                if fmt is not None and fmt.foreground().style() != Qt.BrushStyle.NoBrush:
+                    painter.setPen(fmt.foreground().color())
+                else:
+                    painter.setPen(default_pen)
+                is_bold = fmt is not None and fmt.fontWeight() > QtGui.QFont.Weight.Normal.value
+                painter.setFont(bold_font if is_bold else normal_font)
+                painter.drawText(text_x + run_start * char_width, baseline, shown[run_start:run_end])
+
+            # underlined ranges
+            for m_start, m_end in self.marked_ranges:
+                s_col = max(m_start, line_start) - line_start
+                e_col = min(m_end, line_end) - line_start
+                if e_col > s_col:
+                    painter.setPen(default_pen)
+                    y = baseline + font_metrics.underlinePos()
+                    painter.drawLine(text_x + s_col * char_width, y, text_x + e_col * char_width, y)
+
+            if line_no == cursor_line and self.hasFocus():
+                x = text_x + (self.cursor_pos - line_start) * char_width
+                painter.setPen(default_pen)
+                painter.drawLine(x, top, x, top + line_height - 1)
+
+            line_start = line_end + 1
+
+        if max_columns > self.max_columns:
+            self.max_columns = max_columns
+            self._update_scrollbars()
+
+        # line numbers, as in the FCTextAreaLineNumber
+        painter.setClipping(False)
+        painter.fillRect(QtCore.QRect(0, 0, gutter, self.viewport().height()), QtCore.Qt.GlobalColor.lightGray)
+        for idx in range(len(lines)):
+            line_no = first + idx
+            if line_no == cursor_line:
+                painter.setFont(bold_font)
+                painter.setPen(QtCore.Qt.GlobalColor.blue)
+            else:
+                painter.setFont(normal_font)
+                painter.setPen(palette.base().color())
+            paint_rect = QtCore.QRect(0, idx * line_height, gutter, line_height)
+            painter.drawText(paint_rect, Qt.AlignmentFlag.AlignRight, ' %d  ' % (line_no + 1))
+
+        painter.end()
+
+    # #################################################################################################################
+    # Events
+    # #################################################################################################################
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            keep_anchor = bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier)
+            self.set_cursor(self.position_at(event.position().toPoint()), keep_anchor)
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            # ensure_visible() scrolls the view when the mouse is dragged outside it
+            self.set_cursor(self.position_at(event.position().toPoint()), keep_anchor=True)
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+        pos = self.position_at(event.position().toPoint())
+        line = self.model.line_of(pos)
+        line_start = self.model.line_start(line)
+        line_text = self.model.line(line)
+        column = pos - line_start
+        for match in re.finditer(r'\w+', line_text):
+            if match.start() <= column <= match.end():
+                self.select_range(line_start + match.start(), line_start + match.end())
+                break
+
+    def wheelEvent(self, event):
+        lines = -event.angleDelta().y() // 40
+        if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+            h_bar = self.horizontalScrollBar()
+            h_bar.setValue(h_bar.value() + lines * 3 * self._char_width())
+        else:
+            v_bar = self.verticalScrollBar()
+            v_bar.setValue(v_bar.value() + lines)
+        event.accept()
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.viewport().update()
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        self.viewport().update()
+
+    def contextMenuEvent(self, event):
+        editable = not self.read_only
+        self.undo_action.setDisabled(not (editable and self.model.undo_stack))
+        self.redo_action.setDisabled(not (editable and self.model.redo_stack))
+        self.cut_action.setDisabled(not (editable and self.has_selection()))
+        self.copy_action.setDisabled(not self.has_selection())
+        self.paste_action.setDisabled(not editable)
+        self.delete_action.setDisabled(not editable)
+        self.menu.exec(event.globalPos())
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        modifiers = event.modifiers()
+        shift = bool(modifiers & Qt.KeyboardModifier.ShiftModifier)
+        ctrl = bool(modifiers & Qt.KeyboardModifier.ControlModifier)
+        std_key = QKeySequence.StandardKey
+
+        if event.matches(std_key.SelectAll):
+            self.selectAll()
+        elif event.matches(std_key.Copy):
+            self.copy_text()
+        elif event.matches(std_key.Cut):
+            self.cut_text()
+        elif event.matches(std_key.Paste):
+            self.paste_text()
+        elif event.matches(std_key.Undo):
+            self.undo()
+        elif event.matches(std_key.Redo):
+            self.redo()
+        elif ctrl and key == Qt.Key.Key_G:
+            self.on_goto_line()
+        elif key == Qt.Key.Key_Left:
+            self.set_cursor(self.cursor_pos - 1, shift)
+        elif key == Qt.Key.Key_Right:
+            self.set_cursor(self.cursor_pos + 1, shift)
+        elif key == Qt.Key.Key_Up:
+            self._move_lines(-1, shift)
+        elif key == Qt.Key.Key_Down:
+            self._move_lines(1, shift)
+        elif key == Qt.Key.Key_PageUp:
+            self._move_lines(-self._visible_lines(), shift)
+        elif key == Qt.Key.Key_PageDown:
+            self._move_lines(self._visible_lines(), shift)
+        elif key == Qt.Key.Key_Home:
+            self.moveCursor(QTextCursor.MoveOperation.Start if ctrl else QTextCursor.MoveOperation.StartOfLine,
+                            QTextCursor.MoveMode.KeepAnchor if shift else QTextCursor.MoveMode.MoveAnchor)
+        elif key == Qt.Key.Key_End:
+            self.moveCursor(QTextCursor.MoveOperation.End if ctrl else QTextCursor.MoveOperation.EndOfLine,
+                            QTextCursor.MoveMode.KeepAnchor if shift else QTextCursor.MoveMode.MoveAnchor)
+        elif key == Qt.Key.Key_Backspace:
+            self._delete(forward=False)
+        elif key == Qt.Key.Key_Delete:
+            self._delete(forward=True)
+        elif key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.insertPlainText('\n')
+        elif event.text() and event.text().isprintable() and not ctrl:
+            self.insertPlainText(event.text())
+        elif key == Qt.Key.Key_Tab:
+            self.insertPlainText('\t')
+        else:
+            super().keyPressEvent(event)
+
+
 class FCFileSaveDialog(QtWidgets.QFileDialog):
 
     def __init__(self, *args):
@@ -15,6 +15,7 @@ from PyQt6.QtCore import pyqtSignal
 from descartes.patch import PolygonPatch
 
 from shapely import Polygon, LineString, LinearRing
+from shapely.affinity import translate
 
 from copy import deepcopy
 
@@ -1338,7 +1339,7 @@ class ShapeCollectionLegacy:
 
     def add(self, shape=None, color=None, face_color=None, alpha=None, visible=True,
             update=False, layer=1, tolerance=0.01, obj=None, gcode_parsed=None, tool_tolerance=None, tooldia=None,
-            linewidth=None):
+            linewidth=None, offsets=None):
         """
         This function will add shapes to the shape collection
 
@@ -1355,8 +1356,13 @@ class ShapeCollectionLegacy:
         :param tool_tolerance:  just for compatibility with VIsPy canvas
         :param tooldia:         tool diameter
         :param linewidth:       the width of the line
+        :param offsets:         offsets of the instances of the shape; here the shape is copied at each offset
         :return:
         """
+        if offsets is not None and len(offsets) > 0:
+            shape = [translate(sh, xoff=off_x, yoff=off_y)
+                     for sh in (shape if isinstance(shape, list) else [shape]) for off_x, off_y in offsets]
+
         self._color = color if color is not None else "#006E20"
         # self._face_color = face_color if face_color is not None else "#BBF268"
         self._face_color = face_color
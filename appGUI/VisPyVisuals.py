@@ -15,6 +15,38 @@ import threading
 import numpy as np
 from appGUI.VisPyTesselators import GLUTess
 
+try:
+    from vispy.visuals import InstancedMeshVisual
+except ImportError:
+    # older VisPy versions have no instanced mesh; the instances are then merged into the layer buffers
+    InstancedMeshVisual = None
+
+
+def _line_mesh_data(line_pts, line_colors):
+    """
+    Packs line segments as the data of a mesh drawn in the 'lines' mode. Such a mesh draws its vertices taken in the
+    order of its faces, two by two, so the faces are the consecutive groups of 3 end points; the segments are padded
+    with zero length segments to a multiple of 6 end points.
+
+    :param line_pts: list
+        End points of the segments, two for each segment
+    :param line_colors: list
+        RGBA color of each end point
+    :return: tuple
+        (vertices, faces, vertex_colors) numpy arrays
+    """
+    pts = np.asarray(line_pts, dtype=np.float32).reshape(-1, 2)
+    colors = np.asarray(line_colors, dtype=np.float32).reshape(-1, 4)
+    pad = -len(pts) % 6
+    if pad:
+        pts = np.concatenate((pts, np.repeat(pts[-1:], pad, axis=0)))
+        colors = np.concatenate((colors, np.repeat(colors[-1:], pad, axis=0)))
+
+    vertices = np.zeros((len(pts), 3), dtype=np.float32)
+    vertices[:, :2] = pts
+    faces = np.arange(len(pts), dtype=np.uint32).reshape((-1, 3))
+    return vertices, faces, colors
+
 
 # class FlatCAMLineVisual(LineVisual):
 #     def __init__(self, pos=None, color=(0.5, 0.5, 0.5, 1), width=1, connect='strip', method='gl', antialias=False):
@@ -127,6 +159,22 @@ def _linestring_to_segments(arr):
     return [arr[i // 2] for i in range(0, len(arr) * 2)][1:-1]
 
 
+def _transform_points(points, matrix):
+    """
+    Applies an affine transformation to the vertices of a shape buffer
+    :param points: list
+        List of (x, y) vertices
+    :param matrix: numpy.array
+        3x3 affine matrix
+    :return: list
+        List of the transformed vertices
+    """
+    if len(points) == 0:
+        return []
+    pts = np.asarray(points, dtype=float).reshape(-1, 2)
+    return (pts @ matrix[:2, :2].T + matrix[:2, 2]).tolist()
+
+
 class ShapeGroup(object):
     def __init__(self, collection):
         """
@@ -170,6 +218,19 @@ class ShapeGroup(object):
         if update:
             self._collection.redraw([])             # Skip waiting results
 
+    def set_transform(self, matrix):
+        """
+        Sets the affine transformation applied to the group shapes when they are drawn. The shapes are not
+        tessellated again so changing the transformation is cheap.
+        :param matrix: numpy.array
+            3x3 affine matrix or None for no transformation
+        """
+        for i in self._indexes:
+            if i in self._collection.data:
+                self._collection.data[i]['transform'] = matrix
+
+        self._collection.redraw([])
+
     def redraw(self, update_colors=None):
         """
         Redraws shape collection
@@ -265,6 +326,9 @@ class ShapeCollectionVisual(CompoundVisual):
         self._line_width = linewidth
         self._triangulation = triangulation
 
+        # Instanced visuals, a (mesh, lines) pair for each set of instance offsets, created when needed
+        self._instanced_visuals = {}
+
         visuals_ = [self._lines[i // 2] if i % 2 else self._meshes[i // 2] for i in range(0, layers * 2)]
 
         CompoundVisual.__init__(self, visuals_, **kwargs)
@@ -280,7 +344,7 @@ class ShapeCollectionVisual(CompoundVisual):
         self.freeze()
 
     def add(self, shape=None, color=None, face_color=None, alpha=None, visible=True,
-            update=False, layer=1, tolerance=0.001, linewidth=None):
+            update=False, layer=1, tolerance=0.001, linewidth=None, offsets=None):
         """
         Adds shape to collection
         :return:
@@ -302,6 +366,9 @@ class ShapeCollectionVisual(CompoundVisual):
             Geometry simplifying tolerance
         :param linewidth: int
             Width of the line
+        :param offsets: numpy.array
+            (N, 2) array with the offsets of the instances of the shape.
+            The shape is tessellated once and it is drawn at each of the offsets.
         :return: int
             Index of shape
         """
@@ -320,6 +387,9 @@ class ShapeCollectionVisual(CompoundVisual):
             'visible': visible,
             'layer': layer,
             'tolerance': tolerance,
+            'offsets': np.asarray(offsets, dtype=float).reshape(-1, 2) if offsets is not None and len(offsets) else None,
+            # affine transformation applied to the buffers when they are merged, set by ShapeGroup.set_transform()
+            'transform': None,
             # the following keys are updated in the _update_shape_buffers() method
             'mesh_vertices': [],    # Vertices for mesh
             'mesh_tris': [],        # Faces for mesh
@@ -397,6 +467,13 @@ class ShapeCollectionVisual(CompoundVisual):
         if not self.data:
             return
 
+        if any(data.get('offsets') is not None for data in list(self.data.values())):
+            # the instanced shapes are not in the layer buffers, so the stored colors are changed and then
+            # all the buffers are rebuilt
+            self._set_data_colors(new_mesh_color, new_line_color, indexes)
+            self.__update()
+            return
+
         # if a new color is empty string then make it None so it will not be updated
         # if a new color is valid then transform it here in a format palatable
         mesh_color_rgba = None
@@ -520,6 +597,79 @@ class ShapeCollectionVisual(CompoundVisual):
 
         self.update_lock.release()
 
+    def _set_data_colors(self, new_mesh_color=None, new_line_color=None, indexes=None):
+        """
+        Changes the colors stored for the shapes, without updating the visuals.
+
+        :param new_mesh_color:  new face color or None to keep the current one
+        :param new_line_color:  new line color or None to keep the current one
+        :param indexes:         list of shape indexes to change or None for all the shapes
+        """
+        mesh_color_rgba = Color(new_mesh_color).rgba if new_mesh_color else None
+        line_color_rgba = Color(new_line_color).rgba if new_line_color else None
+
+        for k, data in list(self.data.items()):
+            if (indexes is not None and k not in indexes) or 'line_pts' not in data:
+                continue
+            if mesh_color_rgba is not None:
+                data['face_color'] = new_mesh_color
+                data['mesh_colors'] = [mesh_color_rgba for __ in range(len(data['mesh_colors']))]
+            if line_color_rgba is not None:
+                data['color'] = new_line_color
+                data['line_colors'] = [line_color_rgba for __ in range(len(data['line_colors']))]
+
+    def _update_instanced_visuals(self, instanced):
+        """
+        Sets the data of the instanced visuals. For each set of offsets there is an instanced mesh for the polygons and
+        an instanced mesh drawn in the 'lines' mode for the lines, so the data of an instanced shape is uploaded once
+        whatever the number of instances; the visuals that are no longer used are removed.
+
+        :param instanced: dict
+            For each set of offsets, a dict with the merged 'offsets', 'vertices', 'tris', 'colors', 'line_pts' and
+            'line_colors'
+        """
+        for key in list(self._instanced_visuals.keys()):
+            if key not in instanced:
+                for visual in self._instanced_visuals.pop(key):
+                    self.remove_subvisual(visual)
+
+        for key, inst in instanced.items():
+            nr_instances = len(inst['offsets'])
+            positions = np.zeros((nr_instances, 3), dtype=np.float32)
+            positions[:, :2] = inst['offsets']
+
+            if key not in self._instanced_visuals:
+                transforms = np.tile(np.eye(3), (nr_instances, 1, 1))
+                mesh = InstancedMeshVisual(instance_positions=positions, instance_transforms=transforms)
+                mesh.set_gl_state(polygon_offset_fill=True, polygon_offset=(1, 1), cull_face=False)
+                line = InstancedMeshVisual(instance_positions=positions, instance_transforms=transforms, mode='lines')
+                line.set_gl_state('translucent', line_smooth=True, line_width=max(float(self._line_width), 1.0))
+                self._instanced_visuals[key] = (mesh, line)
+                # the lines are added after the mesh so they are drawn over it
+                self.add_subvisual(mesh)
+                self.add_subvisual(line)
+            mesh, line = self._instanced_visuals[key]
+
+            if inst['tris']:
+                # the instanced mesh works with 3D vertices
+                vertices = np.zeros((len(inst['vertices']), 3), dtype=np.float32)
+                vertices[:, :2] = inst['vertices']
+                mesh.set_data(
+                    vertices=vertices,
+                    faces=np.asarray(inst['tris'], dtype=np.uint32).reshape((-1, 3)),
+                    face_colors=np.asarray(inst['colors'])
+                )
+            else:
+                mesh.set_data()
+            mesh._bounds_changed()
+
+            if inst['line_pts']:
+                vertices, faces, colors = _line_mesh_data(inst['line_pts'], inst['line_colors'])
+                line.set_data(vertices=vertices, faces=faces, vertex_colors=colors)
+            else:
+                line.set_data()
+            line._bounds_changed()
+
     def __update(self):
         """
         Merges internal buffers, sets data to visuals, redraws collection on scene
@@ -529,6 +679,7 @@ class ShapeCollectionVisual(CompoundVisual):
         mesh_colors = [[] for _ in range(0, len(self._meshes))]         # Face colors
         line_pts = [[] for _ in range(0, len(self._lines))]             # Vertices for line
         line_colors = [[] for _ in range(0, len(self._lines))]          # Line color
+        instanced = {}                                                  # Instanced meshes, by offsets
 
         # Lock sub-visuals updates
         self.update_lock.acquire(True)
@@ -537,12 +688,51 @@ class ShapeCollectionVisual(CompoundVisual):
         for data in list(self.data.values()):
             if data['visible'] and 'line_pts' in data:
                 try:
-                    line_pts[data['layer']] += data['line_pts']
-                    line_colors[data['layer']] += data['line_colors']
-
-                    mesh_tris[data['layer']] += [x + len(mesh_vertices[data['layer']]) for x in data['mesh_tris']]
-                    mesh_vertices[data['layer']] += data['mesh_vertices']
-                    mesh_colors[data['layer']] += data['mesh_colors']
+                    offsets = data.get('offsets')
+                    transform = data.get('transform')
+                    shape_line_pts, shape_mesh_vertices = data['line_pts'], data['mesh_vertices']
+                    if transform is not None:
+                        shape_line_pts = _transform_points(shape_line_pts, transform)
+                        shape_mesh_vertices = _transform_points(shape_mesh_vertices, transform)
+                        if offsets is not None:
+                            # the instance at offset O is drawn at M(P + O) = M(P) + L(O), L being the linear part
+                            offsets = offsets @ transform[:2, :2].T
+
+                    if offsets is None:
+                        line_pts[data['layer']] += shape_line_pts
+                        line_colors[data['layer']] += data['line_colors']
+
+                        mesh_tris[data['layer']] += [x + len(mesh_vertices[data['layer']]) for x in data['mesh_tris']]
+                        mesh_vertices[data['layer']] += shape_mesh_vertices
+                        mesh_colors[data['layer']] += data['mesh_colors']
+                        continue
+
+                    if InstancedMeshVisual is None:
+                        # no instancing: the lines and the mesh of the shape are copied at each offset
+                        if shape_line_pts:
+                            pts = np.asarray(shape_line_pts, dtype=float)
+                            line_pts[data['layer']] += \
+                                (pts[None, :, :] + offsets[:, None, :]).reshape(-1, 2).tolist()
+                            line_colors[data['layer']] += data['line_colors'] * len(offsets)
+
+                        if data['mesh_tris']:
+                            vertices = np.asarray(shape_mesh_vertices, dtype=float)
+                            for offset in offsets:
+                                mesh_tris[data['layer']] += [x + len(mesh_vertices[data['layer']])
+                                                             for x in data['mesh_tris']]
+                                mesh_vertices[data['layer']] += (vertices + offset).tolist()
+                                mesh_colors[data['layer']] += data['mesh_colors']
+                        continue
+
+                    # Instanced shape: the lines and the mesh are stored once and drawn by the instanced visuals
+                    inst = instanced.setdefault(offsets.tobytes(), {
+                        'offsets': offsets, 'vertices': [], 'tris': [], 'colors': [], 'line_pts': [], 'line_colors': []
+                    })
+                    inst['tris'] += [x + len(inst['vertices']) for x in data['mesh_tris']]
+                    inst['vertices'] += shape_mesh_vertices
+                    inst['colors'] += data['mesh_colors']
+                    inst['line_pts'] += shape_line_pts
+                    inst['line_colors'] += data['line_colors']
                 except Exception as e:
                     print("VisPyVisuals.ShapeCollectionVisual._update() --> Data error. %s" % str(e))
 
@@ -576,6 +766,9 @@ class ShapeCollectionVisual(CompoundVisual):
 
             line._bounds_changed()
 
+        if InstancedMeshVisual is not None:
+            self._update_instanced_visuals(instanced)
+
         self._bounds_changed()
         self.update_lock.release()
 
@@ -594,7 +787,10 @@ class ShapeCollectionVisual(CompoundVisual):
                 try:
                     self.results[i].wait()                                  # Wait for process results
                     if i in self.data:
+                        # the transformation may have been set while the shape was tessellated
+                        transform = self.data[i].get('transform')
                         self.data[i] = self.results[i].get()[0]             # Store translated data
+                        self.data[i]['transform'] = transform
                         del self.results[i]
                 except Exception as e:
                     print("VisPyVisuals.ShapeCollectionVisual.redraw() --> Data error = %s. Indexes = %s" %
@@ -73,6 +73,7 @@ class PreferencesUIManager(QtCore.QObject):
             "global_worker_number": self.ui.general_pref_form.general_app_group.worker_number_sb,
             "global_process_number": self.ui.general_pref_form.general_app_group.process_number_sb,
             "global_tolerance": self.ui.general_pref_form.general_app_group.tol_entry,
+            "global_large_text_lines": self.ui.general_pref_form.general_app_group.large_text_entry,
 
             "global_compression_level": self.ui.general_pref_form.general_app_group.compress_spinner,
             "global_save_compressed": self.ui.general_pref_form.general_app_group.save_type_cb,
@@ -558,6 +559,7 @@ class PreferencesUIManager(QtCore.QObject):
             "tools_panelize_columns": self.ui.plugin_pref_form.tools_panelize_group.pcolumns,
             "tools_panelize_rows": self.ui.plugin_pref_form.tools_panelize_group.prows,
             "tools_panelize_optimization": self.ui.plugin_pref_form.tools_panelize_group.poptimization_cb,
+            "tools_panelize_instanced": self.ui.plugin_pref_form.tools_panelize_group.pinstanced_cb,
             "tools_panelize_constrain": self.ui.plugin_pref_form.tools_panelize_group.pconstrain_cb,
             "tools_panelize_constrainx": self.ui.plugin_pref_form.tools_panelize_group.px_width_entry,
             "tools_panelize_constrainy": self.ui.plugin_pref_form.tools_panelize_group.py_height_entry,
@@ -634,6 +636,7 @@ class PreferencesUIManager(QtCore.QObject):
 
             # Optimal Tool
             "tools_opt_precision": self.ui.plugin2_pref_form.tools2_optimal_group.precision_sp,
+            "tools_opt_max_distances": self.ui.plugin2_pref_form.tools2_optimal_group.max_distances_sp,
 
             # Check Rules Tool
             "tools_cr_trace_size": self.ui.plugin2_pref_form.tools2_checkrules_group.trace_size_cb,
@@ -110,7 +110,7 @@ class GeneralAppPrefGroupUI(OptionsGroupUI):
         self.process_number_label.setToolTip(
             _("The number of processes.\n"
               "A larger number may improve performance but it will require more memory.\n"
-              "After change, it will be applied at next App start.")
+              "It is applied at once; the running tasks finish in the old processes.")
         )
         self.process_number_sb = FCSpinner()
         self.process_number_sb.set_range(2, 32)
@@ -135,6 +135,22 @@ class GeneralAppPrefGroupUI(OptionsGroupUI):
         grid1.addWidget(tol_label, 6, 0)
         grid1.addWidget(self.tol_entry, 6, 1)
 
+        # Large text
+        large_text_label = FCLabel('%s:' % _("Large text lines"))
+        large_text_label.setToolTip(_(
+            "A text with more lines than this value is shown in the\n"
+            "code editor in a lightweight text area that draws\n"
+            "only the visible lines.\n"
+            "It has no auto-completion and the text can't be printed.\n"
+            "A value of zero will disable it."
+        ))
+        self.large_text_entry = FCSpinner()
+        self.large_text_entry.set_range(0, 100000000)
+        self.large_text_entry.set_step(10000)
+
+        grid1.addWidget(large_text_label, 7, 0)
+        grid1.addWidget(self.large_text_entry, 7, 1)
+
         # Portability
         self.portability_cb = FCCheckBox('%s' % _('Portable app'))
         self.portability_cb.setToolTip(_("Choose if the application should run as portable.\n\n"
@@ -51,4 +51,18 @@ class Tools2OptimalPrefGroupUI(OptionsGroupUI):
         param_grid.addWidget(self.precision_lbl, 0, 0)
         param_grid.addWidget(self.precision_sp, 0, 1)
 
+        # Maximum number of distances
+        self.max_distances_sp = FCSpinner()
+        self.max_distances_sp.set_range(1, 100000)
+        self.max_distances_sp.set_step(1)
+
+        self.max_distances_lbl = FCLabel('%s:' % _("Distances"))
+        self.max_distances_lbl.setToolTip(
+            _("How many of the smallest distances between the copper features are found.\n"
+              "The first one is the result and the others are listed in 'Other distances'.")
+        )
+
+        param_grid.addWidget(self.max_distances_lbl, 2, 0)
+        param_grid.addWidget(self.max_distances_sp, 2, 1)
+
         self.layout.addStretch()
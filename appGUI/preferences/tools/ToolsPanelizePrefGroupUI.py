@@ -114,6 +114,16 @@ class ToolsPanelizePrefGroupUI(OptionsGroupUI):
         )
         param_grid.addWidget(self.poptimization_cb, 10, 0, 1, 2)
 
+        # Instanced panel
+        self.pinstanced_cb = FCCheckBox('%s' % _("Instanced"))
+        self.pinstanced_cb.setToolTip(
+            _("The panel keeps a single copy of the source geometry and its positions.\n"
+              "It is much faster to make and to display for large panels.\n"
+              "The copies are made when the panel geometry is used by\n"
+              "a plugin, an editor or to create a CNCJob.")
+        )
+        param_grid.addWidget(self.pinstanced_cb, 11, 0, 1, 2)
+
         # ## Constrains
         self.pconstrain_cb = FCCheckBox('%s:' % _("Constrain within"))
         self.pconstrain_cb.setToolTip(
@@ -0,0 +1,465 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
+
+# Batch server. Started with the --batch_server=1 command line option (usually together with --headless=1) the App
+# keeps running and accepts jobs on a local connection: Tcl scripts or job descriptors. Each job runs in a new project
+# on the warm App, which means the preprocessors, the Tools DB, the Tcl commands and the multiprocessing Pool are
+# loaded once for all the jobs. The result, the messages and the log of each job are sent back to the client.
+#
+# A job descriptor is a dictionary:
+#     {
+#         'id':           optional, returned in the job result
+#         'script':       Tcl script text
+#         'shellfile':    path to a Tcl script file; used when there is no 'script'
+#         'vars':         optional dictionary of Tcl variables set before running the script
+#     }
+# A plain string is run as a Tcl script. The string 'close' ends the connection.
+#
+# From the command line, in the FlatCAM folder:
+#     python -m appHandlers.appBatch board_1.tcl board_2.tcl
+#
+# or from a script:
+#     from appHandlers.appBatch import submit_jobs
+#     for job_result in submit_jobs([{'id': 'board_1', 'shellfile': '/path/board_1.tcl'}]):
+#         print(job_result['status'], job_result['objects'])
+
+from PyQt6 import QtCore
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
+
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import threading
+from copy import deepcopy
+import tkinter as tk
+from multiprocessing.connection import Listener, Client
+
+# App Translation
+import gettext
+import appTranslation as fcTranslate
+import builtins
+
+fcTranslate.apply_language('strings')
+if '_' not in builtins.__dict__:
+    _ = gettext.gettext
+
+log = logging.getLogger('base')
+
+# the key used to authenticate the clients is saved in this file in the data folder
+BATCH_KEY_FILE = 'batch_server.key'
+
+
+def batch_address(data_path):
+    """
+    :param data_path:   the FlatCAM data folder
+    :return:            the address and the family of the batch server connection
+    """
+    if sys.platform == 'win32':
+        return r'\\.\pipe\FlatCAMBatch', 'AF_PIPE'
+    return os.path.join(data_path, 'batch_server.sock'), 'AF_UNIX'
+
+
+def batch_server_running(address, family):
+    """
+    Check if a batch server is listening on the address by connecting to it. The connection is closed right away, which
+    the server takes as a failed authentication.
+
+    :param address:     the address of the batch server connection
+    :param family:      the family of the batch server connection
+    :return:            True if a server accepted the connection
+    """
+    try:
+        Client(address, family).close()
+    except OSError:
+        return False
+    return True
+
+
+def batch_authkey(data_path, create=False):
+    """
+    Read the key used to authenticate the batch clients. The connection runs Tcl scripts so only the user that started
+    the server, who can read the key file, can submit jobs.
+
+    :param data_path:   the FlatCAM data folder
+    :param create:      if True a new key is made and saved
+    :return:            the key as bytes
+    """
+    key_path = os.path.join(data_path, BATCH_KEY_FILE)
+    if create:
+        key = os.urandom(32)
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+        return key
+
+    with open(key_path, 'rb') as f:
+        return f.read()
+
+
+def default_data_path():
+    """
+    :return:    the FlatCAM data folder of the current user, the same as used by the App when not portable
+    """
+    if sys.platform == 'win32':
+        return os.path.join(os.getenv('appdata'), 'FlatCAM')
+    return os.path.expanduser('~') + '/.FlatCAM'
+
+
+def submit_jobs(jobs, data_path=None):
+    """
+    Send jobs to a running batch server and wait for the results. The jobs run one after another, in order.
+
+    :param jobs:        list of job descriptors (dictionaries) or Tcl scripts (strings)
+    :param data_path:   the FlatCAM data folder of the server; by default the one of the current user
+    :return:            generator of the job results, in the jobs order
+    """
+    data_path = data_path if data_path is not None else default_data_path()
+    address, family = batch_address(data_path)
+
+    conn = Client(address, family, authkey=batch_authkey(data_path))
+    try:
+        for job in jobs:
+            conn.send(job)
+            yield conn.recv()
+    finally:
+        try:
+            conn.send('close')
+        except OSError:
+            pass
+        conn.close()
+
+
+class BatchLogHandler(logging.Handler):
+    """
+    Collects the log records emitted while a batch job runs.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+        self.lines = []
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class BatchServer(QtCore.QObject):
+    """
+    Listens for batch jobs in its own thread. The jobs are run in the main thread, where the Tcl interpreter lives, by
+    the job_signal connected with a blocking queued connection, so a job result is ready when the emit() returns.
+    """
+
+    start = pyqtSignal()
+    job_signal = pyqtSignal(object)
+
+    def __init__(self, address, authkey):
+        super().__init__()
+
+        self.address = address
+        self.authkey = authkey
+        self.listener = None
+        self.conn = None
+        self.thread_exit = False
+
+        self.start.connect(self.run)    # noqa
+
+    # the decorator is a must; without it the slot would run in the thread where the instance was made
+    @pyqtSlot()
+    def run(self):
+        address, family = self.address
+        try:
+            self.listener = Listener(address, family, authkey=self.authkey)
+        except OSError as err:
+            log.error("BatchServer.run() -> could not listen on %s: %s" % (str(address), str(err)))
+            return
+
+        log.debug("BatchServer.run() -> listening on %s" % str(address))
+        while self.thread_exit is False:
+            try:
+                self.conn = self.listener.accept()
+            except Exception as err:
+                # authentication failures end here, and the closing of the listener
+                if self.thread_exit is False:
+                    log.debug("BatchServer.run() -> %s" % str(err))
+                continue
+            self.serve(self.conn)
+
+        try:
+            self.listener.close()
+        except Exception:
+            pass
+        log.debug("BatchServer.run() -> stopped")
+
+    def serve(self, conn):
+        while self.thread_exit is False:
+            if QtCore.QThread.currentThread().isInterruptionRequested():
+                break
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            if msg == 'close':
+                break
+
+            job = {'descriptor': msg, 'result': None}
+            self.job_signal.emit(job)   # noqa
+            try:
+                conn.send(job['result'])
+            except (OSError, ValueError) as err:
+                log.error("BatchServer.serve() -> %s" % str(err))
+                break
+        conn.close()
+
+    def close_listener(self):
+        """
+        Stop the server. Called from the main thread; the thread of the server is blocked waiting for a connection so
+        it is woken up by a connection that is closed right away.
+
+        :return: None
+        """
+        self.thread_exit = True
+
+        def wake_up():
+            try:
+                Client(*self.address, authkey=self.authkey).close()
+            except Exception:
+                pass
+
+        # in a daemon thread: if the server waits for the main thread to run a job, this would never return
+        threading.Thread(target=wake_up, daemon=True).start()
+
+
+class appBatch(QtCore.QObject):
+    def __init__(self, app):
+        super(appBatch, self).__init__()
+
+        self.app = app
+        self.log = self.app.log
+        self.inform = self.app.inform
+
+        self.server = None
+        self.server_thread = None
+        self.jobs_count = 0
+
+        # the options changed by the jobs; they are set back to the application defaults before the next job
+        self.changed_options = set()
+
+    def start_server(self):
+        """
+        Start listening for batch jobs.
+
+        :return: None
+        """
+        address = batch_address(self.app.data_path)
+        if batch_server_running(*address):
+            self.log.error("appBatch.start_server() -> a batch server is already running on %s" % str(address[0]))
+            self.inform.emit('[ERROR_NOTCL] %s' % _("A batch server is already running."))
+            return
+
+        if address[1] == 'AF_UNIX' and os.path.exists(address[0]):
+            # left by a server that did not close cleanly
+            try:
+                os.remove(address[0])
+            except OSError:
+                pass
+
+        # the key is made only now so the clients of a running server keep working
+        authkey = batch_authkey(self.app.data_path, create=True)
+
+        # make sure the thread is stored by using a self. otherwise it's garbage collected
+        self.server_thread = QtCore.QThread()
+        self.server_thread.start(priority=QtCore.QThread.Priority.LowestPriority)
+
+        self.server = BatchServer(address, authkey)
+        self.server.job_signal.connect(self.on_job, type=Qt.ConnectionType.BlockingQueuedConnection)
+        self.server.moveToThread(self.server_thread)
+        self.server.start.emit()    # noqa
+
+        self.log.warning("*******************  BATCH SERVER: %s  *******************" % str(address[0]))
+
+    def stop_server(self):
+        """
+        Stop listening for batch jobs.
+
+        :return: None
+        """
+        if self.server is None:
+            return
+
+        self.server.close_listener()
+        if self.server_thread.isRunning():
+            self.server_thread.requestInterruption()
+            self.server_thread.quit()
+            # bounded: a server thread that waits for the main thread to run a job would never end
+            self.server_thread.wait(2000)
+        # the socket file is removed by the listener, when it is closed or at exit
+
+    def on_job(self, job):
+        """
+        Run a job received by the batch server. The result is stored in job['result'].
+
+        :param job:     dictionary: {'descriptor': job descriptor or Tcl script, 'result': None}
+        :return:        None
+        """
+        try:
+            job['result'] = self.run_job(job['descriptor'])
+        except Exception as err:
+            self.log.error("appBatch.on_job() -> %s" % str(err))
+            job['result'] = {
+                'id': None,
+                'status': 'error',
+                'result': None,
+                'error': str(err),
+                'messages': [],
+                'log': [],
+                'objects': [],
+                'duration': 0.0
+            }
+
+    def run_job(self, descriptor):
+        """
+        Run a job in a new project.
+
+        :param descriptor:  job descriptor (dictionary) or Tcl script (string)
+        :return:            dictionary with the job result: 'id', 'status' ('ok' or 'error'), 'result' (what the
+                            Tcl script returned), 'error', 'messages' (the messages shown to the user), 'log',
+                            'objects' (list of (name, kind) of the objects in the project at the end of the job) and
+                            'duration' in seconds
+        """
+        t_start = time.time()
+
+        if isinstance(descriptor, str):
+            descriptor = {'script': descriptor}
+        if not isinstance(descriptor, dict):
+            raise ValueError("A job is a dictionary or a Tcl script.")
+
+        self.jobs_count += 1
+        job_id = descriptor.get('id', self.jobs_count)
+
+        script = descriptor.get('script')
+        if script is None and descriptor.get('shellfile'):
+            with open(descriptor['shellfile'], 'r') as f:
+                script = f.read()
+        if not script:
+            raise ValueError("The job has no 'script' and no 'shellfile'.")
+
+        self.new_job_project()
+
+        messages = []
+
+        def collect_message(msg, *args):
+            messages.append(str(msg))
+
+        handler = BatchLogHandler()
+        self.log.addHandler(handler)
+        self.app.inform[str].connect(collect_message)
+        self.app.inform_shell[str].connect(collect_message)
+
+        options_callback = self.app.options.callback
+
+        def track_option_change(key):
+            self.changed_options.add(key)
+            options_callback(key)
+
+        self.app.options.set_change_callback(track_option_change)
+
+        tcl = self.app.shell.tcl
+        # the global variables and the procedures made by the job are deleted when the job is done
+        old_globals = set(tcl.splitlist(tcl.eval('info globals')))
+        old_procs = set(tcl.splitlist(tcl.eval('info procs')))
+
+        status = 'ok'
+        result = None
+        error = None
+        try:
+            for var_name, var_value in descriptor.get('vars', {}).items():
+                tcl.setvar(str(var_name), str(var_value))
+
+            result = tcl.eval(script)
+        except tk.TclError as err:
+            status = 'error'
+            try:
+                error = tcl.eval("set errorInfo")
+            except tk.TclError:
+                error = str(err)
+            self.log.error("appBatch.run_job() -> job %s: %s" % (str(job_id), error))
+        finally:
+            self.app.options.set_change_callback(options_callback)
+            self.app.inform[str].disconnect(collect_message)
+            self.app.inform_shell[str].disconnect(collect_message)
+            self.log.removeHandler(handler)
+
+            for var_name in set(tcl.splitlist(tcl.eval('info globals'))) - old_globals:
+                tcl.unsetvar(var_name)
+            for proc_name in set(tcl.splitlist(tcl.eval('info procs'))) - old_procs:
+                tcl.eval('rename {%s} {}' % proc_name)
+
+        objects = [(obj.obj_options['name'], obj.kind) for obj in self.app.collection.get_list()]
+
+        return {
+            'id': job_id,
+            'status': status,
+            'result': result,
+            'error': error,
+            'messages': messages,
+            'log': handler.lines,
+            'objects': objects,
+            'duration': time.time() - t_start
+        }
+
+    def new_job_project(self):
+        """
+        Start a new project for a job: the objects of the previous job are deleted and the options changed by the
+        previous jobs are set back to the application defaults. Unlike a new project made from the GUI the Pool and
+        the Plugins are kept.
+
+        :return: None
+        """
+        self.app.exc_areas.clear_shapes()
+        self.app.collection.delete_all()
+        self.app.project_filename = None
+
+        # the options are set back without running the options callback, there is no GUI to update
+        options_callback = self.app.options.callback
+        self.app.options.set_change_callback(lambda x: None)
+        try:
+            for key in self.changed_options:
+                if key in self.app.defaults:
+                    self.app.options[key] = deepcopy(self.app.defaults[key])
+        finally:
+            self.app.options.set_change_callback(options_callback)
+        self.changed_options = set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send Tcl scripts to a running FlatCAM batch server "
+                                                 "(started with: flatcam.py --headless=1 --batch_server=1).")
+    parser.add_argument('scripts', nargs='+', help="Tcl script files; each one is a job")
+    parser.add_argument('--data_path', default=None, help="FlatCAM data folder of the server")
+    parser.add_argument('--json', action='store_true', help="Print the job results as JSON")
+    args = parser.parse_args(argv)
+
+    jobs = [{'id': filename, 'shellfile': os.path.abspath(filename)} for filename in args.scripts]
+    ret = 0
+    for job_result in submit_jobs(jobs, data_path=args.data_path):
+        if job_result['status'] != 'ok':
+            ret = 1
+        if args.json:
+            print(json.dumps(job_result))
+        else:
+            print("%s: %s in %.3f s" % (job_result['id'], job_result['status'], job_result['duration']))
+            if job_result['error']:
+                print(job_result['error'])
+    return ret
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,8 +7,9 @@ from appEditors.appGeoEditor import AppGeoEditor
 from appEditors.appGerberEditor import AppGerberEditor
 
 from appGUI.GUIElements import FCFileSaveDialog, FCMessageBox
-from camlib import to_dict, dict2obj, ET, ParseError
+from camlib import to_dict, dict2obj, ET, ParseError, atomic_file
 from appParsers.ParseHPGL2 import HPGL2
+from appCore import gerber_file_init, excellon_file_init, export_gerber_code, export_excellon_code
 
 from appObjects.ObjectCollection import GerberObject, ExcellonObject, GeometryObject, ScriptObject, CNCJobObject
 
@@ -32,6 +33,7 @@ from datetime import datetime
 import simplejson as json
 
 from appCommon.Common import LoudDict
+from appWorkerStack import PRIORITY_JOB
 
 from vispy.gloo.util import _screenshot
 from vispy.io import write_png
@@ -1091,13 +1093,14 @@ class appIO(QtCore.QObject):
                 self.app.error("App.on_file_run_cript() -> %s" % str(e))
                 sys.exit(2)
 
-    def on_file_save_project(self, silent=False):
+    def on_file_save_project(self, silent=False, priority=PRIORITY_JOB):
         """
         Callback for menu item File->Save Project. Saves the project to
         ``self.project_filename`` or calls ``self.on_file_save_project_as()``
         if set to None. The project is saved by calling ``self.save_project()``.
 
-        :param silent: if True will not display status messages
+        :param silent:      if True will not display status messages
+        :param priority:    priority of the save task in the Workers queue; the autosave runs in the background
         :return: None
         """
         self.log.debug("on_file_save_project()")
@@ -1105,7 +1108,8 @@ class appIO(QtCore.QObject):
         if self.app.project_filename is None:
             self.on_file_save_project_as()
         else:
-            self.worker_task.emit({'fcn': self.save_project, 'params': [self.app.project_filename, silent]})
+            self.worker_task.emit({'fcn': self.save_project, 'params': [self.app.project_filename, silent],
+                                   'priority': priority})
             if self.options["global_open_style"] is False:
                 self.app.file_opened.emit("project", self.app.project_filename)
             self.app.file_saved.emit("project", self.app.project_filename)
@@ -1557,10 +1561,6 @@ class appIO(QtCore.QObject):
 
         self.log.debug("export_excellon()")
 
-        format_exc = ';FILE_FORMAT=%d:%d\n' % (self.options["excellon_exp_integer"],
-                                               self.options["excellon_exp_decimals"]
-                                               )
-
         if local_use is None:
             try:
                 obj = self.app.collection.get_by_name(str(obj_name))
@@ -1574,92 +1574,14 @@ class appIO(QtCore.QObject):
                              _("Failed. Only Excellon objects can be saved as Excellon files..."))
             return
 
-        # updated units
-        e_units = self.options["excellon_exp_units"]
-        e_whole = self.options["excellon_exp_integer"]
-        e_fract = self.options["excellon_exp_decimals"]
-        e_zeros = self.options["excellon_exp_zeros"]
-        e_format = self.options["excellon_exp_format"]
-        slot_type = self.options["excellon_exp_slot_type"]
-
-        fc_units = self.app_units.upper()
-        if fc_units == 'MM':
-            factor = 1 if e_units == 'METRIC' else 0.03937
-        else:
-            factor = 25.4 if e_units == 'METRIC' else 1
-
         def make_excellon():
             try:
-                time_str = "{:%A, %d %B %Y at %H:%M}".format(datetime.now())
-
-                header = 'M48\n'
-                header += ';EXCELLON GENERATED BY FLATCAM v%s - www.flatcam.org - Version Date: %s\n' % \
-                          (str(self.app.version), str(self.app.version_date))
-
-                header += ';Filename: %s' % str(obj_name) + '\n'
-                header += ';Created on : %s' % time_str + '\n'
-
-                if e_format == 'dec':
-                    has_slots, excellon_code = obj.export_excellon(e_whole, e_fract, factor=factor, slot_type=slot_type)
-                    header += e_units + '\n'
-
-                    for tool in obj.tools:
-                        if e_units == 'METRIC':
-                            header += "T{tool}F00S00C{:.{dec}f}\n".format(float(obj.tools[tool]['tooldia']) * factor,
-                                                                          tool=str(tool),
-                                                                          dec=2)
-                        else:
-                            header += "T{tool}F00S00C{:.{dec}f}\n".format(float(obj.tools[tool]['tooldia']) * factor,
-                                                                          tool=str(tool),
-                                                                          dec=4)
-                else:
-                    if e_zeros == 'LZ':
-                        has_slots, excellon_code = obj.export_excellon(e_whole, e_fract,
-                                                                       form='ndec', e_zeros='LZ', factor=factor,
-                                                                       slot_type=slot_type)
-                        header += '%s,%s\n' % (e_units, 'LZ')
-                        header += format_exc
-
-                        for tool in obj.tools:
-                            if e_units == 'METRIC':
-                                header += "T{tool}F00S00C{:.{dec}f}\n".format(
-                                    float(obj.tools[tool]['tooldia']) * factor,
-                                    tool=str(tool),
-                                    dec=2)
-                            else:
-                                header += "T{tool}F00S00C{:.{dec}f}\n".format(
-                                    float(obj.tools[tool]['tooldia']) * factor,
-                                    tool=str(tool),
-                                    dec=4)
-                    else:
-                        has_slots, excellon_code = obj.export_excellon(e_whole, e_fract,
-                                                                       form='ndec', e_zeros='TZ', factor=factor,
-                                                                       slot_type=slot_type)
-                        header += '%s,%s\n' % (e_units, 'TZ')
-                        header += format_exc
-
-                        for tool in obj.tools:
-                            if e_units == 'METRIC':
-                                header += "T{tool}F00S00C{:.{dec}f}\n".format(
-                                    float(obj.tools[tool]['tooldia']) * factor,
-                                    tool=str(tool),
-                                    dec=2)
-                            else:
-                                header += "T{tool}F00S00C{:.{dec}f}\n".format(
-                                    float(obj.tools[tool]['tooldia']) * factor,
-                                    tool=str(tool),
-                                    dec=4)
-                header += '%\n'
-                footer = 'M30\n'
-
-                exported_excellon = header
-                exported_excellon += excellon_code
-                exported_excellon += footer
-
                 if local_use is None:
                     try:
-                        with open(filename, 'w') as fp:
-                            fp.write(exported_excellon)
+                        # the file is replaced only when the whole export succeeded
+                        with atomic_file(filename) as fp:
+                            # the Excellon code is written to the file in chunks, as it is generated
+                            export_excellon_code(self.app, obj, obj_name, file_handle=fp)
                     except PermissionError:
                         self.inform.emit('[WARNING] %s' %
                                          _("Permission denied, saving not possible.\n"
@@ -1671,7 +1593,7 @@ class appIO(QtCore.QObject):
                     self.app.file_saved.emit("Excellon", filename)
                     self.inform.emit('[success] %s: %s' % (_("Excellon file exported to"), filename))
                 else:
-                    return exported_excellon
+                    return export_excellon_code(self.app, obj, obj_name)
             except Exception as e:
                 self.log.error("App.export_excellon.make_excellon() --> %s" % str(e))
                 return 'fail'
@@ -1721,80 +1643,14 @@ class appIO(QtCore.QObject):
         else:
             obj = local_use
 
-        # updated units
-        g_units = self.options["gerber_exp_units"]
-        g_whole = self.options["gerber_exp_integer"]
-        g_fract = self.options["gerber_exp_decimals"]
-        g_zeros = self.options["gerber_exp_zeros"]
-
-        fc_units = self.app_units.upper()
-        if fc_units == 'MM':
-            factor = 1 if g_units == 'MM' else 0.03937
-        else:
-            factor = 25.4 if g_units == 'MM' else 1
-
         def make_gerber():
             try:
-                time_str = "{:%A, %d %B %Y at %H:%M}".format(datetime.now())
-
-                header = 'G04*\n'
-                header += 'G04 RS-274X GERBER GENERATED BY FLATCAM v%s - www.flatcam.org - Version Date: %s*\n' % \
-                          (str(self.app.version), str(self.app.version_date))
-
-                header += 'G04 Filename: %s*' % str(obj_name) + '\n'
-                header += 'G04 Created on : %s*' % time_str + '\n'
-                header += '%%FS%sAX%s%sY%s%s*%%\n' % (g_zeros, g_whole, g_fract, g_whole, g_fract)
-                header += "%MO{units}*%\n".format(units=g_units)
-
-                for apid in obj.tools:
-                    if obj.tools[apid]['type'] == 'C':
-                        header += "%ADD{apid}{type},{size}*%\n".format(
-                            apid=str(apid),
-                            type='C',
-                            size=(factor * obj.tools[apid]['size'])
-                        )
-                    elif obj.tools[apid]['type'] == 'R':
-                        header += "%ADD{apid}{type},{width}X{height}*%\n".format(
-                            apid=str(apid),
-                            type='R',
-                            width=(factor * obj.tools[apid]['width']),
-                            height=(factor * obj.tools[apid]['height'])
-                        )
-                    elif obj.tools[apid]['type'] == 'O':
-                        header += "%ADD{apid}{type},{width}X{height}*%\n".format(
-                            apid=str(apid),
-                            type='O',
-                            width=(factor * obj.tools[apid]['width']),
-                            height=(factor * obj.tools[apid]['height'])
-                        )
-
-                header += '\n'
-
-                # obsolete units but some software may need it
-                if g_units == 'IN':
-                    header += 'G70*\n'
-                else:
-                    header += 'G71*\n'
-
-                # Absolute Mode
-                header += 'G90*\n'
-
-                header += 'G01*\n'
-                # positive polarity
-                header += '%LPD*%\n'
-
-                footer = 'M02*\n'
-
-                gerber_code = obj.export_gerber(g_whole, g_fract, g_zeros=g_zeros, factor=factor)
-
-                exported_gerber = header
-                exported_gerber += gerber_code
-                exported_gerber += footer
-
                 if local_use is None:
                     try:
-                        with open(filename, 'w') as fp:
-                            fp.write(exported_gerber)
+                        # the file is replaced only when the whole export succeeded
+                        with atomic_file(filename) as fp:
+                            # the Gerber code is written to the file in chunks, as it is generated
+                            export_gerber_code(self.app, obj, obj_name, file_handle=fp)
                     except PermissionError:
                         self.inform.emit('[WARNING] %s' %
                                          _("Permission denied, saving not possible.\n"
@@ -1806,7 +1662,7 @@ class appIO(QtCore.QObject):
                     self.app.file_saved.emit("Gerber", filename)
                     self.inform.emit('[success] %s: %s' % (_("Gerber file exported to"), filename))
                 else:
-                    return exported_gerber
+                    return export_gerber_code(self.app, obj, obj_name)
             except Exception as e:
                 self.log.error("App.export_gerber.make_gerber() --> %s" % str(e))
                 return 'fail'
@@ -2027,37 +1883,6 @@ class appIO(QtCore.QObject):
         :return: None
         """
 
-        # How the object should be initialized
-        def obj_init(gerber_obj, app_obj):
-
-            assert isinstance(gerber_obj, GerberObject), \
-                "Expected to initialize a GerberObject but got %s" % type(gerber_obj)
-
-            # Opening the file happens here
-            try:
-                parse_ret_val = gerber_obj.parse_file(filename)
-            except IOError:
-                app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open file"), filename))
-                return "fail"
-            except ParseError as parse_err:
-                app_obj.inform.emit('[ERROR_NOTCL] %s: %s. %s' % (_("Failed to parse file"), filename, str(parse_err)))
-                app_obj.log.error(str(parse_err))
-                return "fail"
-            except Exception as e:
-                app_obj.log.error("App.open_gerber() --> %s" % str(e))
-                msg = '[ERROR] %s' % _("An internal error has occurred. See shell.\n")
-                msg += traceback.format_exc()
-                app_obj.inform.emit(msg)
-                return "fail"
-
-            if gerber_obj.is_empty():
-                app_obj.inform.emit('[ERROR_NOTCL] %s' %
-                                    _("Object is not Gerber file or empty. Aborting object creation."))
-                return "fail"
-
-            if parse_ret_val:
-                return parse_ret_val
-
         self.log.debug("open_gerber()")
         if not os.path.exists(filename):
             self.inform.emit('[ERROR_NOTCL] %s. %s' % (filename, _("File no longer available.")))
@@ -2068,7 +1893,8 @@ class appIO(QtCore.QObject):
             name = outname or filename.split('/')[-1].split('\\')[-1]
 
             # # ## Object creation # ##
-            ret_val = self.app.app_obj.new_object("gerber", name, obj_init, autoselected=False, plot=plot)
+            ret_val = self.app.app_obj.new_object("gerber", name, gerber_file_init(filename), autoselected=False,
+                                                  plot=plot)
             if ret_val == "defective":
                 message = '[ERROR] %s' % \
                           _('The Gerber file is DAMAGED. We could open it but the file parsing PARTIALLY FAILED.\n'
@@ -2080,7 +1906,8 @@ class appIO(QtCore.QObject):
             if ret_val == 'fail':
                 if from_tcl:
                     filename = self.options['global_tcl_path'] + '/' + name
-                    ret_val = self.app.app_obj.new_object("gerber", name, obj_init, autoselected=False, plot=plot)
+                    ret_val = self.app.app_obj.new_object("gerber", name, gerber_file_init(filename),
+                                                          autoselected=False, plot=plot)
                 if ret_val == 'fail':
                     self.inform.emit('[ERROR_NOTCL] %s' % _('Open Gerber failed. Probable not a Gerber file.'))
                     return 'fail'
@@ -2110,45 +1937,16 @@ class appIO(QtCore.QObject):
             self.inform.emit('[ERROR_NOTCL] %s. %s' % (filename, _("File no longer available.")))
             return
 
-        # How the object should be initialized
-        def obj_init(excellon_obj, app_obj):
-            # populate excellon_obj.tools dict
-            try:
-                ret = excellon_obj.parse_file(filename=filename)
-                if ret == "fail":
-                    app_obj.log.debug("Excellon parsing failed.")
-                    self.inform.emit('[ERROR_NOTCL] %s' % _("This is not Excellon file."))
-                    return "fail"
-            except IOError:
-                app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Cannot open file"), filename))
-                app_obj.log.debug("Could not open Excellon object.")
-                return "fail"
-            except Exception:
-                msg = '[ERROR_NOTCL] %s' % _("An internal error has occurred. See shell.\n")
-                msg += traceback.format_exc()
-                app_obj.inform.emit(msg)
-                return "fail"
-
-            # populate excellon_obj.solid_geometry list
-            ret = excellon_obj.create_geometry()
-            if ret == 'fail':
-                app_obj.log.debug("Could not create geometry for Excellon object.")
-                return "fail"
-
-            for tool in excellon_obj.tools:
-                if excellon_obj.tools[tool]['solid_geometry']:
-                    return
-            app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("No geometry found in file"), filename))
-            return "fail"
-
         with self.app.proc_container.new('%s...' % _("Opening")):
             # Object name
             name = outname or filename.split('/')[-1].split('\\')[-1]
-            ret_val = self.app.app_obj.new_object("excellon", name, obj_init, autoselected=False, plot=plot)
+            ret_val = self.app.app_obj.new_object("excellon", name, excellon_file_init(filename), autoselected=False,
+                                                  plot=plot)
             if ret_val == 'fail':
                 if from_tcl:
                     filename = self.options['global_tcl_path'] + '/' + name
-                    ret_val = self.app.app_obj.new_object("excellon", name, obj_init, autoselected=False, plot=plot)
+                    ret_val = self.app.app_obj.new_object("excellon", name, excellon_file_init(filename),
+                                                          autoselected=False, plot=plot)
                 if ret_val == 'fail':
                     self.inform.emit('[ERROR_NOTCL] %s' %
                                      _('Open Excellon file failed. Probable not an Excellon file.'))
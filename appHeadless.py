@@ -0,0 +1,236 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
+
+# Headless mode. Started with the --headless=1 command line option FlatCAM runs without any widget: no MainGUI, no
+# Preferences, no Plugins UI, no plot canvas and no systray. The Tcl script given with --shellfile runs on the core of
+# the application (appCore.AppCore) and, with the --batch_server=1 option, the batch server (appHandlers/appBatch.py)
+# keeps the core running and accepts jobs.
+#
+# This module has also two jobs made of the App Tcl commands, from the command line:
+#     python appHeadless.py --gerber board.gbr --excellon board.drl --output board --tooldia 0.2
+#
+# or from a script:
+#     core = AppCore()
+#     gerber_to_gcode(core, 'board.gbr', 'board.nc', tooldia=0.2, passes=2)
+#     core.exec_command('open_excellon board.drl -outname drl; drillcncjob drl -drillz -1.8 -outname drl_cnc')
+#     core.exec_command('write_gcode drl_cnc board_drl.nc')
+#     core.close()
+
+import os
+import sys
+import signal
+import logging
+import argparse
+
+from PyQt6 import QtCore
+
+from appCore import AppCore, unique_object_name, shellvar_commands
+
+import gettext
+import appTranslation as fcTranslate
+import builtins
+
+fcTranslate.apply_language('strings')
+if '_' not in builtins.__dict__:
+    _ = gettext.gettext
+
+log = logging.getLogger('base')
+
+
+def write_gcode(core, job_name, gcode_file):
+    """
+    Save the GCode of a CNCJob object with the write_gcode Tcl command.
+
+    :param core:        the AppCore
+    :param job_name:    name of the CNCJob object
+    :param gcode_file:  path of the GCode file
+    :return:            None
+    """
+    ret_val = core.run_command('write_gcode', job_name, gcode_file)
+    if ret_val is not None:
+        raise ValueError('%s: %s' % (_("Failed."), str(ret_val)))
+
+
+def gerber_to_gcode(core, gerber_file, gcode_file, tooldia=None, passes=None, overlap=None, pp=None, **params):
+    """
+    Isolate the copper features of a Gerber file and save the GCode that mills the isolation. The file is opened and
+    isolated by the open_gerber and isolate Tcl commands. The GCode is made by Geometry.generatecncjob(), the code of
+    the cncjob Tcl command for the single geometry objects; the cncjob command itself needs the Milling Plugin of the
+    App for the multi-geometry objects.
+
+    :param core:        the AppCore
+    :param gerber_file: path of the Gerber file
+    :param gcode_file:  path of the GCode file
+    :param tooldia:     isolation tool diameter; by default the first diameter in the 'tools_iso_tooldia' preference
+    :param passes:      number of passes; by default from the preferences
+    :param overlap:     overlap of the passes, in percent; by default from the preferences
+    :param pp:          name of the geometry preprocessor; by default the 'tools_mill_ppname_g' preference
+    :param params:      parameters of Geometry.generatecncjob(), like z_cut, z_move, feedrate
+    :return:            the CNCjob
+    """
+    if tooldia is None:
+        tooldia = float(str(core.options["tools_iso_tooldia"]).split(',')[0])
+    params.setdefault('z_cut', core.options["tools_iso_tool_cutz"])
+
+    names = core.collection.get_names()
+    gerber_name = unique_object_name(os.path.splitext(os.path.basename(gerber_file))[0], names)
+    iso_name = unique_object_name('%s_iso' % gerber_name, names)
+    job_name = unique_object_name('%s_cnc' % gerber_name, names)
+
+    core.run_command('open_gerber', gerber_file, '-outname', gerber_name)
+
+    iso_args = [gerber_name, '-dia', tooldia, '-combine', 1, '-outname', iso_name]
+    if passes is not None:
+        iso_args += ['-passes', passes]
+    if overlap is not None:
+        iso_args += ['-overlap', overlap]
+    core.run_command('isolate', *iso_args)
+
+    geometry = core.collection.get_by_name(iso_name)
+    if geometry is None:
+        raise ValueError('%s: %s' % (_("Failed."), iso_name))
+
+    with core.app_context():
+        geometry.generatecncjob(outname=job_name, dia=tooldia, pp=pp, use_thread=False, plot=False, **params)
+
+    job = core.collection.get_by_name(job_name)
+    if job is None:
+        raise ValueError('%s: %s' % (_("Failed."), job_name))
+
+    write_gcode(core, job_name, gcode_file)
+    return job
+
+
+def excellon_to_gcode(core, excellon_file, gcode_file, drilled_dias="all", pp=None, drillz=None):
+    """
+    Save the GCode that drills the holes of an Excellon file. The file is opened and drilled by the open_excellon and
+    drillcncjob Tcl commands so the drilling parameters that are not given are taken from the 'tools_drill_*'
+    preferences, like in the App.
+
+    :param core:            the AppCore
+    :param excellon_file:   path of the Excellon file
+    :param gcode_file:      path of the GCode file
+    :param drilled_dias:    comma separated tool diameters or "all"
+    :param pp:              name of the Excellon preprocessor; by default from the preferences
+    :param drillz:          drill depth; by default from the preferences
+    :return:                the CNCjob
+    """
+    names = core.collection.get_names()
+    excellon_name = unique_object_name(os.path.splitext(os.path.basename(excellon_file))[0], names)
+    job_name = unique_object_name('%s_cnc' % excellon_name, names)
+
+    core.run_command('open_excellon', excellon_file, '-outname', excellon_name)
+
+    drill_args = [excellon_name, '-drilled_dias', drilled_dias, '-outname', job_name]
+    if pp is not None:
+        drill_args += ['-pp', pp]
+    if drillz is not None:
+        drill_args += ['-drillz', drillz]
+    core.run_command('drillcncjob', *drill_args)
+
+    job = core.collection.get_by_name(job_name)
+    if job is None:
+        raise ValueError('%s: %s' % (_("Failed."), job_name))
+
+    write_gcode(core, job_name, gcode_file)
+    return job
+
+
+def run_headless(data_path, shellfile='', shellvar='', batch_server=False):
+    """
+    Run FlatCAM without the GUI. Started by flatcam.py with the --headless=1 command line option.
+
+    :param data_path:       the FlatCAM data folder
+    :param shellfile:       path of a Tcl script to run
+    :param shellvar:        value of the --shellvar command line option; sets the shellvar_0, shellvar_1, ... Tcl
+                            variables used by the script
+    :param batch_server:    if True keep running and accept the jobs of the batch clients, until interrupted
+    :return:                the exit code
+    """
+    # the batch server thread talks to the core through the Qt event loop
+    qapp = QtCore.QCoreApplication(sys.argv) if batch_server else None
+
+    core = AppCore(data_path=data_path)
+    log.warning("*******************  RUNNING HEADLESS  *******************")
+
+    ret = 0
+    try:
+        for command_tcl_formatted in shellvar_commands(shellvar) if shellvar else []:
+            core.exec_command(command_tcl_formatted)
+
+        if shellfile:
+            with open(shellfile, "r") as myfile:
+                core.exec_command(myfile.read())
+
+        if batch_server:
+            from appHandlers.appBatch import appBatch
+
+            batch = appBatch(app=core)
+            batch.start_server()
+
+            signal.signal(signal.SIGINT, lambda *args: qapp.quit())
+            # interrupt the Qt loop such that Python events have a chance to be responsive
+            timer = QtCore.QTimer()
+            timer.timeout.connect(lambda: None)
+            timer.start(100)
+
+            qapp.exec()
+            batch.stop_server()
+    except Exception as err:
+        log.error("run_headless() -> %s" % str(err))
+        ret = 2
+    finally:
+        core.close()
+    return ret
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FlatCAM headless GCode generation.")
+    parser.add_argument('--gerber', action='append', default=[], help="Gerber file to isolate (can be repeated)")
+    parser.add_argument('--excellon', action='append', default=[], help="Excellon file to drill (can be repeated)")
+    parser.add_argument('--output', default=None, help="Output folder; by default next to the input files")
+    parser.add_argument('--tooldia', type=float, default=None, help="Isolation tool diameter")
+    parser.add_argument('--passes', type=int, default=None, help="Number of isolation passes")
+    parser.add_argument('--overlap', type=float, default=None, help="Overlap of the isolation passes, in percent")
+    parser.add_argument('--cutz', type=float, default=None, help="Isolation cut depth")
+    parser.add_argument('--drillz', type=float, default=None, help="Drill depth")
+    parser.add_argument('--pp_geometry', default=None, help="Preprocessor for the isolation GCode")
+    parser.add_argument('--pp_excellon', default=None, help="Preprocessor for the drilling GCode")
+    parser.add_argument('--factory_defaults', action='store_true', help="Ignore the saved preferences")
+    parser.add_argument('--verbose', action='store_true', help="Log the progress messages")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.ERROR, format='[%(levelname)s] %(message)s')
+
+    def out_path(filename):
+        folder = args.output if args.output else os.path.dirname(os.path.abspath(filename))
+        return os.path.join(folder, os.path.splitext(os.path.basename(filename))[0] + '.nc')
+
+    core = AppCore(user_defaults=not args.factory_defaults)
+    ret = 0
+    try:
+        for filename in args.gerber:
+            params = {} if args.cutz is None else {'z_cut': args.cutz}
+            try:
+                gerber_to_gcode(core, filename, out_path(filename), tooldia=args.tooldia, passes=args.passes,
+                                overlap=args.overlap, pp=args.pp_geometry, **params)
+                print("%s -> %s" % (filename, out_path(filename)))
+            except Exception as err:
+                log.error("%s: %s" % (filename, str(err)))
+                ret = 1
+        for filename in args.excellon:
+            try:
+                excellon_to_gcode(core, filename, out_path(filename), pp=args.pp_excellon, drillz=args.drillz)
+                print("%s -> %s" % (filename, out_path(filename)))
+            except Exception as err:
+                log.error("%s: %s" % (filename, str(err)))
+                ret = 1
+    finally:
+        core.close()
+    return ret
+
+
+if __name__ == '__main__':
+    sys.exit(main())
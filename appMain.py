@@ -42,7 +42,6 @@ from io import StringIO
 import gc
 
 from multiprocessing.connection import Listener, Client
-from multiprocessing import Pool
 import socket
 
 import tkinter as tk
@@ -76,13 +75,14 @@ from appCommon.RegisterFileKeywords import RegisterFK, Extensions, KeyWords
 
 from appHandlers.appIO import appIO
 from appHandlers.appEdit import appEditor
+from appHandlers.appBatch import appBatch
 
 from Bookmark import BookmarkManager
 from appDatabase import ToolsDB2
 
 # App defaults (preferences)
 from defaults import AppDefaults
-from defaults import AppOptions
+from appCore import VERSION, VERSION_DATE, load_options, shellvar_commands
 
 # App Objects
 from appGUI.preferences.OptionsGroupUI import OptionsGroupUI
@@ -109,10 +109,13 @@ from appEditors.appGCodeEditor import AppGCodeEditor
 
 # App Workers
 from appProcess import *
-from appWorkerStack import WorkerStack
+from appStartupTracer import startup_tracer
+from appWorkerStack import WorkerStack, PRIORITY_INTERACTIVE, PRIORITY_JOB, PRIORITY_BACKGROUND
+from appPool import WorkerPool
 
 # App Plugins
-from appPlugins import *
+from appPlugins import install_plugins, is_loaded
+from appPlugins.ToolShell import FCShell
 
 from numpy import inf
 
@@ -143,15 +146,20 @@ class App(QtCore.QObject):
     cmd_line_shellfile = ''
     cmd_line_shellvar = ''
     cmd_line_headless = None
+    cmd_line_batch_server = None
 
     cmd_line_help = "FlatCam.py --shellfile=<cmd_line_shellfile>\n" \
                     "FlatCam.py --shellvar=<1,'C:\\path',23>\n" \
-                    "FlatCam.py --headless=1"
+                    "FlatCam.py --headless=1\n" \
+                    "FlatCam.py --headless=1 --batch_server=1\n" \
+                    "FlatCam.py --startup_trace=<json|chrome>"
     try:
         # Multiprocessing pool will spawn additional processes with 'multiprocessing-fork' flag
         cmd_line_options, args = getopt.getopt(sys.argv[1:], "h:", ["shellfile=",
                                                                     "shellvar=",
                                                                     "headless=",
+                                                                    "batch_server=",
+                                                                    "startup_trace=",
                                                                     "multiprocessing-fork="])
     except getopt.GetoptError:
         print(cmd_line_help)
@@ -170,13 +178,18 @@ class App(QtCore.QObject):
                 cmd_line_headless = eval(arg)
             except NameError:
                 pass
+        elif opt == '--batch_server':
+            try:
+                cmd_line_batch_server = int(arg)
+            except ValueError:
+                pass
 
     # ###############################################################################################################
     # ################################### Version and VERSION DATE ##################################################
     # ###############################################################################################################
-    version = "Unstable"
+    version = VERSION
     # version = 1.0
-    version_date = "2023/6/31"
+    version_date = VERSION_DATE
     beta = True
     engine = '3D'
 
@@ -294,6 +307,7 @@ class App(QtCore.QObject):
         # #############################################################################################################
         # ######################################### LOGGING ###########################################################
         # #############################################################################################################
+        startup_tracer.begin("Logging, data and folders")
         self.log = logging.getLogger('base')
         self.log.setLevel(logging.DEBUG)
         # log.setLevel(logging.WARNING)
@@ -488,9 +502,6 @@ class App(QtCore.QObject):
                                     portable = eval(param[2])
                                 except NameError:
                                     portable = False
-                            if param[0] == 'headless':
-                                if param[2].lower() == 'true':
-                                    self.cmd_line_headless = 1
                     except Exception as e:
                         self.log.error('App.__init__() -->%s' % str(e))
                         return
@@ -586,24 +597,16 @@ class App(QtCore.QObject):
         # ############################################################################################################
         # ################################# DEFAULTS - PREFERENCES STORAGE ###########################################
         # ############################################################################################################
-        self.defaults = AppDefaults(beta=self.beta, version=self.version)
-
-        # current_defaults_path = os.path.join(self.data_path, "current_defaults.FlatConfig")
-        current_defaults_path = self.defaults_path()
-        if user_defaults:
-            self.defaults.load(filename=current_defaults_path, inform=self.inform)
-
+        startup_tracer.begin("Defaults")
         # ###########################################################################################################
         # ######################################## UPDATE THE OPTIONS ###############################################
         # ###########################################################################################################
-        self.options = AppOptions(version=self.version)
         # -----------------------------------------------------------------------------------------------------------
-        #   Update the self.options from the self.defaults
-        #   The self.options holds the application defaults while the self.options holds the object defaults
+        #   The self.options are a copy of the self.defaults
+        #   The self.defaults holds the application defaults while the self.options holds the object defaults
         # -----------------------------------------------------------------------------------------------------------
-        # Copy app defaults to project options
-        for def_key, def_val in self.defaults.items():
-            self.options[def_key] = deepcopy(def_val)
+        self.defaults, self.options = load_options(self.defaults_path(), version=self.version, beta=self.beta,
+                                                   inform=self.inform, user_defaults=user_defaults)
 
         # self.preferencesUiManager.show_preferences_gui()
 
@@ -657,11 +660,13 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ###################################### CREATE MULTIPROCESSING POOL #######################################
         # ###########################################################################################################
-        self.pool = Pool(processes=self.options["global_process_number"])
+        startup_tracer.begin("Multiprocessing Pool")
+        self.pool = WorkerPool(processes=self.options["global_process_number"])
 
         # ###########################################################################################################
         # ###################################### Clear GUI Settings - once at first start ###########################
         # ###########################################################################################################
+        startup_tracer.begin("GUI settings and Splash Screen")
         if self.options["first_run"] is True:
             # on first run clear the previous QSettings, therefore clearing the GUI settings
             qsettings = QSettings("Open Source", "FlatCAM_EVO")
@@ -683,7 +688,7 @@ class App(QtCore.QObject):
             del splash_settings
             show_splash = 1
 
-        if show_splash and self.cmd_line_headless != 1:
+        if show_splash:
             splash_pix = QtGui.QPixmap(self.resource_location + '/splash.png')
             # self.splash = QtWidgets.QSplashScreen(splash_pix, Qt.WindowType.WindowStaysOnTopHint)
             self.splash = QtWidgets.QSplashScreen(splash_pix)
@@ -709,6 +714,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ########################################## LOAD LANGUAGES  ################################################
         # ###########################################################################################################
+        startup_tracer.begin("Translations")
 
         self.languages = fcTranslate.load_languages()
         aval_languages = []
@@ -733,6 +739,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # #################################### LOAD PREPROCESSORS ###################################################
         # ###########################################################################################################
+        startup_tracer.begin("Preprocessors")
 
         # ----------------------------------------- WARNING --------------------------------------------------------
         # Preprocessors need to be loaded before the Preferences Manager builds the Preferences
@@ -779,6 +786,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ######################################### Initialize GUI ##################################################
         # ###########################################################################################################
+        startup_tracer.begin("Main GUI")
 
         # FlatCAM colors used in plotting
         self.FC_light_green = '#BBF268BF'
@@ -816,6 +824,7 @@ class App(QtCore.QObject):
         # ########################################### Initialize Tcl Shell ##########################################
         # ###########################    always initialize it after the UI is initialized   #########################
         # ###########################################################################################################
+        startup_tracer.begin("Tcl Shell")
         self.shell = FCShell(app=self, version=self.version)
         self.log.debug("Stardate: %s" % self.date)
         self.log.debug("TCL Shell has been initialized.")
@@ -846,6 +855,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ##################################### UPDATE PREFERENCES GUI FORMS ########################################
         # ###########################################################################################################
+        startup_tracer.begin("Preferences GUI")
         self.preferencesUiManager = PreferencesUIManager(
             data_path=self.data_path,
             ui=self.ui,
@@ -875,6 +885,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # #################################### SETUP OBJECT COLLECTION ##############################################
         # ###########################################################################################################
+        startup_tracer.begin("Object Collection")
 
         self.collection = ObjectCollection(app=self)
         self.ui.project_tab_layout.addWidget(self.collection.view)
@@ -890,6 +901,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ######################################## SETUP 3D Area ####################################################
         # ###########################################################################################################
+        startup_tracer.begin("Plot Area")
         self.area_3d_tab = QtWidgets.QWidget()
 
         # ###########################################################################################################
@@ -978,6 +990,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ############################################### Worker SETUP ##############################################
         # ###########################################################################################################
+        startup_tracer.begin("Workers")
         w_number = int(self.options["global_worker_number"]) if self.options["global_worker_number"] else 2
         self.workers = WorkerStack(workers_number=w_number)
 
@@ -999,6 +1012,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ########################################## Tools and Plugins ##############################################
         # ###########################################################################################################
+        startup_tracer.begin("Plugins")
 
         self.dblsidedtool = None
         self.distance_tool = None
@@ -1048,6 +1062,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ######################################### BookMarks Manager ###############################################
         # ###########################################################################################################
+        startup_tracer.begin("Bookmarks, Tools Database and Shell")
 
         # install Bookmark Manager and populate bookmarks in the Help -> Bookmarks
         self.install_bookmarks()
@@ -1088,6 +1103,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ################################## ADDING FlatCAM EDITORS section #########################################
         # ###########################################################################################################
+        startup_tracer.begin("Editors")
 
         # watch out for the position of the editor instantiation ... if it is done before a save of the default values
         # at the first launch of the App , the editors will not be functional.
@@ -1127,6 +1143,7 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         self.f_handlers = appIO(app=self)
         self.edit_class = appEditor(app=self)
+        self.batch = appBatch(app=self)
 
         # this is calculated in the class above (somehow?)
         self.options["root_folder_path"] = self.app_home
@@ -1135,6 +1152,7 @@ class App(QtCore.QObject):
         # ##################################### FIRST RUN SECTION ###################################################
         # ################################ It's done only once after install   #####################################
         # ###########################################################################################################
+        startup_tracer.begin("First run, Systray and Recent items")
         if self.options["first_run"] is True:
             # ONLY AT FIRST STARTUP INIT THE GUI LAYOUT TO 'minimal'
             self.log.debug("-> First Run: Setting up the first Layout")
@@ -1154,18 +1172,10 @@ class App(QtCore.QObject):
         # ############################################### SYS TRAY ##################################################
         # ###########################################################################################################
         self.parent_w = QtWidgets.QWidget()
-        if self.cmd_line_headless == 1:
-            # if running headless always have the systray to be able to quit the app correctly
+        if self.options["global_systray_icon"]:
             self.trayIcon = AppSystemTray(app=self,
-                                          icon=QtGui.QIcon(self.resource_location +
-                                                           '/app32.png'),
-                                          headless=True,
+                                          icon=QtGui.QIcon(self.resource_location + '/app32.png'),
                                           parent=self.parent_w)
-        else:
-            if self.options["global_systray_icon"]:
-                self.trayIcon = AppSystemTray(app=self,
-                                              icon=QtGui.QIcon(self.resource_location + '/app32.png'),
-                                              parent=self.parent_w)
 
         # ###########################################################################################################
         # ############################################ SETUP RECENT ITEMS ###########################################
@@ -1177,6 +1187,7 @@ class App(QtCore.QObject):
         # ############################################# Signal handling #############################################
         # ###########################################################################################################
         # ###########################################################################################################
+        startup_tracer.begin("Signals")
 
         # ########################################## Custom signals  ################################################
         # signal for displaying messages in status bar
@@ -1316,65 +1327,43 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         # ########################################## SHOW GUI #######################################################
         # ###########################################################################################################
+        startup_tracer.begin("Show GUI")
 
-        # if the app is not started as headless, show it
-        if self.cmd_line_headless != 1:
-            if show_splash:
-                # finish the splash
-                self.splash.finish(self.ui)
-
-            mgui_settings = QSettings("Open Source", "FlatCAM_EVO")
-            if mgui_settings.contains("maximized_gui"):
-                maximized_ui = mgui_settings.value('maximized_gui', type=bool)
-                if maximized_ui is True:
-                    self.ui.showMaximized()
-                else:
-                    self.ui.show()
+        # the headless mode (appHeadless.py) runs without the App so the GUI is always shown
+        if show_splash:
+            # finish the splash
+            self.splash.finish(self.ui)
+
+        mgui_settings = QSettings("Open Source", "FlatCAM_EVO")
+        if mgui_settings.contains("maximized_gui"):
+            maximized_ui = mgui_settings.value('maximized_gui', type=bool)
+            if maximized_ui is True:
+                self.ui.showMaximized()
             else:
                 self.ui.show()
-
-            if self.options["global_systray_icon"]:
-                self.trayIcon.show()
         else:
-            try:
-                self.trayIcon.show()
-            except Exception as t_err:
-                self.log.error("App.__init__() Running headless and trying to show the systray got: %s" % str(t_err))
-            self.log.warning("*******************  RUNNING HEADLESS  *******************")
+            self.ui.show()
+
+        if self.options["global_systray_icon"]:
+            self.trayIcon.show()
 
         # ###########################################################################################################
         # ######################################## START-UP ARGUMENTS ###############################################
         # ###########################################################################################################
+        startup_tracer.begin("Start-up arguments")
 
         # test if the program was started with a script as parameter
         if self.cmd_line_shellvar:
             try:
-                cnt = 0
-                command_tcl = 0
-                for i in self.cmd_line_shellvar.split(','):
-                    if i is not None:
-                        # noinspection PyBroadException
-                        try:
-                            command_tcl = eval(i)
-                        except Exception:
-                            command_tcl = i
-
-                    command_tcl_formatted = 'set shellvar_{nr} "{cmd}"'.format(cmd=str(command_tcl), nr=str(cnt))
-
-                    cnt += 1
-
-                    # if there are Windows paths then replace the path separator with a Unix like one
-                    if sys.platform == 'win32':
-                        command_tcl_formatted = command_tcl_formatted.replace('\\', '/')
+                for command_tcl_formatted in shellvar_commands(self.cmd_line_shellvar):
                     self.shell.exec_command(command_tcl_formatted, no_echo=True)
             except Exception as ext:
                 print("ERROR: ", ext)
                 sys.exit(2)
 
         if self.cmd_line_shellfile:
-            if self.cmd_line_headless != 1:
-                if self.ui.shell_dock.isHidden():
-                    self.ui.shell_dock.show()
+            if self.ui.shell_dock.isHidden():
+                self.ui.shell_dock.show()
             try:
                 with open(self.cmd_line_shellfile, "r") as myfile:
                     # if show_splash:
@@ -1385,10 +1374,7 @@ class App(QtCore.QObject):
                     #                             alignment=Qt.AlignBottom | Qt.AlignLeft,
                     #                             color=QtGui.QColor("lightgray"))
                     cmd_line_shellfile_text = myfile.read()
-                    if self.cmd_line_headless != 1:
-                        self.shell.exec_command(cmd_line_shellfile_text)
-                    else:
-                        self.shell.exec_command(cmd_line_shellfile_text, no_echo=True)
+                    self.shell.exec_command(cmd_line_shellfile_text)
 
             except Exception as ext:
                 print("ERROR: ", ext)
@@ -1404,6 +1390,12 @@ class App(QtCore.QObject):
                                                       "Please reboot the application to update."))
             self.defaults.old_defaults_found = False
 
+        # keep running and accept Tcl scripts and jobs from the batch clients
+        if self.cmd_line_batch_server == 1:
+            self.batch.start_server()
+
+        startup_tracer.end()
+
     # ######################################### INIT FINISHED  #######################################################
     # #################################################################################################################
     # #################################################################################################################
@@ -1579,6 +1571,10 @@ class App(QtCore.QObject):
         ]:
             self.on_properties_tab_click()
 
+        if key_changed == "global_process_number":
+            # the running tasks finish in the old processes
+            self.pool.resize(self.options["global_process_number"])
+
         # TODO handle changing the units in the Preferences
         # if key_changed == "units":
         #     self.on_toggle_units(no_pref=False)
@@ -1596,13 +1592,12 @@ class App(QtCore.QObject):
 
     def clear_pool(self):
         """
-        Clear the multiprocessing pool and calls garbage collector.
+        Replace the processes of the multiprocessing pool, to free their memory, and calls garbage collector.
+        The tasks running in the old processes are not interrupted.
 
         :return: None
         """
-        self.pool.close()
-
-        self.pool = Pool(processes=self.options["global_process_number"])
+        self.pool.recycle()
         self.pool_recreated.emit(self.pool)
 
         gc.collect()
@@ -1610,7 +1605,7 @@ class App(QtCore.QObject):
     def install_tools(self, init_tcl=False):
         """
         This installs the FlatCAM tools (plugin-like) which reside in their own classes.
-        Instantiation of the Tools classes.
+        Only the menu entries are installed here; each Tool is imported and instantiated on first use.
         The order that the tools are installed is important as they can depend on each other installing position.
 
         :return: None
@@ -1621,135 +1616,9 @@ class App(QtCore.QObject):
             self.shell = FCShell(app=self, version=self.version)
             self.log.debug("TCL was re-instantiated. TCL variables are reset.")
 
-        self.distance_tool = Distance(self)
-        self.distance_tool.install(icon=QtGui.QIcon(self.resource_location + '/distance16.png'), pos=self.ui.menuedit,
-                                   before=self.ui.menuedit_numeric_move,
-                                   separator=False)
-
-        self.distance_min_tool = ObjectDistance(self)
-        self.distance_min_tool.install(icon=QtGui.QIcon(self.resource_location + '/distance_min16.png'),
-                                       pos=self.ui.menuedit,
-                                       before=self.ui.menuedit_numeric_move,
-                                       separator=True)
-
-        self.dblsidedtool = DblSidedTool(self)
-        self.dblsidedtool.install(icon=QtGui.QIcon(self.resource_location + '/doubleside16.png'), separator=False)
-
-        self.align_objects_tool = AlignObjects(self)
-        self.align_objects_tool.install(icon=QtGui.QIcon(self.resource_location + '/align16.png'), separator=False)
-
-        self.extract_tool = ToolExtract(self)
-        self.extract_tool.install(icon=QtGui.QIcon(self.resource_location + '/extract32.png'), separator=True)
-
-        self.panelize_tool = Panelize(self)
-        self.panelize_tool.install(icon=QtGui.QIcon(self.resource_location + '/panelize16.png'))
-
-        self.film_tool = Film(self)
-        self.film_tool.install(icon=QtGui.QIcon(self.resource_location + '/film32.png'))
-
-        self.paste_tool = SolderPaste(self)
-        self.paste_tool.install(icon=QtGui.QIcon(self.resource_location + '/solderpastebis32.png'))
-
-        self.calculator_tool = ToolCalculator(self)
-        self.calculator_tool.install(icon=QtGui.QIcon(self.resource_location + '/calculator32.png'), separator=True)
-
-        self.sub_tool = ToolSub(self)
-        self.sub_tool.install(icon=QtGui.QIcon(self.resource_location + '/sub32.png'),
-                              pos=self.ui.menu_plugins, separator=True)
-
-        self.rules_tool = RulesCheck(self)
-        self.rules_tool.install(icon=QtGui.QIcon(self.resource_location + '/rules32.png'),
-                                pos=self.ui.menu_plugins, separator=False)
-
-        self.optimal_tool = ToolOptimal(self)
-        self.optimal_tool.install(icon=QtGui.QIcon(self.resource_location + '/open_excellon32.png'),
-                                  pos=self.ui.menu_plugins, separator=True)
-
-        self.move_tool = ToolMove(self)
-        self.move_tool.install(icon=QtGui.QIcon(self.resource_location + '/move16.png'), pos=self.ui.menuedit,
-                               before=self.ui.menuedit_numeric_move, separator=True)
-
-        self.cutout_tool = CutOut(self)
-        self.cutout_tool.install(icon=QtGui.QIcon(self.resource_location + '/cut32.png'), pos=self.ui.menu_plugins,
-                                 before=self.sub_tool.menuAction)
-
-        self.ncclear_tool = NonCopperClear(self)
-        self.ncclear_tool.install(icon=QtGui.QIcon(self.resource_location + '/ncc32.png'), pos=self.ui.menu_plugins,
-                                  before=self.sub_tool.menuAction, separator=True)
-
-        self.paint_tool = ToolPaint(self)
-        self.paint_tool.install(icon=QtGui.QIcon(self.resource_location + '/paint32.png'), pos=self.ui.menu_plugins,
-                                before=self.sub_tool.menuAction, separator=True)
-
-        self.isolation_tool = ToolIsolation(self)
-        self.isolation_tool.install(icon=QtGui.QIcon(self.resource_location + '/iso_16.png'), pos=self.ui.menu_plugins,
-                                    before=self.sub_tool.menuAction, separator=True)
-
-        self.follow_tool = ToolFollow(self)
-        self.follow_tool.install(icon=QtGui.QIcon(self.resource_location + '/follow32.png'), pos=self.ui.menu_plugins,
-                                 before=self.sub_tool.menuAction, separator=True)
-
-        self.drilling_tool = ToolDrilling(self)
-        self.drilling_tool.install(icon=QtGui.QIcon(self.resource_location + '/extract_drill32.png'),
-                                   pos=self.ui.menu_plugins, before=self.sub_tool.menuAction, separator=True)
-        self.milling_tool = ToolMilling(self)
-        self.milling_tool.install(icon=QtGui.QIcon(self.resource_location + '/milling_tool32.png'),
-                                  pos=self.ui.menu_plugins, before=self.sub_tool.menuAction, separator=True)
-
-        self.levelling_tool = ToolLevelling(self)
-        self.levelling_tool.install(icon=QtGui.QIcon(self.resource_location + '/level32.png'),
-                                    pos=self.ui.menuoptions_experimental, separator=True)
-
-        self.copper_thieving_tool = ToolCopperThieving(self)
-        self.copper_thieving_tool.install(icon=QtGui.QIcon(self.resource_location + '/copperfill32.png'),
-                                          pos=self.ui.menu_plugins)
-
-        self.fiducial_tool = ToolFiducials(self)
-        self.fiducial_tool.install(icon=QtGui.QIcon(self.resource_location + '/fiducials_32.png'),
-                                   pos=self.ui.menu_plugins)
-
-        self.qrcode_tool = QRCode(self)
-        self.qrcode_tool.install(icon=QtGui.QIcon(self.resource_location + '/qrcode32.png'),
-                                 pos=self.ui.menu_plugins)
-
-        self.punch_tool = ToolPunchGerber(self)
-        self.punch_tool.install(icon=QtGui.QIcon(self.resource_location + '/punch32.png'), pos=self.ui.menu_plugins)
-
-        self.invert_tool = ToolInvertGerber(self)
-        self.invert_tool.install(icon=QtGui.QIcon(self.resource_location + '/invert32.png'), pos=self.ui.menu_plugins)
-
-        self.markers_tool = ToolMarkers(self)
-        self.markers_tool.install(icon=QtGui.QIcon(self.resource_location + '/corners_32.png'),
-                                  pos=self.ui.menu_plugins)
-
-        self.etch_tool = ToolEtchCompensation(self)
-        self.etch_tool.install(icon=QtGui.QIcon(self.resource_location + '/etch_32.png'), pos=self.ui.menu_plugins)
-
-        self.transform_tool = ToolTransform(self)
-        self.transform_tool.install(icon=QtGui.QIcon(self.resource_location + '/transform.png'),
-                                    pos=self.ui.menuoptions, separator=True)
-
-        self.report_tool = ObjectReport(self)
-        self.report_tool.install(icon=QtGui.QIcon(self.resource_location + '/properties32.png'),
-                                 pos=self.ui.menuoptions)
-
-        self.pdf_tool = ToolPDF(self)
-        self.pdf_tool.install(icon=QtGui.QIcon(self.resource_location + '/pdf32.png'),
-                              pos=self.ui.menufileimport,
-                              separator=True)
-
-        try:
-            self.image_tool = ToolImage(self)
-            self.image_tool.install(icon=QtGui.QIcon(self.resource_location + '/image32.png'),
-                                    pos=self.ui.menufileimport,
-                                    separator=True)
-        except Exception as im_err:
-            self.log.error("Image Import plugin could not be started due of: %s" % str(im_err))
-            self.image_tool = lambda x: None
-
-        self.pcb_wizard_tool = PcbWizard(self)
-        self.pcb_wizard_tool.install(icon=QtGui.QIcon(self.resource_location + '/drill32.png'),
-                                     pos=self.ui.menufileimport)
+        # the Plugins are installed as proxies holding only the menu entry; a Plugin is imported and instantiated on
+        # first use (see appPlugins.PLUGINS for the menu positions and the install order)
+        install_plugins(self)
 
         # create a list of plugins references
         self.app_plugins = [
@@ -3830,6 +3699,8 @@ class App(QtCore.QObject):
                 self.listen_th.requestInterruption()
                 self.log.debug("ArgThread QThread requested an interruption.")
 
+        self.batch.stop_server()
+
         # close editors before quiting the app, if they are open
         if self.call_source == 'geo_editor':
             self.geo_editor.deactivate()
@@ -3873,33 +3744,32 @@ class App(QtCore.QObject):
             self.plotcanvas.graph_event_disconnect(self.mdc)
             self.plotcanvas.graph_event_disconnect(self.kp)
 
-        if self.cmd_line_headless != 1:
-            # save app state to file
-            stgs = QSettings("Open Source", "FlatCAM_EVO")
-            stgs.setValue('saved_gui_state', self.ui.saveState())
-            stgs.setValue('maximized_gui', self.ui.isMaximized())
-            stgs.setValue(
-                'language',
-                self.ui.general_pref_form.general_app_group.language_combo.get_value()
-            )
-            stgs.setValue(
-                'notebook_font_size',
-                self.ui.general_pref_form.general_app_set_group.notebook_font_size_spinner.get_value()
-            )
-            stgs.setValue(
-                'axis_font_size',
-                self.ui.general_pref_form.general_app_set_group.axis_font_size_spinner.get_value()
-            )
-            stgs.setValue(
-                'textbox_font_size',
-                self.ui.general_pref_form.general_app_set_group.textbox_font_size_spinner.get_value()
-            )
-            stgs.setValue(
-                'hud_font_size',
-                self.ui.general_pref_form.general_app_set_group.hud_font_size_spinner.get_value()
-            )
-            # This will write the setting to the platform specific storage.
-            del stgs
+        # save app state to file
+        stgs = QSettings("Open Source", "FlatCAM_EVO")
+        stgs.setValue('saved_gui_state', self.ui.saveState())
+        stgs.setValue('maximized_gui', self.ui.isMaximized())
+        stgs.setValue(
+            'language',
+            self.ui.general_pref_form.general_app_group.language_combo.get_value()
+        )
+        stgs.setValue(
+            'notebook_font_size',
+            self.ui.general_pref_form.general_app_set_group.notebook_font_size_spinner.get_value()
+        )
+        stgs.setValue(
+            'axis_font_size',
+            self.ui.general_pref_form.general_app_set_group.axis_font_size_spinner.get_value()
+        )
+        stgs.setValue(
+            'textbox_font_size',
+            self.ui.general_pref_form.general_app_set_group.textbox_font_size_spinner.get_value()
+        )
+        stgs.setValue(
+            'hud_font_size',
+            self.ui.general_pref_form.general_app_set_group.hud_font_size_spinner.get_value()
+        )
+        # This will write the setting to the platform specific storage.
+        del stgs
 
         if silent is False:
             self.log.debug("App.quit_application() --> App UI state saved.")
@@ -3916,7 +3786,7 @@ class App(QtCore.QObject):
 
         # terminate workers
         # self.workers.__del__()
-        self.clear_pool()
+        self.pool.close()
 
         self.workers.quit()
 
@@ -5002,6 +4872,28 @@ class App(QtCore.QObject):
             self.inform.emit('[WARNING_NOTCL] %s' % _("The current task was gracefully closed on user request..."))
             self.abort_flag = False
 
+    def new_progress(self, total=0):
+        """
+        Make the progress context of a long operation. Its tick() method checks for an abort and updates the progress
+        shown in the activity view at a limited rate.
+
+        :param total:   number of elements to be processed; 0 if not known
+        :return:        FCProgress
+        """
+        return FCProgress(self, total)
+
+    def submit_task(self, fcn, params=None, priority=PRIORITY_JOB, name=None):
+        """
+        Run a function in a Worker thread. Unlike the worker_task signal it returns a handle of the task.
+
+        :param fcn:         the function
+        :param params:      list of positional parameters for the function
+        :param priority:    PRIORITY_INTERACTIVE (plotting), PRIORITY_JOB (CAM jobs) or PRIORITY_BACKGROUND (autosave)
+        :param name:        name of the task, used in the log
+        :return:            TaskHandle; it can cancel the task, wait for its result and call functions when it is done
+        """
+        return self.workers.submit(fcn, params, priority=priority, name=name)
+
     def on_selectall(self):
         """
         Will draw a selection box shape around the selected objects.
@@ -6884,7 +6776,7 @@ class App(QtCore.QObject):
 
             if use_thread is True:
                 # Send to worker
-                self.worker_task.emit({'fcn': worker_task, 'params': [plot_obj]})
+                self.worker_task.emit({'fcn': worker_task, 'params': [plot_obj], 'priority': PRIORITY_INTERACTIVE})
             else:
                 worker_task(plot_obj)
 
@@ -6937,8 +6829,10 @@ class App(QtCore.QObject):
 
         }
 
+        # do not load the Image Import plugin just to register its opener
         try:
-            image_opener = self.image_tool.import_image
+            image_opener = self.image_tool.import_image if is_loaded(self.image_tool) else \
+                (lambda fname: self.image_tool.import_image(fname))
         except AttributeError:
             image_opener = None
 
@@ -7792,7 +7686,7 @@ class App(QtCore.QObject):
         """
 
         if self.block_autosave is False and self.should_we_save is True and self.save_in_progress is False:
-            self.f_handlers.on_file_save_project()
+            self.f_handlers.on_file_save_project(priority=PRIORITY_BACKGROUND)
 
     def save_project_auto_update(self):
         """
@@ -15,9 +15,10 @@ from appObjects.ExcellonObject import ExcellonObject
 from appObjects.GeometryObject import GeometryObject
 from appObjects.GerberObject import GerberObject
 from appObjects.ScriptObject import ScriptObject
+from appWorkerStack import PRIORITY_INTERACTIVE
+from appCore import init_new_object
 
 import time
-import traceback
 from copy import deepcopy
 
 # FlatCAM Translation
@@ -96,8 +97,6 @@ class AppObject(QtCore.QObject):
         obj_plot = plot
         obj_autoselected = autoselected
 
-        t0 = time.time()  # Debug
-
         # ## Create object
         classdict = {
             "gerber":       GerberObject,
@@ -120,95 +119,14 @@ class AppObject(QtCore.QObject):
         obj.isHovering = False
         obj.notHovering = True
 
-        # IMPORTANT
-        # The key names in defaults and options dictionaries are not random:
-        # they have to have in name first the type of the object (geometry, excellon, cncjob and gerber) or how it's
-        # called here, the 'kind' followed by an underline. Above the App default values from self.defaults are
-        # copied to self.obj_options. After that, below, depending on the type of
-        # object that is created, it will strip the name of the object and the underline (if the original key was
-        # let's say "excellon_toolchange", it will strip the excellon_) and to the obj.obj_options the key will become
-        # "toolchange"
-
-        # ############################################################################################################
-        # this section copies the application defaults related to the object to the object OPTIONS
         # ############################################################################################################
-        for option in self.app.options:
-            if option.find(kind + "_") == 0:
-                oname = option[len(kind) + 1:]
-                obj.obj_options[oname] = self.app.options[option]
-
-        # add some of the FlatCAM Tools related properties
-        # it is done like this to preserve some kind of order in the keys
-        if kind == 'excellon':
-            for option in self.app.options:
-                if option.find('tools_drill_') == 0:
-                    obj.obj_options[option] = self.app.options[option]
-        if kind == 'gerber':
-            for option in self.app.options:
-                if option.find('tools_iso_') == 0:
-                    obj.obj_options[option] = self.app.options[option]
-
-        # the milling options should be inherited by all manufacturing objects
-        if kind in ['excellon', 'gerber', 'geometry', 'cncjob']:
-            for option in self.app.options:
-                if option.find('tools_mill_') == 0:
-                    obj.obj_options[option] = self.app.options[option]
-            for option in self.app.options:
-                if option.find('tools_') == 0:
-                    obj.obj_options[option] = self.app.options[option]
+        # copy the application options to the object options, initialize the object, convert the units and store the
+        # object bounds; the same is done by the core of the application (appCore.py)
         # ############################################################################################################
-        # ############################################################################################################
-
-        # Initialize as per user request
-        # User must take care to implement initialize
-        # in a thread-safe way as is likely that we
-        # have been invoked in a separate thread.
-        t1 = time.time()
-        self.app.log.debug("%f seconds before initialize()." % (t1 - t0))
-
-        try:
-            return_value = initialize(obj, self.app)
-        except Exception as e:
-            msg = '[ERROR_NOTCL] %s' % _("An internal error has occurred. See shell.\n")
-            msg += _("Object ({kind}) failed because: {error} \n\n").format(kind=kind, error=str(e))
-            msg += traceback.format_exc()
-            self.app.inform.emit(msg)
-            return "fail"
-
-        t2 = time.time()
-        msg = "%s %s. %f seconds executing initialize()." % (_("New object with name:"), name, (t2 - t1))
-        self.app.log.debug(msg)
-        self.app.inform_shell.emit(msg)
-
+        return_value = init_new_object(self.app, obj, kind, name, initialize)
         if return_value == 'fail':
-            self.app.log.debug("Object (%s) parsing and/or geometry creation failed." % kind)
             return "fail"
 
-        # ############################################################################################################
-        # Check units and convert if necessary
-        # This condition CAN be true because initialize() can change obj.units
-        # ############################################################################################################
-        if self.app.options["units"].upper() != obj.units.upper():
-            self.app.inform.emit('%s: %s' % (_("Converting units to "), self.app.options["units"]))
-            obj.convert_units(self.app.options["units"])
-            t3 = time.time()
-            self.app.log.debug("%f seconds converting units." % (t3 - t2))
-
-        # ############################################################################################################
-        # Create the bounding box for the object and then add the results to the obj.obj_options
-        # But not for Scripts or for Documents
-        # ############################################################################################################
-        if kind != 'document' and kind != 'script':
-            try:
-                xmin, ymin, xmax, ymax = obj.bounds()
-                obj.obj_options['xmin'] = xmin
-                obj.obj_options['ymin'] = ymin
-                obj.obj_options['xmax'] = xmax
-                obj.obj_options['ymax'] = ymax
-            except Exception as e:
-                self.app.log.error("AppObject.new_object() -> The object has no bounds properties. %s" % str(e))
-                return "fail"
-
         self.app.log.debug("Moving new object back to main thread.")
 
         # ############################################################################################################
@@ -372,7 +290,7 @@ class AppObject(QtCore.QObject):
         # Send to worker
         # self.worker.add_task(worker_task, [self])
         if plot is True:
-            self.app.worker_task.emit({'fcn': plotting_task, 'params': [obj]})
+            self.app.worker_task.emit({'fcn': plotting_task, 'params': [obj], 'priority': PRIORITY_INTERACTIVE})
 
         if callback is not None:
             # callback(*callback_params)
@@ -14,6 +14,7 @@ from PyQt6 import QtCore, QtGui
 
 from appGUI.ObjectUI import ObjectUI
 from appCommon.Common import LoudDict
+from appWorkerStack import PRIORITY_INTERACTIVE
 from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
 from appGUI.VisPyVisuals import ShapeCollection
 
@@ -21,6 +22,10 @@ from shapely.ops import unary_union
 from shapely import Polygon, MultiPolygon, Point, LineString
 
 from copy import deepcopy, copy
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+import threading
 import sys
 import math
 import inspect
@@ -39,11 +44,62 @@ class ObjectDeleted(Exception):
     pass
 
 
-class ValidationError(Exception):
-    def __init__(self, message, errors):
-        super().__init__(message)
+# the objects whose geometry attributes are read as stored, without the pending transformation, in the current thread
+_raw_access = threading.local()
 
-        self.errors = errors
+# the objects whose instanced panel geometry is read as stored, without expanding the instances, in the current thread
+_instanced_access = threading.local()
+
+# only one thread at a time applies the pending transformation of an object
+_bake_lock = threading.RLock()
+
+
+class DeferredGeometryAttribute:
+    """
+    An attribute of a FlatCAMObj holding coordinates (the solid geometry, the tools ...). Reading or replacing it
+    applies first the pending transformation of the object, see FlatCAMObj.transform_geometry(). Reading it on an
+    instanced panel makes first the copies of the panel (see FlatCAMObj.expand_instances()) so whoever uses the
+    geometry (the plugins, the Tcl commands ...) gets all the copies.
+    """
+
+    def __init__(self, expands_instances=True):
+        self.expands_instances = expands_instances
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.storage = '_stored_' + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if obj.__dict__.get('_pending_transform') is not None and not obj.is_raw_access():
+            obj.bake_transform()
+        if self.expands_instances and obj.__dict__.get('_stored_instance_offsets') and \
+                not obj.is_raw_access() and not obj.is_instanced_access():
+            obj.expand_instances()
+        try:
+            return obj.__dict__[self.storage]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj, value):
+        if obj.__dict__.get('_pending_transform') is not None and not obj.is_raw_access():
+            obj.bake_transform()
+        obj.__dict__[self.storage] = value
+
+
+def keeps_instances(method):
+    """
+    Decorator for the FlatCAMObj methods that know about the instanced panels (plotting, bounds, export ...): the
+    geometry is read as stored and the instances are not expanded while the method runs.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.instanced_geometry_access():
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class FlatCAMObj(QtCore.QObject):
@@ -63,6 +119,12 @@ class FlatCAMObj(QtCore.QObject):
     # signal for Properties
     calculations_finished = QtCore.pyqtSignal(float, float, float, float, float, object)
 
+    # the attributes holding coordinates; the pending transformation is applied to them before they are used
+    solid_geometry = DeferredGeometryAttribute()
+    follow_geometry = DeferredGeometryAttribute()
+    tools = DeferredGeometryAttribute()
+    instance_offsets = DeferredGeometryAttribute(expands_instances=False)
+
     def __init__(self, name):
         """
         Constructor.
@@ -125,6 +187,14 @@ class FlatCAMObj(QtCore.QObject):
 
         self.plot_single_object.connect(self.single_object_plot)
 
+        # 3x3 affine matrix of the transformations (offset, scale, mirror, rotate, skew) recorded but not yet applied
+        # to the geometry, see transform_geometry() and bake_transform()
+        self._pending_transform = None
+        # bounds of the object with the pending transformation, when they are known without applying it
+        self._deferred_bounds = None
+        # 3x3 affine matrix applied by the canvas to the plotted shapes, reset when the object is plotted again
+        self._plot_transform = None
+
     def __del__(self):
         pass
 
@@ -158,6 +228,10 @@ class FlatCAMObj(QtCore.QObject):
                     pass
 
     def on_options_change(self, key):
+        # keep the collection name index in sync when the object is renamed
+        if key == 'name':
+            self.app.collection.on_object_renamed(self)
+
         # Update form on programmatically options change
         self.set_form_item(key)
 
@@ -189,7 +263,7 @@ class FlatCAMObj(QtCore.QObject):
                 self.plot()
             self.app.app_obj.object_changed.emit(self)
 
-        self.app.worker_task.emit({'fcn': plot_task, 'params': []})
+        self.app.worker_task.emit({'fcn': plot_task, 'params': [], 'priority': PRIORITY_INTERACTIVE})
 
     def add_shape(self, **kwargs):
         tol = kwargs['tolerance'] if 'tolerance' in kwargs else self.drawing_tolerance
@@ -197,6 +271,10 @@ class FlatCAMObj(QtCore.QObject):
         if self.deleted:
             raise ObjectDeleted()
         else:
+            # an instanced panel plots the stored geometry at each of the instance offsets
+            offsets = getattr(self, 'instance_offsets', None)
+            if offsets:
+                kwargs['offsets'] = offsets
             key = self.shapes.add(tolerance=tol, **kwargs)
         return key
 
@@ -250,6 +328,7 @@ class FlatCAMObj(QtCore.QObject):
 
     def clear(self, update=False):
         self.shapes.clear(update)
+        self._plot_transform = None
 
         # Not all object types has annotations
         try:
@@ -257,6 +336,163 @@ class FlatCAMObj(QtCore.QObject):
         except Exception:
             pass
 
+    @property
+    def pending_transform(self):
+        """
+        :return:    3x3 affine matrix of the transformations not yet applied to the geometry or None
+        """
+        return self.__dict__.get('_pending_transform')
+
+    def defer_transforms(self):
+        """
+        The offset, scale, mirror, rotate and skew of Gerber, Excellon and Geometry objects are recorded in a pending
+        matrix and applied to the geometry only when the coordinates are needed. The plotted shapes follow the
+        transformation without being tessellated again, which is possible only with the 3D graphic engine.
+
+        :return:    True if the transformations of this object are deferred
+        """
+        return self.kind in ('gerber', 'excellon', 'geometry') and self.app.use_3d_engine and \
+            hasattr(self.shapes, 'set_transform')
+
+    def is_instanced_access(self):
+        """
+        :return:    True if the geometry of an instanced panel is read as stored, without expanding the instances
+        """
+        return id(self) in getattr(_instanced_access, 'objects', ())
+
+    @contextmanager
+    def instanced_geometry_access(self):
+        """
+        Context in which the geometry attributes of an instanced panel are read as stored, in the current thread. It is
+        used by the code that handles the instance offsets by itself.
+        """
+        objects = getattr(_instanced_access, 'objects', None)
+        if objects is None:
+            objects = _instanced_access.objects = set()
+
+        nested = id(self) in objects
+        objects.add(id(self))
+        try:
+            yield
+        finally:
+            if not nested:
+                objects.discard(id(self))
+
+    @keeps_instances
+    def expand_instances(self):
+        """
+        Make the copies of an instanced panel. Done when the geometry is read, see DeferredGeometryAttribute.
+
+        :return:    None
+        """
+        with _bake_lock:
+            super().expand_instances()
+
+    @keeps_instances
+    def to_dict(self):
+        # an instanced panel is saved with its instance offsets
+        return super().to_dict()
+
+    def is_raw_access(self):
+        """
+        :return:    True if the geometry attributes are read as stored, without the pending transformation
+        """
+        return id(self) in getattr(_raw_access, 'objects', ())
+
+    @contextmanager
+    def raw_geometry_access(self):
+        """
+        Context in which the geometry attributes of the object are read and set as stored, in the current thread.
+        """
+        objects = getattr(_raw_access, 'objects', None)
+        if objects is None:
+            objects = _raw_access.objects = set()
+
+        nested = id(self) in objects
+        objects.add(id(self))
+        try:
+            yield
+        finally:
+            if not nested:
+                objects.discard(id(self))
+
+    def transform_geometry(self, matrix):
+        """
+        Apply an affine transformation to the geometry of the object. When the transformations are deferred (see
+        defer_transforms()) the matrix is composed with the pending one and the canvas transforms the plotted shapes;
+        the geometry is changed only when it is used (see bake_transform()).
+
+        :param matrix:  3x3 affine matrix
+        :return:        None
+        """
+        if not self.defer_transforms():
+            # the instance offsets are transformed together with the stored geometry
+            with self.instanced_geometry_access():
+                super().transform_geometry(matrix)
+            return
+
+        matrix = np.asarray(matrix, dtype=float)
+        with _bake_lock:
+            # the bounds with the pending transformation, when they can be found without applying it; else they are
+            # found after baking, see bounds()
+            bounds = None
+            if self.affine_bounds and matrix[0, 1] == 0 and matrix[1, 0] == 0:
+                if self.pending_transform is None:
+                    try:
+                        bounds = self.bounds()
+                    except Exception:
+                        bounds = None
+                else:
+                    bounds = self._deferred_bounds
+                bounds = self.transformed_bounds(bounds, matrix)
+
+            pending = self.pending_transform
+            self._pending_transform = matrix if pending is None else matrix @ pending
+            self._deferred_bounds = bounds
+            self.invalidate_bounds()
+
+        self._plot_transform = matrix if self._plot_transform is None else matrix @ self._plot_transform
+        self.shapes.set_transform(self._plot_transform)
+
+    def bake_transform(self):
+        """
+        Apply the pending transformation to the geometry. It is done when a geometry attribute is read or replaced,
+        that is before the geometry is used to make the isolation or the GCode, exported or edited.
+
+        :return:    None
+        """
+        with _bake_lock:
+            matrix = self.pending_transform
+            if matrix is None:
+                return
+
+            self.app.log.debug("FlatCAMObj.bake_transform() -> %s" % str(self.obj_options['name']))
+            with self.raw_geometry_access():
+                super().transform_geometry(matrix)
+            self._pending_transform = None
+            self._deferred_bounds = None
+
+    @keeps_instances
+    def bounds(self, flatten=False):
+        if self.pending_transform is not None:
+            # while a transformation is pending the geometry is not changed so the bounds found when the
+            # transformation was recorded are still valid
+            bounds = self._deferred_bounds
+            if bounds is not None and not flatten:
+                return bounds
+            self.bake_transform()
+        return super().bounds(flatten=flatten)
+
+    def replot_transformed(self):
+        """
+        Show on canvas the result of an offset, scale, mirror, rotate or skew. The plotted shapes already follow a
+        deferred transformation, otherwise the object is plotted again.
+
+        :return:    None
+        """
+        if self._plot_transform is None:
+            self.plot()
+
     def set_ui(self, ui):
         self.ui = ui
 
@@ -360,7 +596,7 @@ class FlatCAMObj(QtCore.QObject):
                 self.offset(vector_val)
             self.app.proc_container.update_view_text('')
             with self.app.proc_container.new('%s ...' % _("Plotting")):
-                self.plot()
+                self.replot_transformed()
             self.app.app_obj.object_changed.emit(self)
 
         self.app.worker_task.emit({'fcn': worker_task, 'params': []})
@@ -391,7 +627,7 @@ class FlatCAMObj(QtCore.QObject):
 
             self.app.proc_container.update_view_text('')
             with self.app.proc_container.new('%s ...' % _("Plotting")):
-                self.plot()
+                self.replot_transformed()
             self.app.app_obj.object_changed.emit(self)
 
         self.app.worker_task.emit({'fcn': worker_task, 'params': []})
@@ -407,7 +643,7 @@ class FlatCAMObj(QtCore.QObject):
                 self.skew(x_angle, y_angle)
             self.app.proc_container.update_view_text('')
             with self.app.proc_container.new('%s ...' % _("Plotting")):
-                self.plot()
+                self.replot_transformed()
             self.app.app_obj.object_changed.emit(self)
 
         self.app.worker_task.emit({'fcn': worker_task, 'params': []})
@@ -19,12 +19,9 @@ from appGUI.ObjectUI import CNCObjectUI
 from camlib import CNCjob
 
 import os
-import sys
 import math
 import re
 
-from io import StringIO
-from datetime import datetime as dt
 from copy import deepcopy
 
 import gettext
@@ -185,25 +182,23 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         self.gcode_editor_tab = None
         self.gcode_viewer_tab = None
 
-        self.source_file = ''
         self.units_found = self.app.app_units
 
-        self.prepend_snippet = ''
-        self.append_snippet = ''
-        self.gc_header = ''
-        self.gc_start = ''
-        self.gc_end = ''
-
         # it is possible that the user will process only a few tools not all in the parent object
         # here we store the used tools so the UI will build only those that were generated
         self.used_tools = []
 
+        # autolevelling: the GCode as it was before it was levelled (for the multitool jobs it is stored in each tool
+        # as 'unlevelled_gcode') and the hash of the levelled GCode, to find out if the GCode changed since then
+        self.unlevelled_gcode = None
+        self.levelled_gcode_hash = None
+
         # Attributes to be included in serialization
         # Always append to it because it carries contents
         # from predecessors.
         self.ser_attrs += [
             'obj_options', 'kind', 'tools', 'multitool', 'append_snippet', 'prepend_snippet', 'gc_header', 'gc_start',
-            'multigeo', 'used_tools'
+            'multigeo', 'used_tools', 'unlevelled_gcode', 'levelled_gcode_hash'
         ]
 
         # this is used, so we don't recreate the GCode for loaded objects in set_ui(), it is already there
@@ -562,25 +557,7 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         # #############################################################################################################
 
         # On CNCJob object creation, generate the GCode
-        if self.is_loaded_from_project is False:
-            self.prepend_snippet = self.app.options['cncjob_prepend']
-            self.append_snippet = self.app.options['cncjob_append']
-            self.gc_header = self.gcode_header()
-        else:
-            # this is dealt when loading the project, the header, prepend and append are already loaded
-            # by being 'serr_attrs' attributes
-            pass
-
-        gc = self.export_gcode(preamble=self.prepend_snippet, postamble=self.append_snippet, to_file=True,
-                               s_code=self.gc_start)
-
-        # set the Source File attribute with the calculated GCode
-        try:
-            # gc is StringIO
-            self.source_file = gc.getvalue()
-        except AttributeError:
-            # gc is text
-            self.source_file = gc
+        self.make_source_file(loaded_from_project=self.is_loaded_from_project)
 
         if self.append_snippet != '' or self.prepend_snippet != '':
             self.ui.snippets_cb.set_value(True)
@@ -746,19 +723,11 @@ class CNCJobObject(FlatCAMObj, CNCjob):
             self.ui.name_entry.set_value(new_name)
             self.on_name_activate(silent=True)
 
-        if self.source_file == '':
+        if not self.source_segments:
             return 'fail'
 
         try:
-            force_windows_line_endings = self.app.options['cncjob_line_ending']
-            if force_windows_line_endings and sys.platform != 'win32':
-                with open(filename, 'w', newline='\r\n') as f:
-                    for line in self.source_file:
-                        f.write(line)
-            else:
-                with open(filename, 'w') as f:
-                    for line in self.source_file:
-                        f.write(line)
+            self.write_gcode_file(filename, self.source_segments)
         except FileNotFoundError:
             self.app.inform.emit('[WARNING_NOTCL] %s' % _("No such file or directory"))
             return
@@ -791,7 +760,8 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         #     return
         # else:
         #     self.app.gcode_edited = gco
-        self.app.gcode_edited = self.source_file
+        # the code segments are loaded as they are, the code is not joined in one string
+        self.app.gcode_edited = self.source_segments
 
         self.gcode_editor_tab = AppTextEditor(app=self.app, plain_text=True)
 
@@ -847,359 +817,9 @@ class CNCJobObject(FlatCAMObj, CNCjob):
             self.app.inform.emit('[ERROR_NOTCL] %s %s...' % (_('Failed.'), _('CNC Machine Code could not be updated')))
             return
         else:
-            self.source_file = gco.getvalue()
+            self.source_file = gco
             self.app.inform.emit('[success] %s...' % _('CNC Machine Code was updated'))
 
-    def gcode_header(self, comment_start_symbol=None, comment_stop_symbol=None):
-        """
-        Will create a header to be added to all GCode files generated by FlatCAM
-
-        :param comment_start_symbol:    A symbol to be used as the first symbol in a comment
-        :param comment_stop_symbol:     A symbol to be used as the last symbol in a comment
-        :return:                        A string with a GCode header
-        """
-
-        self.app.log.debug("FlatCAMCNCJob.gcode_header()")
-        time_str = "{:%A, %d %B %Y at %H:%M}".format(dt.now())
-        marlin = False
-        hpgl = False
-        probe_pp = False
-        nccad_pp = False
-
-        gcode = ''
-
-        start_comment = comment_start_symbol if comment_start_symbol is not None else '('
-        stop_comment = comment_stop_symbol if comment_stop_symbol is not None else ')'
-
-        if self.obj_options['type'].lower() == 'geometry':
-            try:
-                for key in self.tools:
-                    try:
-                        ppg = self.tools[key]['data']['tools_mill_ppname_g']
-                    except KeyError:
-                        # for older loaded projects
-                        ppg = self.app.options['tools_mill_ppname_g']
-
-                    if 'marlin' in ppg.lower() or 'repetier' in ppg.lower():
-                        marlin = True
-                        break
-                    if ppg == 'hpgl':
-                        hpgl = True
-                        break
-                    if "toolchange_probe" in ppg.lower():
-                        probe_pp = True
-                        break
-                    if "nccad" in ppg.lower():
-                        nccad_pp = True
-            except Exception as e:
-                self.app.log.debug("FlatCAMCNCJob.gcode_header() error: --> %s" % str(e))
-                pass
-
-        try:
-            if 'marlin' in self.obj_options['tools_drill_ppname_e'].lower() or \
-                    'repetier' in self.obj_options['tools_drill_ppname_e'].lower():
-                marlin = True
-        except KeyError:
-            # self.app.log.debug("FlatCAMCNCJob.gcode_header(): --> There is no such self.option: %s" % str(e))
-            pass
-
-        try:
-            if "toolchange_probe" in self.obj_options['tools_drill_ppname_e'].lower():
-                probe_pp = True
-        except KeyError:
-            # self.app.log.debug("FlatCAMCNCJob.gcode_header(): --> There is no such self.option: %s" % str(e))
-            pass
-
-        try:
-            if 'nccad' in self.obj_options['tools_drill_ppname_e'].lower():
-                nccad_pp = True
-        except KeyError:
-            pass
-
-        if marlin is True:
-            gcode += ';Marlin(Repetier) G-code generated by FlatCAM Evo v%s - Version Date:    %s\n' % \
-                     (str(self.app.version), str(self.app.version_date)) + '\n'
-
-            gcode += ';Name: ' + str(self.obj_options['name']) + '\n'
-            gcode += ';Type: ' + "G-code from " + str(self.obj_options['type']) + '\n'
-
-            gcode += ';Units: ' + self.units.upper() + '\n' + "\n"
-            gcode += ';Created on ' + time_str + '\n' + '\n'
-        elif hpgl is True:
-            gcode += 'CO "HPGL code generated by FlatCAM Evo v%s - Version Date:    %s' % \
-                     (str(self.app.version), str(self.app.version_date)) + '";\n'
-
-            gcode += 'CO "Name: ' + str(self.obj_options['name']) + '";\n'
-            gcode += 'CO "Type: ' + "HPGL code from " + str(self.obj_options['type']) + '";\n'
-
-            gcode += 'CO "Units: ' + self.units.upper() + '";\n'
-            gcode += 'CO "Created on ' + time_str + '";\n'
-        elif probe_pp is True:
-            gcode += '(G-code generated by FlatCAM Evo v%s - Version Date: %s)\n' % \
-                     (str(self.app.version), str(self.app.version_date)) + '\n'
-
-            gcode += '(This GCode tool change is done by using a Probe.)\n' \
-                     '(Make sure that before you start the job you first do a rough zero for Z axis.)\n' \
-                     '(This means that you need to zero the CNC axis and then jog to the toolchange X, Y location,)\n' \
-                     '(mount the probe and adjust the Z so more or less the probe tip touch the plate. ' \
-                     'Then zero the Z axis.)\n' + '\n'
-
-            gcode += '(Name: ' + str(self.obj_options['name']) + ')\n'
-            gcode += '(Type: ' + "G-code from " + str(self.obj_options['type']) + ')\n'
-
-            gcode += '(Units: ' + self.units.upper() + ')\n' + "\n"
-            gcode += '(Created on ' + time_str + ')\n' + '\n'
-        elif nccad_pp is True:
-            gcode += ';NCCAD9 G-code generated by FlatCAM Evo v%s - Version Date:    %s\n' % \
-                     (str(self.app.version), str(self.app.version_date)) + '\n'
-
-            gcode += ';Name: ' + str(self.obj_options['name']) + '\n'
-            gcode += ';Type: ' + "G-code from " + str(self.obj_options['type']) + '\n'
-
-            gcode += ';Units: ' + self.units.upper() + '\n' + "\n"
-            gcode += ';Created on ' + time_str + '\n' + '\n'
-        else:
-            gcode += '%sG-code generated by FlatCAM Evo v%s - Version Date: %s%s\n' % \
-                     (start_comment, str(self.app.version), str(self.app.version_date), stop_comment) + '\n'
-
-            gcode += '%sName: ' % start_comment + str(self.obj_options['name']) + '%s\n' % stop_comment
-            gcode += '%sType: ' % start_comment + "G-code from " + str(self.obj_options['type']) + '%s\n' % stop_comment
-
-            gcode += '%sUnits: ' % start_comment + self.units.upper() + '%s\n' % stop_comment + "\n"
-            gcode += '%sCreated on ' % start_comment + time_str + '%s\n' % stop_comment + '\n'
-
-        return gcode
-
-    @staticmethod
-    def gcode_footer(end_command=None):
-        """
-        Will add the M02 to the end of GCode, if requested.
-
-        :param end_command: 'M02' or 'M30' - String
-        :return:
-        """
-        if end_command:
-            return end_command
-        else:
-            return 'M02'
-
-    def export_gcode(self, filename=None, preamble='', postamble='', to_file=False, from_tcl=False, glob_gcode='',
-                     s_code=''):
-        """
-        This will save the GCode from the Gcode object to a file on the OS filesystem
-
-        :param filename:    filename for the GCode file
-        :param preamble:    a custom Gcode block to be added at the beginning of the Gcode file
-        :param postamble:   a custom Gcode block to be added at the end of the Gcode file
-        :param to_file:     if False then no actual file is saved but the app will know that a file was created
-        :param from_tcl:    True if run from Tcl Shell
-        :param glob_gcode:  Passing an object attribute that is used to hold GCode; string
-        :return:            None
-        """
-
-        global_gcode = self.gcode if glob_gcode == '' else glob_gcode
-        start_code = self.gc_start if s_code == '' else s_code
-        include_header = True
-
-        if preamble == '':
-            preamble = self.app.options["cncjob_prepend"]
-        if postamble == '':
-            postamble = self.app.options["cncjob_append"]
-
-        # try:
-        #     if self.special_group:
-        #         self.app.inform.emit('[WARNING_NOTCL] %s %s %s.' %
-        #                              (_("This CNCJob object can't be processed because it is a"),
-        #                               str(self.special_group),
-        #                               _("CNCJob object")))
-        #         return 'fail'
-        # except AttributeError:
-        #     pass
-
-        # if this dict is not empty then the object is a Geometry object
-        if self.obj_options['type'].lower() == 'geometry':
-            # for the case that self.tools is empty: old projects
-            try:
-                first_key = list(self.tools.keys())[0]
-                try:
-                    include_header = self.app.preprocessors[self.tools[first_key]['data']['tools_mill_ppname_g']]
-                except KeyError:
-                    try:
-                        # for older loaded projects
-                        self.app.log.debug(
-                            "CNCJobObject.export_gcode() --> old project detected. Results are unreliable.")
-                        include_header = self.app.preprocessors[self.app.options['ppname_g']]
-                    except KeyError:
-                        # for older loaded projects
-                        self.app.log.debug(
-                            "CNCJobObject.export_gcode() --> old project detected. Results are unreliable.")
-                        include_header = self.app.preprocessors[self.app.options['tools_mill_ppname_g']]
-
-                include_header = include_header.include_header
-            except (TypeError, IndexError):
-                include_header = self.app.preprocessors['default'].include_header
-
-        # if this dict is not empty then the object is an Excellon object
-        if self.obj_options['type'].lower() == 'excellon':
-            # for the case that self.tools is empty: old projects
-            try:
-                first_key = list(self.tools.keys())[0]
-                try:
-                    include_header = self.app.preprocessors[
-                        self.tools[first_key]['data']['tools_drill_ppname_e']
-                    ].include_header
-                except KeyError:
-                    # for older loaded projects
-                    try:
-                        include_header = self.app.preprocessors[
-                            self.tools[first_key]['data']['ppname_e']
-                        ].include_header
-                    except KeyError:
-                        self.app.log.debug(
-                            "CNCJobObject.export_gcode() --> old project detected. Results are unreliable.")
-                        # for older loaded projects
-                        include_header = self.app.preprocessors[
-                            self.app.options['tools_drill_ppname_e']
-                        ].include_header
-            except TypeError:
-                # when self.tools is empty - old projects
-                include_header = self.app.preprocessors['default'].include_header
-
-        gcode = ''
-
-        if include_header is False:
-            # detect if using multi-tool and make the Gcode summation correctly for each case
-            if self.multitool is True:
-                try:
-                    if self.obj_options['type'].lower() == 'geometry':
-                        for tooluid_key in self.tools:
-                            for key, value in self.tools[tooluid_key].items():
-                                if key == 'gcode':
-                                    gcode += value
-                                    break
-                except TypeError:
-                    pass
-            else:
-                gcode += global_gcode
-
-            # g = sstart_code + '\n' + preamble + '\n' + gcode + '\n' + postamble
-            g = ''
-            end_gcode = self.gcode_footer() if self.app.options['cncjob_footer'] is True else ''
-            if preamble != '' and postamble != '':
-                g = start_code + '\n' + preamble + '\n' + gcode + '\n' + postamble + '\n' + end_gcode
-            if preamble == '':
-                g = start_code + '\n' + gcode + '\n' + postamble + '\n' + end_gcode
-            if postamble == '':
-                g = start_code + '\n' + preamble + '\n' + gcode + '\n' + end_gcode
-            if preamble == '' and postamble == '':
-                g = start_code + '\n' + gcode + '\n' + end_gcode
-        else:
-            # detect if using multi-tool and make the Gcode summation correctly for each case
-            if self.multitool is True:
-                # for the case that self.tools is empty: old projects
-                try:
-                    if self.obj_options['type'].lower() == 'excellon':
-                        for tooluid_key in self.tools:
-                            for key, value in self.tools[tooluid_key].items():
-                                if key == 'gcode' and value:
-                                    gcode += value
-                                    break
-                    else:
-                        # it's made from a Geometry object
-                        for tooluid_key in self.tools:
-                            for key, value in self.tools[tooluid_key].items():
-                                if key == 'gcode' and value:
-                                    gcode += value
-                                    break
-                except TypeError:
-                    pass
-            else:
-                gcode += global_gcode
-
-            end_gcode = self.gcode_footer() if self.app.options['cncjob_footer'] is True else ''
-
-            # detect if using a HPGL preprocessor
-            hpgl = False
-            # for the case that self.tools is empty: old projects
-            try:
-                if self.obj_options['type'].lower() == 'geometry':
-                    for key in self.tools:
-                        if 'tools_mill_ppname_g' in self.tools[key]['data']:
-                            if 'hpgl' in self.tools[key]['data']['tools_mill_ppname_g']:
-                                hpgl = True
-                                break
-                elif self.obj_options['type'].lower() == 'excellon':
-                    for key in self.tools:
-                        if 'ppname_e' in self.tools[key]['data']:
-                            if 'hpgl' in self.tools[key]['data']['ppname_e']:
-                                hpgl = True
-                                break
-            except TypeError:
-                hpgl = False
-
-            if hpgl:
-                processed_body_gcode = ''
-                pa_re = re.compile(r"^PA\s*(-?\d+\.\d*),?\s*(-?\d+\.\d*)*;?$")
-
-                # process body gcode
-                for gline in gcode.splitlines():
-                    match = pa_re.search(gline)
-                    if match:
-                        x_int = int(float(match.group(1)))
-                        y_int = int(float(match.group(2)))
-                        new_line = 'PA%d,%d;\n' % (x_int, y_int)
-                        processed_body_gcode += new_line
-                    else:
-                        processed_body_gcode += gline + '\n'
-
-                gcode = processed_body_gcode
-                g = self.gc_header + '\n' + start_code + '\n' + preamble + '\n' + \
-                    gcode + '\n' + postamble + end_gcode
-            else:
-                g = ''
-                if preamble != '' and postamble != '':
-                    g = self.gc_header + start_code + '\n' + preamble + '\n' + gcode + '\n' + \
-                        postamble + '\n' + end_gcode
-                if preamble == '':
-                    g = self.gc_header + start_code + '\n' + gcode + '\n' + postamble + '\n' + end_gcode
-                if postamble == '':
-                    g = self.gc_header + start_code + '\n' + preamble + '\n' + gcode + '\n' + end_gcode
-                if preamble == '' and postamble == '':
-                    g = self.gc_header + start_code + '\n' + gcode + '\n' + end_gcode
-
-        lines = StringIO(g)
-
-        # Write
-        if filename is not None:
-            try:
-                force_windows_line_endings = self.app.options['cncjob_line_ending']
-                if force_windows_line_endings and sys.platform != 'win32':
-                    with open(filename, 'w', newline='\r\n') as f:
-                        for line in lines:
-                            f.write(line)
-                else:
-                    with open(filename, 'w') as f:
-                        for line in lines:
-                            f.write(line)
-            except FileNotFoundError:
-                self.app.inform.emit('[WARNING_NOTCL] %s' % _("No such file or directory"))
-                return
-            except PermissionError:
-                self.app.inform.emit(
-                    '[WARNING] %s' % _("Permission denied, saving not possible.\n"
-                                       "Most likely another app is holding the file open and not accessible.")
-                )
-                return 'fail'
-        elif to_file is False:
-            # Just for adding it to the recent files list.
-            if self.app.options["global_open_style"] is False:
-                self.app.file_opened.emit("cncjob", filename)
-            self.app.file_saved.emit("cncjob", filename)
-
-            self.app.inform.emit('[success] %s: %s' % (_("Saved to"), filename))
-        else:
-            return lines
-
     def get_gcode(self, preamble='', postamble=''):
         """
         We need this to be able to get_gcode separately for shell command export_gcode
@@ -13,7 +13,7 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 
 from appParsers.ParseExcellon import Excellon
-from appObjects.AppObjectTemplate import FlatCAMObj, ObjectDeleted
+from appObjects.AppObjectTemplate import FlatCAMObj, keeps_instances, ObjectDeleted
 from appGUI.GUIElements import FCCheckBox
 from appGUI.ObjectUI import ExcellonObjectUI
 
@@ -255,6 +255,7 @@ class ExcellonObject(FlatCAMObj, Excellon):
             # Context Menu section
             self.ui.tools_table.setupContextMenu()
 
+    @keeps_instances
     def build_ui(self):
         """
         Will (re)build the Excellon UI updating it (the tool table)
@@ -298,6 +299,9 @@ class ExcellonObject(FlatCAMObj, Excellon):
         for opt in self.obj_options:
             new_options[opt] = self.obj_options[opt]
 
+        # an instanced panel holds the drills and slots of a single copy
+        copies = len(self.instance_offsets) or 1
+
         for tool_no in tools:
             try:
                 dia_val = self.tools[tool_no]['tooldia']
@@ -313,14 +317,14 @@ class ExcellonObject(FlatCAMObj, Excellon):
 
             # Find no of drills for the current tool
             try:
-                drill_cnt = len(self.tools[tool_no]['drills'])
+                drill_cnt = len(self.tools[tool_no]['drills']) * copies
             except KeyError:
                 drill_cnt = 0
             self.tot_drill_cnt += drill_cnt
 
             # Find no of slots for the current tool
             try:
-                slot_cnt = len(self.tools[tool_no]['slots'])
+                slot_cnt = len(self.tools[tool_no]['slots']) * copies
             except KeyError:
                 slot_cnt = 0
             self.tot_slot_cnt += slot_cnt
@@ -747,208 +751,11 @@ class ExcellonObject(FlatCAMObj, Excellon):
     def on_milling_button_clicked(self):
         self.app.milling_tool.run(toggle=True)
 
-    def export_excellon(self, whole, fract, e_zeros=None, form='dec', factor=1, slot_type='routing'):
-        """
-        Returns two values, first is a boolean , if 1 then the file has slots and second contain the Excellon code
-
-        :param whole:       Integer part digits
-        :type whole:        int
-        :param fract:       Fractional part digits
-        :type fract:        int
-        :param e_zeros:     Excellon zeros suppression: LZ or TZ
-        :type e_zeros:      str
-        :param form:        Excellon format: 'dec',
-        :type form:         str
-        :param factor:      Conversion factor
-        :type factor:       float
-        :param slot_type:   How to treat slots: "routing" or "drilling"
-        :type slot_type:    str
-        :return:            A tuple: (has_slots, Excellon_code) -> (bool, str)
-        :rtype:             tuple
-        """
-
-        excellon_code = ''
-
-        # store here if the file has slots, return 1 if any slots, 0 if only drills
-        slots_in_file = 0
-
-        # find if we have drills:
-        has_drills = None
-        for tt in self.tools:
-            if 'drills' in self.tools[tt] and self.tools[tt]['drills']:
-                has_drills = True
-                break
-        # find if we have slots:
-        has_slots = None
-        for tt in self.tools:
-            if 'slots' in self.tools[tt] and self.tools[tt]['slots']:
-                has_slots = True
-                slots_in_file = 1
-                break
-
-        # drills processing
-        if has_drills:
-            length = whole + fract
-            for tool in self.tools:
-                excellon_code += 'T0%s\n' % str(tool) if int(tool) < 10 else 'T%s\n' % str(tool)
-
-                for drill in self.tools[tool]['drills']:
-                    if form == 'dec':
-                        try:
-                            drill_x = drill.x * factor
-                            drill_y = drill.y * factor
-                            excellon_code += "X{:.{dec}f}Y{:.{dec}f}\n".format(drill_x, drill_y, dec=fract)
-                        except Exception as e:
-                            self.app.log.error('ExcellonObject.export_excellon() drills "dec" -> %s' % str(e))
-                    elif e_zeros == 'LZ':
-                        try:
-                            drill_x = drill.x * factor
-                            drill_y = drill.y * factor
-
-                            exc_x_formatted = "{:.{dec}f}".format(drill_x, dec=fract)
-                            exc_y_formatted = "{:.{dec}f}".format(drill_y, dec=fract)
-
-                            # extract whole part and decimal part
-                            exc_x_formatted = exc_x_formatted.partition('.')
-                            exc_y_formatted = exc_y_formatted.partition('.')
-
-                            # left pad the 'whole' part with zeros
-                            x_whole = exc_x_formatted[0].rjust(whole, '0')
-                            y_whole = exc_y_formatted[0].rjust(whole, '0')
-
-                            # restore the coordinate padded in the left with 0 and added the decimal part
-                            # without the decinal dot
-                            exc_x_formatted = x_whole + exc_x_formatted[2]
-                            exc_y_formatted = y_whole + exc_y_formatted[2]
-
-                            excellon_code += "X{xform}Y{yform}\n".format(xform=exc_x_formatted, yform=exc_y_formatted)
-                        except Exception as e:
-                            self.app.log.error('ExcellonObject.export_excellon() drills "LZ" -> %s' % str(e))
-                    else:
-                        try:
-                            drill_x = drill.x * factor
-                            drill_y = drill.y * factor
-
-                            exc_x_formatted = "{:.{dec}f}".format(drill_x, dec=fract).replace('.', '')
-                            exc_y_formatted = "{:.{dec}f}".format(drill_y, dec=fract).replace('.', '')
-
-                            # pad with rear zeros
-                            exc_x_formatted.ljust(length, '0')
-                            exc_y_formatted.ljust(length, '0')
-
-                            excellon_code += "X{xform}Y{yform}\n".format(xform=exc_x_formatted, yform=exc_y_formatted)
-                        except Exception as e:
-                            self.app.log.error('ExcellonObject.export_excellon() drills "TZ" -> %s' % str(e))
-
-        # slots processing
-        if has_slots:
-            for tool in self.tools:
-                excellon_code += 'G05\n'
-
-                if int(tool) < 10:
-                    excellon_code += 'T0' + str(tool) + '\n'
-                else:
-                    excellon_code += 'T' + str(tool) + '\n'
-
-                for slot in self.tools[tool]['slots']:
-                    if form == 'dec':
-                        try:
-                            start_slot_x = slot[0].x * factor
-                            start_slot_y = slot[0].y * factor
-                            stop_slot_x = slot[1].x * factor
-                            stop_slot_y = slot[1].y * factor
-                            if slot_type == 'routing':
-                                excellon_code += "G00X{:.{dec}f}Y{:.{dec}f}\nM15\n".format(start_slot_x,
-                                                                                           start_slot_y,
-                                                                                           dec=fract)
-                                excellon_code += "G01X{:.{dec}f}Y{:.{dec}f}\nM16\n".format(stop_slot_x,
-                                                                                           stop_slot_y,
-                                                                                           dec=fract)
-                            elif slot_type == 'drilling':
-                                excellon_code += "X{:.{dec}f}Y{:.{dec}f}G85X{:.{dec}f}Y{:.{dec}f}\nG05\n".format(
-                                    start_slot_x, start_slot_y, stop_slot_x, stop_slot_y, dec=fract
-                                )
-                        except Exception as err:
-                            self.app.log.error('ExcellonObject.export_excellon() slots "dec" -> %s' % str(err))
-                    elif e_zeros == 'LZ':
-                        try:
-                            start_slot_x = slot[0].x * factor
-                            start_slot_y = slot[0].y * factor
-                            stop_slot_x = slot[1].x * factor
-                            stop_slot_y = slot[1].y * factor
-
-                            start_slot_x_formatted = "{:.{dec}f}".format(start_slot_x, dec=fract).replace('.', '')
-                            start_slot_y_formatted = "{:.{dec}f}".format(start_slot_y, dec=fract).replace('.', '')
-                            stop_slot_x_formatted = "{:.{dec}f}".format(stop_slot_x, dec=fract).replace('.', '')
-                            stop_slot_y_formatted = "{:.{dec}f}".format(stop_slot_y, dec=fract).replace('.', '')
-
-                            # extract whole part and decimal part
-                            start_slot_x_formatted = start_slot_x_formatted.partition('.')
-                            start_slot_y_formatted = start_slot_y_formatted.partition('.')
-                            stop_slot_x_formatted = stop_slot_x_formatted.partition('.')
-                            stop_slot_y_formatted = stop_slot_y_formatted.partition('.')
-
-                            # left pad the 'whole' part with zeros
-                            start_x_whole = start_slot_x_formatted[0].rjust(whole, '0')
-                            start_y_whole = start_slot_y_formatted[0].rjust(whole, '0')
-                            stop_x_whole = stop_slot_x_formatted[0].rjust(whole, '0')
-                            stop_y_whole = stop_slot_y_formatted[0].rjust(whole, '0')
-
-                            # restore the coordinate padded in the left with 0 and added the decimal part
-                            # without the decinal dot
-                            start_slot_x_formatted = start_x_whole + start_slot_x_formatted[2]
-                            start_slot_y_formatted = start_y_whole + start_slot_y_formatted[2]
-                            stop_slot_x_formatted = stop_x_whole + stop_slot_x_formatted[2]
-                            stop_slot_y_formatted = stop_y_whole + stop_slot_y_formatted[2]
-
-                            if slot_type == 'routing':
-                                excellon_code += "G00X{xstart}Y{ystart}\nM15\n".format(xstart=start_slot_x_formatted,
-                                                                                       ystart=start_slot_y_formatted)
-                                excellon_code += "G01X{xstop}Y{ystop}\nM16\n".format(xstop=stop_slot_x_formatted,
-                                                                                     ystop=stop_slot_y_formatted)
-                            elif slot_type == 'drilling':
-                                excellon_code += "{xstart}Y{ystart}G85X{xstop}Y{ystop}\nG05\n".format(
-                                    xstart=start_slot_x_formatted, ystart=start_slot_y_formatted,
-                                    xstop=stop_slot_x_formatted, ystop=stop_slot_y_formatted
-                                )
-                        except Exception as err:
-                            self.app.log.error('ExcellonObject.export_excellon() slots "LZ" -> %s' % str(err))
-                    else:
-                        try:
-                            start_slot_x = slot[0].x * factor
-                            start_slot_y = slot[0].y * factor
-                            stop_slot_x = slot[1].x * factor
-                            stop_slot_y = slot[1].y * factor
-                            length = whole + fract
-
-                            start_slot_x_formatted = "{:.{dec}f}".format(start_slot_x, dec=fract).replace('.', '')
-                            start_slot_y_formatted = "{:.{dec}f}".format(start_slot_y, dec=fract).replace('.', '')
-                            stop_slot_x_formatted = "{:.{dec}f}".format(stop_slot_x, dec=fract).replace('.', '')
-                            stop_slot_y_formatted = "{:.{dec}f}".format(stop_slot_y, dec=fract).replace('.', '')
-
-                            # pad with rear zeros
-                            start_slot_x_formatted.ljust(length, '0')
-                            start_slot_y_formatted.ljust(length, '0')
-                            stop_slot_x_formatted.ljust(length, '0')
-                            stop_slot_y_formatted.ljust(length, '0')
-
-                            if slot_type == 'routing':
-                                excellon_code += "G00X{xstart}Y{ystart}\nM15\n".format(xstart=start_slot_x_formatted,
-                                                                                       ystart=start_slot_y_formatted)
-                                excellon_code += "G01X{xstop}Y{ystop}\nM16\n".format(xstop=stop_slot_x_formatted,
-                                                                                     ystop=stop_slot_y_formatted)
-                            elif slot_type == 'drilling':
-                                excellon_code += "{xstart}Y{ystart}G85X{xstop}Y{ystop}\nG05\n".format(
-                                    xstart=start_slot_x_formatted, ystart=start_slot_y_formatted,
-                                    xstop=stop_slot_x_formatted, ystop=stop_slot_y_formatted
-                                )
-                        except Exception as err:
-                            self.app.log.error('ExcellonObject.export_excellon() slots "TZ" -> %s' % str(err))
-        if not has_drills and not has_slots:
-            self.app.log.debug("ExcellonObject.export_excellon() --> Excellon Object is empty: no drills, no slots.")
-            return 'fail'
-
-        return slots_in_file, excellon_code
+    @keeps_instances
+    def export_excellon(self, whole, fract, e_zeros=None, form='dec', factor=1, slot_type='routing', file_handle=None):
+        # the instances of a panel are written by Excellon.export_excellon(), without expanding the panel geometry
+        return super().export_excellon(whole, fract, e_zeros=e_zeros, form=form, factor=factor, slot_type=slot_type,
+                                       file_handle=file_handle)
 
     def generate_milling_drills(self, tools=None, outname=None, tooldia=None, plot=False, use_thread=False):
         """
@@ -1259,6 +1066,7 @@ class ExcellonObject(FlatCAMObj, Excellon):
         self.shapes.redraw()
         self.ui_connect()
 
+    @keeps_instances
     def plot(self, visible=None, kind=None):
 
         multicolored = self.ui.multicolored_cb.get_value()
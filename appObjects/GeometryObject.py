@@ -11,17 +11,15 @@
 # ##########################################################
 
 from PyQt6 import QtWidgets, QtCore
-from appObjects.AppObjectTemplate import FlatCAMObj, ObjectDeleted
+from appObjects.AppObjectTemplate import FlatCAMObj, keeps_instances, ObjectDeleted
 from appGUI.GUIElements import FCCheckBox
 from appGUI.ObjectUI import GeometryObjectUI
 
 from shapely import MultiLineString, LinearRing, Polygon, MultiPolygon, LineString
-from shapely.affinity import scale, translate
 from shapely.ops import unary_union
 
-from camlib import Geometry, flatten_shapely_geometry
+from camlib import Geometry, flatten_shapely_geometry, scale_matrix, translation_matrix
 
-import re
 import ezdxf
 import numpy as np
 import traceback
@@ -165,6 +163,7 @@ class GeometryObject(FlatCAMObj, Geometry):
         # from predecessors.
         self.ser_attrs += ['obj_options', 'kind', 'multigeo', 'fill_color', 'outline_color', 'alpha_level']
 
+    @keeps_instances
     def build_ui(self):
         try:
             self.ui_disconnect()
@@ -988,160 +987,6 @@ class GeometryObject(FlatCAMObj, Geometry):
             else:
                 self.app.app_obj.new_object("cncjob", outname, job_init_multi_geometry, plot=plot)
 
-    def generatecncjob(self, outname=None, dia=None, offset=None, z_cut=None, z_move=None, feedrate=None,
-                       feedrate_z=None, feedrate_rapid=None, spindlespeed=None, dwell=None, dwelltime=None,
-                       las_min_pwr=0.0,
-                       multidepth=None, dpp=None, toolchange=None, toolchangez=None, toolchangexy=None,
-                       extracut=None, extracut_length=None, startz=None, endz=None, endxy=None, pp=None,
-                       seg_x=None, seg_y=None, use_thread=True, plot=True, **args):
-        """
-        Only used by the TCL Command Cncjob.
-        Creates a CNCJob out of this Geometry object. The actual
-        work is done by the target camlib.CNCjob
-        `generate_from_geometry_2()` method.
-
-        :param outname:         Name of the new object
-        :param dia:             Tool diameter
-        :param offset:
-        :param z_cut:           Cut depth (negative value)
-        :param z_move:          Height of the tool when travelling (not cutting)
-        :param feedrate:        Feed rate while cutting on X - Y plane
-        :param feedrate_z:      Feed rate while cutting on Z plane
-        :param feedrate_rapid:  Feed rate while moving with rapids
-        :param spindlespeed:    Spindle speed (RPM)
-        :param dwell:
-        :param dwelltime:
-        :param las_min_pwr:     Float. Set the power for a laser (when used due of a preprocessor) when not cutting
-        :param multidepth:      Bool: If True use the `dpp` parameter
-        :param dpp:             Depth for each pass when multidepth parameter is True. Positive value.
-        :param toolchange:
-        :param toolchangez:
-        :param toolchangexy:    A sequence ox X,Y coordinates: a 2-length tuple or a string.
-                                Coordinates in X,Y plane for the Toolchange event
-        :param extracut:
-        :param extracut_length:
-        :param startz:
-        :param endz:
-        :param endxy:           A sequence ox X,Y coordinates: a 2-length tuple or a string.
-                                Coordinates in X, Y plane for the last move after ending the job.
-        :param pp:              Name of the preprocessor
-        :param seg_x:
-        :param seg_y:
-        :param use_thread:
-        :param plot:
-        :return: None
-        """
-
-        self.app.log.debug("FlatCAMGeometry.GeometryObject.generatecncjob()")
-
-        tooldia = dia if dia else float(self.obj_options["tools_mill_tooldia"])
-        outname = outname if outname is not None else self.obj_options["name"]
-
-        z_cut = z_cut if z_cut is not None else float(self.obj_options["tools_mill_cutz"])
-        z_move = z_move if z_move is not None else float(self.obj_options["tools_mill_travelz"])
-
-        feedrate = feedrate if feedrate is not None else float(self.obj_options["tools_mill_feedrate"])
-        feedrate_z = feedrate_z if feedrate_z is not None else float(self.obj_options["tools_mill_feedrate_z"])
-        feedrate_rapid = feedrate_rapid if feedrate_rapid is not None else float(self.obj_options[
-                                                                                     "tools_mill_feedrate_rapid"])
-
-        multidepth = multidepth if multidepth is not None else self.obj_options["tools_mill_multidepth"]
-        depthperpass = dpp if dpp is not None else float(self.obj_options["tools_mill_depthperpass"])
-
-        seg_x = seg_x if seg_x is not None else float(self.app.options['geometry_seg_x'])
-        seg_y = seg_y if seg_y is not None else float(self.app.options['geometry_seg_y'])
-
-        extracut = extracut if extracut is not None else float(self.obj_options["tools_mill_extracut"])
-        extracut_length = extracut_length if extracut_length is not None else float(self.obj_options[
-                                                                                        "tools_mill_extracut_length"])
-
-        startz = startz if startz is not None else self.obj_options["tools_mill_startz"]
-        endz = endz if endz is not None else float(self.obj_options["tools_mill_endz"])
-
-        endxy = endxy if endxy else self.obj_options["tools_mill_endxy"]
-        if isinstance(endxy, str):
-            endxy = re.sub(r'[()\[\]]', '', endxy)
-            if endxy and endxy != '':
-                endxy = [float(eval(a)) for a in endxy.split(",")]
-
-        toolchangez = toolchangez if toolchangez else float(self.obj_options["tools_mill_toolchangez"])
-
-        toolchangexy = toolchangexy if toolchangexy else self.obj_options["tools_mill_toolchangexy"]
-        if isinstance(toolchangexy, str):
-            toolchangexy = re.sub(r'[()\[\]]', '', toolchangexy)
-            if toolchangexy and toolchangexy != '':
-                toolchangexy = [float(eval(a)) for a in toolchangexy.split(",")]
-
-        toolchange = toolchange if toolchange else self.obj_options["tools_mill_toolchange"]
-
-        offset = offset if offset else 0.0
-
-        # int or None.
-        spindlespeed = spindlespeed if spindlespeed else self.obj_options['tools_mill_spindlespeed']
-        las_min_pwr = las_min_pwr if las_min_pwr else self.obj_options['tools_mill_min_power']
-        dwell = dwell if dwell else self.obj_options["tools_mill_dwell"]
-        dwelltime = dwelltime if dwelltime else float(self.obj_options["tools_mill_dwelltime"])
-
-        ppname_g = pp if pp else self.obj_options["tools_mill_ppname_g"]
-
-        # Object initialization function for app.app_obj.new_object()
-        # RUNNING ON SEPARATE THREAD!
-        def job_init(job_obj, app_obj):
-            assert job_obj.kind == 'cncjob', "Initializer expected a CNCJobObject, got %s" % type(job_obj)
-
-            # Propagate options
-            job_obj.obj_options["tooldia"] = tooldia
-            job_obj.obj_options["tools_mill_tooldia"] = tooldia
-
-            job_obj.coords_decimals = self.app.options["cncjob_coords_decimals"]
-            job_obj.fr_decimals = self.app.options["cncjob_fr_decimals"]
-
-            job_obj.obj_options['type'] = 'Geometry'
-            job_obj.obj_options['tool_dia'] = tooldia
-
-            job_obj.seg_x = seg_x
-            job_obj.seg_y = seg_y
-
-            job_obj.z_p_depth = float(self.obj_options["tools_mill_z_p_depth"])
-            job_obj.feedrate_probe = float(self.obj_options["tools_mill_feedrate_probe"])
-
-            job_obj.obj_options['xmin'] = self.obj_options['xmin']
-            job_obj.obj_options['ymin'] = self.obj_options['ymin']
-            job_obj.obj_options['xmax'] = self.obj_options['xmax']
-            job_obj.obj_options['ymax'] = self.obj_options['ymax']
-
-            # it seems that the tolerance needs to be a lot lower value than 0.01, and it was hardcoded initially
-            # to a value of 0.0005 which is 20 times less than 0.01
-            tol = float(self.app.options['global_tolerance']) / 20
-            res, start_gcode = job_obj.generate_from_geometry_2(
-                self, tooldia=tooldia, offset=offset, tolerance=tol, z_cut=z_cut, z_move=z_move, feedrate=feedrate,
-                feedrate_z=feedrate_z, feedrate_rapid=feedrate_rapid, spindlespeed=spindlespeed, dwell=dwell,
-                dwelltime=dwelltime, laser_min_power=las_min_pwr, multidepth=multidepth, depthpercut=depthperpass,
-                toolchange=toolchange,
-                toolchangez=toolchangez, toolchangexy=toolchangexy, extracut=extracut, extracut_length=extracut_length,
-                startz=startz, endz=endz, endxy=endxy, pp_geometry_name=ppname_g, is_first=True)
-
-            if start_gcode != '':
-                job_obj.gc_start = start_gcode
-
-            job_obj.source_file = start_gcode + res
-            job_obj.gcode_parse()
-            app_obj.inform.emit('[success] %s...' % _("Finished G-Code processing"))
-
-        if use_thread:
-            # To be run in separate thread
-            def job_thread(app_obj):
-                with self.app.proc_container.new('%s...' % _("Generating")):
-                    app_obj.app_obj.new_object("cncjob", outname, job_init, plot=plot)
-                    app_obj.inform.emit('[success] %s: %s' % (_("CNCjob created"), outname))
-
-            # Create a promise with the name
-            self.app.collection.promise(outname)
-            # Send to worker
-            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app]})
-        else:
-            self.app.app_obj.new_object("cncjob", outname, job_init, plot=plot)
-
     def scale(self, xfactor, yfactor=None, point=None):
         """
         Scales all geometry by a given factor.
@@ -1154,6 +999,7 @@ class GeometryObject(FlatCAMObj, Geometry):
         :return: None
         """
         self.app.log.debug("FlatCAMObj.GeometryObject.scale()")
+        self.invalidate_bounds()
 
         try:
             xfactor = float(xfactor)
@@ -1174,60 +1020,9 @@ class GeometryObject(FlatCAMObj, Geometry):
             return
 
         if point is None:
-            px = 0
-            py = 0
-        else:
-            px, py = point
-
-        self.geo_len = 0
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def scale_recursion(geom):
-            if type(geom) is list:
-                geoms = []
-                for local_geom in geom:
-                    geoms.append(scale_recursion(local_geom))
-                return geoms
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return scale(geom, xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return geom
-
-        if self.multigeo is True:
-            for tool in self.tools:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.tools[tool]['solid_geometry'])
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.tools[tool]['solid_geometry'] = scale_recursion(self.tools[tool]['solid_geometry'])
-
-        try:
-            # variables to display the percentage of work done
-            self.geo_len = 0
-            try:
-                self.geo_len = len(self.solid_geometry)
-            except TypeError:
-                self.geo_len = 1
-            self.old_disp_number = 0
-            self.el_count = 0
+            point = (0, 0)
 
-            self.solid_geometry = scale_recursion(self.solid_geometry)
-        except AttributeError:
-            self.solid_geometry = []
-            return
+        self.transform_geometry(scale_matrix(xfactor, yfactor, origin=point))
 
         self.app.proc_container.new_text = ''
         self.app.inform.emit('[success] %s' % _("Done."))
@@ -1241,6 +1036,7 @@ class GeometryObject(FlatCAMObj, Geometry):
         :return: None
         """
         self.app.log.debug("FlatCAMObj.GeometryObject.offset()")
+        self.invalidate_bounds()
 
         try:
             dx, dy = vect
@@ -1254,58 +1050,7 @@ class GeometryObject(FlatCAMObj, Geometry):
         if dx == 0 and dy == 0:
             return
 
-        self.geo_len = 0
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def translate_recursion(geom):
-            if type(geom) is list:
-                geoms = []
-                for local_geom in geom:
-                    geoms.append(translate_recursion(local_geom))
-                return geoms
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return translate(geom, xoff=dx, yoff=dy)
-                except AttributeError:
-                    return geom
-
-        if self.multigeo is True:
-            for tool in self.tools:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    source_geo = self.tools[tool]['solid_geometry']
-                    work_geo = source_geo.geoms if isinstance(source_geo, (MultiPolygon, MultiLineString)) else \
-                        source_geo
-                    self.geo_len = len(work_geo)
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.tools[tool]['solid_geometry'] = translate_recursion(self.tools[tool]['solid_geometry'])
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            source_geo = self.solid_geometry
-            work_geo = source_geo.geoms if isinstance(source_geo, (MultiPolygon, MultiLineString)) else \
-                source_geo
-            self.geo_len = len(work_geo)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        self.solid_geometry = translate_recursion(self.solid_geometry)
+        self.transform_geometry(translation_matrix(dx, dy))
 
         self.app.proc_container.new_text = ''
         self.app.inform.emit('[success] %s' % _("Done."))
@@ -1428,6 +1173,7 @@ class GeometryObject(FlatCAMObj, Geometry):
             # if self.app.use_3d_engine:
             self.add_shape(shape=element, color=color, visible=visible, layer=0)
 
+    @keeps_instances
     def plot(self, visible=None, kind=None, plot_tool=None):
         """
         Plot the object.
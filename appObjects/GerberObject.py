@@ -14,7 +14,7 @@ from PyQt6 import QtWidgets, QtCore
 from appGUI.GUIElements import FCCheckBox
 from appGUI.ObjectUI import GerberObjectUI
 from appParsers.ParseGerber import Gerber
-from appObjects.AppObjectTemplate import FlatCAMObj, ObjectDeleted, ValidationError
+from appObjects.AppObjectTemplate import FlatCAMObj, keeps_instances, ObjectDeleted
 
 from camlib import flatten_shapely_geometry
 
@@ -69,9 +69,6 @@ class GerberObject(FlatCAMObj, Gerber):
             "milling_type": 'cl',
         })
 
-        # type of isolation: 0 = exteriors, 1 = interiors, 2 = complete isolation (both interiors and exteriors)
-        self.iso_type = 2
-
         self.multigeo = False
 
         self.follow = False
@@ -256,6 +253,7 @@ class GerberObject(FlatCAMObj, Gerber):
 
             self.ui.follow_cb.show()
 
+    @keeps_instances
     def build_ui(self):
         FlatCAMObj.build_ui(self)
 
@@ -524,246 +522,6 @@ class GerberObject(FlatCAMObj, Gerber):
 
         self.app.app_obj.new_object("geometry", name, geo_init)
 
-    def isolate(self, iso_type=None, geometry=None, dia=None, passes=None, overlap=None, outname=None, combine=None,
-                milling_type=None, plot=True):
-        """
-        Creates an isolation routing geometry object in the project.
-
-        :param iso_type:        type of isolation to be done: 0 = exteriors, 1 = interiors and 2 = both
-        :param geometry:        specific geometry to isolate
-        :param dia:             Tool diameter
-        :param passes:          Number of tool widths to cut
-        :param overlap:         Overlap between passes in fraction of tool diameter
-        :param outname:         Base name of the output object
-        :param combine:         Boolean: if to combine passes in one resulting object in case of multiple passes
-        :param milling_type:    type of milling: conventional or climbing
-        :param plot: Boolean:   if to plot the resulting geometry object
-        :return:                None
-        """
-
-        if geometry is None:
-            work_geo = self.solid_geometry
-        else:
-            work_geo = geometry
-
-        if dia is None:
-            dia = float(self.app.options["tools_iso_tooldia"])
-
-        if passes is None:
-            passes = int(self.app.options["tools_iso_passes"])
-
-        if overlap is None:
-            overlap = float(self.app.options["tools_iso_overlap"])
-
-        overlap /= 100.0
-
-        combine = self.app.options["tools_iso_combine_passes"] if combine is None else bool(combine)
-
-        if milling_type is None:
-            milling_type = self.app.options["tools_iso_milling_type"]
-
-        if iso_type is None:
-            iso_t = 2
-        else:
-            iso_t = iso_type
-
-        base_name = self.obj_options["name"]
-
-        if combine:
-            if outname is None:
-                if self.iso_type == 0:
-                    iso_name = base_name + "_ext_iso"
-                elif self.iso_type == 1:
-                    iso_name = base_name + "_int_iso"
-                else:
-                    iso_name = base_name + "_iso"
-            else:
-                iso_name = outname
-
-            def iso_init(geo_obj, app_obj):
-                # Propagate options
-                geo_obj.obj_options["tools_mill_tooldia"] = str(dia)
-                geo_obj.tool_type = self.app.options["tools_iso_tool_shape"]
-                geo_obj.multigeo = True
-
-                # store here the default data for Geometry Data
-                default_data = {}
-                for opt_key, opt_val in app_obj.options.items():
-                    if opt_key.find('geometry' + "_") == 0:
-                        oname = opt_key[len('geometry') + 1:]
-                        default_data[oname] = app_obj.options[opt_key]
-                    if opt_key.find('tools_mill' + "_") == 0:
-                        default_data[opt_key] = app_obj.options[opt_key]
-
-                geo_obj.tools = {
-                    1: {
-                        'tooldia':          dia,
-                        'data':             default_data,
-                        'solid_geometry':   []
-                    }
-                }
-
-                for nr_pass in range(passes):
-                    iso_offset = dia * ((2 * nr_pass + 1) / 2.0) - (nr_pass * overlap * dia)
-
-                    # if milling type is climb then the move is counter-clockwise around features
-                    mill_dir = 1 if milling_type == 'cl' else 0
-                    geom = self.generate_envelope(iso_offset, mill_dir, geometry=work_geo, env_iso_type=iso_t,
-                                                  nr_passes=nr_pass)
-
-                    if geom == 'fail':
-                        if plot:
-                            app_obj.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
-                        return 'fail'
-                    geo_obj.solid_geometry = flatten_shapely_geometry(geom)
-
-                    # update the geometry in the tools
-                    geo_obj.tools[1]['solid_geometry'] = geo_obj.solid_geometry
-
-                # detect if solid_geometry is empty
-                empty_cnt = 0
-                w_geo = geo_obj.solid_geometry
-                for g in w_geo:
-                    if g or not g.is_empty:
-                        break
-                    else:
-                        empty_cnt += 1
-
-                if empty_cnt == len(w_geo):
-                    raise ValidationError("Empty Geometry", None)
-                elif plot:
-                    msg = '[success] %s: %s' % (_("Isolation geometry created"), geo_obj.obj_options["name"])
-                    app_obj.inform.emit(msg)
-
-                # ############################################################
-                # ########## AREA SUBTRACTION ################################
-                # ############################################################
-                # if self.app.options["tools_iso_except"]:
-                #     self.app.proc_container.update_view_text(' %s' % _("Subtracting Geo"))
-                #     geo_obj.solid_geometry = self.area_subtraction(geo_obj.solid_geometry)
-
-            self.app.app_obj.new_object("geometry", iso_name, iso_init, plot=plot)
-        else:
-            for i in range(passes):
-
-                offset = dia * ((2 * i + 1) / 2.0) - (i * overlap * dia)
-                if passes > 1:
-                    if outname is None:
-                        if self.iso_type == 0:
-                            iso_name = base_name + "_ext_iso" + str(i + 1)
-                        elif self.iso_type == 1:
-                            iso_name = base_name + "_int_iso" + str(i + 1)
-                        else:
-                            iso_name = base_name + "_iso" + str(i + 1)
-                    else:
-                        iso_name = outname
-                else:
-                    if outname is None:
-                        if self.iso_type == 0:
-                            iso_name = base_name + "_ext_iso"
-                        elif self.iso_type == 1:
-                            iso_name = base_name + "_int_iso"
-                        else:
-                            iso_name = base_name + "_iso"
-                    else:
-                        iso_name = outname
-
-                def iso_init(geo_obj, app_obj):
-                    # Propagate options
-                    geo_obj.obj_options["tools_mill_tooldia"] = str(dia)
-                    geo_obj.tool_type = app_obj.options["tools_iso_tool_shape"]
-                    geo_obj.multigeo = True
-
-                    # if milling type is climb then the move is counter-clockwise around features
-                    mill_dir = 1 if milling_type == 'cl' else 0
-                    geom = self.generate_envelope(offset, mill_dir, geometry=work_geo, env_iso_type=iso_t, nr_passes=i)
-
-                    if geom == 'fail':
-                        if plot:
-                            app_obj.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
-                        return 'fail'
-
-                    geo_obj.solid_geometry = flatten_shapely_geometry(geom)
-
-                    # store here the default data for Geometry Data
-                    default_data = {}
-                    for opt_key, opt_val in app_obj.options.items():
-                        if opt_key.find('geometry' + "_") == 0:
-                            oname = opt_key[len('geometry') + 1:]
-                            default_data[oname] = app_obj.options[opt_key]
-                        if opt_key.find('tools_mill' + "_") == 0:
-                            default_data[opt_key] = app_obj.options[opt_key]
-
-                    geo_obj.tools = {
-                        1: {
-                            'tooldia':          dia,
-                            'data':             default_data,
-                            'solid_geometry':   geo_obj.solid_geometry
-                        }
-                    }
-
-                    # detect if solid_geometry is empty
-                    empty_cnt = 0
-                    w_geo = geo_obj.solid_geometry
-                    for g in geo_obj.solid_geometry:
-                        if g or not g.is_empty:
-                            break
-                        else:
-                            empty_cnt += 1
-
-                    if empty_cnt == len(w_geo):
-                        raise ValidationError("Empty Geometry", None)
-                    elif plot:
-                        msg = '[success] %s: %s' % (_("Isolation geometry created"), geo_obj.obj_options["name"])
-                        app_obj.inform.emit(msg)
-
-                    # ############################################################
-                    # ########## AREA SUBTRACTION ################################
-                    # ############################################################
-                    # if self.app.options["tools_iso_except"]:
-                    #     self.app.proc_container.update_view_text(' %s' % _("Subtracting Geo"))
-                    #     geo_obj.solid_geometry = self.area_subtraction(geo_obj.solid_geometry)
-
-                self.app.app_obj.new_object("geometry", iso_name, iso_init, plot=plot)
-
-    def generate_envelope(self, offset, invert, geometry=None, env_iso_type=2, nr_passes=0):
-        # isolation_geometry produces an envelope that is going on the left of the geometry
-        # (the copper features). To leave the least amount of burrs on the features
-        # the tool needs to travel on the right side of the features (this is called conventional milling)
-        # the first pass is the one cutting all the features, so it needs to be reversed
-        # the other passes overlap preceding ones and cut the leftover copper. It is better for them
-        # to cut on the right side of the leftover copper i.e. on the left side of the features.
-
-        try:
-            geom = self.isolation_geometry(offset, geometry=geometry, iso_type=env_iso_type, passes=nr_passes)
-        except Exception as e:
-            self.app.log.error('GerberObject.isolate().generate_envelope() --> %s' % str(e))
-            return 'fail'
-
-        if invert:
-            try:
-                pl = []
-                w_geo = geom.geoms if isinstance(geom, (MultiPolygon, MultiLineString)) else geom
-                for p in w_geo:
-                    if p is not None:
-                        if isinstance(p, Polygon):
-                            pl.append(Polygon(p.exterior.coords[::-1], p.interiors))
-                        elif isinstance(p, LinearRing):
-                            pl.append(Polygon(p.coords[::-1]))
-                geom = MultiPolygon(pl)
-            except TypeError:
-                if isinstance(geom, Polygon) and geom is not None:
-                    geom = Polygon(geom.exterior.coords[::-1], geom.interiors)
-                elif isinstance(geom, LinearRing) and geom is not None:
-                    geom = Polygon(geom.coords[::-1])
-                else:
-                    self.app.log.debug("GerberObject.isolate().generate_envelope() Error --> Unexpected Geometry %s" %
-                                       type(geom))
-            except Exception as e:
-                self.app.log.error("GerberObject.isolate().generate_envelope() Error --> %s" % str(e))
-                return 'fail'
-        return geom
-
     def follow_geo(self, outname=None):
         """
         Creates a geometry object "following" the gerber paths.
@@ -891,6 +649,7 @@ class GerberObject(FlatCAMObj, Gerber):
         # self.obj_options['isotd_list'] = float(self.obj_options['isotd_list']) * factor
         # self.obj_options['bboxmargin'] = float(self.obj_options['bboxmargin']) * factor
 
+    @keeps_instances
     def plot(self, kind=None, **kwargs):
         """
 
@@ -1153,515 +912,10 @@ class GerberObject(FlatCAMObj, Gerber):
 
         self.ui_connect()
 
-    def export_gerber(self, whole, fract, g_zeros='L', factor=1):
-        """
-        Creates a Gerber file content to be exported to a file.
-
-        :param whole: how many digits in the whole part of coordinates
-        :param fract: how many decimals in coordinates
-        :param g_zeros: type of the zero suppression used: LZ or TZ; string
-        :param factor: factor to be applied onto the Gerber coordinates
-        :return: Gerber_code
-        """
-        self.app.log.debug("GerberObject.export_gerber() --> Generating the Gerber code from the selected Gerber file")
-
-        def tz_format(x, y, fac):
-            x_c = x * fac
-            y_c = y * fac
-
-            x_form = "{:.{dec}f}".format(x_c, dec=fract)
-            y_form = "{:.{dec}f}".format(y_c, dec=fract)
-
-            # extract whole part and decimal part
-            x_form = x_form.partition('.')
-            y_form = y_form.partition('.')
-
-            # left padd the 'whole' part with zeros
-            x_whole = x_form[0].rjust(whole, '0')
-            y_whole = y_form[0].rjust(whole, '0')
-
-            # restore the coordinate padded in the left with 0 and added the decimal part
-            # without the decinal dot
-            x_form = x_whole + x_form[2]
-            y_form = y_whole + y_form[2]
-            return x_form, y_form
-
-        def lz_format(x, y, fac):
-            x_c = x * fac
-            y_c = y * fac
-
-            x_form = "{:.{dec}f}".format(x_c, dec=fract).replace('.', '')
-            y_form = "{:.{dec}f}".format(y_c, dec=fract).replace('.', '')
-
-            # pad with rear zeros
-            x_form.ljust(length, '0')
-            y_form.ljust(length, '0')
-
-            return x_form, y_form
-
-        # Gerber code is stored here
-        gerber_code = ''
-
-        # apertures processing
-        try:
-            length = whole + fract
-            if 0 in self.tools:
-                if 'geometry' in self.tools[0]:
-                    for geo_elem in self.tools[0]['geometry']:
-                        if 'solid' in geo_elem:
-                            geo = geo_elem['solid']
-                            if not geo.is_empty and not isinstance(geo, LineString) and \
-                                    not isinstance(geo, MultiLineString) and not isinstance(geo, Point):
-                                gerber_code += 'G36*\n'
-                                geo_coords = list(geo.exterior.coords)
-                                # first command is a move with pen-up D02 at the beginning of the geo
-                                if g_zeros == 'T':
-                                    x_formatted, y_formatted = tz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-                                else:
-                                    x_formatted, y_formatted = lz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-                                for coord in geo_coords[1:]:
-                                    if g_zeros == 'T':
-                                        x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                        gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                       yform=y_formatted)
-                                    else:
-                                        x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                        gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                       yform=y_formatted)
-                                gerber_code += 'D02*\n'
-                                gerber_code += 'G37*\n'
-
-                                clear_list = list(geo.interiors)
-                                if clear_list:
-                                    gerber_code += '%LPC*%\n'
-                                    for clear_geo in clear_list:
-                                        gerber_code += 'G36*\n'
-                                        geo_coords = list(clear_geo.coords)
-
-                                        # first command is a move with pen-up D02 at the beginning of the geo
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-
-                                        prev_coord = geo_coords[0]
-                                        for coord in geo_coords[1:]:
-                                            if coord != prev_coord:
-                                                if g_zeros == 'T':
-                                                    x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-                                                else:
-                                                    x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-                                            prev_coord = coord
-
-                                        gerber_code += 'D02*\n'
-                                        gerber_code += 'G37*\n'
-                                    gerber_code += '%LPD*%\n'
-                            elif isinstance(geo, LineString) or isinstance(geo, MultiLineString) or \
-                                    isinstance(geo, Point):
-                                try:
-                                    if not geo.is_empty:
-                                        if isinstance(geo, Point):
-                                            if g_zeros == 'T':
-                                                x_formatted, y_formatted = tz_format(geo.x, geo.y, factor)
-                                                gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                            else:
-                                                x_formatted, y_formatted = lz_format(geo.x, geo.y, factor)
-                                                gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                        else:
-                                            geo_coords = list(geo.coords)
-                                            # first command is a move with pen-up D02 at the beginning of the geo
-                                            if g_zeros == 'T':
-                                                x_formatted, y_formatted = tz_format(
-                                                    geo_coords[0][0], geo_coords[0][1], factor)
-                                                gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                            else:
-                                                x_formatted, y_formatted = lz_format(
-                                                    geo_coords[0][0], geo_coords[0][1], factor)
-                                                gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-
-                                            prev_coord = geo_coords[0]
-                                            for coord in geo_coords[1:]:
-                                                if coord != prev_coord:
-                                                    if g_zeros == 'T':
-                                                        x_formatted, y_formatted = tz_format(coord[0], coord[1],
-                                                                                             factor)
-                                                        gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                            xform=x_formatted,
-                                                            yform=y_formatted)
-                                                    else:
-                                                        x_formatted, y_formatted = lz_format(coord[0], coord[1],
-                                                                                             factor)
-                                                        gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                            xform=x_formatted,
-                                                            yform=y_formatted)
-                                                prev_coord = coord
-
-                                            # gerber_code += "D02*\n"
-                                except Exception as e:
-                                    self.app.log.error(
-                                        "FlatCAMObj.GerberObject.export_gerber() 'follow' for 0 aperture --> %s" %
-                                        str(e))
-                        if 'clear' in geo_elem:
-                            geo = geo_elem['clear']
-                            if not geo.is_empty:
-                                gerber_code += '%LPC*%\n'
-                                gerber_code += 'G36*\n'
-                                geo_coords = list(geo.exterior.coords)
-                                # first command is a move with pen-up D02 at the beginning of the geo
-                                if g_zeros == 'T':
-                                    x_formatted, y_formatted = tz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-                                else:
-                                    x_formatted, y_formatted = lz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-
-                                prev_coord = geo_coords[0]
-                                for coord in geo_coords[1:]:
-                                    if coord != prev_coord:
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                            gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                            gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                    prev_coord = coord
-
-                                gerber_code += 'D02*\n'
-                                gerber_code += 'G37*\n'
-                                gerber_code += '%LPD*%\n'
-        except Exception as e:
-            self.app.log.error("FlatCAMObj.GerberObject.export_gerber() 0 aperture --> %s" % str(e))
-
-        for apid in self.tools:
-            if apid == 0:
-                continue
-            elif self.tools[apid]['type'] in ['AM', 'P']:
-                if 'geometry' in self.tools[apid]:
-                    for geo_elem in self.tools[apid]['geometry']:
-                        if 'solid' in geo_elem:
-                            geo = geo_elem['solid']
-                            if not geo.is_empty and not isinstance(geo, LineString) and \
-                                    not isinstance(geo, MultiLineString) and not isinstance(geo, Point):
-                                gerber_code += 'G36*\n'
-                                geo_coords = list(geo.exterior.coords)
-                                # first command is a move with pen-up D02 at the beginning of the geo
-                                if g_zeros == 'T':
-                                    x_formatted, y_formatted = tz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-                                else:
-                                    x_formatted, y_formatted = lz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-                                for coord in geo_coords[1:]:
-                                    if g_zeros == 'T':
-                                        x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                        gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                       yform=y_formatted)
-                                    else:
-                                        x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                        gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                       yform=y_formatted)
-                                gerber_code += 'D02*\n'
-                                gerber_code += 'G37*\n'
-
-                                clear_list = list(geo.interiors)
-                                if clear_list:
-                                    gerber_code += '%LPC*%\n'
-                                    for clear_geo in clear_list:
-                                        gerber_code += 'G36*\n'
-                                        geo_coords = list(clear_geo.coords)
-
-                                        # first command is a move with pen-up D02 at the beginning of the geo
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-
-                                        prev_coord = geo_coords[0]
-                                        for coord in geo_coords[1:]:
-                                            if coord != prev_coord:
-                                                if g_zeros == 'T':
-                                                    x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                        xform=x_formatted,
-                                                        yform=y_formatted)
-                                                else:
-                                                    x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                        xform=x_formatted,
-                                                        yform=y_formatted)
-                                            prev_coord = coord
-
-                                        gerber_code += 'D02*\n'
-                                        gerber_code += 'G37*\n'
-                                    gerber_code += '%LPD*%\n'
-                            elif isinstance(geo, LineString) or isinstance(geo, MultiLineString) or \
-                                    isinstance(geo, Point):
-                                try:
-                                    if not geo.is_empty:
-                                        if isinstance(geo, Point):
-                                            if g_zeros == 'T':
-                                                x_formatted, y_formatted = tz_format(geo.x, geo.y, factor)
-                                                gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                            else:
-                                                x_formatted, y_formatted = lz_format(geo.x, geo.y, factor)
-                                                gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                        else:
-                                            geo_coords = list(geo.coords)
-                                            # first command is a move with pen-up D02 at the beginning of the geo
-                                            if g_zeros == 'T':
-                                                x_formatted, y_formatted = tz_format(
-                                                    geo_coords[0][0], geo_coords[0][1], factor)
-                                                gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                            else:
-                                                x_formatted, y_formatted = lz_format(
-                                                    geo_coords[0][0], geo_coords[0][1], factor)
-                                                gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-
-                                            prev_coord = geo_coords[0]
-                                            for coord in geo_coords[1:]:
-                                                if coord != prev_coord:
-                                                    if g_zeros == 'T':
-                                                        x_formatted, y_formatted = tz_format(coord[0], coord[1],
-                                                                                             factor)
-                                                        gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                            xform=x_formatted,
-                                                            yform=y_formatted)
-                                                    else:
-                                                        x_formatted, y_formatted = lz_format(coord[0], coord[1],
-                                                                                             factor)
-                                                        gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                            xform=x_formatted,
-                                                            yform=y_formatted)
-                                                prev_coord = coord
-
-                                            # gerber_code += "D02*\n"
-                                except Exception as e:
-                                    self.app.log.error(
-                                        "FlatCAMObj.GerberObject.export_gerber() 'follow' for AM --> %s" % str(e))
-                        if 'clear' in geo_elem:
-                            geo = geo_elem['clear']
-                            if not geo.is_empty:
-                                gerber_code += '%LPC*%\n'
-                                gerber_code += 'G36*\n'
-                                geo_coords = list(geo.exterior.coords)
-                                # first command is a move with pen-up D02 at the beginning of the geo
-                                if g_zeros == 'T':
-                                    x_formatted, y_formatted = tz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-                                else:
-                                    x_formatted, y_formatted = lz_format(geo_coords[0][0], geo_coords[0][1], factor)
-                                    gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                   yform=y_formatted)
-
-                                prev_coord = geo_coords[0]
-                                for coord in geo_coords[1:]:
-                                    if coord != prev_coord:
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                            gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                            gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                    prev_coord = coord
-
-                                gerber_code += 'D02*\n'
-                                gerber_code += 'G37*\n'
-                                gerber_code += '%LPD*%\n'
-            else:
-                gerber_code += 'D%s*\n' % str(apid)
-                if 'geometry' in self.tools[apid]:
-                    for geo_elem in self.tools[apid]['geometry']:
-                        try:
-                            if 'follow' in geo_elem:
-                                geo = geo_elem['follow']
-                                if not geo.is_empty:
-                                    if isinstance(geo, Point):
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(geo.x, geo.y, factor)
-                                            gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(geo.x, geo.y, factor)
-                                            gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                    else:
-                                        geo_coords = list(geo.coords)
-                                        # first command is a move with pen-up D02 at the beginning of the geo
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-
-                                        prev_coord = geo_coords[0]
-                                        for coord in geo_coords[1:]:
-                                            if coord != prev_coord:
-                                                if g_zeros == 'T':
-                                                    x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-                                                else:
-                                                    x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-                                            prev_coord = coord
-
-                                        # gerber_code += "D02*\n"
-                        except Exception as e:
-                            self.app.log.error(
-                                "FlatCAMObj.GerberObject.export_gerber() 'follow' normal aperture--> %s" % str(e))
-
-                        try:
-                            if 'clear' in geo_elem:
-                                gerber_code += '%LPC*%\n'
-
-                                geo = geo_elem['clear']
-                                if not geo.is_empty:
-                                    if isinstance(geo, Point):
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(geo.x, geo.y, factor)
-                                            gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(geo.x, geo.y, factor)
-                                            gerber_code += "X{xform}Y{yform}D03*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                    elif isinstance(geo, Polygon):
-                                        geo_coords = list(geo.exterior.coords)
-                                        # first command is a move with pen-up D02 at the beginning of the geo
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-
-                                        prev_coord = geo_coords[0]
-                                        for coord in geo_coords[1:]:
-                                            if coord != prev_coord:
-                                                if g_zeros == 'T':
-                                                    x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-                                                else:
-                                                    x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-
-                                            prev_coord = coord
-
-                                        for geo_int in geo.interiors:
-                                            geo_coords = list(geo_int.coords)
-                                            # first command is a move with pen-up D02 at the beginning of the geo
-                                            if g_zeros == 'T':
-                                                x_formatted, y_formatted = tz_format(
-                                                    geo_coords[0][0], geo_coords[0][1], factor)
-                                                gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-                                            else:
-                                                x_formatted, y_formatted = lz_format(
-                                                    geo_coords[0][0], geo_coords[0][1], factor)
-                                                gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                               yform=y_formatted)
-
-                                            prev_coord = geo_coords[0]
-                                            for coord in geo_coords[1:]:
-                                                if coord != prev_coord:
-                                                    if g_zeros == 'T':
-                                                        x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                                        gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                            xform=x_formatted,
-                                                            yform=y_formatted)
-                                                    else:
-                                                        x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                                        gerber_code += "X{xform}Y{yform}D01*\n".format(
-                                                            xform=x_formatted,
-                                                            yform=y_formatted)
-
-                                                prev_coord = coord
-                                    else:
-                                        geo_coords = list(geo.coords)
-                                        # first command is a move with pen-up D02 at the beginning of the geo
-                                        if g_zeros == 'T':
-                                            x_formatted, y_formatted = tz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-                                        else:
-                                            x_formatted, y_formatted = lz_format(
-                                                geo_coords[0][0], geo_coords[0][1], factor)
-                                            gerber_code += "X{xform}Y{yform}D02*\n".format(xform=x_formatted,
-                                                                                           yform=y_formatted)
-
-                                        prev_coord = geo_coords[0]
-                                        for coord in geo_coords[1:]:
-                                            if coord != prev_coord:
-                                                if g_zeros == 'T':
-                                                    x_formatted, y_formatted = tz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-                                                else:
-                                                    x_formatted, y_formatted = lz_format(coord[0], coord[1], factor)
-                                                    gerber_code += "X{xform}Y{yform}D01*\n".format(xform=x_formatted,
-                                                                                                   yform=y_formatted)
-
-                                            prev_coord = coord
-                                        # gerber_code += "D02*\n"
-                                    gerber_code += '%LPD*%\n'
-                        except Exception as e:
-                            self.app.log.error("FlatCAMObj.GerberObject.export_gerber() 'clear' --> %s" % str(e))
-
-        if not self.tools:
-            self.app.log.debug("FlatCAMObj.GerberObject.export_gerber() --> Gerber Object is empty: no apertures.")
-            return 'fail'
-
-        return gerber_code
+    @keeps_instances
+    def export_gerber(self, whole, fract, g_zeros='L', factor=1, file_handle=None):
+        # the instances of a panel are written by Gerber.export_gerber(), without expanding the panel geometry
+        return super().export_gerber(whole, fract, g_zeros=g_zeros, factor=factor, file_handle=file_handle)
 
     @staticmethod
     def merge(grb_list, grb_final, app):
@@ -1736,7 +990,9 @@ class GerberObject(FlatCAMObj, Gerber):
         self.replotApertures.emit()
 
     def scale(self, xfactor, yfactor=None, point=None):
-        Gerber.scale(self, xfactor=xfactor, yfactor=yfactor, point=point)
+        # the aperture sizes are scaled now; the aperture geometry may be scaled later, by a deferred transformation
+        with self.raw_geometry_access():
+            Gerber.scale(self, xfactor=xfactor, yfactor=yfactor, point=point)
         self.replotApertures.emit()
 
     def skew(self, angle_x, angle_y, point):
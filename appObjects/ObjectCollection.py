@@ -23,10 +23,10 @@ from appObjects.ExcellonObject import ExcellonObject
 from appObjects.GeometryObject import GeometryObject
 from appObjects.GerberObject import GerberObject
 from appObjects.ScriptObject import ScriptObject
+from appPlugins import is_loaded
+from appCore import unique_object_name
 
-import inspect  # TODO: Remove
 
-import re
 import logging
 from copy import deepcopy
 from numpy import inf
@@ -334,6 +334,13 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         # same as above only for objects that are plotted
         self.plot_promises = set()
 
+        # Name index used by get_by_name(): name -> object and casefolded name -> list of objects; indexed_names holds
+        # the name under which each object is indexed. It is updated when objects are appended, renamed (the 'name'
+        # option is changed) and deleted.
+        self.name_index = {}
+        self.casefold_index = {}
+        self.indexed_names = {}
+
         # ## View
         self.view = EventSensitiveListView(self.app)
         self.view.setModel(self)
@@ -551,6 +558,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
                 if old_name != new_name and new_name != '':
                     # rename the object
                     obj.obj_options["name"] = deepcopy(data)
+                    self.on_object_renamed(obj)
 
                     self.app.object_status_changed.emit(obj, 'rename', old_name)
 
@@ -593,7 +601,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         # return QtWidgets.QAbstractItemModel.flags(self, index)
 
     def append(self, obj, active=False, to_index=None):
-        self.app.log.debug(str(inspect.stack()[1][3]) + " --> OC.append()")
+        self.app.log.debug("OC.append()")
 
         name = obj.obj_options["name"]
 
@@ -604,17 +612,9 @@ class ObjectCollection(QtCore.QAbstractItemModel):
             # log.debug("%d promised objects remaining." % len(self.promises))
 
         # Prevent same name
-        while name in self.get_names():
-            # ## Create a new name
-            # Ends with number?
+        if name in self.name_index:
             self.app.log.debug("app_obj.new_object(): Object name (%s) exists, changing." % name)
-            match = re.search(r'(.*[^\d])?(\d+)$', name)
-            if match:  # Yes: Increment the number!
-                base = match.group(1) or ''
-                num = int(match.group(2))
-                name = base + str(num + 1)
-            else:  # No: add a number!
-                name += "_1"
+            name = unique_object_name(name, self.name_index)
         obj.obj_options["name"] = name
 
         # ############################################################################################################
@@ -648,6 +648,8 @@ class ObjectCollection(QtCore.QAbstractItemModel):
             # Required after appending (Qt MVC)
             self.endInsertRows()
 
+        self.index_name(obj)
+
         # Expand group
         if group.child_count() == 1:
             self.view.setExpanded(group_index, True)
@@ -669,7 +671,6 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         :rtype:             list
         """
 
-        # log.debug(str(inspect.stack()[1][3]) + " --> OC.get_names()")
         return [x.obj_options['name'] for x in self.get_list()]
 
     def get_bounds(self):
@@ -679,10 +680,6 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         :return: [xmin, ymin, xmax, ymax]
         :rtype: list
         """
-        self.app.log.debug(str(inspect.stack()[1][3]) + "--> OC.get_bounds()")
-
-        # TODO: Move the operation out of here.
-
         xmin = inf
         ymin = inf
         xmax = -inf
@@ -711,18 +708,74 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         :return: The requested object or None if no such object.
         :rtype: FlatCAMObj or None
         """
-        # log.debug(str(inspect.stack()[1][3]) + "--> OC.get_by_name()")
+        case_sensitive = isCaseSensitive is None or isCaseSensitive is True
+        folded_name = str(name).casefold()
 
-        if isCaseSensitive is None or isCaseSensitive is True:
-            for obj in self.get_list():
-                if obj.obj_options['name'] == name:
-                    return obj
+        if case_sensitive:
+            obj = self.name_index.get(name)
+            if obj is not None and obj.obj_options['name'] == name:
+                return obj
         else:
-            for obj in self.get_list():
-                if obj.obj_options['name'].lower() == name.lower():
+            for obj in self.casefold_index.get(folded_name, []):
+                if obj.obj_options['name'].casefold() == folded_name:
                     return obj
+
+        # not in the index; the object may have been renamed while its options change callback was muted
+        for obj in self.get_list():
+            obj_name = obj.obj_options['name']
+            if (obj_name == name) if case_sensitive else (obj_name.casefold() == folded_name):
+                self.index_name(obj)
+                return obj
         return None
 
+    def index_name(self, obj):
+        """
+        Add the object to the name index, under its current name. If the object was in the index under another name
+        (it was renamed), the old entry is removed.
+
+        :param obj:     FlatCAM object in the collection
+        :type obj:      FlatCAMObj
+        :return:        None
+        """
+        self.unindex_name(obj)
+
+        name = obj.obj_options['name']
+        self.name_index[name] = obj
+        self.casefold_index.setdefault(name.casefold(), []).append(obj)
+        self.indexed_names[obj] = name
+
+    def unindex_name(self, obj):
+        """
+        Remove the object from the name index, no matter the name under which it was indexed.
+
+        :param obj:     FlatCAM object
+        :type obj:      FlatCAMObj
+        :return:        None
+        """
+        name = self.indexed_names.pop(obj, None)
+        if name is None:
+            return
+
+        if self.name_index.get(name) is obj:
+            self.name_index.pop(name)
+        folded = self.casefold_index.get(name.casefold(), [])
+        if obj in folded:
+            folded.remove(obj)
+        if not folded:
+            self.casefold_index.pop(name.casefold(), None)
+
+    def on_object_renamed(self, obj):
+        """
+        Called when the 'name' option of an object is changed. Updates the name index if the object is in the
+        collection.
+
+        :param obj:     FlatCAM object that was renamed
+        :type obj:      FlatCAMObj
+        :return:        None
+        """
+        if obj in self.indexed_names:
+            self.index_name(obj)
+
     def delete_active(self, select_project=True):
         selections = self.view.selectedIndexes()
         if len(selections) == 0:
@@ -753,6 +806,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
                 "delete_active() --> Could not remove the old object name from auto-completer model list. %s" % str(e))
 
         self.app.object_status_changed.emit(active.obj, 'delete', name)
+        self.unindex_name(active.obj)
 
         # ############ OBJECT DELETION FROM MODEL STARTS HERE ####################
         self.beginRemoveRows(self.index(group.row(), 0, QtCore.QModelIndex()), active.row(), active.row())
@@ -807,6 +861,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
                 "delete_by_name() --> Could not remove the old object name from auto-completer model list. %s" % str(e))
 
         self.app.object_status_changed.emit(deleted.obj, 'delete', name)
+        self.unindex_name(deleted.obj)
 
         # ############ OBJECT DELETION FROM MODEL STARTS HERE ####################
         self.beginRemoveRows(self.index(group.row(), 0, QtCore.QModelIndex()), deleted.row(), deleted.row())
@@ -835,7 +890,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         self.app.all_objects_list = self.get_list()
 
     def delete_all(self):
-        self.app.log.debug(str(inspect.stack()[1][3]) + "--> OC.delete_all()")
+        self.app.log.debug("OC.delete_all()")
 
         self.app.object_status_changed.emit(None, 'delete_all', '')
 
@@ -845,15 +900,18 @@ class ObjectCollection(QtCore.QAbstractItemModel):
             self.app.geo_editor.clear()
             self.app.exc_editor.clear()
 
-            self.app.dblsidedtool.reset_fields()
-            self.app.panelize_tool.reset_fields()
-            self.app.cutout_tool.reset_fields()
-            self.app.film_tool.reset_fields()
+            # the Plugins that were not used yet are not loaded and have nothing to reset
+            for plugin in (self.app.dblsidedtool, self.app.panelize_tool, self.app.cutout_tool, self.app.film_tool):
+                if is_loaded(plugin):
+                    plugin.reset_fields()
         except Exception as e:
             self.app.log.error("ObjectCollection.delete_all() --> %s" % str(e))
 
         self.beginResetModel()
         self.checked_indexes = []
+        self.name_index.clear()
+        self.casefold_index.clear()
+        self.indexed_names.clear()
 
         for group in self.root_item.child_items:
             try:
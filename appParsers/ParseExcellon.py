@@ -6,10 +6,12 @@
 # MIT Licence                                                 #
 # ########################################################## ##
 
-from camlib import Geometry, grace
+from camlib import Geometry, grace, affine_transform, is_rigid_matrix, translation_matrix, scale_matrix, \
+    mirror_matrix, rotation_matrix, skew_matrix, DrillArray, SlotArray, drill_polygons, slot_polygons, format_coords, \
+    ChunkedWriter, drill_coords, slot_coords, panelize_points, panelize_slots
 
 import shapely.affinity as affinity
-from shapely import Point, LineString, LinearRing, MultiLineString, MultiPolygon
+from shapely import LineString, LinearRing, MultiLineString, MultiPolygon
 import numpy as np
 
 import re
@@ -41,8 +43,10 @@ class Excellon(Geometry):
     Key               Value
     ================  ====================================
     tooldia           Diameter of the tool
-    drills            List that store the Shapely Points for drill points
-    slots             List that store the Shapely Points for slots. Each is a tuple: (start_point, stop_point)
+    drills            DrillArray: the (x, y) coordinates of the drill points in a Numpy array of shape (N, 2); it behaves
+                      like a list of Shapely Points
+    slots             SlotArray: the coordinates of the slots in a Numpy array of shape (N, 4); it behaves like a list
+                      of (start_point, stop_point) tuples
     data              dictionary which holds the options for each tool
     solid_geometry    Geometry list for each tool
     ================  ====================================
@@ -59,6 +63,9 @@ class Excellon(Geometry):
         "excellon_circle_steps": '16'
     }
 
+    # the bounds hold the radius of the holes, which is not scaled together with the drills
+    affine_bounds = False
+
     def __init__(self, zeros=None, excellon_format_upper_mm=None, excellon_format_lower_mm=None,
                  excellon_format_upper_in=None, excellon_format_lower_in=None, excellon_units=None,
                  excellon_circle_steps=None):
@@ -282,6 +289,8 @@ class Excellon(Geometry):
         # ## Parsing starts here ## ##
         line_num = 0  # Line number
         eline = ""
+        # the source lines are joined once, at the end; adding them one by one to the string is quadratic
+        source_lines = []
         try:
             for eline in elines:
                 if self.app.abort_flag:
@@ -291,7 +300,7 @@ class Excellon(Geometry):
                 line_num += 1
                 # self.app.log.debug("%3d %s" % (line_num, str(eline)))
 
-                self.source_file += eline
+                source_lines.append(eline)
 
                 # Cleanup lines
                 eline = eline.strip(' \r\n')
@@ -299,7 +308,7 @@ class Excellon(Geometry):
                 # Excellon files and Gcode share some extensions therefore if we detect G20 or G21 it's GCODe
                 # and we need to exit from here
                 if self.detect_gcode_re.search(eline):
-                    self.app.log.warning("This is GCODE mark: %s" % eline)
+                    self.app.log.warning("This is GCODE mark: %s", eline)
                     self.app.inform.emit('[ERROR_NOTCL] %s: %s' % (_('This is GCODE mark'), eline))
                     return
 
@@ -365,7 +374,7 @@ class Excellon(Geometry):
                         self.app.log.warning(aef_msg)
                         continue
                     else:
-                        self.app.log.warning("Line ignored, it's a comment: %s" % eline)
+                        self.app.log.warning("Line ignored, it's a comment: %s", eline)
                 else:
                     if self.hend_re.search(eline):
                         if in_header is False or bool(self.tools) is False:
@@ -559,10 +568,7 @@ class Excellon(Geometry):
                             )
 
                             # ----------  add a slot  ------------ #
-                            slot = (
-                                Point(slot_start_x, slot_start_y),
-                                Point(slot_stop_x, slot_stop_y)
-                            )
+                            slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                             if current_tool not in self.tools:
                                 self.tools[current_tool] = {}
                             if 'slots' in self.tools[current_tool]:
@@ -633,10 +639,7 @@ class Excellon(Geometry):
                             )
 
                             # ----------  add a Slot  ------------ #
-                            slot = (
-                                Point(slot_start_x, slot_start_y),
-                                Point(slot_stop_x, slot_stop_y)
-                            )
+                            slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                             if current_tool not in self.tools:
                                 self.tools[current_tool] = {}
                             if 'slots' in self.tools[current_tool]:
@@ -675,9 +678,9 @@ class Excellon(Geometry):
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'drills' in self.tools[current_tool]:
-                                    self.tools[current_tool]['drills'].append(Point((coordx, coordy)))
+                                    self.tools[current_tool]['drills'].append((coordx, coordy))
                                 else:
-                                    self.tools[current_tool]['drills'] = [Point((coordx, coordy))]
+                                    self.tools[current_tool]['drills'] = [(coordx, coordy)]
 
                                 repeat -= 1
                             current_x = coordx
@@ -729,10 +732,7 @@ class Excellon(Geometry):
                                     slot_stop_y = y
 
                                     # ----------  add a Slot  ------------ #
-                                    slot = (
-                                        Point(slot_start_x, slot_start_y),
-                                        Point(slot_stop_x, slot_stop_y)
-                                    )
+                                    slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                                     if current_tool not in self.tools:
                                         self.tools[current_tool] = {}
                                     if 'slots' in self.tools[current_tool]:
@@ -749,9 +749,9 @@ class Excellon(Geometry):
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'drills' in self.tools[current_tool]:
-                                    self.tools[current_tool]['drills'].append(Point((x, y)))
+                                    self.tools[current_tool]['drills'].append((x, y))
                                 else:
-                                    self.tools[current_tool]['drills'] = [Point((x, y))]
+                                    self.tools[current_tool]['drills'] = [(x, y)]
                                 # self.app.log.debug("{:15} {:8} {:8}".format(eline, x, y))
                                 continue
 
@@ -809,10 +809,7 @@ class Excellon(Geometry):
                                 slot_stop_y = y
 
                                 # ----------  add a Slot  ------------ #
-                                slot = (
-                                    Point(slot_start_x, slot_start_y),
-                                    Point(slot_stop_x, slot_stop_y)
-                                )
+                                slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'slots' in self.tools[current_tool]:
@@ -831,9 +828,9 @@ class Excellon(Geometry):
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'drills' in self.tools[current_tool]:
-                                    self.tools[current_tool]['drills'].append(Point((x, y)))
+                                    self.tools[current_tool]['drills'].append((x, y))
                                 else:
-                                    self.tools[current_tool]['drills'] = [Point((x, y))]
+                                    self.tools[current_tool]['drills'] = [(x, y)]
                             else:
                                 coordx = x
                                 coordy = y
@@ -847,9 +844,9 @@ class Excellon(Geometry):
                                     if current_tool not in self.tools:
                                         self.tools[current_tool] = {}
                                     if 'drills' in self.tools[current_tool]:
-                                        self.tools[current_tool]['drills'].append(Point((coordx, coordy)))
+                                        self.tools[current_tool]['drills'].append((coordx, coordy))
                                     else:
-                                        self.tools[current_tool]['drills'] = [Point((coordx, coordy))]
+                                        self.tools[current_tool]['drills'] = [(coordx, coordy)]
 
                                     repeat -= 1
                             repeating_x = repeating_y = 0
@@ -975,7 +972,7 @@ class Excellon(Geometry):
                     self.app.log.warning("Type of ZEROS found outside header, inline: %s" % self.zeros)
                     continue
 
-                self.app.log.warning("Line ignored: %s" % eline)
+                self.app.log.warning("Line ignored: %s", eline)
 
             # make sure that since we are in headerless mode, we convert the tools only after the file parsing
             # is finished since the tools definitions are spread in the Excellon body. We use as units the value
@@ -984,11 +981,10 @@ class Excellon(Geometry):
             # the data structure of the Excellon object has to include bot the 'drills' and the 'slots' keys otherwise
             # I will need to test for them everywhere.
             # Even if there are not drills or slots I just add the storage there with an empty list
+            # The parsed coordinates are stored in the columnar arrays.
             for tool in self.tools:
-                if 'drills' not in self.tools[tool]:
-                    self.tools[tool]['drills'] = []
-                if 'slots' not in self.tools[tool]:
-                    self.tools[tool]['slots'] = []
+                self.tools[tool]['drills'] = DrillArray(self.tools[tool].get('drills'))
+                self.tools[tool]['slots'] = SlotArray(self.tools[tool].get('slots'))
 
             self.app.log.info("Zeros: %s, Units %s." % (self.zeros, self.units))
         except Exception:
@@ -1003,6 +999,8 @@ class Excellon(Geometry):
             self.app.inform.emit(msg)
 
             return "fail"
+        finally:
+            self.source_file += ''.join(source_lines)
 
     def parse_number(self, number_str):
         """
@@ -1064,6 +1062,8 @@ class Excellon(Geometry):
         tool_diameter     list of (Shapely.Point) Where to drill
         ================  ====================================
 
+        The polygons are created in one vectorized operation from the drill and slot arrays of each tool.
+
         :return: None
         """
 
@@ -1077,32 +1077,27 @@ class Excellon(Geometry):
 
             for tool in self.tools:
                 tooldia = self.tools[tool]['tooldia']
+                steps = int(self.excellon_circle_steps)
 
-                if 'drills' in self.tools[tool]:
-                    for drill in self.tools[tool]['drills']:
-                        poly = drill.buffer(tooldia / 2.0, int(self.excellon_circle_steps))
-
-                        # add poly in the tools geometry
-                        self.tools[tool]['solid_geometry'].append(poly)
-                        self.tools[tool]['data'] = deepcopy(self.default_data)
-
-                        # add poly to the total solid geometry
-                        self.solid_geometry.append(poly)
+                # the drills and the slots added as lists (by the editor, the plugins ...) are stored in arrays
+                if 'drills' in self.tools[tool] and not isinstance(self.tools[tool]['drills'], DrillArray):
+                    self.tools[tool]['drills'] = DrillArray(self.tools[tool]['drills'])
+                if 'slots' in self.tools[tool] and not isinstance(self.tools[tool]['slots'], SlotArray):
+                    self.tools[tool]['slots'] = SlotArray(self.tools[tool]['slots'])
 
+                polys = []
+                if 'drills' in self.tools[tool]:
+                    polys += drill_polygons(self.tools[tool]['drills'], tooldia / 2.0, steps)
                 if 'slots' in self.tools[tool]:
-                    for slot in self.tools[tool]['slots']:
-                        start = slot[0]
-                        stop = slot[1]
+                    polys += slot_polygons(self.tools[tool]['slots'], tooldia / 2.0, steps)
 
-                        lines_string = LineString([start, stop])
-                        poly = lines_string.buffer(tooldia / 2.0, int(self.excellon_circle_steps))
+                if polys:
+                    # add polys in the tools geometry
+                    self.tools[tool]['solid_geometry'] += polys
+                    self.tools[tool]['data'] = deepcopy(self.default_data)
 
-                        # add poly in the tools geometry
-                        self.tools[tool]['solid_geometry'].append(poly)
-                        self.tools[tool]['data'] = deepcopy(self.default_data)
-
-                        # add poly to the total solid geometry
-                        self.solid_geometry.append(poly)
+                    # add polys to the total solid geometry
+                    self.solid_geometry += polys
 
         except Exception as e:
             err_msg = "appParsers.ParseExcellon.Excellon.create_geometry() -> " \
@@ -1110,10 +1105,128 @@ class Excellon(Geometry):
             self.app.log.error(err_msg)
             return "fail"
 
-    def bounds(self, flatten=None):
+    def export_excellon(self, whole, fract, e_zeros=None, form='dec', factor=1, slot_type='routing', file_handle=None):
+        """
+        Returns two values, first is a boolean , if 1 then the file has slots and second contain the Excellon code.
+        The coordinates of the drills and slots of each tool are formatted in bulk (see camlib.format_coords()).
+
+        :param whole:       Integer part digits
+        :type whole:        int
+        :param fract:       Fractional part digits
+        :type fract:        int
+        :param e_zeros:     Excellon zeros suppression: LZ or TZ
+        :type e_zeros:      str
+        :param form:        Excellon format: 'dec',
+        :type form:         str
+        :param factor:      Conversion factor
+        :type factor:       float
+        :param slot_type:   How to treat slots: "routing" or "drilling"
+        :type slot_type:    str
+        :param file_handle: if not None, the Excellon code is written in chunks to this open file and it is not returned
+        :type file_handle:  io.TextIOBase
+        :return:            A tuple: (has_slots, Excellon_code) -> (bool, str)
+        :rtype:             tuple
+
+        The instances of a panel are written tool by tool, as copies of the tool coordinates, without expanding the
+        panel geometry in memory.
+        """
+
+        writer = ChunkedWriter(file_handle)
+
+        # the offsets of the panel instances
+        instance_offsets = getattr(self, 'instance_offsets', None)
+        if instance_offsets is not None and len(instance_offsets) == 0:
+            instance_offsets = None
+
+        # 'dec' keeps the decimal point, LZ pads the whole part with zeros and TZ only removes the decimal point
+        decimal_point = form == 'dec'
+        pad_whole = whole if (not decimal_point and e_zeros == 'LZ') else None
+
+        def write_coords(coords, template):
+            for chunk in format_coords(coords, template, fract, whole=pad_whole, decimal_point=decimal_point,
+                                       factor=factor):
+                writer.write(chunk)
+
+        # store here if the file has slots, return 1 if any slots, 0 if only drills
+        slots_in_file = 0
+
+        # find if we have drills:
+        has_drills = None
+        for tt in self.tools:
+            if 'drills' in self.tools[tt] and self.tools[tt]['drills']:
+                has_drills = True
+                break
+        # find if we have slots:
+        has_slots = None
+        for tt in self.tools:
+            if 'slots' in self.tools[tt] and self.tools[tt]['slots']:
+                has_slots = True
+                slots_in_file = 1
+                break
+
+        # drills processing
+        if has_drills:
+            for tool in self.tools:
+                writer.write('T0%s\n' % str(tool) if int(tool) < 10 else 'T%s\n' % str(tool))
+
+                try:
+                    drills = self.tools[tool].get('drills', [])
+                    if instance_offsets is not None:
+                        drills = panelize_points(drills, instance_offsets)
+                    write_coords(drill_coords(drills), "X%sY%s\n")
+                except Exception as e:
+                    self.app.log.error('Excellon.export_excellon() drills -> %s' % str(e))
+
+        # slots processing
+        if has_slots:
+            slot_template = None
+            if slot_type == 'routing':
+                slot_template = "G00X%sY%s\nM15\nG01X%sY%s\nM16\n"
+            elif slot_type == 'drilling':
+                slot_template = "X%sY%sG85X%sY%s\nG05\n"
+
+            for tool in self.tools:
+                writer.write('G05\n')
+
+                if int(tool) < 10:
+                    writer.write('T0' + str(tool) + '\n')
+                else:
+                    writer.write('T' + str(tool) + '\n')
+
+                if slot_template is None:
+                    continue
+                try:
+                    slots = self.tools[tool].get('slots', [])
+                    if instance_offsets is not None:
+                        slots = panelize_slots(slots, instance_offsets)
+                    write_coords(slot_coords(slots), slot_template)
+                except Exception as err:
+                    self.app.log.error('Excellon.export_excellon() slots -> %s' % str(err))
+        if not has_drills and not has_slots:
+            self.app.log.debug("Excellon.export_excellon() --> Excellon Object is empty: no drills, no slots.")
+            return 'fail'
+
+        writer.flush()
+        return slots_in_file, writer.getvalue()
+
+
+    def bounds_sources(self) -> list:
+        """
+        The values read by geometry_bounds(): the diameter, the drills, the slots and the solid geometry of each tool.
+
+        :return:    list of the values that the bounds depend on
+        :rtype:     list
+        """
+        sources = [self.solid_geometry is None]
+        for tool_dict in (self.tools or {}).values():
+            sources += [tool_dict.get('tooldia'), tool_dict.get('drills'), tool_dict.get('slots'),
+                        tool_dict.get('solid_geometry')]
+        return sources
+
+    def geometry_bounds(self, flatten=None):
         """
         Returns coordinates of rectangular bounds
-        of Excellon geometry: (xmin, ymin, xmax, ymax).
+        of Excellon geometry: (xmin, ymin, xmax, ymax). The instances of a panel are added by the base class bounds().
 
         :param flatten:     No used
         """
@@ -1156,7 +1269,18 @@ class Excellon(Geometry):
         maxy_list = []
 
         for tool in self.tools:
-            eminx, eminy, emaxx, emaxy = bounds_rec(self.tools[tool]['solid_geometry'])
+            # the holes bounds are found from the coordinates arrays and the tool radius; the geometry is used only
+            # when the tool has no drills and no slots
+            radius = self.tools[tool].get('tooldia', 0.0) / 2.0
+            arr_bounds = [
+                arr.bounds(radius) for arr in (self.tools[tool].get('drills'), self.tools[tool].get('slots'))
+                if isinstance(arr, DrillArray) and arr
+            ]
+            if arr_bounds:
+                eminx, eminy = min(b[0] for b in arr_bounds), min(b[1] for b in arr_bounds)
+                emaxx, emaxy = max(b[2] for b in arr_bounds), max(b[3] for b in arr_bounds)
+            else:
+                eminx, eminy, emaxx, emaxy = bounds_rec(self.tools[tool]['solid_geometry'])
             minx_list.append(eminx)
             miny_list.append(eminy)
             maxx_list.append(emaxx)
@@ -1205,6 +1329,53 @@ class Excellon(Geometry):
         self.create_geometry()
         return factor
 
+    def transform_geometry(self, matrix):
+        """
+        Apply an affine transformation to the drills, the slots and the geometry of the object.
+        The drill and slot arrays are transformed with one matrix product each and the geometry in one vectorized
+        operation (see camlib.affine_transform()).
+        A transformation that keeps the distances (offset, rotation, mirror) moves the drill and slot polygons as they
+        are. Any other transformation would distort them, so they are created again from the transformed drills and
+        slots, with the tool diameter.
+
+        :param matrix:  3x3 affine matrix
+        :return:        None
+        """
+        self.invalidate_bounds()
+
+        rigid = is_rigid_matrix(matrix)
+        tool_dicts = list(self.tools.values())
+
+        structures = []
+        for tool_dict in tool_dicts:
+            for key in ('drills', 'slots'):
+                if isinstance(tool_dict.get(key), DrillArray):
+                    tool_dict[key].transform(matrix)
+                    structures.append(None)
+                else:
+                    # lists of Shapely elements, not yet stored in arrays
+                    structures.append(tool_dict.get(key))
+            structures.append(tool_dict.get('solid_geometry') if rigid else None)
+        structures.append(self.solid_geometry if rigid else None)
+
+        transformed = affine_transform(structures, matrix)
+
+        for idx, tool_dict in enumerate(tool_dicts):
+            drills, slots, solid_geo = transformed[3 * idx:3 * idx + 3]
+            if drills is not None:
+                tool_dict['drills'] = drills
+            if slots is not None:
+                tool_dict['slots'] = slots
+            if rigid and 'solid_geometry' in tool_dict:
+                tool_dict['solid_geometry'] = solid_geo
+
+        if rigid:
+            self.solid_geometry = transformed[-1]
+        else:
+            self.create_geometry()
+
+        self.transform_instances(matrix)
+
     def scale(self, xfactor, yfactor=None, point=None):
         """
         Scales geometry on the XY plane in the object by a given factor.
@@ -1224,64 +1395,12 @@ class Excellon(Geometry):
             yfactor = xfactor
 
         if point is None:
-            px = 0
-            py = 0
-        else:
-            px, py = point
+            point = (0, 0)
 
         if xfactor == 0 and yfactor == 0:
             return
 
-        def scale_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(scale_geom(g))
-                return new_obj
-            else:
-                try:
-                    return affinity.scale(obj, xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for tool in self.tools:
-            # Scale Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.scale(drill, xfactor, yfactor, origin=(px, py)))
-                self.tools[tool]['drills'] = new_drills
-
-            # Scale Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.scale(slot[0], xfactor, yfactor, origin=(px, py))
-                    new_stop = affinity.scale(slot[1], xfactor, yfactor, origin=(px, py))
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Scale solid_geometry
-            self.tools[tool]['solid_geometry'] = scale_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
-
-        self.create_geometry()
+        self.transform_geometry(scale_matrix(xfactor, yfactor, origin=point))
         self.app.proc_container.new_text = ''
 
     def offset(self, vect):
@@ -1299,57 +1418,7 @@ class Excellon(Geometry):
         if dx == 0 and dy == 0:
             return
 
-        def offset_geom(obj):
-            try:
-                new_obj = []
-                for geo in obj:
-                    new_obj.append(offset_geom(geo))
-                return new_obj
-            except TypeError:
-                try:
-                    return affinity.translate(obj, xoff=dx, yoff=dy)
-                except AttributeError:
-                    return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.translate(drill, xoff=dx, yoff=dy))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.translate(slot[0], xoff=dx, yoff=dy)
-                    new_stop = affinity.translate(slot[1], xoff=dx, yoff=dy)
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = offset_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
-
-        # Recreate geometry
-        self.create_geometry()
+        self.transform_geometry(translation_matrix(dx, dy))
         self.app.proc_container.new_text = ''
 
     def mirror(self, axis, point):
@@ -1363,62 +1432,7 @@ class Excellon(Geometry):
         """
         self.app.log.debug("appParsers.ParseExcellon.Excellon.mirror()")
 
-        px, py = point
-        xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
-
-        def mirror_geom(obj):
-            try:
-                new_obj = []
-                for geo in obj:
-                    new_obj.append(mirror_geom(geo))
-                return new_obj
-            except TypeError:
-                try:
-                    return affinity.scale(obj, xscale, yscale, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        # Modify data
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.scale(drill, xscale, yscale, origin=(px, py)))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.scale(slot[0], xscale, yscale, origin=(px, py))
-                    new_stop = affinity.scale(slot[1], xscale, yscale, origin=(px, py))
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = mirror_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
-
-        # Recreate geometry
-        self.create_geometry()
+        self.transform_geometry(mirror_matrix(axis, point))
         self.app.proc_container.new_text = ''
 
     def skew(self, angle_x=None, angle_y=None, point=None):
@@ -1447,61 +1461,10 @@ class Excellon(Geometry):
         if angle_x == 0 and angle_y == 0:
             return
 
-        def skew_geom(obj):
-            try:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(skew_geom(g))
-                return new_obj
-            except TypeError:
-                try:
-                    return affinity.skew(obj, angle_x, angle_y, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
         if point is None:
-            px, py = 0, 0
-        else:
-            px, py = point
-
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.skew(drill, angle_x, angle_y, origin=(px, py)))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.skew(slot[0], angle_x, angle_y, origin=(px, py))
-                    new_stop = affinity.skew(slot[1], angle_x, angle_y, origin=(px, py))
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = skew_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+            point = (0, 0)
 
-        self.create_geometry()
+        self.transform_geometry(skew_matrix(angle_x, angle_y, origin=point))
         self.app.proc_container.new_text = ''
 
     def rotate(self, angle, point=None):
@@ -1509,7 +1472,7 @@ class Excellon(Geometry):
         Rotate the geometry of an object by an angle around the 'point' coordinates
 
         :param angle:
-        :param point:   tuple of coordinates (x, y)
+        :param point:   tuple of coordinates (x, y); if None the center of the object bounds is used
         :return:        None
         """
         self.app.log.debug("appParsers.ParseExcellon.Excellon.rotate()")
@@ -1517,67 +1480,11 @@ class Excellon(Geometry):
         if angle == 0:
             return
 
-        def rotate_geom(obj, origin=None):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(rotate_geom(g))
-                return new_obj
-            else:
-                if origin:
-                    try:
-                        return affinity.rotate(obj, angle, origin=origin)
-                    except AttributeError:
-                        return obj
-                else:
-                    try:
-                        return affinity.rotate(obj, angle, origin=orig)
-                    except AttributeError:
-                        return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
         if point is None:
-            orig = 'center'
-        else:
-            orig = point
+            xmin, ymin, xmax, ymax = self.geometry_bounds()
+            point = ((xmin + xmax) / 2.0, (ymin + ymax) / 2.0)
 
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.rotate(drill, angle, origin=orig))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.rotate(slot[0], angle, origin=orig)
-                    new_stop = affinity.rotate(slot[1], angle, origin=orig)
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = rotate_geom(self.tools[tool]['solid_geometry'], origin=orig)
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
-
-        self.create_geometry()
+        self.transform_geometry(rotation_matrix(angle, origin=point))
         self.app.proc_container.new_text = ''
 
     def buffer(self, distance, join, factor, only_exterior=False):
@@ -1590,6 +1497,7 @@ class Excellon(Geometry):
         :return:                None
         """
         self.app.log.debug("appParsers.ParseExcellon.Excellon.buffer()")
+        self.invalidate_bounds()
 
         if distance == 0:
             return
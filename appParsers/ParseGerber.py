@@ -1,6 +1,7 @@
 
-from PyQt6 import QtWidgets
-from camlib import Geometry, arc, arc_angle, ApertureMacro, grace, flatten_shapely_geometry
+from camlib import Geometry, arc, arc_angle, ApertureMacro, grace, flatten_shapely_geometry, progress_for, \
+    affine_transform, translation_matrix, scale_matrix, mirror_matrix, rotation_matrix, skew_matrix, \
+    ValidationError, format_coords, ChunkedWriter
 
 from appParsers.ParseDXF import getdxfgeo
 from appParsers.ParseSVG import svgparselength, getsvggeo, svgparse_viewbox
@@ -139,6 +140,9 @@ class Gerber(Geometry):
         # will store the Gerber geometry's as paths
         self.follow_geometry = []
 
+        # type of isolation: 0 = exteriors, 1 = interiors, 2 = complete isolation (both interiors and exteriors)
+        self.iso_type = 2
+
         # made True when the LPC command is encountered in Gerber parsing
         # it allows adding data into the clear_geometry key of the self.tools[aperture] dict
         self.is_lpc = False
@@ -469,11 +473,11 @@ class Gerber(Geometry):
         s_tol = float(self.app.options["gerber_simp_tolerance"])
 
         self.app.inform.emit('%s %d %s.' % (_("Gerber processing. Parsing"), len(glines), _("Lines").lower()))
+        progress = progress_for(self.app, len(glines))
         try:
             for gline in glines:
-                if self.app.abort_flag:
-                    # graceful abort requested by the user
-                    raise grace
+                # check for an abort and publish the progress
+                progress.tick()
 
                 line_num += 1
                 self.source_file += gline + '\n'
@@ -705,7 +709,7 @@ class Gerber(Geometry):
                     match = self.am1_re.search(gline)
                     # Start macro if there is a match, else not an AM, carry on.
                     if match:
-                        self.app.log.debug("Starting macro. Line %d: %s" % (line_num, gline))
+                        self.app.log.debug("Starting macro. Line %d: %s", line_num, gline)
                         current_macro = match.group(1)
                         self.aperture_macros[current_macro] = ApertureMacro(name=current_macro)
                         if match.group(2):  # Append
@@ -716,10 +720,10 @@ class Gerber(Geometry):
                             self.app.log.debug("Macro complete in 1 line.")
                         continue
                 else:  # Continue macro
-                    self.app.log.debug("Continuing macro. Line %d." % line_num)
+                    self.app.log.debug("Continuing macro. Line %d.", line_num)
                     match = self.am2_re.search(gline)
                     if match:  # Finish macro
-                        self.app.log.debug("End of macro. Line %d." % line_num)
+                        self.app.log.debug("End of macro. Line %d.", line_num)
                         self.aperture_macros[current_macro].append(match.group(1))
                         # self.aperture_macros[current_macro].parse_content()
                         current_macro = None
@@ -777,7 +781,7 @@ class Gerber(Geometry):
                                 self.tools[current_aperture]['geometry'].append(geo_dict)
 
                         except IndexError:
-                            self.app.log.warning("Line %d: %s -> Nothing there to flash!" % (line_num, gline))
+                            self.app.log.warning("Line %d: %s -> Nothing there to flash!", line_num, gline)
 
                     continue
 
@@ -871,12 +875,12 @@ class Gerber(Geometry):
                         geo_s = LineString(path).buffer(width / 1.999, int(self.steps_per_circle))
                         if not geo_s.is_valid:
                             self.app.log.warning(
-                                "Found invalid Gerber geometry at line: %s. Fixing..." % str(line_num))
+                                "Found invalid Gerber geometry at line: %s. Fixing...", line_num)
                             geo_s = geo_s.buffer(0.0000001, int(self.steps_per_circle))
 
                         if not geo_s.is_valid:
                             self.app.log.warning(
-                                "Failed to fix the invalid Geometry found at line: %s" % str(line_num))
+                                "Failed to fix the invalid Geometry found at line: %s", line_num)
                         else:
                             if last_path_aperture not in self.tools:
                                 self.tools[last_path_aperture] = {}
@@ -999,13 +1003,13 @@ class Gerber(Geometry):
                     if not region_s.is_empty:
                         if not region_s.is_valid:
                             self.app.log.warning(
-                                "Found invalid Gerber geometry at line: %s. Fixing..." % str(line_num))
+                                "Found invalid Gerber geometry at line: %s. Fixing...", line_num)
                             region_s = region_s.buffer(0.0000001, int(self.steps_per_circle))
                             region_s = flatten_shapely_geometry(region_s)
 
                             if not region_s:
                                 self.app.log.warning(
-                                    "Failed to fix the invalid Geometry found at line: %s" % str(line_num))
+                                    "Failed to fix the invalid Geometry found at line: %s", line_num)
                             else:
                                 for pol in region_s:
                                     # is it possible that simplification creates an Empty Geometry ?????
@@ -1158,7 +1162,7 @@ class Gerber(Geometry):
                                         maxx = max(path[0][0], path[1][0]) + width / 2
                                         miny = min(path[0][1], path[1][1]) - height / 2
                                         maxy = max(path[0][1], path[1][1]) + height / 2
-                                        self.app.log.debug("Coords: %s - %s - %s - %s" % (minx, miny, maxx, maxy))
+                                        self.app.log.debug("Coords: %s - %s - %s - %s", minx, miny, maxx, maxy)
 
                                         geo_dict = {}
                                         geo_f = Point([current_x, current_y])
@@ -1252,14 +1256,14 @@ class Gerber(Geometry):
                                 try:
                                     geo_s = Polygon(path)
                                 except ValueError:
-                                    self.app.log.warning("Problem %s %s" % (gline, line_num))
+                                    self.app.log.warning("Problem %s %s", gline, line_num)
                                     self.app.inform.emit('[ERROR] %s: %s' %
                                                          (_("Region does not have enough points. "
                                                             "File will be processed but there are parser errors. "
                                                             "Line number"), str(line_num)))
                             else:
                                 if last_path_aperture is None:
-                                    self.app.log.warning("No aperture defined for curent path. (%d)" % line_num)
+                                    self.app.log.warning("No aperture defined for curent path. (%d)", line_num)
                                 # TODO: this may (should) fail
                                 width = self.tools[last_path_aperture]["size"]
                                 geo_s = LineString(path).buffer(width / 1.999, int(self.steps_per_circle))
@@ -1477,7 +1481,7 @@ class Gerber(Geometry):
 
                     # Nothing created! Pen Up.
                     if current_operation_code == 2:
-                        self.app.log.warning("Arc with D2. (%d)" % line_num)
+                        self.app.log.warning("Arc with D2. (%d)", line_num)
                         try:
                             path_length = len(path)
                         except TypeError:
@@ -1487,7 +1491,7 @@ class Gerber(Geometry):
                             geo_dict = {}
 
                             if last_path_aperture is None:
-                                self.app.log.warning("No aperture defined for curent path. (%d)" % line_num)
+                                self.app.log.warning("No aperture defined for curent path. (%d)", line_num)
 
                             # --- BUFFERED ---
                             width = self.tools[last_path_aperture]["size"]
@@ -1614,7 +1618,7 @@ class Gerber(Geometry):
                         if valid:
                             continue
                         else:
-                            self.app.log.warning("Invalid arc in line %d." % line_num)
+                            self.app.log.warning("Invalid arc in line %d.", line_num)
 
                 # ################################################################
                 # ######### EOF - END OF FILE ####################################
@@ -1626,9 +1630,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ######### Line did not match any pattern. Warn user.  ##########
                 # ################################################################
-                self.app.log.warning("Line ignored (%d): %s" % (line_num, gline))
-                # provide the app with a way to process the GUI events when in a blocking loop
-                QtWidgets.QApplication.processEvents()
+                self.app.log.warning("Line ignored (%d): %s", line_num, gline)
 
             try:
                 path_length = len(path)
@@ -1902,10 +1904,407 @@ class Gerber(Geometry):
             bbox = bbox.envelope
         return bbox
 
-    def bounds(self, flatten=None):
+    def isolate(self, iso_type=None, geometry=None, dia=None, passes=None, overlap=None, outname=None, combine=None,
+                milling_type=None, plot=True):
+        """
+        Creates an isolation routing geometry object in the project.
+
+        :param iso_type:        type of isolation to be done: 0 = exteriors, 1 = interiors and 2 = both
+        :param geometry:        specific geometry to isolate
+        :param dia:             Tool diameter
+        :param passes:          Number of tool widths to cut
+        :param overlap:         Overlap between passes in fraction of tool diameter
+        :param outname:         Base name of the output object
+        :param combine:         Boolean: if to combine passes in one resulting object in case of multiple passes
+        :param milling_type:    type of milling: conventional or climbing
+        :param plot: Boolean:   if to plot the resulting geometry object
+        :return:                None
+        """
+
+        if geometry is None:
+            work_geo = self.solid_geometry
+        else:
+            work_geo = geometry
+
+        if dia is None:
+            dia = float(self.app.options["tools_iso_tooldia"])
+
+        if passes is None:
+            passes = int(self.app.options["tools_iso_passes"])
+
+        if overlap is None:
+            overlap = float(self.app.options["tools_iso_overlap"])
+
+        overlap /= 100.0
+
+        combine = self.app.options["tools_iso_combine_passes"] if combine is None else bool(combine)
+
+        if milling_type is None:
+            milling_type = self.app.options["tools_iso_milling_type"]
+
+        if iso_type is None:
+            iso_t = 2
+        else:
+            iso_t = iso_type
+
+        base_name = self.obj_options["name"]
+
+        if combine:
+            if outname is None:
+                if self.iso_type == 0:
+                    iso_name = base_name + "_ext_iso"
+                elif self.iso_type == 1:
+                    iso_name = base_name + "_int_iso"
+                else:
+                    iso_name = base_name + "_iso"
+            else:
+                iso_name = outname
+
+            def iso_init(geo_obj, app_obj):
+                # Propagate options
+                geo_obj.obj_options["tools_mill_tooldia"] = str(dia)
+                geo_obj.tool_type = self.app.options["tools_iso_tool_shape"]
+                geo_obj.multigeo = True
+
+                # store here the default data for Geometry Data
+                default_data = {}
+                for opt_key, opt_val in app_obj.options.items():
+                    if opt_key.find('geometry' + "_") == 0:
+                        oname = opt_key[len('geometry') + 1:]
+                        default_data[oname] = app_obj.options[opt_key]
+                    if opt_key.find('tools_mill' + "_") == 0:
+                        default_data[opt_key] = app_obj.options[opt_key]
+
+                geo_obj.tools = {
+                    1: {
+                        'tooldia':          dia,
+                        'data':             default_data,
+                        'solid_geometry':   []
+                    }
+                }
+
+                passes_geo = []
+                for nr_pass in range(passes):
+                    iso_offset = dia * ((2 * nr_pass + 1) / 2.0) - (nr_pass * overlap * dia)
+
+                    # if milling type is climb then the move is counter-clockwise around features
+                    mill_dir = 1 if milling_type == 'cl' else 0
+                    geom = self.generate_envelope(iso_offset, mill_dir, geometry=work_geo, env_iso_type=iso_t,
+                                                  nr_passes=nr_pass)
+
+                    if geom == 'fail':
+                        if plot:
+                            app_obj.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
+                        return 'fail'
+                    # the passes are combined: each one adds its paths
+                    passes_geo += flatten_shapely_geometry(geom)
+
+                geo_obj.solid_geometry = passes_geo
+
+                # update the geometry in the tools
+                geo_obj.tools[1]['solid_geometry'] = geo_obj.solid_geometry
+
+                # detect if solid_geometry is empty
+                empty_cnt = 0
+                w_geo = geo_obj.solid_geometry
+                for g in w_geo:
+                    if g or not g.is_empty:
+                        break
+                    else:
+                        empty_cnt += 1
+
+                if empty_cnt == len(w_geo):
+                    raise ValidationError("Empty Geometry", None)
+                elif plot:
+                    msg = '[success] %s: %s' % (_("Isolation geometry created"), geo_obj.obj_options["name"])
+                    app_obj.inform.emit(msg)
+
+                # ############################################################
+                # ########## AREA SUBTRACTION ################################
+                # ############################################################
+                # if self.app.options["tools_iso_except"]:
+                #     self.app.proc_container.update_view_text(' %s' % _("Subtracting Geo"))
+                #     geo_obj.solid_geometry = self.area_subtraction(geo_obj.solid_geometry)
+
+            self.app.app_obj.new_object("geometry", iso_name, iso_init, plot=plot)
+        else:
+            for i in range(passes):
+
+                offset = dia * ((2 * i + 1) / 2.0) - (i * overlap * dia)
+                if passes > 1:
+                    if outname is None:
+                        if self.iso_type == 0:
+                            iso_name = base_name + "_ext_iso" + str(i + 1)
+                        elif self.iso_type == 1:
+                            iso_name = base_name + "_int_iso" + str(i + 1)
+                        else:
+                            iso_name = base_name + "_iso" + str(i + 1)
+                    else:
+                        iso_name = outname
+                else:
+                    if outname is None:
+                        if self.iso_type == 0:
+                            iso_name = base_name + "_ext_iso"
+                        elif self.iso_type == 1:
+                            iso_name = base_name + "_int_iso"
+                        else:
+                            iso_name = base_name + "_iso"
+                    else:
+                        iso_name = outname
+
+                def iso_init(geo_obj, app_obj):
+                    # Propagate options
+                    geo_obj.obj_options["tools_mill_tooldia"] = str(dia)
+                    geo_obj.tool_type = app_obj.options["tools_iso_tool_shape"]
+                    geo_obj.multigeo = True
+
+                    # if milling type is climb then the move is counter-clockwise around features
+                    mill_dir = 1 if milling_type == 'cl' else 0
+                    geom = self.generate_envelope(offset, mill_dir, geometry=work_geo, env_iso_type=iso_t, nr_passes=i)
+
+                    if geom == 'fail':
+                        if plot:
+                            app_obj.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
+                        return 'fail'
+
+                    geo_obj.solid_geometry = flatten_shapely_geometry(geom)
+
+                    # store here the default data for Geometry Data
+                    default_data = {}
+                    for opt_key, opt_val in app_obj.options.items():
+                        if opt_key.find('geometry' + "_") == 0:
+                            oname = opt_key[len('geometry') + 1:]
+                            default_data[oname] = app_obj.options[opt_key]
+                        if opt_key.find('tools_mill' + "_") == 0:
+                            default_data[opt_key] = app_obj.options[opt_key]
+
+                    geo_obj.tools = {
+                        1: {
+                            'tooldia':          dia,
+                            'data':             default_data,
+                            'solid_geometry':   geo_obj.solid_geometry
+                        }
+                    }
+
+                    # detect if solid_geometry is empty
+                    empty_cnt = 0
+                    w_geo = geo_obj.solid_geometry
+                    for g in geo_obj.solid_geometry:
+                        if g or not g.is_empty:
+                            break
+                        else:
+                            empty_cnt += 1
+
+                    if empty_cnt == len(w_geo):
+                        raise ValidationError("Empty Geometry", None)
+                    elif plot:
+                        msg = '[success] %s: %s' % (_("Isolation geometry created"), geo_obj.obj_options["name"])
+                        app_obj.inform.emit(msg)
+
+                    # ############################################################
+                    # ########## AREA SUBTRACTION ################################
+                    # ############################################################
+                    # if self.app.options["tools_iso_except"]:
+                    #     self.app.proc_container.update_view_text(' %s' % _("Subtracting Geo"))
+                    #     geo_obj.solid_geometry = self.area_subtraction(geo_obj.solid_geometry)
+
+                self.app.app_obj.new_object("geometry", iso_name, iso_init, plot=plot)
+
+    def generate_envelope(self, offset, invert, geometry=None, env_iso_type=2, nr_passes=0):
+        # isolation_geometry produces an envelope that is going on the left of the geometry
+        # (the copper features). To leave the least amount of burrs on the features
+        # the tool needs to travel on the right side of the features (this is called conventional milling)
+        # the first pass is the one cutting all the features, so it needs to be reversed
+        # the other passes overlap preceding ones and cut the leftover copper. It is better for them
+        # to cut on the right side of the leftover copper i.e. on the left side of the features.
+
+        try:
+            geom = self.isolation_geometry(offset, geometry=geometry, iso_type=env_iso_type, passes=nr_passes)
+        except Exception as e:
+            self.app.log.error('GerberObject.isolate().generate_envelope() --> %s' % str(e))
+            return 'fail'
+
+        if invert:
+            try:
+                pl = []
+                w_geo = geom.geoms if isinstance(geom, (MultiPolygon, MultiLineString)) else geom
+                for p in w_geo:
+                    if p is not None:
+                        if isinstance(p, Polygon):
+                            pl.append(Polygon(p.exterior.coords[::-1], p.interiors))
+                        elif isinstance(p, LinearRing):
+                            pl.append(Polygon(p.coords[::-1]))
+                geom = MultiPolygon(pl)
+            except TypeError:
+                if isinstance(geom, Polygon) and geom is not None:
+                    geom = Polygon(geom.exterior.coords[::-1], geom.interiors)
+                elif isinstance(geom, LinearRing) and geom is not None:
+                    geom = Polygon(geom.coords[::-1])
+                else:
+                    self.app.log.debug("GerberObject.isolate().generate_envelope() Error --> Unexpected Geometry %s" %
+                                       type(geom))
+            except Exception as e:
+                self.app.log.error("GerberObject.isolate().generate_envelope() Error --> %s" % str(e))
+                return 'fail'
+        return geom
+
+    def export_gerber(self, whole, fract, g_zeros='L', factor=1, file_handle=None):
+        """
+        Creates a Gerber file content to be exported to a file.
+        The coordinates of each geometry element are formatted in bulk (see camlib.format_coords()).
+
+        :param whole: how many digits in the whole part of coordinates
+        :param fract: how many decimals in coordinates
+        :param g_zeros: type of the zero suppression used: LZ or TZ; string
+        :param factor: factor to be applied onto the Gerber coordinates
+        :param file_handle: if not None, the Gerber code is written in chunks to this open file and it is not returned
+        :return: Gerber_code (empty when it is written to the file_handle)
+
+        The instances of a panel are written one after the other, each with all the apertures, without expanding the
+        panel geometry in memory.
+        """
+        self.app.log.debug("Gerber.export_gerber() --> Generating the Gerber code from the selected Gerber file")
+
+        # Gerber code is stored here
+        writer = ChunkedWriter(file_handle)
+        write = writer.write
+
+        # with TZ the whole part of the coordinates is padded with zeros
+        pad_whole = whole if g_zeros == 'T' else None
+
+        # the offsets of the panel instances; an object that is not a panel is written once, where it is
+        instance_offsets = getattr(self, 'instance_offsets', None)
+        if instance_offsets is None or len(instance_offsets) == 0:
+            instance_offsets = [None]
+        offset = None
+
+        def write_coords(coords, template):
+            for chunk in format_coords(coords, template, fract, whole=pad_whole, factor=factor, offset=offset):
+                write(chunk)
+
+        def write_flash(geo):
+            write_coords([(geo.x, geo.y)], "X%sY%sD03*\n")
+
+        def write_path(coords, skip_duplicates=True):
+            # first command is a move with pen-up D02 at the beginning of the geo, then the pen-down D01 moves
+            coords = np.asarray(coords, dtype=float)
+            write_coords(coords[:1, :2], "X%sY%sD02*\n")
+            moves = coords[1:]
+            if skip_duplicates:
+                moves = moves[np.any(moves != coords[:-1], axis=1)]
+            write_coords(moves[:, :2], "X%sY%sD01*\n")
+
+        def write_region(geo_elem, follow_label):
+            # the geometry of the apertures that are regions: the 0 aperture, the macros and the polygons
+            if 'solid' in geo_elem:
+                geo = geo_elem['solid']
+                if not geo.is_empty and not isinstance(geo, LineString) and \
+                        not isinstance(geo, MultiLineString) and not isinstance(geo, Point):
+                    write('G36*\n')
+                    write_path(geo.exterior.coords, skip_duplicates=False)
+                    write('D02*\n')
+                    write('G37*\n')
+
+                    clear_list = list(geo.interiors)
+                    if clear_list:
+                        write('%LPC*%\n')
+                        for clear_geo in clear_list:
+                            write('G36*\n')
+                            write_path(clear_geo.coords)
+                            write('D02*\n')
+                            write('G37*\n')
+                        write('%LPD*%\n')
+                elif isinstance(geo, LineString) or isinstance(geo, MultiLineString) or \
+                        isinstance(geo, Point):
+                    try:
+                        if not geo.is_empty:
+                            if isinstance(geo, Point):
+                                write_flash(geo)
+                            else:
+                                write_path(geo.coords)
+                    except Exception as err:
+                        self.app.log.error(
+                            "FlatCAMObj.Gerber.export_gerber() 'follow' for %s --> %s" % (follow_label, str(err)))
+            if 'clear' in geo_elem:
+                geo = geo_elem['clear']
+                if not geo.is_empty:
+                    write('%LPC*%\n')
+                    write('G36*\n')
+                    write_path(geo.exterior.coords)
+                    write('D02*\n')
+                    write('G37*\n')
+                    write('%LPD*%\n')
+
+        for offset in instance_offsets:
+            # apertures processing
+            try:
+                if 0 in self.tools:
+                    if 'geometry' in self.tools[0]:
+                        for geo_elem in self.tools[0]['geometry']:
+                            write_region(geo_elem, '0 aperture')
+            except Exception as e:
+                self.app.log.error("FlatCAMObj.Gerber.export_gerber() 0 aperture --> %s" % str(e))
+
+            for apid in self.tools:
+                if apid == 0:
+                    continue
+                elif self.tools[apid]['type'] in ['AM', 'P']:
+                    if 'geometry' in self.tools[apid]:
+                        for geo_elem in self.tools[apid]['geometry']:
+                            write_region(geo_elem, 'AM')
+                else:
+                    write('D%s*\n' % str(apid))
+                    if 'geometry' in self.tools[apid]:
+                        for geo_elem in self.tools[apid]['geometry']:
+                            try:
+                                if 'follow' in geo_elem:
+                                    geo = geo_elem['follow']
+                                    if not geo.is_empty:
+                                        if isinstance(geo, Point):
+                                            write_flash(geo)
+                                        else:
+                                            write_path(geo.coords)
+                            except Exception as e:
+                                self.app.log.error(
+                                    "FlatCAMObj.Gerber.export_gerber() 'follow' normal aperture--> %s" % str(e))
+
+                            try:
+                                if 'clear' in geo_elem:
+                                    write('%LPC*%\n')
+
+                                    geo = geo_elem['clear']
+                                    if not geo.is_empty:
+                                        if isinstance(geo, Point):
+                                            write_flash(geo)
+                                        elif isinstance(geo, Polygon):
+                                            write_path(geo.exterior.coords)
+                                            for geo_int in geo.interiors:
+                                                write_path(geo_int.coords)
+                                        else:
+                                            write_path(geo.coords)
+                                        write('%LPD*%\n')
+                            except Exception as e:
+                                self.app.log.error("FlatCAMObj.Gerber.export_gerber() 'clear' --> %s" % str(e))
+
+        if not self.tools:
+            self.app.log.debug("FlatCAMObj.Gerber.export_gerber() --> Gerber Object is empty: no apertures.")
+            return 'fail'
+
+        writer.flush()
+        return writer.getvalue()
+
+
+    def bounds_sources(self) -> list:
+        """
+        :return:    the solid geometry, the only value read by geometry_bounds()
+        :rtype:     list
+        """
+        return [self.solid_geometry]
+
+    def geometry_bounds(self, flatten=None):
         """
         Returns coordinates of rectangular bounds
-        of Gerber geometry: (xmin, ymin, xmax, ymax).
+        of Gerber geometry: (xmin, ymin, xmax, ymax). The instances of a panel are added by the base class bounds().
 
         :param flatten:     Not used, it is here for compatibility with base class method
         :return:            None
@@ -2140,6 +2539,34 @@ class Gerber(Geometry):
             new_el = {'solid': pol, 'follow': pol}
             self.tools[0]['geometry'].append(new_el)
 
+    def transform_geometry(self, matrix):
+        """
+        Apply an affine transformation to the solid and follow geometry of the object and to the 'solid', 'follow'
+        and 'clear' geometry stored in the apertures. All the elements are transformed in one vectorized operation,
+        see camlib.affine_transform().
+
+        :param matrix:  3x3 affine matrix
+        :return:        None
+        """
+        self.invalidate_bounds()
+
+        # (geometry element dict, key) for each aperture geometry
+        ap_slots = []
+        for ap_dict in self.tools.values():
+            for geo_el in ap_dict.get('geometry', []):
+                for key in ('solid', 'follow', 'clear'):
+                    if key in geo_el:
+                        ap_slots.append((geo_el, key))
+
+        structures = [self.solid_geometry, self.follow_geometry] + [geo_el[key] for geo_el, key in ap_slots]
+        transformed = affine_transform(structures, matrix)
+
+        self.solid_geometry, self.follow_geometry = transformed[0], transformed[1]
+        for (geo_el, key), geo in zip(ap_slots, transformed[2:]):
+            geo_el[key] = geo
+
+        self.transform_instances(matrix)
+
     def scale(self, xfactor, yfactor=None, point=None):
         """
         Scales the objects' geometry on the XY plane by a given factor.
@@ -2163,6 +2590,7 @@ class Gerber(Geometry):
         :rtype : None
         """
         self.app.log.debug("parseGerber.Gerber.scale()")
+        self.invalidate_bounds()
 
         try:
             xfactor = float(xfactor)
@@ -2185,62 +2613,13 @@ class Gerber(Geometry):
             return
 
         if point is None:
-            px = 0
-            py = 0
-        else:
-            px, py = point
+            point = (0, 0)
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
+        # the geometry stored in the Gerber apertures is scaled, too
         try:
-            if isinstance(self.solid_geometry, MultiPolygon):
-                self.geo_len = len(self.solid_geometry.geoms)
-            else:
-                self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def scale_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(scale_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 99]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
+            self.transform_geometry(scale_matrix(xfactor, yfactor, origin=point))
 
-                    return affinity.scale(obj, xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = scale_geom(self.solid_geometry)
-        self.follow_geometry = scale_geom(self.follow_geometry)
-
-        # we need to scale the geometry stored in the Gerber apertures, too
-        try:
             for apid in self.tools:
-                new_geometry = []
-                if 'geometry' in self.tools[apid]:
-                    for geo_el in self.tools[apid]['geometry']:
-                        new_geo_el = {}
-                        if 'solid' in geo_el:
-                            new_geo_el['solid'] = scale_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            new_geo_el['follow'] = scale_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            new_geo_el['clear'] = scale_geom(geo_el['clear'])
-                        new_geometry.append(new_geo_el)
-
-                self.tools[apid]['geometry'] = deepcopy(new_geometry)
-
                 try:
                     if str(self.tools[apid]['type']) == 'R' or str(self.tools[apid]['type']) == 'O':
                         self.tools[apid]['width'] *= xfactor
@@ -2292,6 +2671,7 @@ class Gerber(Geometry):
         :return: None
         """
         self.app.log.debug("ParseGerber.Gerber.offset()")
+        self.invalidate_bounds()
 
         try:
             dx, dy = vect
@@ -2304,53 +2684,9 @@ class Gerber(Geometry):
         if dx == 0 and dy == 0:
             return
 
-        # variables to display the percentage of work done
-        if isinstance(self.solid_geometry, (MultiPolygon, MultiLineString)):
-            self.geo_len = len(self.solid_geometry.geoms)
-        elif isinstance(self.solid_geometry, list):
-            self.geo_len = len(self.solid_geometry)
-        elif isinstance(self.solid_geometry, Polygon):
-            self.geo_len = 1
-        else:
-            self.geo_len = 0
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def offset_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(offset_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 99]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.translate(obj, xoff=dx, yoff=dy)
-                except AttributeError:
-                    return obj
-
-        # ## Solid geometry
-        self.solid_geometry = offset_geom(self.solid_geometry)
-        self.follow_geometry = offset_geom(self.follow_geometry)
-
-        # we need to offset the geometry stored in the Gerber apertures, too
+        # the geometry stored in the Gerber apertures is offset, too
         try:
-            for apid in self.tools:
-                if 'geometry' in self.tools[apid]:
-                    for geo_el in self.tools[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = offset_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = offset_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = offset_geom(geo_el['clear'])
-
+            self.transform_geometry(translation_matrix(dx, dy))
         except Exception as e:
             self.app.log.error('ParseGerber.Gerber.offset() Exception --> %s' % str(e))
             return 'fail'
@@ -2380,52 +2716,11 @@ class Gerber(Geometry):
         :return: None
         """
         self.app.log.debug("parseGerber.Gerber.mirror()")
+        self.invalidate_bounds()
 
-        px, py = point
-        xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
+        # the geometry stored in the Gerber apertures is mirrored, too
         try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def mirror_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(mirror_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 99]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.scale(obj, xscale, yscale, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = mirror_geom(self.solid_geometry)
-        self.follow_geometry = mirror_geom(self.follow_geometry)
-
-        # we need to mirror the geometry stored in the Gerber apertures, too
-        try:
-            for apid in self.tools:
-                if 'geometry' in self.tools[apid]:
-                    for geo_el in self.tools[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = mirror_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = mirror_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = mirror_geom(geo_el['clear'])
+            self.transform_geometry(mirror_matrix(axis, point))
         except Exception as e:
             self.app.log.error('ParseGerber.Gerber.mirror() Exception --> %s' % str(e))
             return 'fail'
@@ -2452,54 +2747,14 @@ class Gerber(Geometry):
         :return None
         """
         self.app.log.debug("parseGerber.Gerber.skew()")
-
-        px, py = point
+        self.invalidate_bounds()
 
         if angle_x == 0 and angle_y == 0:
             return
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def skew_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(skew_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.skew(obj, angle_x, angle_y, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = skew_geom(self.solid_geometry)
-        self.follow_geometry = skew_geom(self.follow_geometry)
-
-        # we need to skew the geometry stored in the Gerber apertures, too
+        # the geometry stored in the Gerber apertures is skewed, too
         try:
-            for apid in self.tools:
-                if 'geometry' in self.tools[apid]:
-                    for geo_el in self.tools[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = skew_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = skew_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = skew_geom(geo_el['clear'])
+            self.transform_geometry(skew_matrix(angle_x, angle_y, origin=point))
         except Exception as e:
             self.app.log.error('ParseGerber.Gerber.skew() Exception --> %s' % str(e))
             return 'fail'
@@ -2515,54 +2770,14 @@ class Gerber(Geometry):
         :return:
         """
         self.app.log.debug("parseGerber.Gerber.rotate()")
-
-        px, py = point
+        self.invalidate_bounds()
 
         if angle == 0:
             return
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
+        # the geometry stored in the Gerber apertures is rotated, too
         try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def rotate_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(rotate_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.rotate(obj, angle, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = rotate_geom(self.solid_geometry)
-        self.follow_geometry = rotate_geom(self.follow_geometry)
-
-        # we need to rotate the geometry stored in the Gerber apertures, too
-        try:
-            for apid in self.tools:
-                if 'geometry' in self.tools[apid]:
-                    for geo_el in self.tools[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = rotate_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = rotate_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = rotate_geom(geo_el['clear'])
+            self.transform_geometry(rotation_matrix(angle, origin=point))
         except Exception as e:
             self.app.log.error('ParseGerber.Gerber.rotate() Exception --> %s' % str(e))
             return 'fail'
@@ -2579,6 +2794,7 @@ class Gerber(Geometry):
         :return:                None
         """
         self.app.log.debug("parseGerber.Gerber.buffer()")
+        self.invalidate_bounds()
 
         if distance == 0:
             return
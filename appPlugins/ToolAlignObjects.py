@@ -132,9 +132,6 @@ class AlignObjects(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Align Tool"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+A', **kwargs)
-
     def set_tool_ui(self):
 
         self.clear_ui(self.layout)
@@ -286,7 +283,7 @@ class AlignObjects(AppTool):
             if self.align_type == 'sp':
                 self.align_translate()
                 self.app.inform.emit('[success] %s' % _("Done."))
-                self.app.plot_all()
+                self.show_aligned()
 
                 self.disconnect_cal_events()
                 return
@@ -310,7 +307,18 @@ class AlignObjects(AppTool):
             self.app.inform.emit('[success] %s' % _("Done."))
 
             self.disconnect_cal_events()
-            self.app.plot_all()
+            self.show_aligned()
+
+    def show_aligned(self):
+        """
+        Restore the colors of the objects and show the aligned object. The moves are deferred for most objects and
+        then the plotted shapes already follow them, so only the aligned object is plotted again, if needed.
+
+        :return:    None
+        """
+        self.reset_color()
+        self.app.app_obj.object_changed.emit(self.aligned_obj)
+        self.aligned_obj.replot_transformed()
 
     def align_translate(self):
         dx = self.clicked_points[1][0] - self.clicked_points[0][0]
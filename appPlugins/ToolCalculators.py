@@ -141,9 +141,6 @@ class ToolCalculator(AppTool):
 
         self.ep_calculate_output()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+C', **kwargs)
-
     def set_tool_ui(self):
         self.units = self.app.app_units.lower()
 
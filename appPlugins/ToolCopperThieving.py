@@ -12,7 +12,7 @@ from appGUI.GUIElements import VerticalScrollArea, FCLabel, FCButton, FCFrame, G
 
 from appCommon.Common import LoudDict
 from appCommon.Common import GracefulException as grace
-from camlib import flatten_shapely_geometry
+from camlib import flatten_shapely_geometry, process_gui_events
 
 import logging
 from copy import deepcopy
@@ -144,9 +144,6 @@ class ToolCopperThieving(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Copper Thieving"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+J', **kwargs)
-
     def connect_signals_at_init(self):
         # SIGNALS
         self.ui.ref_combo_type.currentIndexChanged.connect(self.on_ref_combo_type_change)
@@ -548,7 +545,7 @@ class ToolCopperThieving(AppTool):
         if run_threaded:
             self.app.proc_container.new('%s ...' % _("Thieving"))
         else:
-            QtWidgets.QApplication.processEvents()
+            process_gui_events()
 
         self.app.proc_container.view.set_busy('%s ...' % _("Thieving"))
 
@@ -941,7 +938,7 @@ class ToolCopperThieving(AppTool):
         if run_threaded:
             self.app.proc_container.new('%s ...' % _("P-Plating Mask"))
         else:
-            QtWidgets.QApplication.processEvents()
+            process_gui_events()
 
         self.app.proc_container.view.set_busy('%s ...' % _("P-Plating Mask"))
 
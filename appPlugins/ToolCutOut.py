@@ -187,9 +187,6 @@ class CutOut(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Cutout"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+X', **kwargs)
-
     def connect_signals_at_init(self):
         # #############################################################################
         # ############################ SIGNALS ########################################
@@ -50,9 +50,6 @@ class DblSidedTool(AppTool):
         # set True if mouse events are locally connected
         self.local_connected = False
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+D', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("Tool2Sided()")
 
@@ -541,7 +538,7 @@ class DblSidedTool(AppTool):
 
         fcobj.mirror(axis, [px, py])
         self.app.app_obj.object_changed.emit(fcobj)
-        fcobj.plot()
+        fcobj.replot_transformed()
         self.app.inform.emit('[success] %s: %s' % (_("Object was mirrored"), str(fcobj.obj_options['name'])))
 
     def on_point_add(self):
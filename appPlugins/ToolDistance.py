@@ -166,9 +166,6 @@ class Distance(AppTool):
         self.original_call_source = copy(self.app.call_source)
         self.units = self.app.app_units.lower()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Ctrl+M', **kwargs)
-
     def set_tool_ui(self):
         # if the Tool Tab is hidden display it, else hide it but only if the objectName is the same
         found_idx = None
@@ -129,9 +129,6 @@ class ToolDrilling(AppTool, Excellon):
 
         self.poly_drawn = False
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+D', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolDrilling()")
 
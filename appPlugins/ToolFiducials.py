@@ -144,9 +144,6 @@ class ToolFiducials(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Fiducials"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+F', **kwargs)
-
     def connect_signals_at_init(self):
         # #############################################################################
         # ############################ SIGNALS ########################################
@@ -159,9 +159,6 @@ class Film(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Film"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+L', **kwargs)
-
     def connect_signals_at_init(self):
         # #############################################################################
         # ############################ SIGNALS ########################################
@@ -70,9 +70,6 @@ class ToolFollow(AppTool, Gerber):
         # it is made False by first click to signify that the shape is complete
         self.poly_drawn = False
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolFollow()")
 
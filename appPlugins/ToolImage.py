@@ -104,9 +104,6 @@ class ToolImage(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Image Import"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, **kwargs)
-
     def connect_signals_at_init(self):
         # ## Signals
         self.ui.import_button.clicked.connect(lambda: self.on_file_importimage())
@@ -43,9 +43,6 @@ class ToolInvertGerber(AppTool):
         self.pluginName = self.ui.pluginName
         self.connect_signals_at_init()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='ALT+G', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolInvertGerber()")
         self.app.log.debug("ToolInvertGerber() is running ...")
@@ -21,7 +21,8 @@ import sys
 import math
 
 from shapely import LineString, MultiLineString, Polygon, MultiPolygon, Point, LinearRing
-from shapely.ops import unary_union, nearest_points
+from shapely.ops import unary_union
+from shapely.strtree import STRtree
 
 import gettext
 import appTranslation as fcTranslate
@@ -29,7 +30,7 @@ import builtins
 
 from appParsers.ParseGerber import Gerber
 from matplotlib.backend_bases import KeyEvent as mpl_key_event
-from camlib import grace, flatten_shapely_geometry
+from camlib import grace, flatten_shapely_geometry, find_min_clearances, isolation_passes_mp, progress_for
 
 fcTranslate.apply_language('strings')
 if '_' not in builtins.__dict__:
@@ -144,9 +145,6 @@ class ToolIsolation(AppTool, Gerber):
             "i_iso_type":       "tools_iso_isotype"
         }
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+I', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolIsolation()")
 
@@ -1140,28 +1138,8 @@ class ToolIsolation(AppTool, Gerber):
             msg = ('[ERROR_NOTCL] %s' % _("The Gerber object has one Polygon as geometry.\n"
                                           "There are no distances between geometry elements to be found."))
 
-        min_dict = {}
-        idx = 1
         w_geo = flatten_shapely_geometry(total_geo)
-        for geo in w_geo:
-            for s_geo in w_geo[idx:]:
-                # minimize the number of distances by not taking into considerations
-                # those that are too small
-                dist = geo.distance(s_geo)
-                dist = float('%.*f' % (decimals, dist))
-                loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                proc_loc = (
-                    (float('%.*f' % (decimals, loc_1.x)), float('%.*f' % (decimals, loc_1.y))),
-                    (float('%.*f' % (decimals, loc_2.x)), float('%.*f' % (decimals, loc_2.y)))
-                )
-
-                if dist in min_dict:
-                    min_dict[dist].append(proc_loc)
-                else:
-                    min_dict[dist] = [proc_loc]
-
-            idx += 1
+        min_dict = find_min_clearances(w_geo, k=1, decimals=decimals)
 
         min_list = list(min_dict.keys())
         min_dist = min(min_list)
@@ -1192,8 +1170,11 @@ class ToolIsolation(AppTool, Gerber):
 
                 ap_storage = fcobj.tools
 
-                p = app_obj.pool.apply_async(self.find_optim_mp, args=(ap_storage, self.decimals))
-                res = p.get()
+                try:
+                    res = app_obj.pool.call(self.find_optim_mp, (ap_storage, self.decimals),
+                                            progress=progress_for(app_obj))
+                except grace:
+                    return 'fail'
 
                 if res[0] != 'ok':
                     app_obj.inform.emit(res[0])
@@ -1254,8 +1235,6 @@ class ToolIsolation(AppTool, Gerber):
         def job_thread(app_obj):
             with self.app.proc_container.new(_("Checking ...")):
                 try:
-                    old_disp_number = 0
-                    pol_nr = 0
                     app_obj.proc_container.update_view_text(' %d%%' % 0)
                     total_geo = []
 
@@ -1280,39 +1259,7 @@ class ToolIsolation(AppTool, Gerber):
                         app_obj.inform.emit('[ERROR_NOTCL] %s' % msg)
                         return 'fail'
 
-                    geo_len = (geo_len * (geo_len - 1)) / 2
-
-                    min_dict = {}
-                    idx = 1
-                    for geo in total_geo:
-                        for s_geo in total_geo[idx:]:
-                            if self.app.abort_flag:
-                                # graceful abort requested by the user
-                                raise grace
-
-                            # minimize the number of distances by not taking into considerations those
-                            # that are too small
-                            dist = geo.distance(s_geo)
-                            dist = float('%.*f' % (self.decimals, dist))
-                            loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                            proc_loc = (
-                                (float('%.*f' % (self.decimals, loc_1.x)), float('%.*f' % (self.decimals, loc_1.y))),
-                                (float('%.*f' % (self.decimals, loc_2.x)), float('%.*f' % (self.decimals, loc_2.y)))
-                            )
-
-                            if dist in min_dict:
-                                min_dict[dist].append(proc_loc)
-                            else:
-                                min_dict[dist] = [proc_loc]
-
-                            pol_nr += 1
-                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-
-                            if old_disp_number < disp_number <= 100:
-                                app_obj.proc_container.update_view_text(' %d%%' % disp_number)
-                                old_disp_number = disp_number
-                        idx += 1
+                    min_dict = find_min_clearances(total_geo, k=1, decimals=self.decimals)
 
                     min_list = list(min_dict.keys())
                     min_dist = min(min_list)
@@ -1798,14 +1745,27 @@ class ToolIsolation(AppTool, Gerber):
         else:
             prog_plot = self.app.options["tools_iso_plotting"]
 
+            # the isolation passes of all the tools are done first, in parallel
+            jobs = []
             for tool in sel_tools:
                 tool_data = tools_storage[tool]['data']
+                iso_t = {
+                    'ext':  0,
+                    'int':  1,
+                    'full': 2
+                }[tool_data['tools_iso_isotype']]
+                offsets = self.pass_offsets(tools_storage[tool]['tooldia'], tool_data['tools_iso_passes'],
+                                            tool_data['tools_iso_overlap'] / 100.0, negative_dia=negative_dia)
+                # if milling type is climb then the move is counter-clockwise around features
+                mill_dir = 0 if tool_data['tools_iso_milling_type'] == 'cl' else 1
+                # with no geometry we do isolation over all the geometry of the Gerber object
+                # because it is already fused together
+                jobs.append((flatten_shapely_geometry(geometry), offsets, mill_dir, iso_t))
 
-                work_geo = flatten_shapely_geometry(geometry)
-                if work_geo is None:
-                    # we do isolation over all the geometry of the Gerber object
-                    # because it is already fused together
-                    work_geo = flatten_shapely_geometry(isolated_obj.solid_geometry)
+            envelopes = self.generate_envelopes(isolated_obj, jobs, prog_plot=prog_plot)
+
+            for tool, tool_envelopes in zip(sel_tools, envelopes):
+                tool_data = tools_storage[tool]['data']
 
                 iso_t = {
                     'ext':  0,
@@ -1817,14 +1777,8 @@ class ToolIsolation(AppTool, Gerber):
                 overlap = tool_data['tools_iso_overlap']
                 overlap /= 100.0
 
-                milling_type = tool_data['tools_iso_milling_type']
-
                 tool_dia = tools_storage[tool]['tooldia']
-                for i in range(passes):
-                    iso_offset = tool_dia * ((2 * i + 1) / 2.0000001) - (i * overlap * tool_dia)
-                    if negative_dia:
-                        iso_offset = -iso_offset
-
+                for i, iso_geo in enumerate(tool_envelopes):
                     outname = "%s_%.*f" % (isolated_obj.obj_options["name"], self.decimals, float(tool_dia))
 
                     if passes > 1:
@@ -1840,11 +1794,6 @@ class ToolIsolation(AppTool, Gerber):
                         elif iso_t == 1:
                             iso_name = outname + "_int_iso"
 
-                    # if milling type is climb then the move is counter-clockwise around features
-                    mill_dir = 0 if milling_type == 'cl' else 1
-
-                    iso_geo = self.generate_envelope(isolated_obj, iso_offset, mill_dir, geometry=work_geo,
-                                                     env_iso_type=iso_t, nr_passes=i, prog_plot=prog_plot)
                     if iso_geo == 'fail':
                         self.app.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
                         continue
@@ -2210,17 +2159,30 @@ class ToolIsolation(AppTool, Gerber):
         if prog_plot is None:
             prog_plot = self.app.options["tools_iso_plotting"]
 
+        # the isolation passes of all the tools are done first, in parallel
+        jobs = []
         for tool in sel_tools:
+            tool_data = tools_storage[tool]['data']
+            iso_t = {
+                'ext': 0,
+                'int': 1,
+                'full': 2
+            }[tool_data['tools_iso_isotype']]
+            offsets = self.pass_offsets(tools_storage[tool]['tooldia'], tool_data['tools_iso_passes'],
+                                        tool_data['tools_iso_overlap'] / 100.0, negative_dia=negative_dia)
+            # if milling type is climb then the move is counter-clockwise around features
+            mill_dir = 0 if tool_data['tools_iso_milling_type'] == 'cl' else 1
+            jobs.append((geometry if geometry is not None else iso_obj.solid_geometry, offsets, mill_dir, iso_t))
+
+        envelopes = self.generate_envelopes(iso_obj, jobs, prog_plot=prog_plot)
+
+        for tool, tool_envelopes in zip(sel_tools, envelopes):
             tool_dia = tools_storage[tool]['tooldia']
             tool_has_offset = tools_storage[tool]['data']['tools_mill_offset_type']
             tool_offset_value = tools_storage[tool]['data']['tools_mill_offset_value']
             tool_type = tools_storage[tool]['data']['tools_mill_tool_shape']
             tool_data = tools_storage[tool]['data']
 
-            work_geo = geometry
-            if work_geo is None:
-                work_geo = iso_obj.solid_geometry
-
             iso_t = {
                 'ext': 0,
                 'int': 1,
@@ -2231,8 +2193,6 @@ class ToolIsolation(AppTool, Gerber):
             overlap = tool_data['tools_iso_overlap']
             overlap /= 100.0
 
-            milling_type = tool_data['tools_iso_milling_type']
-
             outname = "%s_%.*f" % (iso_obj.obj_options["name"], self.decimals, float(tool_dia))
 
             internal_name = outname + "_iso"
@@ -2246,16 +2206,7 @@ class ToolIsolation(AppTool, Gerber):
             })
 
             solid_geo = []
-            for nr_pass in range(passes):
-                iso_offset = tool_dia * ((2 * nr_pass + 1) / 2.0000001) - (nr_pass * overlap * tool_dia)
-                if negative_dia:
-                    iso_offset = -iso_offset
-
-                # if milling type is climb then the move is counter-clockwise around features
-                mill_dir = 0 if milling_type == 'cl' else 1
-
-                iso_geo = self.generate_envelope(iso_obj, iso_offset, mill_dir, geometry=work_geo, env_iso_type=iso_t,
-                                                 nr_passes=nr_pass, prog_plot=prog_plot)
+            for iso_geo in tool_envelopes:
                 if iso_geo == 'fail':
                     self.app.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
                     continue
@@ -3076,6 +3027,20 @@ class ToolIsolation(AppTool, Gerber):
             self.app.log.error('ToolIsolation.generate_envelope() --> %s' % str(e))
             return 'fail'
 
+        return self.invert_envelope(geom_shp, invert)
+
+    def invert_envelope(self, geom_shp, invert):
+        """
+        Will invert the direction of the isolation geometry (CW to CCW or reverse), if required.
+
+        :param geom_shp:        The isolation geometry as returned by the obj.isolation_geometry() method
+        :type geom_shp:         list or MultiPolygon or MultiLineString
+        :param invert:          If to invert the direction of geometry (CW to CCW or reverse)
+        :type invert:           int
+        :return:                The isolation geometry or 'fail'
+        :rtype:                 MultiPolygon or Polygon or list
+        """
+
         if isinstance(geom_shp, (MultiPolygon, MultiLineString)):
             geom = geom_shp.geoms
         else:
@@ -3097,13 +3062,112 @@ class ToolIsolation(AppTool, Gerber):
                 elif isinstance(geom, LinearRing) and geom is not None:
                     geom = Polygon(geom.coords[::-1])
                 else:
-                    msg = "ToolIsolation.generate_envelope() Error --> Unexpected Geometry %s" % type(geom)
+                    msg = "ToolIsolation.invert_envelope() Error --> Unexpected Geometry %s" % type(geom)
                     self.app.log.debug(msg)
             except Exception as e:
-                self.app.log.error("ToolIsolation.generate_envelope() Error --> %s" % str(e))
+                self.app.log.error("ToolIsolation.invert_envelope() Error --> %s" % str(e))
                 return 'fail'
         return geom
 
+    def generate_envelopes(self, iso_obj, jobs, prog_plot=False):
+        """
+        Will generate the isolation envelopes for a list of jobs, a job being all the passes done with one tool.
+        The tools are isolated in parallel in the multiprocessing Pool and all the passes of a tool are buffered in
+        one task; if there are fewer tools than processes then each pass is a task.
+        For the "progressive" plotting the passes are done one by one, using the generate_envelope() method.
+        The results are returned in the order of the jobs and passes, no matter the order in which they finish.
+
+        :param iso_obj:         The Gerber object to be isolated
+        :type iso_obj:          AppObjects.FlatCAMGerber.GerberObject
+        :param jobs:            A list of tuples (geometry, offsets, invert, env_iso_type), one for each tool.
+                                If the geometry is empty then the iso_obj solid geometry is used
+        :type jobs:             list
+        :param prog_plot:       Type of plotting: "normal" or "progressive"
+        :type prog_plot:        str
+        :return:                A list with an item for each job: a list with the envelope (or 'fail') of each pass
+        :rtype:                 list
+        """
+
+        if prog_plot == 'progressive':
+            return [
+                [
+                    self.generate_envelope(iso_obj, offset, invert, geometry=geometry, env_iso_type=iso_t,
+                                           nr_passes=nr_pass, prog_plot=prog_plot)
+                    for nr_pass, offset in enumerate(offsets)
+                ]
+                for geometry, offsets, invert, iso_t in jobs
+            ]
+
+        pool = self.app.pool
+        proc_number = max(1, int(self.app.options["global_process_number"]))
+        steps = int(iso_obj.geo_steps_per_circle)
+        split_passes = len(jobs) < proc_number
+
+        results = []
+        tasks = []
+        task_args = []
+        # the geometry of a tool is stored once in shared memory no matter how many tasks (passes) use it
+        shared_geos = []
+        try:
+            for job_idx, (geometry, offsets, invert, iso_t) in enumerate(jobs):
+                results.append(['fail'] * len(offsets))
+
+                work_geo = pool.share(flatten_shapely_geometry(geometry if geometry else iso_obj.solid_geometry))
+                shared_geos.append(work_geo)
+                if split_passes:
+                    pass_groups = [[nr_pass] for nr_pass in range(len(offsets))]
+                else:
+                    pass_groups = [list(range(len(offsets)))]
+
+                for group in pass_groups:
+                    group_offsets = [offsets[nr_pass] for nr_pass in group]
+                    tasks.append((job_idx, group))
+                    task_args.append((work_geo, group_offsets, steps, iso_t))
+
+            self.app.log.debug("ToolIsolation.generate_envelopes() -> %d tools in %d tasks" % (len(jobs), len(tasks)))
+
+            # a user abort raises a GracefulException and the tasks not started yet are dropped
+            progress = progress_for(self.app, len(tasks))
+            task_results = pool.run_tasks(isolation_passes_mp, task_args, progress=progress, return_exceptions=True)
+            for (job_idx, group), passes_geo in zip(tasks, task_results):
+                if isinstance(passes_geo, Exception):
+                    self.app.log.error('ToolIsolation.generate_envelopes() --> %s' % str(passes_geo))
+                    continue
+
+                invert = jobs[job_idx][2]
+                for nr_pass, geom_shp in zip(group, passes_geo):
+                    if geom_shp is None:
+                        self.app.log.debug("ToolIsolation.generate_envelopes() --> Type of isolation not supported")
+                        continue
+                    results[job_idx][nr_pass] = self.invert_envelope(geom_shp, invert)
+        finally:
+            for work_geo in shared_geos:
+                work_geo.release()
+
+        return results
+
+    @staticmethod
+    def pass_offsets(tool_dia, passes, overlap, negative_dia=None):
+        """
+        The offsets used to buffer the geometry for each of the isolation passes.
+
+        :param tool_dia:        Tool diameter
+        :type tool_dia:         float
+        :param passes:          Number of passes
+        :type passes:           int
+        :param overlap:         How much a pass overlaps the previous pass, as a fraction of the tool diameter
+        :type overlap:          float
+        :param negative_dia:    isolate the geometry with a negative value for the tool diameter
+        :type negative_dia:     bool
+        :return:                A list with the offset of each pass
+        :rtype:                 list
+        """
+        offsets = []
+        for nr_pass in range(passes):
+            iso_offset = tool_dia * ((2 * nr_pass + 1) / 2.0000001) - (nr_pass * overlap * tool_dia)
+            offsets.append(-iso_offset if negative_dia else iso_offset)
+        return offsets
+
     def generate_rest_geometry(self, geometry, tooldia, passes, overlap, invert, env_iso_type=2, negative_dia=None,
                                forced_rest=False,
                                prog_plot="normal", prog_plot_handler=None, plot=False):
@@ -3142,14 +3206,11 @@ class ToolIsolation(AppTool, Gerber):
 
         work_geo = []
 
-        geo_len = len(geometry)
+        # spatial index used to find the geometries that may intersect the current pass
+        geo_tree = STRtree(geometry)
         for idx, geo in enumerate(geometry):
             good_pass_iso = []
 
-            geo_idx_list = list(range(geo_len))
-            # we don't want to test intersection with itself
-            del geo_idx_list[idx]
-
             for nr_pass in range(passes):
 
                 iso_offset = tooldia * ((2 * nr_pass + 1) / 2.0) - (nr_pass * overlap * tooldia)
@@ -3159,12 +3220,10 @@ class ToolIsolation(AppTool, Gerber):
                 buf_chek = iso_offset * 1.99999
                 check_geo = geo.buffer(buf_chek)
 
-                intersect_flag = False
                 # find if current pass for current geo is valid (no intersection with other geos)
-                for geo_search_idx in geo_idx_list:
-                    if check_geo.intersects(geometry[geo_search_idx]):
-                        intersect_flag = True
-                        break
+                # we don't want to test intersection with itself
+                intersect_flag = any(
+                    geo_search_idx != idx for geo_search_idx in geo_tree.query(check_geo, predicate='intersects'))
 
                 # if we had an intersection do nothing, else add the geo to the good pass isolation's
                 if intersect_flag is False:
@@ -15,8 +15,11 @@ from appGUI.GUIElements import VerticalScrollArea, FCLabel, FCButton, FCFrame, G
 import logging
 from copy import deepcopy
 import sys
+import re
+import hashlib
 
-from shapely import Point, MultiPoint, MultiPolygon, box
+import numpy as np
+from shapely import Point, MultiPoint, MultiPolygon, box, points, STRtree
 from shapely.ops import unary_union
 from shapely.affinity import translate
 from datetime import datetime as dt
@@ -30,7 +33,8 @@ from appGUI.VisPyVisuals import *
 from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
 from appEditors.appTextEditor import AppTextEditor
 
-from camlib import CNCjob
+from camlib import CNCjob, grace
+from appCommon.bilinearInterpolator import bilinearInterpolator
 
 import time
 import serial
@@ -133,9 +137,6 @@ class ToolLevelling(AppTool, CNCjob):
 
         self.connect_signals_at_init()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolLevelling()")
 
@@ -233,6 +234,7 @@ class ToolLevelling(AppTool, CNCjob):
         self.ui.view_h_gcode_button.clicked.connect(self.on_edit_probing_gcode)
         self.ui.h_gcode_button.clicked.connect(self.on_save_probing_gcode)
         self.ui.import_heights_button.clicked.connect(self.on_import_height_map)
+        self.ui.apply_heights_button.clicked.connect(self.on_apply_height_map)
         self.ui.pause_resume_button.clicked.connect(self.on_grbl_pause_resume)
         self.ui.grbl_get_heightmap_button.clicked.connect(self.on_grbl_autolevel)
         self.ui.grbl_save_height_map_button.clicked.connect(self.on_grbl_heightmap_save)
@@ -1086,23 +1088,232 @@ class ToolLevelling(AppTool, CNCjob):
             self.app.on_jump_to()
 
     def autolevell_gcode(self):
-        pass
+        """
+        Apply the probed heights over the GCode of the selected CNCJob object.
+        The heights are always applied over the GCode as it was before any autolevelling, so applying them again
+        (e.g. after a new probing) replaces the previous autolevelling instead of adding to it.
+        The linear cut moves are segmented so no segment is longer than the segmentation set for the CNCJob object and
+        then the height of all the resulting points is interpolated at once, using either the Voronoi cells or the
+        bilinear interpolation on the probed grid.
+
+        :return:    None
+        """
+        obj_name = self.ui.object_combo.get_value()
+        target_obj = self.app.collection.get_by_name(obj_name)
+        if target_obj is None:
+            self.app.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Could not retrieve object"), str(obj_name)))
+            return 'fail'
+
+        pp_names = '%s %s' % (target_obj.pp_geometry_name, target_obj.pp_excellon_name)
+        if 'Roland' in pp_names or 'hpgl' in pp_names or 'laser' in pp_names.lower():
+            self.app.inform.emit('[ERROR_NOTCL] %s' % _("The preprocessor used does not support autolevelling."))
+            return 'fail'
 
-    def autolevell_gcode_line(self, gcode_line):
         al_method = self.ui.al_method_radio.get_value()
+        if al_method == 'v':
+            heights_func = self.autolevell_voronoi()
+        else:
+            heights_func = self.autolevell_bilinear()
+        if heights_func is None:
+            self.app.inform.emit('[ERROR_NOTCL] %s' % _("There is no height data. Probe the board first."))
+            return 'fail'
 
-        coords = ()
+        seg_lengths = [seg for seg in (target_obj.seg_x, target_obj.seg_y) if seg > 0]
+        max_len = min(seg_lengths) if seg_lengths else 0.0
 
-        if al_method == 'v':
-            self.autolevell_voronoi(gcode_line, coords)
-        elif al_method == 'b':
-            self.autolevell_bilinear(gcode_line, coords)
+        with self.app.proc_container.new('%s...' % _("Working")):
+            self.store_unlevelled_gcode(target_obj)
 
-    def autolevell_bilinear(self, gcode_line, coords):
-        pass
+            # the job is changed only after all its GCode was levelled, so an abort leaves it as it was
+            if target_obj.multitool is False:
+                target_obj.gcode = self.autolevell_gcode_text(
+                    target_obj, target_obj.unlevelled_gcode, heights_func, max_len)
+            else:
+                levelled = {
+                    tool: self.autolevell_gcode_text(target_obj, tool_dict['unlevelled_gcode'], heights_func, max_len)
+                    for tool, tool_dict in target_obj.tools.items()
+                }
+                for tool, tool_dict in target_obj.tools.items():
+                    tool_dict['gcode'] = levelled[tool]
+            target_obj.levelled_gcode_hash = self.job_gcode_hash(target_obj)
+
+            gco = target_obj.export_gcode(preamble=target_obj.prepend_snippet, postamble=target_obj.append_snippet,
+                                          to_file=True)
+            if gco == 'fail':
+                self.app.inform.emit('[ERROR_NOTCL] %s %s...' % (
+                    _('Failed.'), _('CNC Machine Code could not be updated')))
+                return 'fail'
+            target_obj.source_file = gco
 
-    def autolevell_voronoi(self, gcode_line, coords):
-        pass
+        self.app.inform.emit('[success] %s' % _("Finished autolevelling."))
+
+    @staticmethod
+    def job_gcode_hash(cnc_obj) -> str:
+        """
+        :param cnc_obj:     CNCJob object
+        :return:            hash of the current GCode of the job (of all its tools for a multitool job)
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        if cnc_obj.multitool is False:
+            hasher.update(str(cnc_obj.gcode).encode())
+        else:
+            for tool in sorted(cnc_obj.tools, key=str):
+                hasher.update(('|%s|' % str(tool)).encode())
+                hasher.update(str(cnc_obj.tools[tool].get('gcode', '')).encode())
+        return hasher.hexdigest()
+
+    def store_unlevelled_gcode(self, cnc_obj):
+        """
+        Keep the GCode of the job as it is before the autolevelling. If the job was already levelled and its GCode was
+        not changed since then, the GCode kept at that time is used; otherwise (never levelled, or the GCode was
+        regenerated or edited after the levelling) the current GCode is the one kept.
+
+        :param cnc_obj:     CNCJob object
+        :return:            None
+        """
+        if cnc_obj.levelled_gcode_hash is not None and cnc_obj.levelled_gcode_hash == self.job_gcode_hash(cnc_obj):
+            if cnc_obj.multitool is False and cnc_obj.unlevelled_gcode is not None:
+                return
+            if cnc_obj.multitool is True and all('unlevelled_gcode' in t for t in cnc_obj.tools.values()):
+                return
+
+        if cnc_obj.multitool is False:
+            cnc_obj.unlevelled_gcode = cnc_obj.gcode
+        else:
+            for tool_dict in cnc_obj.tools.values():
+                tool_dict['unlevelled_gcode'] = tool_dict.get('gcode', '')
+
+    def autolevell_gcode_text(self, cnc_obj, gcode, heights_func, max_len):
+        """
+        Add the heights to the Z coordinates of the linear moves in a GCode text.
+        The GCode words are parsed like in CNCJob.codes_split() for the standard preprocessors; the lines that are not
+        linear moves (G0, G1) are not changed.
+
+        :param cnc_obj:         the CNCJob object that holds the GCode
+        :param gcode:           GCode text
+        :param heights_func:    function that takes a Numpy array of (x, y) points and returns their heights
+        :param max_len:         maximum length of a cut (G1) segment; if zero the moves are not segmented
+        :return:                the levelled GCode text
+        """
+        if not gcode:
+            return gcode
+
+        lines = gcode.splitlines()
+        word_re = cnc_obj.gcode_word_re
+        coords_re = re.compile(r'\s*[XYZ]\s*[+-]?\d*\.?\d+')
+
+        # data for each of the moves that are levelled
+        moves_idx = []
+        moves_data = []     # (start x, start y, end x, end y, z, G code, has XY)
+
+        cur_x = cur_y = 0.0
+        cur_z = None
+        g_modal = None
+        for idx, line in enumerate(lines):
+            if idx % 10000 == 0 and self.app.abort_flag:
+                # graceful abort requested by the user
+                raise grace
+
+            stripped = line.strip()
+            if not stripped or stripped[0] in '(;%':
+                continue
+            gobj = {}
+            match = word_re.match(stripped)
+            while match:
+                gobj[match.group(1)] = float(match.group(2).replace(" ", ""))
+                match = word_re.match(stripped, match.end())
+            if 'G' in gobj and gobj['G'] in (0, 1, 2, 3):
+                g_modal = int(gobj['G'])
+            if 'X' not in gobj and 'Y' not in gobj and 'Z' not in gobj:
+                continue
+
+            new_x = gobj.get('X', cur_x)
+            new_y = gobj.get('Y', cur_y)
+            new_z = gobj.get('Z', cur_z)
+            if g_modal in (0, 1) and new_z is not None:
+                moves_idx.append(idx)
+                moves_data.append((cur_x, cur_y, new_x, new_y, new_z, g_modal, 'X' in gobj or 'Y' in gobj))
+            cur_x, cur_y, cur_z = new_x, new_y, new_z
+
+        if not moves_data:
+            return gcode
+
+        # calculate the end points of all the segments and their heights at once
+        data = np.array(moves_data, dtype=float)
+        nr_segments = np.ones(len(data), dtype=int)
+        if max_len > 0:
+            cuts = data[:, 5] == 1
+            lengths = np.hypot(data[cuts, 2] - data[cuts, 0], data[cuts, 3] - data[cuts, 1])
+            nr_segments[cuts] = np.maximum(1, np.ceil(lengths / max_len)).astype(int)
+        move_of_point = np.repeat(np.arange(len(data)), nr_segments)
+        first_point = np.cumsum(nr_segments) - nr_segments
+        fraction = (np.arange(len(move_of_point)) - first_point[move_of_point] + 1) / nr_segments[move_of_point]
+        start = data[move_of_point, 0:2]
+        end = data[move_of_point, 2:4]
+        seg_xy = start + (end - start) * fraction[:, None]
+        seg_z = data[move_of_point, 4] + heights_func(seg_xy)
+
+        dec = self.app.options["cncjob_coords_decimals"]
+        xyz_fmt = 'X%.{d}f Y%.{d}f Z%.{d}f'.format(d=dec)
+        z_fmt = 'Z%.{d}f'.format(d=dec)
+        xyz_text = [xyz_fmt % pt for pt in zip(seg_xy[:, 0].tolist(), seg_xy[:, 1].tolist(), seg_z.tolist())]
+        first_point = first_point.tolist()
+        nr_segments = nr_segments.tolist()
+        has_xy = data[:, 6].astype(bool).tolist()
+        for move_nr, idx in enumerate(moves_idx):
+            start = first_point[move_nr]
+            stop = start + nr_segments[move_nr]
+            if has_xy[move_nr]:
+                new_lines = xyz_text[start:stop]
+            else:
+                new_lines = [z_fmt % z for z in seg_z[start:stop].tolist()]
+            words = coords_re.sub('', lines[idx]).strip()
+            if words:
+                new_lines[0] = '%s %s' % (words, new_lines[0])
+            lines[idx] = '\n'.join(new_lines)
+
+        return '\n'.join(lines) + ('\n' if gcode.endswith('\n') else '')
+
+    def autolevell_bilinear(self):
+        """
+        Build the heights function using the bilinear interpolation over the probed grid.
+
+        :return:    a function that takes a Numpy array of (x, y) points and returns their heights, or None
+        """
+        if not self.al_bilinear_geo_storage:
+            return None
+        interpolator = bilinearInterpolator(self.al_bilinear_geo_storage)
+        return interpolator.interpolate_many
+
+    def autolevell_voronoi(self):
+        """
+        Build the heights function using the Voronoi diagram: the height of a point is the height of the probe point
+        whose Voronoi cell holds the point. The cells are searched using a STRtree.
+
+        :return:    a function that takes a Numpy array of (x, y) points and returns their heights, or None
+        """
+        storage = self.al_voronoi_geo_storage
+        if not storage:
+            return None
+        if any(not storage[k].get('geo') for k in storage) and self.solid_geo is not None:
+            self.generate_voronoi_geometry(pts=[storage[k]['point'] for k in storage])
+
+        cells = [storage[k]['geo'] for k in storage if storage[k].get('geo')]
+        heights = np.array([storage[k].get('height', 0.0) for k in storage if storage[k].get('geo')], dtype=float)
+        if not cells:
+            # no cells; the nearest probe point is what the Voronoi cell lookup would find
+            cells = [storage[k]['point'] for k in storage]
+            heights = np.array([storage[k].get('height', 0.0) for k in storage], dtype=float)
+        tree = STRtree(cells)
+
+        def heights_func(xy):
+            # for the points inside a cell the nearest cell is the one that holds the point (distance is zero)
+            pt_idx, cell_idx = tree.query_nearest(points(xy), all_matches=False)
+            result = np.zeros(len(xy))
+            result[pt_idx] = heights[cell_idx]
+            return result
+
+        return heights_func
 
     def on_show_al_table(self, state):
         self.ui.al_probe_points_table.show() if state else self.ui.al_probe_points_table.hide()
@@ -1169,6 +1380,7 @@ class ToolLevelling(AppTool, CNCjob):
             self.ui.view_h_gcode_button.hide()
 
             self.ui.import_heights_button.hide()
+            self.ui.apply_heights_button.hide()
             self.ui.grbl_frame.show()
             self.on_grbl_search_ports(muted=True)
         else:
@@ -1176,6 +1388,7 @@ class ToolLevelling(AppTool, CNCjob):
             self.ui.view_h_gcode_button.show()
 
             self.ui.import_heights_button.show()
+            self.ui.apply_heights_button.show()
             self.ui.grbl_frame.hide()
 
     @staticmethod
@@ -1746,7 +1959,23 @@ class ToolLevelling(AppTool, CNCjob):
                         y = float(line[1])
                         self.al_voronoi_geo_storage[idx]['point'] = Point((x, y))
 
+            self.update_bilinear_heights()
             self.build_al_table_sig.emit()
+            self.app.inform.emit('[success] %s' % _("Height map imported. Apply it to level the GCode."))
+
+    def on_apply_height_map(self):
+        self.app.worker_task.emit({'fcn': self.autolevell_gcode, 'params': []})
+
+    def update_bilinear_heights(self):
+        """
+        Copy the probed heights into the storage used by the bilinear interpolation.
+
+        :return:    None
+        """
+        self.al_bilinear_geo_storage = [
+            (val['point'].x, val['point'].y, val.get('height', 0.0))
+            for val in self.al_voronoi_geo_storage.values() if 'point' in val
+        ]
 
     def on_grbl_autolevel(self):
         # show the Shell Dock
@@ -1830,8 +2059,19 @@ class ToolLevelling(AppTool, CNCjob):
             self.app.inform.emit('[ERROR_NOTCL] %s' % _("Empty GRBL heightmap."))
 
     def on_grbl_apply_autolevel(self):
-        # TODO here we call the autolevell method
-        self.app.inform.emit('%s' % _("Finished autolevelling."))
+        # the GRBL probing results are reported as: [PRB:x,y,z:1] in the order the points were probed
+        probed = re.findall(r'\[PRB:([+-]?\d*\.?\d+),([+-]?\d*\.?\d+),([+-]?\d*\.?\d+)', self.grbl_probe_result)
+        if len(probed) != len(self.al_voronoi_geo_storage):
+            self.app.inform.emit('[ERROR_NOTCL] %s' % _("The number of probing results does not match the number "
+                                                        "of probe points."))
+            return
+
+        for pt_key, prb in zip(self.al_voronoi_geo_storage, probed):
+            self.al_voronoi_geo_storage[pt_key]['height'] = float(prb[2])
+        self.update_bilinear_heights()
+        self.build_al_table_sig.emit()
+
+        self.autolevell_gcode()
 
     def ui_connect(self):
         self.ui.al_add_button.clicked.connect(self.on_add_al_probepoints)
@@ -2476,12 +2716,18 @@ class LevelUI:
         self.import_heights_button = FCButton(_("Import Height Map"))
         self.import_heights_button.setToolTip(
             _("Import the file that has the Z heights\n"
-              "obtained through probing and then apply this data\n"
-              "over the original GCode therefore\n"
-              "doing autolevelling.")
+              "obtained through probing.")
         )
         self.al_box.addWidget(self.import_heights_button)
 
+        self.apply_heights_button = FCButton(_("Apply Height Map"))
+        self.apply_heights_button.setToolTip(
+            _("Apply the imported Z heights over the original GCode\n"
+              "therefore doing autolevelling.\n"
+              "Applying them again replaces the previous autolevelling.")
+        )
+        self.al_box.addWidget(self.apply_heights_button)
+
         # self.h_gcode_button.hide()
         # self.import_heights_button.hide()
 
@@ -156,9 +156,6 @@ class ToolMarkers(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Markers"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+B', **kwargs)
-
     def connect_signals_at_init(self):
 
         # #############################################################################
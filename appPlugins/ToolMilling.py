@@ -13,7 +13,6 @@ from appGUI.GUIElements import VerticalScrollArea, FCLabel, FCButton, FCFrame, G
 
 import logging
 from copy import deepcopy
-import numpy as np
 import simplejson as json
 import sys
 import math
@@ -27,7 +26,7 @@ import builtins
 
 from appParsers.ParseExcellon import Excellon
 from matplotlib.backend_bases import KeyEvent as mpl_key_event
-from camlib import grace
+from camlib import grace, process_gui_events, progress_for
 
 fcTranslate.apply_language('strings')
 if '_' not in builtins.__dict__:
@@ -167,9 +166,6 @@ class ToolMilling(AppTool, Excellon):
         self.old_tool_dia = None
         self.poly_drawn = False
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+M', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolMilling()")
 
@@ -2828,7 +2824,6 @@ class ToolMilling(AppTool, Excellon):
                 new_obj.obj_options[oname] = self.app.options[option]
 
         for tool in tools_dict:
-            old_disp_number = 0
             drills_tool_geo = []
             slots_tool_geo = []
             total_paint_geo = []
@@ -2872,28 +2867,18 @@ class ToolMilling(AppTool, Excellon):
             if not total_paint_geo:
                 continue
 
-            pol_nr = 0
-            geo_len = len(total_paint_geo)
+            progress = progress_for(self.app, len(total_paint_geo))
             cp = []
 
             for pp in total_paint_geo:
-                # provide the app with a way to process the GUI events when in a blocking loop
-                QtWidgets.QApplication.processEvents()
-                if self.app.abort_flag:
-                    # graceful abort requested by the user
-                    raise grace
+                progress.check_abort()
                 geo_res = self.clear_polygon_seed(pp, seedpoint=pp.centroid, tooldia=mill_dia, overlap=over,
                                                   steps_per_circle=self.app.options['geometry_circle_steps'],
-                                                  connect=conn, contour=cont, prog_plot=False)
+                                                  connect=conn, contour=cont, prog_plot=False, progress=progress)
                 if geo_res:
                     cp.append(geo_res)
-                pol_nr += 1
-                disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                # log.debug("Polygons cleared: %d" % pol_nr)
-
-                if old_disp_number < disp_number <= 100:
-                    self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                    old_disp_number = disp_number
+                # check for an abort and publish the progress
+                progress.tick()
 
             total_geometry = []
             if cp:
@@ -3303,7 +3288,7 @@ class ToolMilling(AppTool, Excellon):
                     # paint the box
                     try:
                         # provide the app with a way to process the GUI events when in a blocking loop
-                        QtWidgets.QApplication.processEvents()
+                        process_gui_events()
                         if self.app.abort_flag:
                             # graceful abort requested by the user
                             raise grace
@@ -57,9 +57,6 @@ class ToolMove(AppTool):
 
         self.replot_signal[list].connect(self.replot)
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='M', **kwargs)
-
     def run(self, toggle):
         self.app.defaults.report_usage("ToolMove()")
 
@@ -167,7 +164,7 @@ class ToolMove(AppTool):
         def worker_task():
             with self.app.proc_container.new('%s ...' % _("Plotting")):
                 for sel_obj in obj_list:
-                    sel_obj.plot()
+                    sel_obj.replot_transformed()
 
         self.app.worker_task.emit({'fcn': worker_task, 'params': []})
 
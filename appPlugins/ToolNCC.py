@@ -20,14 +20,15 @@ import traceback
 
 from shapely import LineString, Polygon, MultiPolygon, MultiLineString, LinearRing
 from shapely.geometry import base
-from shapely.ops import unary_union, nearest_points
+from shapely.ops import unary_union
 
 import gettext
 import appTranslation as fcTranslate
 import builtins
 
 from appParsers.ParseGerber import Gerber
-from camlib import grace, flatten_shapely_geometry
+from camlib import grace, flatten_shapely_geometry, clear_polygon_mp, find_min_clearances, \
+    process_gui_events, progress_for
 from matplotlib.backend_bases import KeyEvent as mpl_key_event
 
 fcTranslate.apply_language('strings')
@@ -144,9 +145,6 @@ class NonCopperClear(AppTool, Gerber):
 
         self.old_tool_dia = None
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+N', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolNonCopperClear()")
 
@@ -977,27 +975,7 @@ class NonCopperClear(AppTool, Gerber):
         if len(total_geo) in [0, 1]:
             msg = ('[ERROR_NOTCL] %s' % _("Too few polygons in the Gerber object to determine distances."))
             return msg, np.inf
-        min_dict = {}
-        idx = 1
-        for geo in total_geo:
-            for s_geo in total_geo[idx:]:
-                # minimize the number of distances by not taking into considerations
-                # those that are too small
-                dist = geo.distance(s_geo)
-                dist = float('%.*f' % (decimals, dist))
-                loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                proc_loc = (
-                    (float('%.*f' % (decimals, loc_1.x)), float('%.*f' % (decimals, loc_1.y))),
-                    (float('%.*f' % (decimals, loc_2.x)), float('%.*f' % (decimals, loc_2.y)))
-                )
-
-                if dist in min_dict:
-                    min_dict[dist].append(proc_loc)
-                else:
-                    min_dict[dist] = [proc_loc]
-
-            idx += 1
+        min_dict = find_min_clearances(total_geo, k=1, decimals=decimals)
 
         min_list = list(min_dict.keys())
         min_dist = min(min_list)
@@ -1028,8 +1006,11 @@ class NonCopperClear(AppTool, Gerber):
 
                 ap_storage = fcobj.tools
 
-                p = app_obj.pool.apply_async(self.find_optim_mp, args=(ap_storage, self.decimals))
-                res = p.get()
+                try:
+                    res = app_obj.pool.call(self.find_optim_mp, (ap_storage, self.decimals),
+                                            progress=progress_for(app_obj))
+                except grace:
+                    return 'fail'
 
                 if res[0] != 'ok':
                     app_obj.inform.emit(res[0])
@@ -1095,8 +1076,6 @@ class NonCopperClear(AppTool, Gerber):
         def job_thread(app_obj):
             with self.app.proc_container.new(_("Checking ...")):
                 try:
-                    old_disp_number = 0
-                    pol_nr = 0
                     app_obj.proc_container.update_view_text(' %d%%' % 0)
                     total_geo = []
 
@@ -1121,39 +1100,7 @@ class NonCopperClear(AppTool, Gerber):
                                               "There are no distances between geometry elements to be found."))
                         return 'fail'
 
-                    geo_len = (geo_len * (geo_len - 1)) / 2
-
-                    min_dict = {}
-                    idx = 1
-                    for geo in total_geo:
-                        for s_geo in total_geo[idx:]:
-                            if self.app.abort_flag:
-                                # graceful abort requested by the user
-                                raise grace
-
-                            # minimize the number of distances by not taking into considerations
-                            # those that are too small
-                            dist = geo.distance(s_geo)
-                            dist = float('%.*f' % (self.decimals, dist))
-                            loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                            proc_loc = (
-                                (float('%.*f' % (self.decimals, loc_1.x)), float('%.*f' % (self.decimals, loc_1.y))),
-                                (float('%.*f' % (self.decimals, loc_2.x)), float('%.*f' % (self.decimals, loc_2.y)))
-                            )
-
-                            if dist in min_dict:
-                                min_dict[dist].append(proc_loc)
-                            else:
-                                min_dict[dist] = [proc_loc]
-
-                            pol_nr += 1
-                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-
-                            if old_disp_number < disp_number <= 100:
-                                app_obj.proc_container.update_view_text(' %d%%' % disp_number)
-                                old_disp_number = disp_number
-                        idx += 1
+                    min_dict = find_min_clearances(total_geo, k=1, decimals=self.decimals)
 
                     min_list = list(min_dict.keys())
                     min_dist = min(min_list)
@@ -2078,12 +2025,10 @@ class NonCopperClear(AppTool, Gerber):
                                                                   "than isolation tool diameter."))
 
                 w_isolated_geo = flatten_shapely_geometry(isolated_geo)
+                progress = progress_for(self.app, len(w_isolated_geo))
                 for geo_elem in w_isolated_geo:
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
-                    if self.app.abort_flag:
-                        # graceful abort requested by the user
-                        raise grace
+                    # check for an abort and publish the progress
+                    progress.tick()
 
                     if isinstance(geo_elem, Polygon):
                         for ring in self.poly2rings(geo_elem):
@@ -2156,7 +2101,7 @@ class NonCopperClear(AppTool, Gerber):
         return empty, warning_flag
 
     def clear_polygon_worker(self, pol, tooldia, ncc_method, ncc_overlap, ncc_connect, ncc_contour, prog_plot,
-                             simplify_tol=0.0):
+                             simplify_tol=0.0, progress=None):
 
         cp = None
 
@@ -2166,7 +2111,7 @@ class NonCopperClear(AppTool, Gerber):
                                                steps_per_circle=self.circle_steps,
                                                overlap=ncc_overlap, contour=ncc_contour,
                                                connect=ncc_connect,
-                                               prog_plot=prog_plot)
+                                               prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -2177,7 +2122,7 @@ class NonCopperClear(AppTool, Gerber):
                                              steps_per_circle=self.circle_steps,
                                              overlap=ncc_overlap, contour=ncc_contour,
                                              connect=ncc_connect,
-                                             prog_plot=prog_plot)
+                                             prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -2188,7 +2133,7 @@ class NonCopperClear(AppTool, Gerber):
                                               steps_per_circle=self.circle_steps,
                                               overlap=ncc_overlap, contour=ncc_contour,
                                               connect=ncc_connect,
-                                              prog_plot=prog_plot)
+                                              prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -2200,7 +2145,7 @@ class NonCopperClear(AppTool, Gerber):
                                               steps_per_circle=self.circle_steps,
                                               overlap=ncc_overlap, contour=ncc_contour,
                                               connect=ncc_connect,
-                                              prog_plot=prog_plot)
+                                              prog_plot=prog_plot, progress=progress)
 
                 if cp and cp.objects:
                     pass
@@ -2210,7 +2155,7 @@ class NonCopperClear(AppTool, Gerber):
                                                  steps_per_circle=self.circle_steps,
                                                  overlap=ncc_overlap, contour=ncc_contour,
                                                  connect=ncc_connect,
-                                                 prog_plot=prog_plot)
+                                                 prog_plot=prog_plot, progress=progress)
                     if cp and cp.objects:
                         pass
                     else:
@@ -2219,7 +2164,7 @@ class NonCopperClear(AppTool, Gerber):
                                                        steps_per_circle=self.circle_steps,
                                                        overlap=ncc_overlap, contour=ncc_contour,
                                                        connect=ncc_connect,
-                                                       prog_plot=prog_plot)
+                                                       prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -2236,6 +2181,69 @@ class NonCopperClear(AppTool, Gerber):
             self.app.inform_shell.emit('%s %s' % (_('Polygon could not be cleared. Location:'), str(coords)))
             return None
 
+    def clear_polygons(self, polygons, tooldia, ncc_method, ncc_overlap, ncc_connect, ncc_contour, prog_plot,
+                       simplify_tol=0.0):
+        """
+        Copper clear a list of polygons with the same tool. The polygons are independent of each other therefore,
+        unless the progressive plotting is used, they are cleared in parallel in the multiprocessing Pool.
+
+        :param polygons:        list of Shapely Polygons to be cleared
+        :param tooldia:         the tool diameter
+        :param ncc_method:      0 = standard, 1 = seed, 2 = lines, 3 = combo
+        :param ncc_overlap:     overlap of the tool passes, as a fraction of the tool diameter
+        :param ncc_connect:     if True, draw lines between disjoint segments to minimize tool lifts
+        :param ncc_contour:     if True, cut around the edges
+        :param prog_plot:       if True, use the progressive plotting
+        :param simplify_tol:    if non-zero then simplify the resulting geometry
+        :return:                a list with one item for each polygon, in the order of the polygons: a list of
+                                cleared geometry elements or None if the polygon could not be cleared
+        :rtype:                 list
+        """
+        progress = progress_for(self.app, len(polygons))
+        if prog_plot or len(polygons) < 2 or self.app.pool is None:
+            results = []
+            for pol in polygons:
+                progress.check_abort()
+                res = self.clear_polygon_worker(pol=pol, tooldia=tooldia, ncc_method=ncc_method,
+                                                ncc_overlap=ncc_overlap, ncc_connect=ncc_connect,
+                                                ncc_contour=ncc_contour, simplify_tol=simplify_tol,
+                                                prog_plot=prog_plot, progress=progress)
+                if res == "fail":
+                    raise grace
+                results.append(res)
+                progress.tick()
+            return results
+
+        return self.clear_polygons_mp(polygons, tooldia, ncc_method, ncc_overlap, ncc_connect, ncc_contour,
+                                      simplify_tol=simplify_tol, progress=progress)
+
+    def clear_polygons_mp(self, polygons, tooldia, ncc_method, ncc_overlap, ncc_connect, ncc_contour,
+                          simplify_tol=0.0, progress=None):
+        """
+        Copper clear a list of polygons in the multiprocessing Pool. The polygons are stored once, as WKB, in shared
+        memory and cleared in chunks; only a limited number of chunks are in the Pool at one time and the chunks
+        running when the user aborts are stopped. The results are in the order of the polygons.
+
+        :param progress:    ProgressContext of the operation; if None a new one is made
+        :return:            same as for the clear_polygons() method
+        """
+        if progress is None:
+            progress = progress_for(self.app, len(polygons))
+
+        self.app.log.debug("NonCopperClear.clear_polygons_mp() -> %d polygons" % len(polygons))
+
+        results = self.app.pool.map_geometry(
+            clear_polygon_mp, polygons,
+            args=(tooldia, ncc_method, self.circle_steps, ncc_overlap, ncc_connect, ncc_contour, simplify_tol),
+            progress=progress)
+
+        for pol, res in zip(polygons, results):
+            if res is None:
+                pt = pol.representative_point()
+                self.app.inform_shell.emit('%s %s' % (_('Polygon could not be cleared. Location:'), str((pt.x, pt.y))))
+
+        return results
+
     def ncc_handler(self, ncc_obj, ncctd_list, isotd_list, sel_obj=None, outname=None, order=None,
                     tools_storage=None, run_threaded=True):
         """
@@ -2268,7 +2276,7 @@ class NonCopperClear(AppTool, Gerber):
             proc = self.app.proc_container.new('%s...' % _("Working"))
         else:
             self.app.proc_container.view.set_busy('%s...' % _("Working"))
-            QtWidgets.QApplication.processEvents()
+            process_gui_events()
 
         # ######################################################################################################
         # ######################### Read the parameters ########################################################
@@ -2308,7 +2316,7 @@ class NonCopperClear(AppTool, Gerber):
 
             # provide the app with a way to process the GUI events when in a blocking loop
             if not run_threaded:
-                QtWidgets.QApplication.processEvents()
+                process_gui_events()
 
             # a flag to signal that the isolation is broken by the bounding box in 'area' and 'box' cases
             # will store the number of tools for which the isolation is broken
@@ -2351,7 +2359,7 @@ class NonCopperClear(AppTool, Gerber):
 
                 # provide the app with a way to process the GUI events when in a blocking loop
                 if not run_threaded:
-                    QtWidgets.QApplication.processEvents()
+                    process_gui_events()
 
                 app_obj.inform.emit('[success] %s = %s%s %s' % (
                     _('NCC Tool clearing with tool diameter'), str(tool), units.lower(), _('started.'))
@@ -2398,21 +2406,14 @@ class NonCopperClear(AppTool, Gerber):
                 if not tool_empty_area:
                     continue
 
-                # variables to display the percentage of work done
-                old_disp_number = 0
                 geo_len = len(tool_empty_area)
                 self.app.log.warning("Total number of polygons to be cleared. %s" % str(geo_len))
 
                 # ----------------------------------------------------
                 # Copper-clear the Polygons in the non-copper-area
-                # Iterate over them
                 # ----------------------------------------------------
-                pol_nr = 0
+                pols_to_clear = []
                 for p in tool_empty_area:
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    if not run_threaded:
-                        QtWidgets.QApplication.processEvents()
-
                     if self.app.abort_flag:
                         # graceful abort requested by the user
                         raise grace
@@ -2423,37 +2424,27 @@ class NonCopperClear(AppTool, Gerber):
                     p = p.buffer(0.0000001)
                     p = flatten_shapely_geometry(p, simplify_tolerance=simplification_value)
 
-                    poly_failed = 0
                     for pol in p:
-                        # provide the app with a way to process the GUI events when in a blocking loop
-                        QtWidgets.QApplication.processEvents()
-
                         if pol is not None and pol.is_valid and isinstance(pol, Polygon):
-                            # ----------------------------------------------------
-                            # This is where copper clearing is happening
-                            # ----------------------------------------------------
-                            res = self.clear_polygon_worker(pol=pol, tooldia=tool,
-                                                            ncc_method=ncc_method,
-                                                            ncc_overlap=ncc_overlap,
-                                                            ncc_connect=ncc_connect,
-                                                            ncc_contour=ncc_contour,
-                                                            simplify_tol=simplification_value,
-                                                            prog_plot=prog_plot)
-                            if res is not None:
-                                cleared_geo += res
-                            else:
-                                poly_failed += 1
+                            pols_to_clear.append(pol)
                         else:
                             self.app.log.warning(
                                 "Expected geo is a Polygon. Instead got a %s" % str(type(pol)))
 
-                        pol_nr += 1
-                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                        if old_disp_number < disp_number <= 100:
-                            self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                            old_disp_number = disp_number
-
-                    if poly_failed > 0:
+                # ----------------------------------------------------
+                # This is where copper clearing is happening
+                # ----------------------------------------------------
+                cleared_results = self.clear_polygons(pols_to_clear, tooldia=tool,
+                                                      ncc_method=ncc_method,
+                                                      ncc_overlap=ncc_overlap,
+                                                      ncc_connect=ncc_connect,
+                                                      ncc_contour=ncc_contour,
+                                                      simplify_tol=simplification_value,
+                                                      prog_plot=prog_plot)
+                for res in cleared_results:
+                    if res is not None:
+                        cleared_geo += res
+                    else:
                         app_obj.poly_not_cleared = True
 
                 # ---------------------------------------------------------
@@ -2577,7 +2568,7 @@ class NonCopperClear(AppTool, Gerber):
 
             # provide the app with a way to process the GUI events when in a blocking loop
             if not run_threaded:
-                QtWidgets.QApplication.processEvents()
+                process_gui_events()
 
             sorted_clear_tools.sort(reverse=True)
 
@@ -2631,7 +2622,7 @@ class NonCopperClear(AppTool, Gerber):
                     raise grace
 
                 # provide the app with a way to process the GUI events when in a blocking loop
-                QtWidgets.QApplication.processEvents()
+                process_gui_events()
 
                 app_obj.inform.emit('[success] %s = %s%s %s' % (
                     _('NCC Tool clearing with tool diameter'), str(tool), units.lower(), _('started.'))
@@ -2650,9 +2641,7 @@ class NonCopperClear(AppTool, Gerber):
                 ncc_overlap = float(tool_data_dict["tools_ncc_overlap"]) / 100.0
                 ncc_method = tool_data_dict["tools_ncc_method"]
 
-                # variables to display the percentage of work done
                 geo_len = len(area.geoms)
-                old_disp_number = 0
                 self.app.log.warning("Total number of polygons to be cleared: %s" % str(geo_len))
 
                 # def random_color():
@@ -2668,21 +2657,13 @@ class NonCopperClear(AppTool, Gerber):
                     tool_empty_area = flatten_shapely_geometry(area.geoms)
 
                 if tool_empty_area:
-                    poly_failed = 0
-                    pol_nr = 0
+                    pols_to_clear = []
                     for p in tool_empty_area:
-                        # provide the app with a way to process the GUI events when in a blocking loop
-                        if not run_threaded:
-                            QtWidgets.QApplication.processEvents()
-
                         if self.app.abort_flag:
                             # graceful abort requested by the user
                             raise grace
 
                         if p is not None and p.is_valid and not p.is_empty:
-                            # provide the app with a way to process the GUI events when in a blocking loop
-                            QtWidgets.QApplication.processEvents()
-
                             # speedup the clearing by not trying to clear polygons that is obvious they can't be
                             # cleared with the current tool. this tremendously reduce the clearing time
                             check_dist = -tool / 2
@@ -2691,44 +2672,28 @@ class NonCopperClear(AppTool, Gerber):
                             if not check_buff:
                                 continue
 
-                            # if self.app.dec_format(float(tool), self.decimals) == 0.15:
-                            #     # for testing purposes ----------------------------------
-                            #     self.app.tool_shapes.add(p, color=self.app.options['global_sel_line'],
-                            #                              face_color=random_color(),
-                            #                              update=True, layer=0, tolerance=None)
-                            #     self.app.tool_shapes.add(check_buff, color=self.app.options['global_sel_line'],
-                            #                              face_color='#FFFFFFFF',
-                            #                              update=True, layer=0, tolerance=None)
-                            #     # -------------------------------------------------------
-
-                            # actual copper clearing is done here
                             if isinstance(p, Polygon):
-                                res = self.clear_polygon_worker(pol=p, tooldia=tool,
-                                                                ncc_method=ncc_method,
-                                                                ncc_overlap=ncc_overlap,
-                                                                ncc_connect=ncc_connect,
-                                                                ncc_contour=ncc_contour,
-                                                                simplify_tol=simplification_value,
-                                                                prog_plot=prog_plot)
-
-                                if res is not None:
-                                    cleared_geo += res
-                                else:
-                                    poly_failed += 1
+                                pols_to_clear.append(p)
                             else:
                                 self.app.log.warning("Expected geo is a Polygon. Instead got a %s" % str(type(p)))
 
-                            if poly_failed > 0:
-                                app_obj.poly_not_cleared = True
-
-                            pol_nr += 1
-                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                            # log.debug("Polygons cleared: %d" % pol_nr)
+                    # actual copper clearing is done here
+                    cleared_results = self.clear_polygons(pols_to_clear, tooldia=tool,
+                                                          ncc_method=ncc_method,
+                                                          ncc_overlap=ncc_overlap,
+                                                          ncc_connect=ncc_connect,
+                                                          ncc_contour=ncc_contour,
+                                                          simplify_tol=simplification_value,
+                                                          prog_plot=prog_plot)
+                    poly_failed = 0
+                    for res in cleared_results:
+                        if res is not None:
+                            cleared_geo += res
+                        else:
+                            poly_failed += 1
 
-                            if old_disp_number < disp_number <= 100:
-                                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                                old_disp_number = disp_number
-                                # log.debug("Polygons cleared: %d. Percentage done: %d%%" % (pol_nr, disp_number))
+                    if poly_failed > 0:
+                        app_obj.poly_not_cleared = True
 
                     if self.app.abort_flag:
                         raise grace     # graceful abort requested by the user
@@ -2918,7 +2883,7 @@ class NonCopperClear(AppTool, Gerber):
             proc = self.app.proc_container.new('%s...' % _("Working"))
         else:
             self.app.proc_container.view.set_busy('%s...' % _("Working"))
-            QtWidgets.QApplication.processEvents()
+            process_gui_events()
 
         # #####################################################################
         # ####### Read the parameters #########################################
@@ -3046,7 +3011,7 @@ class NonCopperClear(AppTool, Gerber):
 
             # provide the app with a way to process the GUI events when in a blocking loop
             if not run_threaded:
-                QtWidgets.QApplication.processEvents()
+                process_gui_events()
 
             self.app.log.debug("NCC Tool. Normal copper clearing task started.")
             self.app.inform.emit(_("NCC Tool. Finished non-copper polygons. Normal copper clearing task started."))
@@ -3134,13 +3099,10 @@ class NonCopperClear(AppTool, Gerber):
                             app_obj.inform.emit('[WARNING_NOTCL] %s' % _("Isolation geometry is broken. Margin is less "
                                                                          "than isolation tool diameter."))
                         try:
+                            progress = progress_for(app_obj, len(isolated_geo))
                             for geo_elem in isolated_geo:
-                                # provide the app with a way to process the GUI events when in a blocking loop
-                                QtWidgets.QApplication.processEvents()
-
-                                if self.app.abort_flag:
-                                    # graceful abort requested by the user
-                                    raise grace
+                                # check for an abort and publish the progress
+                                progress.tick()
 
                                 if isinstance(geo_elem, Polygon):
                                     for ring in self.poly2rings(geo_elem):
@@ -3245,7 +3207,7 @@ class NonCopperClear(AppTool, Gerber):
                     raise grace
 
                 # provide the app with a way to process the GUI events when in a blocking loop
-                QtWidgets.QApplication.processEvents()
+                process_gui_events()
 
                 app_obj.inform.emit('[success] %s = %s%s %s' % (
                     _('NCC Tool clearing with tool diameter'), str(tool), units.lower(), _('started.'))
@@ -3266,20 +3228,14 @@ class NonCopperClear(AppTool, Gerber):
 
                 area = flatten_shapely_geometry(area)
 
-                # variables to display the percentage of work done
                 geo_len = len(area)
-
-                old_disp_number = 0
                 self.app.log.warning("Total number of polygons to be cleared. %s" % str(geo_len))
 
                 if not area:
                     continue
 
-                pol_nr = 0
+                pols_to_clear = []
                 for p in area:
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
-
                     if self.app.abort_flag:
                         # graceful abort requested by the user
                         raise grace
@@ -3288,46 +3244,24 @@ class NonCopperClear(AppTool, Gerber):
                     p = p.buffer(0)
 
                     if p and p.is_valid:
-                        poly_processed = []
                         if isinstance(p, Polygon):
-                            if ncc_method == 0:  # standard
-                                cp = self.clear_polygon_shrink(p, tool, self.circle_steps,
-                                                               overlap=overlap, contour=contour, connect=connect,
-                                                               prog_plot=False)
-                            elif ncc_method == 1:  # seed
-                                cp = self.clear_polygon_seed(p, tool, self.circle_steps,
-                                                             overlap=overlap, contour=contour, connect=connect,
-                                                             prog_plot=False)
-                            else:
-                                cp = self.clear_polygon_lines(p, tool, self.circle_steps,
-                                                              overlap=overlap, contour=contour, connect=connect,
-                                                              prog_plot=False)
-                            if cp:
-                                cleared_geo += list(cp.get_objects())
-                                poly_processed.append(True)
-                            else:
-                                poly_processed.append(False)
-                                self.app.log.warning("Polygon can not be cleared.")
+                            pols_to_clear.append(p)
                         else:
                             self.app.log.warning("Geo can not be cleared because it is: %s" % str(type(p)))
 
-                        p_cleared = poly_processed.count(True)
-                        p_not_cleared = poly_processed.count(False)
-
-                        if p_not_cleared:
-                            app_obj.poly_not_cleared = True
-
-                        if p_cleared == 0:
-                            continue
-
-                        pol_nr += 1
-                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                        # log.debug("Polygons cleared: %d" % pol_nr)
-
-                        if old_disp_number < disp_number <= 100:
-                            self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                            old_disp_number = disp_number
-                            # log.debug("Polygons cleared: %d. Percentage done: %d%%" % (pol_nr, disp_number))
+                # the methods other than 'standard' and 'seed' are done with 'lines'
+                cleared_results = self.clear_polygons(pols_to_clear, tooldia=tool,
+                                                      ncc_method=ncc_method if ncc_method in [0, 1] else 2,
+                                                      ncc_overlap=overlap,
+                                                      ncc_connect=connect,
+                                                      ncc_contour=contour,
+                                                      prog_plot=False)
+                for res in cleared_results:
+                    if res is not None:
+                        cleared_geo += res
+                    else:
+                        app_obj.poly_not_cleared = True
+                        self.app.log.warning("Polygon can not be cleared.")
 
                     # check if there is a geometry at all in the cleared geometry
                 if cleared_geo:
@@ -3421,7 +3355,7 @@ class NonCopperClear(AppTool, Gerber):
 
             # provide the app with a way to process the GUI events when in a blocking loop
             if not run_threaded:
-                QtWidgets.QApplication.processEvents()
+                process_gui_events()
 
             # a flag to signal that the isolation is broken by the bounding box in 'area' and 'box' cases
             # will store the number of tools for which the isolation is broken
@@ -3482,13 +3416,10 @@ class NonCopperClear(AppTool, Gerber):
                                                                      "than isolation tool diameter."))
 
                         try:
+                            progress = progress_for(app_obj, len(isolated_geo))
                             for geo_elem in isolated_geo:
-                                # provide the app with a way to process the GUI events when in a blocking loop
-                                QtWidgets.QApplication.processEvents()
-
-                                if self.app.abort_flag:
-                                    # graceful abort requested by the user
-                                    raise grace
+                                # check for an abort and publish the progress
+                                progress.tick()
 
                                 if isinstance(geo_elem, Polygon):
                                     for ring in self.poly2rings(geo_elem):
@@ -3610,13 +3541,10 @@ class NonCopperClear(AppTool, Gerber):
                 cleared_geo[:] = []
 
                 # Area to clear
+                progress = progress_for(app_obj, len(cleared_by_last_tool))
                 for poly_r in cleared_by_last_tool:
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
-
-                    if self.app.abort_flag:
-                        # graceful abort requested by the user
-                        raise grace
+                    # check for an abort and publish the progress
+                    progress.tick()
                     try:
                         area = area.difference(poly_r)
                     except Exception:
@@ -3635,14 +3563,12 @@ class NonCopperClear(AppTool, Gerber):
                 area = MultiPolygon(deepcopy(allparts))
                 allparts[:] = []
 
-                # variables to display the percentage of work done
                 geo_len = len(area.geoms)
-                old_disp_number = 0
                 self.app.log.warning("Total number of polygons to be cleared. %s" % str(geo_len))
 
                 if area.geoms:
                     if len(area.geoms) > 0:
-                        pol_nr = 0
+                        pols_to_clear = []
                         for p in area.geoms:
                             if self.app.abort_flag:
                                 # graceful abort requested by the user
@@ -3652,73 +3578,22 @@ class NonCopperClear(AppTool, Gerber):
                             p = p.buffer(0)
 
                             if p is not None and p.is_valid:
-                                # provide the app with a way to process the GUI events when in a blocking loop
-                                QtWidgets.QApplication.processEvents()
-
-                                if isinstance(p, Polygon):
-                                    try:
-                                        if ncc_method == 0:     # standard
-                                            cp = self.clear_polygon_shrink(p, tool_used,
-                                                                           self.circle_steps,
-                                                                           overlap=overlap, contour=contour, connect=connect,
-                                                                           prog_plot=False)
-                                        elif ncc_method == 1:   # seed
-                                            cp = self.clear_polygon_seed(p, tool_used,
-                                                                         self.circle_steps,
-                                                                         overlap=overlap, contour=contour, connect=connect,
-                                                                         prog_plot=False)
-                                        else:
-                                            cp = self.clear_polygon_lines(p, tool_used,
-                                                                          self.circle_steps,
-                                                                          overlap=overlap, contour=contour, connect=connect,
-                                                                          prog_plot=False)
-                                        cleared_geo.append(list(cp.get_objects()))
-                                    except Exception as ee:
-                                        self.app.log.error("Polygon can't be cleared. %s" % str(ee))
-                                        # this polygon should be added to a list and then try clear it with
-                                        # a smaller tool
-                                        rest_geo.append(p)
-                                elif isinstance(p, MultiPolygon):
-                                    for poly_p in p.geoms:
-                                        if poly_p is not None:
-                                            # provide the app with a way to process the GUI events when
-                                            # in a blocking loop
-                                            QtWidgets.QApplication.processEvents()
-
-                                            try:
-                                                if ncc_method == 0:     # 'standard'
-                                                    cp = self.clear_polygon_shrink(poly_p, tool_used,
-                                                                                   self.circle_steps,
-                                                                                   overlap=overlap, contour=contour,
-                                                                                   connect=connect,
-                                                                                   prog_plot=False)
-                                                elif ncc_method == 1:   # 'seed'
-                                                    cp = self.clear_polygon_seed(poly_p, tool_used,
-                                                                                 self.circle_steps,
-                                                                                 overlap=overlap, contour=contour,
-                                                                                 connect=connect,
-                                                                                 prog_plot=False)
-                                                else:
-                                                    cp = self.clear_polygon_lines(poly_p, tool_used,
-                                                                                  self.circle_steps,
-                                                                                  overlap=overlap, contour=contour,
-                                                                                  connect=connect,
-                                                                                  prog_plot=False)
-                                                cleared_geo.append(list(cp.get_objects()))
-                                            except Exception as eee:
-                                                self.app.log.error("Polygon can't be cleared. %s" % str(eee))
-                                                # this polygon should be added to a list and then try clear it with
-                                                # a smaller tool
-                                                rest_geo.append(poly_p)
-
-                                pol_nr += 1
-                                disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                # log.debug("Polygons cleared: %d" % pol_nr)
-
-                                if old_disp_number < disp_number <= 100:
-                                    self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                                    old_disp_number = disp_number
-                                    # log.debug("Polygons cleared: %d. Percentage done: %d%%" % (pol_nr, disp_number))
+                                pols_to_clear += flatten_shapely_geometry(p)
+
+                        # the methods other than 'standard' and 'seed' are done with 'lines'
+                        cleared_results = self.clear_polygons(pols_to_clear, tooldia=tool_used,
+                                                              ncc_method=ncc_method if ncc_method in [0, 1] else 2,
+                                                              ncc_overlap=overlap,
+                                                              ncc_connect=connect,
+                                                              ncc_contour=contour,
+                                                              prog_plot=False)
+                        for poly_p, res in zip(pols_to_clear, cleared_results):
+                            if res is not None:
+                                cleared_geo.append(res)
+                            else:
+                                self.app.log.error("Polygon can't be cleared.")
+                                # this polygon should be added to a list and then try clear it with a smaller tool
+                                rest_geo.append(poly_p)
 
                         if self.app.abort_flag:
                             # graceful abort requested by the user
@@ -3849,9 +3724,6 @@ class NonCopperClear(AppTool, Gerber):
         if isinstance(target, list):
             target = MultiPolygon(target)
 
-        pol_nr = 0
-        old_disp_number = 0
-
         if boundary is None:
             boundary = target.envelope
         else:
@@ -3862,20 +3734,11 @@ class NonCopperClear(AppTool, Gerber):
         except Exception:
             try:
                 target_geoms = target.geoms if isinstance(target, MultiPolygon) else target
+                progress = progress_for(self.app, geo_len)
                 for el in target_geoms:
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
-                    if self.app.abort_flag:
-                        # graceful abort requested by the user
-                        raise grace
-
                     boundary = boundary.difference(el)
-                    pol_nr += 1
-                    disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-
-                    if old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        old_disp_number = disp_number
+                    # check for an abort and publish the progress
+                    progress.tick()
                 return boundary
             except Exception:
                 self.app.inform.emit('[ERROR_NOTCL] %s' %
@@ -101,9 +101,6 @@ class ObjectDistance(AppTool):
         # activate the plugin
         self.activate_measure_tool()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Shift+M', **kwargs)
-
     def connect_signals_at_init(self):
         self.ui.measure_btn.clicked.connect(self.activate_measure_tool)
         self.ui.jump_hp_btn.clicked.connect(self.on_jump_to_half_point)
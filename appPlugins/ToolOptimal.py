@@ -9,13 +9,11 @@ from PyQt6 import QtWidgets, QtCore, QtGui
 from appTool import AppTool
 from appGUI.GUIElements import VerticalScrollArea, FCLabel, FCButton, FCFrame, GLay, FCComboBox, FCCheckBox, \
     FCEntry, FCTextArea, FCSpinner, OptionalHideInputSection
-from camlib import grace, flatten_shapely_geometry
+from camlib import grace, flatten_shapely_geometry, find_min_clearances, progress_for
 
 import logging
-import numpy as np
 
 from shapely import MultiPolygon
-from shapely.ops import nearest_points
 
 import gettext
 import appTranslation as fcTranslate
@@ -52,13 +50,10 @@ class ToolOptimal(AppTool):
         # this is the line selected in the textbox with the locations of the other distances found in the Gerber object
         self.selected_locations_text = ''
 
-        # dict to hold the distances between every two elements in Gerber as keys and the actual locations where that
-        # distances happen as values
+        # dict to hold the smallest distances between the elements in Gerber as keys and the actual locations where
+        # that distances happen as values
         self.min_dict = {}
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+O', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolOptimal()")
 
@@ -185,6 +180,7 @@ class ToolOptimal(AppTool):
         self.ui.freq_entry.set_value(0)
 
         self.ui.precision_spinner.set_value(int(self.app.options["tools_opt_precision"]))
+        self.ui.max_distances_spinner.set_value(int(self.app.options["tools_opt_max_distances"]))
         self.ui.locations_textb.clear()
         # new cursor - select all document
         cursor = self.ui.locations_textb.textCursor()
@@ -211,6 +207,8 @@ class ToolOptimal(AppTool):
     def find_minimum_distance(self):
         self.units = self.app.app_units.upper()
         self.decimals = int(self.ui.precision_spinner.get_value())
+        # how many of the smallest distances between the elements in Gerber are searched for
+        max_distances = int(self.ui.max_distances_spinner.get_value())
 
         selection_index = self.ui.gerber_object_combo.currentIndex()
 
@@ -231,8 +229,6 @@ class ToolOptimal(AppTool):
         def job_thread(app_obj, plugin_instance):
             app_obj.inform.emit(_("Optimal Tool. Started to search for the minimum distance between copper features."))
             try:
-                old_disp_number = 0
-                pol_nr = 0
                 app_obj.proc_container.update_view_text(' %d%%' % 0)
                 total_geo = []
 
@@ -262,42 +258,13 @@ class ToolOptimal(AppTool):
                                           "There are no distances between geometry elements to be found."))
                     return 'fail'
 
-                geo_len = (geo_len * (geo_len - 1)) / 2
+                app_obj.inform.emit(_("Optimal Tool. Finding the distances between each two elements."))
 
-                app_obj.inform.emit(
-                    '%s: %s' % (_("Optimal Tool. Finding the distances between each two elements. Iterations"),
-                                str(geo_len)))
-
-                plugin_instance.min_dict = {}
-                idx = 1
-                for geo in total_geo:
-                    for s_geo in total_geo[idx:]:
-                        if app_obj.abort_flag:
-                            # graceful abort requested by the user
-                            raise grace
-
-                        # minimize the number of distances by not taking into considerations those that are too small
-                        dist = geo.distance(s_geo)
-                        dist = app_obj.dec_format(dist, plugin_instance.decimals)
-                        loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                        proc_loc = (
-                            (app_obj.dec_format(loc_1.x, self.decimals), app_obj.dec_format(loc_1.y, self.decimals)),
-                            (app_obj.dec_format(loc_2.x, self.decimals), app_obj.dec_format(loc_2.y, self.decimals))
-                        )
-
-                        if dist in plugin_instance.min_dict:
-                            plugin_instance.min_dict[dist].append(proc_loc)
-                        else:
-                            plugin_instance.min_dict[dist] = [proc_loc]
-
-                        pol_nr += 1
-                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-
-                        if old_disp_number < disp_number <= 100:
-                            app_obj.proc_container.update_view_text(' %d%%' % disp_number)
-                            old_disp_number = disp_number
-                    idx += 1
+                # only the smallest distances are of interest; the first one is the result and the others are
+                # displayed in the 'Other distances' section. The abort is checked for each element
+                progress = progress_for(app_obj, 2 * geo_len)
+                plugin_instance.min_dict = find_min_clearances(total_geo, k=max_distances,
+                                                               decimals=plugin_instance.decimals, progress=progress)
 
                 app_obj.inform.emit(_("Optimal Tool. Finding the minimum distance."))
 
@@ -535,6 +502,18 @@ class OptimalUI:
         param_grid.addWidget(self.precision_label, 0, 0)
         param_grid.addWidget(self.precision_spinner, 0, 1)
 
+        # Number of distances searched for
+        self.max_distances_label = FCLabel('%s:' % _("Distances"))
+        self.max_distances_label.setToolTip(
+            _("How many of the smallest distances between the copper features are found.\n"
+              "The first one is the result and the others are listed in 'Other distances'.")
+        )
+
+        self.max_distances_spinner = FCSpinner(callback=self.confirmation_message_int)
+        self.max_distances_spinner.set_range(1, 100000)
+        param_grid.addWidget(self.max_distances_label, 2, 0)
+        param_grid.addWidget(self.max_distances_spinner, 2, 1)
+
         # #############################################################################################################
         # Results Frame
         # #############################################################################################################
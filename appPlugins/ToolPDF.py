@@ -76,9 +76,6 @@ class ToolPDF(AppTool):
         self.set_tool_ui()
         self.on_open_pdf_click()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='', **kwargs)
-
     def set_tool_ui(self):
         pass
 
@@ -31,7 +31,7 @@ import appTranslation as fcTranslate
 import builtins
 
 from appParsers.ParseGerber import Gerber
-from camlib import Geometry, AppRTreeStorage, grace, flatten_shapely_geometry
+from camlib import Geometry, AppRTreeStorage, grace, flatten_shapely_geometry, progress_for
 
 fcTranslate.apply_language('strings')
 if '_' not in builtins.__dict__:
@@ -153,9 +153,6 @@ class ToolPaint(AppTool, Gerber):
         self.ui.reference_combo.setCurrentIndex(0)
         self.ui.reference_combo.obj_type = {0: "Gerber", 1: "Excellon", 2: "Geometry"}[obj_type]
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+P', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolPaint()")
 
@@ -1620,7 +1617,7 @@ class ToolPaint(AppTool, Gerber):
             self.delete_moving_selection_shape()
             self.delete_tool_selection_shape()
 
-    def paint_polygon_worker(self, polyg, tooldiameter, paint_method, over, conn, cont, prog_plot, obj):
+    def paint_polygon_worker(self, polyg, tooldiameter, paint_method, over, conn, cont, prog_plot, obj, progress=None):
 
         cpoly = None
 
@@ -1633,7 +1630,7 @@ class ToolPaint(AppTool, Gerber):
                                                   overlap=over,
                                                   contour=cont,
                                                   connect=conn,
-                                                  prog_plot=prog_plot)
+                                                  prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -1647,7 +1644,7 @@ class ToolPaint(AppTool, Gerber):
                                                 overlap=over,
                                                 contour=cont,
                                                 connect=conn,
-                                                prog_plot=prog_plot)
+                                                prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -1661,7 +1658,7 @@ class ToolPaint(AppTool, Gerber):
                                                  overlap=over,
                                                  contour=cont,
                                                  connect=conn,
-                                                 prog_plot=prog_plot)
+                                                 prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -1733,7 +1730,7 @@ class ToolPaint(AppTool, Gerber):
                                                               overlap=over,
                                                               contour=True,
                                                               connect=conn,
-                                                              prog_plot=prog_plot)
+                                                              prog_plot=prog_plot, progress=progress)
                                 pads_lines_list += [p for p in f_o.get_objects() if p]
                             # this is the same as above but I keep it in case I will modify something in the future
                             elif ap_type == 'O':
@@ -1744,7 +1741,7 @@ class ToolPaint(AppTool, Gerber):
                                                               overlap=over,
                                                               contour=True,
                                                               connect=conn,
-                                                              prog_plot=prog_plot)
+                                                              prog_plot=prog_plot, progress=progress)
                                 pads_lines_list += [p for p in f_o.get_objects() if p]
 
                             elif ap_type == 'R':
@@ -1755,7 +1752,7 @@ class ToolPaint(AppTool, Gerber):
                                                                overlap=over,
                                                                contour=True,
                                                                connect=conn,
-                                                               prog_plot=prog_plot)
+                                                               prog_plot=prog_plot, progress=progress)
 
                                 pads_lines_list += [p for p in f_o.get_objects() if p]
             except grace:
@@ -1787,7 +1784,7 @@ class ToolPaint(AppTool, Gerber):
                                                        overlap=over,
                                                        contour=cont,
                                                        connect=conn,
-                                                       prog_plot=prog_plot)
+                                                       prog_plot=prog_plot, progress=progress)
 
                             copper_lines_list += [p for p in t_o.get_objects() if p]
             except grace:
@@ -1815,7 +1812,7 @@ class ToolPaint(AppTool, Gerber):
                                                  overlap=over,
                                                  contour=cont,
                                                  connect=conn,
-                                                 prog_plot=prog_plot)
+                                                 prog_plot=prog_plot, progress=progress)
 
                 if cpoly and cpoly.objects:
                     pass
@@ -1827,7 +1824,7 @@ class ToolPaint(AppTool, Gerber):
                                                     overlap=over,
                                                     contour=cont,
                                                     connect=conn,
-                                                    prog_plot=prog_plot)
+                                                    prog_plot=prog_plot, progress=progress)
                     if cpoly and cpoly.objects:
                         pass
                     else:
@@ -1838,7 +1835,7 @@ class ToolPaint(AppTool, Gerber):
                                                           overlap=over,
                                                           contour=cont,
                                                           connect=conn,
-                                                          prog_plot=prog_plot)
+                                                          prog_plot=prog_plot, progress=progress)
             except grace:
                 return "fail"
             except Exception as ee:
@@ -1914,7 +1911,6 @@ class ToolPaint(AppTool, Gerber):
             tool_dia = None
             current_uid = None
             final_solid_geometry = []
-            old_disp_number = 0
 
             # sort the tools if we have an order selected in the UI
             if order == 1:  # Forward
@@ -1964,7 +1960,7 @@ class ToolPaint(AppTool, Gerber):
 
                 self.app.log.warning("Total number of polygons to be cleared. %s" % str(geo_len))
 
-                pol_nr = 0
+                progress = progress_for(app_obj, geo_len)
 
                 # -----------------------------
                 # effective polygon clearing job
@@ -1972,23 +1968,14 @@ class ToolPaint(AppTool, Gerber):
                 try:
                     cp_list = []
                     for pp in poly_buf:
-                        # provide the app with a way to process the GUI events when in a blocking loop
-                        QtWidgets.QApplication.processEvents()
-                        if self.app.abort_flag:
-                            # graceful abort requested by the user
-                            raise grace
+                        progress.check_abort()
                         geo_res = self.paint_polygon_worker(pp, tooldiameter=tool_dia, over=over, conn=conn,
                                                             cont=cont, paint_method=paint_method, obj=obj,
-                                                            prog_plot=prog_plot)
+                                                            prog_plot=prog_plot, progress=progress)
                         if geo_res:
                             cp_list.append(geo_res)
-                        pol_nr += 1
-                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                        # log.debug("Polygons cleared: %d" % pol_nr)
-
-                        if old_disp_number < disp_number <= 100:
-                            self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                            old_disp_number = disp_number
+                        # check for an abort and publish the progress
+                        progress.tick()
 
                     total_geometry = []
                     if cp_list:
@@ -2073,7 +2060,6 @@ class ToolPaint(AppTool, Gerber):
         def job_rest_clear(geo_obj, app_obj):
             current_uid = None
             final_solid_geometry = []
-            old_disp_number = 0
 
             # sort the tools reversed for the rest machining
             sorted_tools.sort(reverse=True)
@@ -2128,7 +2114,7 @@ class ToolPaint(AppTool, Gerber):
                 conn = tools_storage[current_uid]['data']['tools_paint_connect']
                 cont = tools_storage[current_uid]['data']['tools_paint_contour']
 
-                pol_nr = 0
+                progress = progress_for(app_obj, geo_len)
 
                 # store here the parts of polygons that could not be cleared; actually those are parts of polygons
                 rest_list = []
@@ -2139,11 +2125,8 @@ class ToolPaint(AppTool, Gerber):
                 try:
                     cleared_geo = []
                     for pp in poly_buf:
-                        # provide the app with a way to process the GUI events when in a blocking loop
-                        QtWidgets.QApplication.processEvents()
-                        if self.app.abort_flag:
-                            # graceful abort requested by the user
-                            raise grace
+                        # check for an abort and publish the progress
+                        progress.tick()
 
                         # speedup the clearing by not trying to clear polygons that is clear they can't be
                         # cleared with the current tool. this tremendously reduce the clearing time
@@ -2154,7 +2137,7 @@ class ToolPaint(AppTool, Gerber):
 
                         geo_res = self.paint_polygon_worker(pp, tooldiameter=tool_dia, over=over, conn=conn,
                                                             cont=cont, paint_method=paint_method, obj=obj,
-                                                            prog_plot=prog_plot)
+                                                            prog_plot=prog_plot, progress=progress)
 
                         if simplification_value > 0.0:
                             geo_elems = [x.simplify(simplification_value) for x in geo_res.get_objects()]
@@ -2172,14 +2155,6 @@ class ToolPaint(AppTool, Gerber):
 
                         if geo_res:
                             cleared_geo += geo_elems
-
-                        pol_nr += 1
-                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                        # log.debug("Polygons cleared: %d" % pol_nr)
-
-                        if old_disp_number < disp_number <= 100:
-                            self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                            old_disp_number = disp_number
                 except grace:
                     return "fail"
                 except Exception as e:
@@ -9,15 +9,15 @@ from PyQt6 import QtWidgets, QtCore, QtGui
 from appTool import AppTool
 from appGUI.GUIElements import VerticalScrollArea, FCLabel, FCButton, FCFrame, GLay, FCComboBox, FCCheckBox, \
     RadioSet, FCDoubleSpinner, FCSpinner, OptionalInputSection
-from camlib import grace
+from camlib import grace, panel_offsets, flatten_geometry_list, panelize_geometry, panelize_points, \
+    panelize_slots, panelize_apertures
 
 import logging
 from copy import deepcopy
 import numpy as np
 
-from shapely import LineString, MultiLineString, Polygon, MultiPolygon
+from shapely import LineString, MultiLineString, Polygon
 from shapely.ops import unary_union, linemerge, snap
-from shapely.affinity import translate
 
 import gettext
 import appTranslation as fcTranslate
@@ -110,9 +110,6 @@ class Panelize(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Panelization"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+Z', **kwargs)
-
     def connect_signals_at_init(self):
         self.ui.level.toggled.connect(self.on_level_changed)
         self.ui.reference_radio.activated_custom.connect(self.on_reference_radio_changed)
@@ -170,6 +167,8 @@ class Panelize(AppTool):
             self.app.options["tools_panelize_optimization"] else True
         self.ui.optimization_cb.set_value(optimized_path_cb)
 
+        self.ui.instanced_cb.set_value(bool(self.app.options["tools_panelize_instanced"]))
+
         c_cb = self.app.options["tools_panelize_constrain"] if \
             self.app.options["tools_panelize_constrain"] else False
         self.ui.constrain_cb.set_value(c_cb)
@@ -401,22 +400,54 @@ class Panelize(AppTool):
                 copied_apertures[tt] = deepcopy(tt_val)
 
         to_optimize = self.ui.optimization_cb.get_value()
+        instanced = self.ui.instanced_cb.get_value()
+
+        # the offsets of the panel copies, row by row
+        offsets = panel_offsets(rows, columns, lenghtx, lenghty)
 
         def panelize_worker():
             if panel_source_obj is not None:
                 self.app.inform.emit(_("Generating panel ... "))
 
+                def copy_progress(copy_nr):
+                    # graceful abort requested by the user
+                    if self.app.abort_flag:
+                        raise grace
+
+                    disp_number = int(np.interp(copy_nr, [0, len(offsets)], [0, 100]))
+                    self.app.proc_container.update_view_text(' %s: %d%%' % (_("Copy"), disp_number))
+
+                def panel_geometry(geometry):
+                    # in an instanced panel the geometry is stored only once
+                    if instanced:
+                        return flatten_geometry_list(geometry)
+                    return panelize_geometry(geometry, offsets, callback=copy_progress)
+
+                def panelize_source_geometry(new_obj):
+                    new_obj.solid_geometry = []
+
+                    # create the panel structure out of the source object structure
+                    if panel_source_obj.kind == 'geometry':
+                        new_obj.multigeo = panel_source_obj.multigeo
+                        new_obj.tools = copied_tools
+                        if panel_source_obj.multigeo is True:
+                            for tool in new_obj.tools:
+                                new_obj.tools[tool]['solid_geometry'] = panel_geometry(
+                                    new_obj.tools[tool]['solid_geometry'])
+                    elif panel_source_obj.kind == 'gerber':
+                        new_obj.tools = copied_apertures
+                        for apid in new_obj.tools:
+                            aperture_geo = new_obj.tools[apid].get('geometry') or []
+                            if not instanced:
+                                aperture_geo = panelize_apertures(aperture_geo, offsets, callback=copy_progress)
+                            new_obj.tools[apid]['geometry'] = aperture_geo
+
+                    # Panelize the solid_geometry - always done
+                    new_obj.solid_geometry = panel_geometry(panel_source_obj.solid_geometry)
+
                 def job_init_excellon(obj_fin, app_obj):
                     obj_fin.multitool = True
 
-                    currenty = 0.0
-                    # init the storage for drills and for slots
-                    for tool in copied_tools:
-                        copied_tools[tool]['drills'] = []
-                        copied_tools[tool]['slots'] = []
-                    obj_fin.tools = copied_tools
-                    obj_fin.solid_geometry = []
-
                     for option in panel_source_obj.obj_options:
                         if option != 'name':
                             try:
@@ -424,317 +455,47 @@ class Panelize(AppTool):
                             except KeyError:
                                 app_obj.log.warning("Failed to copy option. %s" % str(option))
 
-                    # calculate the total number of drills and slots
-                    geo_len_drills = 0
-                    geo_len_slots = 0
-                    for tool in copied_tools:
-                        geo_len_drills += len(copied_tools[tool]['drills'])
-                        geo_len_slots += len(copied_tools[tool]['slots'])
-
                     # panelization
-                    element = 0
-                    for row in range(rows):
-                        currentx = 0.0
-                        for col in range(columns):
-                            element += 1
-                            old_disp_number = 0
-
-                            for tool in panel_source_obj.tools:
-                                if 'drills' in panel_source_obj.tools[tool]:
-                                    if panel_source_obj.tools[tool]['drills']:
-                                        drill_nr = 0
-                                        for drill in panel_source_obj.tools[tool]['drills']:
-                                            # graceful abort requested by the user
-                                            if self.app.abort_flag:
-                                                raise grace
-
-                                            # offset / panelization
-                                            point_offseted = translate(drill, currentx, currenty)
-                                            obj_fin.tools[tool]['drills'].append(point_offseted)
-
-                                            # update progress
-                                            drill_nr += 1
-                                            disp_number = int(np.interp(drill_nr, [0, geo_len_drills], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                self.app.proc_container.update_view_text(' %s: %d D:%d%%' %
-                                                                                         (_("Copy"),
-                                                                                          int(element),
-                                                                                          disp_number))
-                                                old_disp_number = disp_number
-                                else:
-                                    panel_source_obj.tools[tool]['drills'] = []
-
-                                if 'slots' in panel_source_obj.tools[tool]:
-                                    if panel_source_obj.tools[tool]['slots']:
-                                        slot_nr = 0
-                                        for slot in panel_source_obj.tools[tool]['slots']:
-                                            # graceful abort requested by the user
-                                            if self.app.abort_flag:
-                                                raise grace
-
-                                            # offset / panelization
-                                            start_offseted = translate(slot[0], currentx, currenty)
-                                            stop_offseted = translate(slot[1], currentx, currenty)
-                                            offseted_slot = (
-                                                start_offseted,
-                                                stop_offseted
-                                            )
-                                            obj_fin.tools[tool]['slots'].append(offseted_slot)
-
-                                            # update progress
-                                            slot_nr += 1
-                                            disp_number = int(np.interp(slot_nr, [0, geo_len_slots], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                self.app.proc_container.update_view_text(' %s: %d S:%d%%' %
-                                                                                         (_("Copy"),
-                                                                                          int(element),
-                                                                                          disp_number))
-                                                old_disp_number = disp_number
-                                else:
-                                    panel_source_obj.tools[tool]['slots'] = []
-
-                            currentx += lenghtx
-                        currenty += lenghty
+                    for tool in copied_tools:
+                        # graceful abort requested by the user
+                        if self.app.abort_flag:
+                            raise grace
+
+                        drills = copied_tools[tool].get('drills') or []
+                        slots = copied_tools[tool].get('slots') or []
+                        if instanced:
+                            copied_tools[tool]['drills'] = drills
+                            copied_tools[tool]['slots'] = slots
+                        else:
+                            copied_tools[tool]['drills'] = panelize_points(drills, offsets)
+                            copied_tools[tool]['slots'] = panelize_slots(slots, offsets)
+                    obj_fin.tools = copied_tools
+                    obj_fin.solid_geometry = []
 
                     obj_fin.create_geometry()
                     obj_fin.zeros = panel_source_obj.zeros
                     obj_fin.units = panel_source_obj.units
-                    app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
-                    obj_fin.source_file = self.app.f_handlers.export_excellon(obj_name=self.outname,
-                                                                              filename=None,
-                                                                              local_use=obj_fin,
-                                                                              use_thread=False)
+
+                    # set last: reading the geometry of an instanced panel makes the copies
+                    if instanced:
+                        obj_fin.instance_offsets = offsets.tolist()
+
+                    # the source code of an instanced panel is made when the panel is expanded
+                    if not instanced:
+                        app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
+                        obj_fin.source_file = self.app.f_handlers.export_excellon(obj_name=self.outname,
+                                                                                  filename=None,
+                                                                                  local_use=obj_fin,
+                                                                                  use_thread=False)
                     app_obj.proc_container.update_view_text('')
 
                 def job_init_geometry(new_obj, app_obj):
-                    currentx = 0.0
-                    currenty = 0.0
-
-                    def translate_recursion(geom):
-                        if type(geom) == list:
-                            geoms = []
-                            for local_geom in geom:
-                                res_geo = translate_recursion(local_geom)
-                                try:
-                                    geoms += res_geo
-                                except TypeError:
-                                    geoms.append(res_geo)
-                            return geoms
-                        else:
-                            return translate(geom, xoff=currentx, yoff=currenty)
-
-                    new_obj.solid_geometry = []
-
-                    # create the initial structure on which to create the panel
-                    if panel_source_obj.kind == 'geometry':
-                        new_obj.multigeo = panel_source_obj.multigeo
-                        new_obj.tools = copied_tools
-                        if panel_source_obj.multigeo is True:
-                            for tool in panel_source_obj.tools:
-                                new_obj.tools[tool]['solid_geometry'] = []
-                        else:
-                            new_obj.solid_geometry = panel_source_obj.solid_geometry
-                    elif panel_source_obj.kind == 'gerber':
-                        new_obj.tools = copied_apertures
-                        for ap in new_obj.tools:
-                            new_obj.tools[ap]['geometry'] = []
-
-                    # find the number of polygons in the source solid_geometry
-                    geo_len = 0
-                    if panel_source_obj.kind == 'geometry':
-                        if panel_source_obj.multigeo is True:
-                            for tool in panel_source_obj.tools:
-                                try:
-                                    source_geo = panel_source_obj.tools[tool]['solid_geometry']
-                                    work_geo = source_geo.geoms if \
-                                        isinstance(source_geo, (MultiPolygon, MultiLineString)) else source_geo
-                                    geo_len += len(work_geo)
-                                except TypeError:
-                                    geo_len += 1
-                        else:
-                            try:
-                                source_geo = panel_source_obj.solid_geometry
-                                work_geo = source_geo.geoms if \
-                                    isinstance(source_geo, (MultiPolygon, MultiLineString)) else source_geo
-                                geo_len = len(work_geo)
-                            except TypeError:
-                                geo_len = 1
-                    elif panel_source_obj.kind == 'gerber':
-                        for ap in panel_source_obj.tools:
-                            if 'geometry' in panel_source_obj.tools[ap]:
-                                try:
-                                    source_geo = panel_source_obj.tools[ap]['geometry']
-                                    work_geo = source_geo.geoms if isinstance(source_geo, MultiPolygon) else source_geo
-                                    geo_len += len(work_geo)
-                                except TypeError:
-                                    geo_len += 1
-
-                    element = 0
-                    for row in range(rows):
-                        currentx = 0.0
-
-                        for col in range(columns):
-                            element += 1
-                            old_disp_number = 0
-
-                            # Will panelize a Geometry Object
-                            if panel_source_obj.kind == 'geometry':
-                                if panel_source_obj.multigeo is True:
-                                    for tool in panel_source_obj.tools:
-                                        # graceful abort requested by the user
-                                        if app_obj.abort_flag:
-                                            raise grace
-
-                                        # calculate the number of polygons
-                                        try:
-                                            source_geo = panel_source_obj.tools[tool]['solid_geometry']
-                                            work_geo = source_geo.geoms if \
-                                                isinstance(source_geo, (MultiPolygon, MultiLineString)) else source_geo
-                                            geo_len = len(work_geo)
-                                        except TypeError as err:
-                                            self.app.log.error(
-                                                "Panelize.on_panelize.panelize_worker() -> %s" % str(err))
-                                            geo_len = 1
-
-                                        # panelization
-                                        pol_nr = 0
-
-                                        trans_geo = translate_recursion(panel_source_obj.tools[tool]['solid_geometry'])
-                                        try:
-                                            work_geo = trans_geo.geoms if \
-                                                isinstance(trans_geo, (MultiPolygon, MultiLineString)) else trans_geo
-                                            for trans_it in work_geo:
-                                                if not trans_it.is_empty:
-                                                    new_obj.tools[tool]['solid_geometry'].append(trans_it)
-
-                                                # update progress
-                                                pol_nr += 1
-                                                disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                                if old_disp_number < disp_number <= 100:
-                                                    app_obj.proc_container.update_view_text(
-                                                        ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                    old_disp_number = disp_number
-                                        except TypeError:
-                                            if not trans_geo.is_empty:
-                                                new_obj.tools[tool]['solid_geometry'].append(trans_geo)
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-
-                                # #####################################################################################
-                                # ##########   Panelize the solid_geometry - always done  #############################
-                                # #####################################################################################
-                                # graceful abort requested by the user
-                                if app_obj.abort_flag:
-                                    raise grace
-
-                                # calculate the number of polygons
-                                try:
-                                    source_geo = panel_source_obj.solid_geometry
-                                    work_geo = source_geo.geoms if \
-                                        isinstance(source_geo, (MultiPolygon, MultiLineString)) else source_geo
-                                    geo_len = len(work_geo)
-                                except TypeError:
-                                    geo_len = 1
-
-                                # panelization
-                                pol_nr = 0
-                                try:
-                                    sol_geo = panel_source_obj.solid_geometry
-                                    work_geo = sol_geo.geoms if \
-                                        isinstance(sol_geo, (MultiPolygon, MultiLineString)) else sol_geo
-                                    for geo_el in work_geo:
-                                        if app_obj.abort_flag:
-                                            # graceful abort requested by the user
-                                            raise grace
-
-                                        trans_geo = translate_recursion(geo_el)
-                                        new_obj.solid_geometry.append(trans_geo)
-
-                                        # update progress
-                                        pol_nr += 1
-                                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                        if old_disp_number < disp_number <= 100:
-                                            app_obj.proc_container.update_view_text(
-                                                ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                            old_disp_number = disp_number
-
-                                except TypeError:
-                                    trans_geo = translate_recursion(panel_source_obj.solid_geometry)
-                                    new_obj.solid_geometry.append(trans_geo)
-
-                            # Will panelize a Gerber Object
-                            if panel_source_obj.kind == 'gerber':
-                                # graceful abort requested by the user
-                                if self.app.abort_flag:
-                                    raise grace
-
-                                for apid in panel_source_obj.tools:
-                                    # graceful abort requested by the user
-                                    if app_obj.abort_flag:
-                                        raise grace
-
-                                    if 'geometry' in panel_source_obj.tools[apid]:
-                                        # calculate the number of polygons
-                                        try:
-                                            geo_len = len(panel_source_obj.tools[apid]['geometry'])
-                                        except TypeError:
-                                            geo_len = 1
-
-                                        # panelization -> tools
-                                        pol_nr = 0
-                                        for el in panel_source_obj.tools[apid]['geometry']:
-                                            if app_obj.abort_flag:
-                                                # graceful abort requested by the user
-                                                raise grace
-
-                                            new_el = {}
-                                            if 'solid' in el:
-                                                geo_aper = translate_recursion(el['solid'])
-                                                new_el['solid'] = geo_aper
-                                            if 'clear' in el:
-                                                geo_aper = translate_recursion(el['clear'])
-                                                new_el['clear'] = geo_aper
-                                            if 'follow' in el:
-                                                geo_aper = translate_recursion(el['follow'])
-                                                new_el['follow'] = geo_aper
-                                            new_obj.tools[apid]['geometry'].append(deepcopy(new_el))
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-
-                                # #####################################################################################
-                                # ##########   Panelize the solid_geometry - always done  #############################
-                                # #####################################################################################
-                                try:
-                                    for geo_el in panel_source_obj.solid_geometry:
-                                        # graceful abort requested by the user
-                                        if app_obj.abort_flag:
-                                            raise grace
-
-                                        trans_geo = translate_recursion(geo_el)
-                                        new_obj.solid_geometry.append(trans_geo)
-                                except TypeError:
-                                    trans_geo = translate_recursion(panel_source_obj.solid_geometry)
-                                    new_obj.solid_geometry.append(trans_geo)
-
-                            currentx += lenghtx
-                        currenty += lenghty
+                    panelize_source_geometry(new_obj)
 
                     # #################################################################################################
                     # ###########################   Path Optimization   ###############################################
                     # #################################################################################################
-                    if panel_source_obj.kind == 'geometry' and panel_source_obj.multigeo is True:
+                    if panel_source_obj.kind == 'geometry' and panel_source_obj.multigeo is True and not instanced:
                         # I'm going to do this only here as a fix for panelizing cutouts
                         # I'm going to separate linestrings out of the solid geometry from other
                         # possible type of elements and apply unary_union on them to fuse them
@@ -812,225 +573,20 @@ class Panelize(AppTool):
                         }
                         del new_obj.tools   # TODO what the hack is this? First we create and then immediately delete?
 
-                    app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
-                    new_obj.source_file = self.app.f_handlers.export_dxf(obj_name=self.outname, filename=None,
-                                                                         local_use=new_obj, use_thread=False)
+                    if not instanced:
+                        app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
+                        new_obj.source_file = self.app.f_handlers.export_dxf(obj_name=self.outname, filename=None,
+                                                                             local_use=new_obj, use_thread=False)
+                    else:
+                        # set last: reading the geometry of an instanced panel makes the copies
+                        new_obj.instance_offsets = offsets.tolist()
 
                     # new_obj.solid_geometry = unary_union(obj_fin.solid_geometry)
                     # app_obj.log.debug("Finished creating a unary_union for the panel.")
                     app_obj.proc_container.update_view_text('')
 
                 def job_init_gerber(new_obj, app_obj):
-                    currentx = 0.0
-                    currenty = 0.0
-
-                    def translate_recursion(geom):
-                        if type(geom) == list:
-                            geoms = []
-                            for local_geom in geom:
-                                res_geo = translate_recursion(local_geom)
-                                try:
-                                    geoms += res_geo
-                                except TypeError:
-                                    geoms.append(res_geo)
-                            return geoms
-                        else:
-                            return translate(geom, xoff=currentx, yoff=currenty)
-
-                    new_obj.solid_geometry = []
-
-                    # create the initial structure on which to create the panel
-                    if panel_source_obj.kind == 'geometry':
-                        new_obj.multigeo = panel_source_obj.multigeo
-                        new_obj.tools = copied_tools
-                        if panel_source_obj.multigeo is True:
-                            for tool in panel_source_obj.tools:
-                                new_obj.tools[tool]['solid_geometry'] = []
-                        else:
-                            new_obj.solid_geometry = panel_source_obj.solid_geometry
-                    elif panel_source_obj.kind == 'gerber':
-                        new_obj.tools = copied_apertures
-                        for ap in new_obj.tools:
-                            new_obj.tools[ap]['geometry'] = []
-
-                    # find the number of polygons in the source solid_geometry
-                    geo_len = 0
-                    if panel_source_obj.kind == 'geometry':
-                        if panel_source_obj.multigeo is True:
-                            for tool in panel_source_obj.tools:
-                                try:
-                                    work_geo = panel_source_obj.tools[tool]['solid_geometry']
-                                    geo_len += len(
-                                        work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString)) else
-                                        work_geo
-                                    )
-                                except TypeError:
-                                    geo_len += 1
-                        else:
-                            try:
-                                work_geo = panel_source_obj.solid_geometry
-                                geo_len = len(
-                                    work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString)) else
-                                    work_geo
-                                )
-                            except TypeError:
-                                geo_len = 1
-                    elif panel_source_obj.kind == 'gerber':
-                        for ap in panel_source_obj.tools:
-                            if 'geometry' in panel_source_obj.tools[ap]:
-                                try:
-                                    geo_len += len(panel_source_obj.tools[ap]['geometry'])
-                                except TypeError:
-                                    geo_len += 1
-
-                    element = 0
-                    for row in range(rows):
-                        currentx = 0.0
-
-                        for col in range(columns):
-                            element += 1
-                            old_disp_number = 0
-
-                            # Will panelize a Geometry Object
-                            if panel_source_obj.kind == 'geometry':
-                                if panel_source_obj.multigeo is True:
-                                    for tool in panel_source_obj.tools:
-                                        # graceful abort requested by the user
-                                        if app_obj.abort_flag:
-                                            raise grace
-
-                                        # calculate the number of polygons
-                                        try:
-                                            work_geo = panel_source_obj.tools[tool]['solid_geometry']
-                                            geo_len = len(
-                                                work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString))
-                                                else work_geo
-                                            )
-                                        except TypeError:
-                                            geo_len = 1
-
-                                        # panelization
-                                        pol_nr = 0
-                                        work_geo = panel_source_obj.tools[tool]['solid_geometry']
-                                        i_wg = work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString)) \
-                                            else work_geo
-                                        for geo_el in i_wg:
-                                            trans_geo = translate_recursion(geo_el)
-                                            if not trans_geo.is_empty:
-                                                new_obj.tools[tool]['solid_geometry'].append(trans_geo)
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-
-                                # #####################################################################################
-                                # ##########   Panelize the solid_geometry - always done  #############################
-                                # #####################################################################################
-                                # graceful abort requested by the user
-                                if app_obj.abort_flag:
-                                    raise grace
-
-                                # calculate the number of polygons
-                                try:
-                                    work_geo = panel_source_obj.solid_geometry
-                                    geo_len = len(
-                                        work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString))
-                                        else work_geo
-                                    )
-                                except TypeError:
-                                    geo_len = 1
-
-                                # panelization
-                                pol_nr = 0
-                                try:
-                                    work_geo = panel_source_obj.solid_geometry
-                                    i_wg = work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString)) \
-                                        else work_geo
-                                    for geo_el in i_wg:
-                                        if app_obj.abort_flag:
-                                            # graceful abort requested by the user
-                                            raise grace
-
-                                        trans_geo = translate_recursion(geo_el)
-                                        new_obj.solid_geometry.append(trans_geo)
-
-                                        # update progress
-                                        pol_nr += 1
-                                        disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                        if old_disp_number < disp_number <= 100:
-                                            app_obj.proc_container.update_view_text(
-                                                ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                            old_disp_number = disp_number
-
-                                except TypeError:
-                                    trans_geo = translate_recursion(panel_source_obj.solid_geometry)
-                                    new_obj.solid_geometry.append(trans_geo)
-                            # Will panelize a Gerber Object
-                            else:
-                                # graceful abort requested by the user
-                                if self.app.abort_flag:
-                                    raise grace
-
-                                for apid in panel_source_obj.tools:
-                                    # graceful abort requested by the user
-                                    if app_obj.abort_flag:
-                                        raise grace
-
-                                    if 'geometry' in panel_source_obj.tools[apid]:
-                                        # calculate the number of polygons
-                                        try:
-                                            geo_len = len(panel_source_obj.tools[apid]['geometry'])
-                                        except TypeError:
-                                            geo_len = 1
-
-                                        # panelization -> apertures
-                                        pol_nr = 0
-                                        for el in panel_source_obj.tools[apid]['geometry']:
-                                            if app_obj.abort_flag:
-                                                # graceful abort requested by the user
-                                                raise grace
-
-                                            new_el = {}
-                                            if 'solid' in el:
-                                                geo_aper = translate_recursion(el['solid'])
-                                                new_el['solid'] = geo_aper
-                                            if 'clear' in el:
-                                                geo_aper = translate_recursion(el['clear'])
-                                                new_el['clear'] = geo_aper
-                                            if 'follow' in el:
-                                                geo_aper = translate_recursion(el['follow'])
-                                                new_el['follow'] = geo_aper
-                                            new_obj.tools[apid]['geometry'].append(deepcopy(new_el))
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-
-                                # #####################################################################################
-                                # ##########   Panelize the solid_geometry - always done  #############################
-                                # #####################################################################################
-                                try:
-                                    for geo_el in panel_source_obj.solid_geometry:
-                                        # graceful abort requested by the user
-                                        if app_obj.abort_flag:
-                                            raise grace
-
-                                        trans_geo = translate_recursion(geo_el)
-                                        new_obj.solid_geometry.append(trans_geo)
-                                except TypeError:
-                                    trans_geo = translate_recursion(panel_source_obj.solid_geometry)
-                                    new_obj.solid_geometry.append(trans_geo)
-
-                            currentx += lenghtx
-                        currenty += lenghty
+                    panelize_source_geometry(new_obj)
 
                     if panel_source_obj.kind == 'geometry':
                         new_obj.multitool = False
@@ -1084,10 +640,13 @@ class Panelize(AppTool):
                             new_obj.solid_geometry = deepcopy(new_obj.solid_geometry)
                             del new_obj.tools
 
-                    app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
-
-                    new_obj.source_file = self.app.f_handlers.export_gerber(obj_name=self.outname, filename=None,
-                                                                            local_use=new_obj, use_thread=False)
+                    if not instanced:
+                        app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
+                        new_obj.source_file = self.app.f_handlers.export_gerber(obj_name=self.outname, filename=None,
+                                                                                local_use=new_obj, use_thread=False)
+                    else:
+                        # set last: reading the geometry of an instanced panel makes the copies
+                        new_obj.instance_offsets = offsets.tolist()
 
                     # new_obj.solid_geometry = unary_union(new_obj.solid_geometry)
                     # app_obj.log.debug("Finished creating a unary_union for the panel.")
@@ -1371,6 +930,16 @@ class PanelizeUI:
         )
         grid3.addWidget(self.optimization_cb, 2, 0, 1, 2)
 
+        # Instanced panel
+        self.instanced_cb = FCCheckBox('%s' % _("Instanced"))
+        self.instanced_cb.setToolTip(
+            _("The panel keeps a single copy of the source geometry and its positions.\n"
+              "It is much faster to make and to display for large panels.\n"
+              "The copies are made when the panel geometry is used by\n"
+              "a plugin, an editor or to create a CNCJob.")
+        )
+        grid3.addWidget(self.instanced_cb, 3, 0, 1, 2)
+
         # Constrains
         self.constrain_cb = FCCheckBox('%s:' % _("Constrain panel within"))
         self.constrain_cb.setToolTip(
@@ -114,9 +114,6 @@ class PcbWizard(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("PcbWizard Import"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, **kwargs)
-
     def connect_signals_at_init(self):
         # ## Signals
         self.ui.excellon_brn.clicked.connect(self.on_load_excellon_click)
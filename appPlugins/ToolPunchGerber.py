@@ -169,9 +169,6 @@ class ToolPunchGerber(AppTool, Gerber):
         # trigger this once at plugin launch
         self.on_object_combo_changed()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+H', **kwargs)
-
     def connect_signals_at_init(self):
         self.ui.level.toggled.connect(self.on_level_changed)
         self.ui.method_punch.activated_custom.connect(self.on_method)
@@ -129,9 +129,6 @@ class QRCode(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("QRCode"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+Q', **kwargs)
-
     def connect_signals_at_init(self):
         self.ui.level.toggled.connect(self.on_level_changed)
         self.ui.qrcode_button.clicked.connect(self.execute)
@@ -125,9 +125,6 @@ class ObjectReport(AppTool):
 
         self.properties()
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='P', **kwargs)
-
     def set_tool_ui(self):
         # this reset the TreeWidget
         self.treeWidget.clear()
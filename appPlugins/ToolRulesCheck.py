@@ -10,12 +10,14 @@ from appTool import AppTool
 from appGUI.GUIElements import VerticalScrollArea, FCLabel, FCButton, FCFrame, GLay, FCComboBox, FCCheckBox, \
     FCDoubleSpinner, OptionalInputSection
 from appObjects import GerberObject
+from appGUI.VisPyVisuals import ShapeCollection
 
 import logging
 from copy import deepcopy
 
-from shapely import Polygon, MultiPolygon
-from shapely.ops import nearest_points
+from shapely import Polygon, MultiPolygon, Point
+
+from camlib import flatten_shapely_geometry, as_geo_array, find_violations
 
 import gettext
 import appTranslation as fcTranslate
@@ -27,10 +29,11 @@ if '_' not in builtins.__dict__:
 
 log = logging.getLogger('base')
 
-
 class RulesCheck(AppTool):
 
     tool_finished = QtCore.pyqtSignal(list)
+    # emitted with a list of (x, y) locations as soon as violations are found
+    violations_found = QtCore.pyqtSignal(list)
 
     def __init__(self, app):
         self.decimals = app.decimals
@@ -59,6 +62,15 @@ class RulesCheck(AppTool):
 
         self.decimals = 4
 
+        # markers for the violations locations
+        if self.app.use_3d_engine:
+            self.violation_shapes = ShapeCollection(parent=self.app.plotcanvas.view.scene, layers=1,
+                                                    pool=self.app.pool)
+        else:
+            from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
+            self.violation_shapes = ShapeCollectionLegacy(obj=self, app=self.app, name='rules_violations')
+        self.violations_found.connect(self.on_violations_found)
+
     # def on_object_loaded(self, index, row):
     #     print(index.internalPointer().child_items[row].obj.obj_options['name'], index.data())
 
@@ -117,9 +129,6 @@ class RulesCheck(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Check Rules"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+R', **kwargs)
-
     def connect_signals_at_init(self):
         self.ui.copper_t_cb.stateChanged.connect(lambda st: self.ui.copper_t_object.setDisabled(not st))
         self.ui.copper_b_cb.stateChanged.connect(lambda st: self.ui.copper_b_object.setDisabled(not st))
@@ -187,7 +196,7 @@ class RulesCheck(AppTool):
         self.reset_fields()
 
     @staticmethod
-    def check_inside_gerber_clearance(gerber_obj, size, rule):
+    def check_inside_gerber_clearance(gerber_obj, size, rule, pool=None, callback=None):
         # log.debug("RulesCheck.check_inside_gerber_clearance()")
 
         rule_title = rule
@@ -228,33 +237,9 @@ class RulesCheck(AppTool):
         if isinstance(total_geo, Polygon):
             obj_violations['points'] = ['Failed. Only one polygon.']
             return rule_title, [obj_violations]
-        else:
-            iterations = len(total_geo)
-            iterations = (iterations * (iterations - 1)) / 2
-        # log.debug("RulesCheck.check_gerber_clearance(). Iterations: %s" % str(iterations))
-
-        min_dict = {}
-        idx = 1
-        for geo in total_geo:
-            for s_geo in total_geo[idx:]:
-                # minimize the number of distances by not taking into considerations those that are too small
-                dist = geo.distance(s_geo)
-                if float(dist) < float(size):
-                    loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                    dx = loc_1.x - loc_2.x
-                    dy = loc_1.y - loc_2.y
-                    loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                    if dist in min_dict:
-                        min_dict[dist].append(loc)
-                    else:
-                        min_dict[dist] = [loc]
-            idx += 1
-        points_list = set()
-        for dist in min_dict.keys():
-            for location in min_dict[dist]:
-                points_list.add(location)
+
+        total_geo = as_geo_array(total_geo)
+        points_list = set(find_violations(total_geo, None, size, pool=pool, callback=callback))
 
         obj_violations['points'] = list(points_list)
         violations.append(deepcopy(obj_violations))
@@ -262,7 +247,7 @@ class RulesCheck(AppTool):
         return rule_title, violations
 
     @staticmethod
-    def check_gerber_clearance(gerber_list: list[GerberObject], size, rule):
+    def check_gerber_clearance(gerber_list: list[GerberObject], size, rule, pool=None, callback=None):
         # log.debug("RulesCheck.check_gerber_clearance()")
         rule_title = rule
 
@@ -317,42 +302,9 @@ class RulesCheck(AppTool):
         total_geo_grb_3 = MultiPolygon(total_geo_grb_3)
         total_geo_grb_3 = total_geo_grb_3.buffer(0)
 
-        if isinstance(total_geo_grb_1, Polygon):
-            len_1 = 1
-            total_geo_grb_1 = [total_geo_grb_1]
-        else:
-            len_1 = len(total_geo_grb_1)
-
-        if isinstance(total_geo_grb_3, Polygon):
-            len_3 = 1
-            total_geo_grb_3 = [total_geo_grb_3]
-        else:
-            len_3 = len(total_geo_grb_3)
-
-        iterations = len_1 * len_3
-        # log.debug("RulesCheck.check_gerber_clearance(). Iterations: %s" % str(iterations))
-
-        min_dict = {}
-        for geo in total_geo_grb_1:
-            for s_geo in total_geo_grb_3:
-                # minimize the number of distances by not taking into considerations those that are too small
-                dist = geo.distance(s_geo)
-                if float(dist) < float(size):
-                    loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                    dx = loc_1.x - loc_2.x
-                    dy = loc_1.y - loc_2.y
-                    loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                    if dist in min_dict:
-                        min_dict[dist].append(loc)
-                    else:
-                        min_dict[dist] = [loc]
-
-        points_list = set()
-        for dist in min_dict.keys():
-            for location in min_dict[dist]:
-                points_list.add(location)
+        total_geo_grb_1 = as_geo_array(total_geo_grb_1)
+        total_geo_grb_3 = as_geo_array(total_geo_grb_3)
+        points_list = set(find_violations(total_geo_grb_1, total_geo_grb_3, size, pool=pool, callback=callback))
 
         name_list = []
         if gerber_1:
@@ -396,7 +348,7 @@ class RulesCheck(AppTool):
         return rule, violations
 
     @staticmethod
-    def check_holes_clearance(elements, size):
+    def check_holes_clearance(elements, size, pool=None, callback=None):
         # log.debug("RulesCheck.check_holes_clearance()")
         rule = _("Hole to Hole Clearance")
 
@@ -415,30 +367,8 @@ class RulesCheck(AppTool):
                     for geo in geometry:
                         total_geo.append(geo)
 
-        min_dict = {}
-        idx = 1
-        for geo in total_geo:
-            for s_geo in total_geo[idx:]:
-
-                # minimize the number of distances by not taking into considerations those that are too small
-                dist = geo.distance(s_geo)
-                loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                dx = loc_1.x - loc_2.x
-                dy = loc_1.y - loc_2.y
-                loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                if dist in min_dict:
-                    min_dict[dist].append(loc)
-                else:
-                    min_dict[dist] = [loc]
-            idx += 1
-
-        points_list = set()
-        for dist in min_dict.keys():
-            if float(dist) < size:
-                for location in min_dict[dist]:
-                    points_list.add(location)
+        total_geo = as_geo_array(total_geo)
+        points_list = set(find_violations(total_geo, None, size, pool=pool, callback=callback))
 
         name_list = []
         for elem in elements:
@@ -491,7 +421,7 @@ class RulesCheck(AppTool):
         return rule, violations
 
     @staticmethod
-    def check_gerber_annular_ring(obj_list, size, rule):
+    def check_gerber_annular_ring(obj_list, size, rule, pool=None, callback=None):
         rule_title = rule
 
         violations = []
@@ -569,54 +499,11 @@ class RulesCheck(AppTool):
                     for geo in geometry:
                         total_geo_exc.append(geo)
 
-        if isinstance(total_geo_grb, Polygon):
-            len_1 = 1
-            total_geo_grb = [total_geo_grb]
-        else:
-            len_1 = len(total_geo_grb)
-
-        if isinstance(total_geo_exc, Polygon):
-            len_2 = 1
-            total_geo_exc = [total_geo_exc]
-        else:
-            len_2 = len(total_geo_exc)
-
-        iterations = len_1 * len_2
-        # log.debug("RulesCheck.check_gerber_annular_ring(). Iterations: %s" % str(iterations))
-
-        min_dict = {}
-        dist = None
-        for geo in total_geo_grb:
-            for s_geo in total_geo_exc:
-                try:
-                    # minimize the number of distances by not taking into considerations those that are too small
-                    dist = abs(geo.exterior.distance(s_geo))
-                except Exception:
-                    # log.error("RulesCheck.check_gerber_annular_ring() --> %s" % str(e))
-                    pass
-
-                if dist > 0:
-                    if float(dist) < float(size):
-                        loc_1, loc_2 = nearest_points(geo.exterior, s_geo)
-
-                        dx = loc_1.x - loc_2.x
-                        dy = loc_1.y - loc_2.y
-                        loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                        if dist in min_dict:
-                            min_dict[dist].append(loc)
-                        else:
-                            min_dict[dist] = [loc]
-                else:
-                    if dist in min_dict:
-                        min_dict[dist].append(s_geo.representative_point())
-                    else:
-                        min_dict[dist] = [s_geo.representative_point()]
-
-        points_list = []
-        for dist in min_dict.keys():
-            for location in min_dict[dist]:
-                points_list.append(location)
+        # the annular ring is the distance between the pad edge and the hole
+        pad_edges = as_geo_array([geo.exterior for geo in flatten_shapely_geometry(total_geo_grb)
+                                  if isinstance(geo, Polygon)])
+        total_geo_exc = as_geo_array(total_geo_exc)
+        points_list = find_violations(pad_edges, total_geo_exc, size, kind='ring', pool=pool, callback=callback)
 
         name_list = []
         try:
@@ -649,6 +536,7 @@ class RulesCheck(AppTool):
 
     def execute(self):
         self.results = []
+        self.clear_violation_markers()
 
         self.app.log.debug("RuleCheck() executing")
 
@@ -676,7 +564,7 @@ class RulesCheck(AppTool):
                     copper_list.append(elem_dict)
 
                 trace_size = float(self.ui.trace_size_entry.get_value())
-                self.results.append(self.pool.apply_async(self.check_traces_size, args=(copper_list, trace_size)))
+                self.results.append(self.check_traces_size(copper_list, trace_size))
 
             # RULE: Check Copper to Copper Clearance
             if self.ui.clearance_copper2copper_cb.get_value():
@@ -698,10 +586,9 @@ class RulesCheck(AppTool):
                         copper_t_dict['name'] = deepcopy(copper_t_obj)
                         copper_t_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(copper_t_obj).tools)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(copper_t_dict,
-                                                                        copper_copper_clearance,
-                                                                        _("TOP -> Copper to Copper clearance"))))
+                        self.results.append(self.check_inside_gerber_clearance(
+                            copper_t_dict, copper_copper_clearance, _("TOP -> Copper to Copper clearance"),
+                            pool=self.pool, callback=self.violations_found.emit))
                 if self.ui.copper_b_cb.get_value():
                     copper_b_obj = self.ui.copper_b_object.currentText()
                     copper_b_dict = {}
@@ -709,10 +596,9 @@ class RulesCheck(AppTool):
                         copper_b_dict['name'] = deepcopy(copper_b_obj)
                         copper_b_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(copper_b_obj).tools)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(copper_b_dict,
-                                                                        copper_copper_clearance,
-                                                                        _("BOTTOM -> Copper to Copper clearance"))))
+                        self.results.append(self.check_inside_gerber_clearance(
+                            copper_b_dict, copper_copper_clearance, _("BOTTOM -> Copper to Copper clearance"),
+                            pool=self.pool, callback=self.violations_found.emit))
 
                 if self.ui.copper_t_cb.get_value() is False and self.ui.copper_b_cb.get_value() is False:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -769,10 +655,9 @@ class RulesCheck(AppTool):
                         _("Outline Gerber object presence is mandatory for this rule but it is not selected.")))
                     return
 
-                self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                          args=(objs,
-                                                                copper_outline_clearance,
-                                                                _("Copper to Outline clearance"))))
+                self.results.append(self.check_gerber_clearance(
+                    objs, copper_outline_clearance, _("Copper to Outline clearance"),
+                    pool=self.pool, callback=self.violations_found.emit))
 
             # RULE: Check Silk to Silk Clearance
             if self.ui.clearance_silk2silk_cb.get_value():
@@ -793,20 +678,18 @@ class RulesCheck(AppTool):
                         silk_dict['name'] = deepcopy(silk_obj)
                         silk_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(silk_obj).tools)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(silk_dict,
-                                                                        silk_silk_clearance,
-                                                                        _("TOP -> Silk to Silk clearance"))))
+                        self.results.append(self.check_inside_gerber_clearance(
+                            silk_dict, silk_silk_clearance, _("TOP -> Silk to Silk clearance"),
+                            pool=self.pool, callback=self.violations_found.emit))
                 if self.ui.ss_b_cb.get_value():
                     silk_obj = self.ui.ss_b_object.currentText()
                     if silk_obj != '':
                         silk_dict['name'] = deepcopy(silk_obj)
                         silk_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(silk_obj).tools)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(silk_dict,
-                                                                        silk_silk_clearance,
-                                                                        _("BOTTOM -> Silk to Silk clearance"))))
+                        self.results.append(self.check_inside_gerber_clearance(
+                            silk_dict, silk_silk_clearance, _("BOTTOM -> Silk to Silk clearance"),
+                            pool=self.pool, callback=self.violations_found.emit))
 
                 if self.ui.ss_t_cb.get_value() is False and self.ui.ss_b_cb.get_value() is False:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -867,16 +750,14 @@ class RulesCheck(AppTool):
 
                 if top_ss is True and top_sm is True:
                     objs = [silk_t_dict, sm_t_dict]
-                    self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                              args=(objs,
-                                                                    silk_sm_clearance,
-                                                                    _("TOP -> Silk to Solder Mask Clearance"))))
+                    self.results.append(self.check_gerber_clearance(
+                        objs, silk_sm_clearance, _("TOP -> Silk to Solder Mask Clearance"),
+                        pool=self.pool, callback=self.violations_found.emit))
                 elif bottom_ss is True and bottom_sm is True:
                     objs = [silk_b_dict, sm_b_dict]
-                    self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                              args=(objs,
-                                                                    silk_sm_clearance,
-                                                                    _("BOTTOM -> Silk to Solder Mask Clearance"))))
+                    self.results.append(self.check_gerber_clearance(
+                        objs, silk_sm_clearance, _("BOTTOM -> Silk to Solder Mask Clearance"),
+                        pool=self.pool, callback=self.violations_found.emit))
                 else:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
                         _("Silk to Solder Mask Clearance"),
@@ -933,10 +814,9 @@ class RulesCheck(AppTool):
                         _("Outline Gerber object presence is mandatory for this rule but it is not selected.")))
                     return
 
-                self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                          args=(objs,
-                                                                copper_outline_clearance,
-                                                                _("Silk to Outline Clearance"))))
+                self.results.append(self.check_gerber_clearance(
+                    objs, copper_outline_clearance, _("Silk to Outline Clearance"),
+                    pool=self.pool, callback=self.violations_found.emit))
 
             # RULE: Check Minimum Solder Mask Sliver
             if self.ui.clearance_silk2silk_cb.get_value():
@@ -957,20 +837,18 @@ class RulesCheck(AppTool):
                         sm_dict['name'] = deepcopy(solder_obj)
                         sm_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(solder_obj).tools)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(sm_dict,
-                                                                        sm_sm_clearance,
-                                                                        _("TOP -> Minimum Solder Mask Sliver"))))
+                        self.results.append(self.check_inside_gerber_clearance(
+                            sm_dict, sm_sm_clearance, _("TOP -> Minimum Solder Mask Sliver"),
+                            pool=self.pool, callback=self.violations_found.emit))
                 if self.ui.sm_b_cb.get_value():
                     solder_obj = self.ui.sm_b_object.currentText()
                     if solder_obj != '':
                         sm_dict['name'] = deepcopy(solder_obj)
                         sm_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(solder_obj).tools)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(sm_dict,
-                                                                        sm_sm_clearance,
-                                                                        _("BOTTOM -> Minimum Solder Mask Sliver"))))
+                        self.results.append(self.check_inside_gerber_clearance(
+                            sm_dict, sm_sm_clearance, _("BOTTOM -> Minimum Solder Mask Sliver"),
+                            pool=self.pool, callback=self.violations_found.emit))
 
                 if self.ui.sm_t_cb.get_value() is False and self.ui.sm_b_cb.get_value() is False:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -1038,10 +916,9 @@ class RulesCheck(AppTool):
                         _("Excellon object presence is mandatory for this rule but none is selected.")))
                     return
 
-                self.results.append(self.pool.apply_async(self.check_gerber_annular_ring,
-                                                          args=(objs,
-                                                                ring_val,
-                                                                _("Minimum Annular Ring"))))
+                self.results.append(self.check_gerber_annular_ring(
+                    objs, ring_val, _("Minimum Annular Ring"),
+                    pool=self.pool, callback=self.violations_found.emit))
 
             # RULE: Check Hole to Hole Clearance
             if self.ui.clearance_d2d_cb.get_value():
@@ -1063,7 +940,8 @@ class RulesCheck(AppTool):
                     exc_list.append(elem_dict)
 
                 hole_clearance = float(self.ui.clearance_d2d_entry.get_value())
-                self.results.append(self.pool.apply_async(self.check_holes_clearance, args=(exc_list, hole_clearance)))
+                self.results.append(self.check_holes_clearance(exc_list, hole_clearance, pool=self.pool,
+                                                                callback=self.violations_found.emit))
 
             # RULE: Check Holes Size
             if self.ui.drill_size_cb.get_value():
@@ -1085,19 +963,128 @@ class RulesCheck(AppTool):
                     exc_list.append(elem_dict)
 
                 drill_size = float(self.ui.drill_size_entry.get_value())
-                self.results.append(self.pool.apply_async(self.check_holes_size, args=(exc_list, drill_size)))
-
-            output = []
-            for p in self.results:
-                output.append(p.get())
+                self.results.append(self.check_holes_size(exc_list, drill_size))
 
-            self.tool_finished.emit(output)
+            self.tool_finished.emit(list(self.results))
             app_obj.proc_container.view.set_idle()
 
             self.app.log.debug("RuleCheck() finished")
 
         self.app.worker_task.emit({'fcn': worker_job, 'params': [self.app]})
 
+    def run_rules(self, layers: dict, rules: dict, pool=None) -> list:
+        """
+        Run the rules without using the GUI; used by the TCL command.
+        The checks are run in the calling thread; each rule reuses the results cached for the spatial tiles that did not
+        change since the last run.
+
+        :param layers:  dict of object names: 'copper_top', 'copper_bottom', 'sm_top', 'sm_bottom', 'silk_top',
+                        'silk_bottom', 'outline', 'drills_1', 'drills_2'. Missing keys mean the layer is not used.
+        :param rules:   dict of rule values: 'trace_size', 'copper2copper', 'copper2outline', 'silk2silk', 'silk2sm',
+                        'silk2outline', 'sm2sm', 'annular_ring', 'hole2hole', 'hole_size'.
+                        Only the rules present in the dict are checked.
+        :param pool:    the WorkerPool of the App or None
+        :return:        list of (rule title, violations) tuples as returned by the check methods
+        """
+
+        def layer(key, attr='apertures'):
+            name = layers.get(key)
+            if not name:
+                return {}
+            obj = self.app.collection.get_by_name(name)
+            if obj is None:
+                raise ValueError('%s: %s' % (_("Object not found"), str(name)))
+            return {'name': name, attr: obj.tools}
+
+        copper_t, copper_b = layer('copper_top'), layer('copper_bottom')
+        sm_t, sm_b = layer('sm_top'), layer('sm_bottom')
+        silk_t, silk_b = layer('silk_top'), layer('silk_bottom')
+        outline = layer('outline')
+        exc_list = [d for d in (layer('drills_1', 'tools'), layer('drills_2', 'tools')) if d]
+
+        results = []
+        if 'trace_size' in rules:
+            copper_list = [d for d in (copper_t, copper_b) if d]
+            if copper_list:
+                results.append(self.check_traces_size(copper_list, float(rules['trace_size'])))
+
+        for key, title, top, bottom in (
+                ('copper2copper', _("Copper to Copper clearance"), copper_t, copper_b),
+                ('silk2silk', _("Silk to Silk clearance"), silk_t, silk_b),
+                ('sm2sm', _("Minimum Solder Mask Sliver"), sm_t, sm_b)):
+            if key not in rules:
+                continue
+            if top:
+                results.append(self.check_inside_gerber_clearance(
+                    top, float(rules[key]), '%s -> %s' % (_("TOP"), title), pool=pool))
+            if bottom:
+                results.append(self.check_inside_gerber_clearance(
+                    bottom, float(rules[key]), '%s -> %s' % (_("BOTTOM"), title), pool=pool))
+
+        for key, title, top, bottom in (
+                ('copper2outline', _("Copper to Outline clearance"), copper_t, copper_b),
+                ('silk2outline', _("Silk to Outline Clearance"), silk_t, silk_b)):
+            objs = [d for d in (top, bottom) if d]
+            if key in rules and objs and outline:
+                results.append(self.check_gerber_clearance(objs + [outline], float(rules[key]), title, pool=pool))
+
+        if 'silk2sm' in rules:
+            title = _("Silk to Solder Mask Clearance")
+            if silk_t and sm_t:
+                results.append(self.check_gerber_clearance(
+                    [silk_t, sm_t], float(rules['silk2sm']), '%s -> %s' % (_("TOP"), title), pool=pool))
+            if silk_b and sm_b:
+                results.append(self.check_gerber_clearance(
+                    [silk_b, sm_b], float(rules['silk2sm']), '%s -> %s' % (_("BOTTOM"), title), pool=pool))
+
+        if 'annular_ring' in rules and exc_list and (copper_t or copper_b):
+            objs = [copper_t if copper_t else copper_b, exc_list[0]]
+            results.append(self.check_gerber_annular_ring(
+                objs, float(rules['annular_ring']), _("Minimum Annular Ring"), pool=pool))
+
+        if 'hole2hole' in rules and exc_list:
+            results.append(self.check_holes_clearance(exc_list, float(rules['hole2hole']), pool=pool))
+
+        if 'hole_size' in rules and exc_list:
+            results.append(self.check_holes_size(exc_list, float(rules['hole_size'])))
+
+        return results
+
+    @staticmethod
+    def rules_report(results: list) -> list:
+        """
+        Convert the results of the rules into a structure that can be serialized as JSON.
+
+        :param results: list of (rule title, violations) tuples as returned by the check methods
+        :return:        list of dicts, one for each rule and object
+        """
+        report = []
+        for res in results:
+            if isinstance(res, str):
+                report.append({'rule': '', 'status': 'error', 'message': res})
+                continue
+            rule_title, violations = res
+            for viol in violations:
+                entry = {
+                    'rule': str(rule_title),
+                    'objects': viol['name'] if isinstance(viol['name'], list) else [viol['name']],
+                }
+                for key, out_key in (('points', 'points'), ('dia', 'diameters')):
+                    if key not in viol:
+                        continue
+                    failed = [val for val in viol[key] if isinstance(val, str)]
+                    if failed:
+                        entry['status'] = 'error'
+                        entry['message'] = failed[0]
+                    elif key == 'points':
+                        entry[out_key] = sorted([float(pt[0]), float(pt[1])] for pt in viol[key])
+                    else:
+                        entry[out_key] = sorted(float(dia) for dia in viol[key])
+                if 'status' not in entry:
+                    entry['status'] = 'failed' if entry.get('points') or entry.get('diameters') else 'passed'
+                report.append(entry)
+        return report
+
     def on_tool_finished(self, res):
         def init(new_obj, app_obj):
             txt = ''
@@ -1164,6 +1151,24 @@ class RulesCheck(AppTool):
 
         self.app.app_obj.new_object('document', name='Rules_check_results', initialize=init, plot=False)
 
+    def on_violations_found(self, locations):
+        marker_size = 0.5 if self.app.app_units.upper() == 'MM' else 0.02
+        for loc in locations:
+            try:
+                marker = Point(loc).buffer(marker_size)
+            except Exception:
+                # the locations that are text messages
+                continue
+            self.violation_shapes.add(marker, color='#FF0000FF', face_color='#FF000040', update=False, layer=0,
+                                      tolerance=None)
+        self.violation_shapes.redraw()
+
+    def clear_violation_markers(self):
+        self.violation_shapes.clear(update=True)
+
+    def on_plugin_cleanup(self):
+        self.clear_violation_markers()
+
     def reset_fields(self):
         # self.object_combo.setRootModelIndex(self.app.collection.index(0, 0, QtCore.QModelIndex()))
         # self.box_combo.setRootModelIndex(self.app.collection.index(0, 0, QtCore.QModelIndex()))
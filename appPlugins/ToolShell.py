@@ -18,7 +18,8 @@ import sys
 import traceback
 
 import tkinter as tk
-import tclCommands
+
+from appCore import setup_tcl_commands
 
 import gettext
 import appTranslation as fcTranslate
@@ -408,25 +409,10 @@ class FCShell(TermWidget):
 
         '''
 
-        # Import/overwrite tcl commands as objects of TclCommand descendants
+        # Import/overwrite tcl commands as objects of TclCommand descendants, add them to the tcl interpreter and
+        # make the tcl puts function return instead of print to stdout.
         # This modifies the variable 'self.tcl_commands_storage'.
-        tclCommands.register_all_commands(self.app, self.tcl_commands_storage)
-
-        # Add commands to the tcl interpreter
-        for cmd in self.tcl_commands_storage:
-            self.tcl.createcommand(cmd, self.tcl_commands_storage[cmd]['fcn'])
-
-        # Make the tcl puts function return instead of print to stdout
-        self.tcl.eval('''
-            rename puts original_puts
-            proc puts {args} {
-                if {[llength $args] == 1} {
-                    return "[lindex $args 0]"
-                } else {
-                    eval original_puts $args
-                }
-            }
-            ''')
+        setup_tcl_commands(self.tcl, self.app, self.tcl_commands_storage)
 
     def is_command_complete(self, text):
 
@@ -126,9 +126,6 @@ class SolderPaste(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("SolderPaste"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+K', **kwargs)
-
     def clear_context_menu(self):
         self.ui.tools_table.removeContextMenu()
 
@@ -17,6 +17,8 @@ import traceback
 from shapely import LineString, Polygon, MultiPolygon, MultiLineString
 from shapely.ops import unary_union
 
+from camlib import grace, progress_for
+
 import gettext
 import appTranslation as fcTranslate
 import builtins
@@ -90,9 +92,6 @@ class ToolSub(AppTool):
         # start the QTimer to check for promises with 0.5 seconds period check
         self.check_interval = 500
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+W', **kwargs)
-
     def run(self, toggle=True):
         self.app.defaults.report_usage("ToolSub()")
 
@@ -337,20 +336,24 @@ class ToolSub(AppTool):
                         if "clear" in s_el:
                             sub_geometry['clear'].append(s_el["clear"])
 
-                for ap_id in app_obj.target_grb_obj.tools:
-                    # TARGET geometry
-                    target_geo = [geo for geo in app_obj.target_grb_obj.tools[ap_id]['geometry']]
-
-                    # send the job to the multiprocessing JOB
-                    app_obj.results.append(
-                        app_obj.pool.apply_async(app_obj.aperture_intersection, args=(ap_id, target_geo, sub_geometry))
-                    )
-
-                output = []
-                for p in app_obj.results:
-                    res = p.get()
-                    output.append(res)
-                    app_obj.app.inform.emit('%s: %s...' % (_("Finished parsing geometry for aperture"), str(res[0])))
+                # the SUBTRACTOR geometry is stored once in shared memory, not sent with the task of each aperture
+                with app_obj.pool.share(sub_geometry) as shared_sub_geometry:
+                    task_args = []
+                    for ap_id in app_obj.target_grb_obj.tools:
+                        # TARGET geometry
+                        target_geo = [geo for geo in app_obj.target_grb_obj.tools[ap_id]['geometry']]
+                        task_args.append((ap_id, target_geo, shared_sub_geometry))
+
+                    # send the jobs to the multiprocessing Pool
+                    progress = progress_for(app_obj.app, len(task_args))
+                    output = []
+                    try:
+                        for res in app_obj.pool.run_tasks(app_obj.aperture_intersection, task_args, progress=progress):
+                            output.append(res)
+                            app_obj.app.inform.emit('%s: %s...' % (_("Finished parsing geometry for aperture"),
+                                                                   str(res[0])))
+                    except grace:
+                        return
 
                 app_obj.app.inform.emit("%s" % _("Subtraction aperture processing finished."))
 
@@ -92,9 +92,6 @@ class ToolTransform(AppTool):
 
         self.app.ui.notebook.setTabText(2, _("Transformation"))
 
-    def install(self, icon=None, separator=None, **kwargs):
-        AppTool.install(self, icon, separator, shortcut='Alt+T', **kwargs)
-
     def connect_signals_at_init(self):
         # ## Signals
         self.ui.ref_combo.currentIndexChanged.connect(self.ui.on_reference_changed)
@@ -349,7 +346,7 @@ class ToolTransform(AppTool):
 
                         # add information to the object that it was changed and how much
                         sel_obj.obj_options['rotate'] = num
-                        sel_obj.plot()
+                        sel_obj.replot_transformed()
                     self.app.inform.emit('[success] %s...' % _('Rotate done'))
                 except Exception as e:
                     self.app.inform.emit('[ERROR_NOTCL] %s: %s.' % (_("Action was not executed"), str(e)))
@@ -390,7 +387,7 @@ class ToolTransform(AppTool):
                                     sel_obj.obj_options['mirror_x'] = True
                                 self.app.inform.emit('[success] %s...' % _('Flip on X axis done'))
                             self.app.app_obj.object_changed.emit(sel_obj)
-                        sel_obj.plot()
+                        sel_obj.replot_transformed()
                 except Exception as e:
                     self.app.inform.emit('[ERROR_NOTCL] %s: %s.' % (_("Action was not executed"), str(e)))
                     return
@@ -428,7 +425,7 @@ class ToolTransform(AppTool):
                                 pass
 
                             self.app.app_obj.object_changed.emit(sel_obj)
-                        sel_obj.plot()
+                        sel_obj.replot_transformed()
                     self.app.inform.emit('[success] %s %s %s...' % (_('Skew on the'),  str(axis), _("axis done")))
                 except Exception as e:
                     self.app.inform.emit('[ERROR_NOTCL] %s: %s.' % (_("Action was not executed"), str(e)))
@@ -462,7 +459,7 @@ class ToolTransform(AppTool):
                                 pass
 
                             self.app.app_obj.object_changed.emit(sel_obj)
-                        sel_obj.plot()
+                        sel_obj.replot_transformed()
 
                     self.app.inform.emit('[success] %s %s %s...' % (_('Scale on the'), str(axis), _('axis done')))
                 except Exception as e:
@@ -499,7 +496,7 @@ class ToolTransform(AppTool):
                                 pass
 
                             self.app.app_obj.object_changed.emit(sel_obj)
-                        sel_obj.plot()
+                        sel_obj.replot_transformed()
 
                     self.app.inform.emit('[success] %s %s %s...' % (_('Offset on the'), str(axis), _('axis done')))
                 except Exception as e:
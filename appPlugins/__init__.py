@@ -1,51 +1,302 @@
-from appPlugins.ToolCalculators import ToolCalculator
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# MIT Licence                                              #
+# ##########################################################
 
-from appPlugins.ToolDblSided import DblSidedTool
-from appPlugins.ToolExtract import ToolExtract
-from appPlugins.ToolAlignObjects import AlignObjects
+# The Plugins are not imported at startup. Each Plugin is described by a PluginSpec holding what is needed to add its
+# entry in the menu: the name, icon, shortcut and menu position. A LazyPlugin proxy takes the place of the Plugin in
+# the app and the Plugin module (with its dependencies) is imported and the Plugin instantiated on first use.
+# The PLUGINS list is the only description of the Plugins menu entries; the Plugins do not install their own entries.
 
-from appPlugins.ToolFilm import Film
+from PyQt6 import QtGui, QtCore
 
-try:
-    from appPlugins.ToolImage import ToolImage
-except ImportError as err:
-    # print(str(err))
-    pass
+import importlib
+import importlib.util
+import logging
 
-from appPlugins.ToolDistance import Distance
-from appPlugins.ToolObjectDistance import ObjectDistance
+from appStartupTracer import startup_tracer
 
-from appPlugins.ToolMove import ToolMove
+import gettext
+import appTranslation as fcTranslate
+import builtins
 
-from appPlugins.ToolCutOut import CutOut
-from appPlugins.ToolNCC import NonCopperClear
-from appPlugins.ToolPaint import ToolPaint
-from appPlugins.ToolIsolation import ToolIsolation
-from appPlugins.ToolFollow import ToolFollow
-from appPlugins.ToolDrilling import ToolDrilling
-from appPlugins.ToolMilling import ToolMilling
-from appPlugins.ToolLevelling import ToolLevelling
+fcTranslate.apply_language('strings')
+if '_' not in builtins.__dict__:
+    _ = gettext.gettext
 
-from appPlugins.ToolOptimal import ToolOptimal
+log = logging.getLogger('base')
 
-from appPlugins.ToolPanelize import Panelize
-from appPlugins.ToolPcbWizard import PcbWizard
-from appPlugins.ToolPDF import ToolPDF
-from appPlugins.ToolReport import ObjectReport
 
-from appPlugins.ToolQRCode import QRCode
-from appPlugins.ToolRulesCheck import RulesCheck
+class PluginSpec:
+    """
+    Metadata of a Plugin, enough to install its menu entry without importing the Plugin module.
+    """
 
-from appPlugins.ToolCopperThieving import ToolCopperThieving
-from appPlugins.ToolFiducials import ToolFiducials
+    def __init__(self, attr, module, class_name, name, icon, pos='ui.menu_plugins', before=None, separator=None,
+                 shortcut=None, requires=()):
+        """
 
-from appPlugins.ToolShell import FCShell
-from appPlugins.ToolSolderPaste import SolderPaste
-from appPlugins.ToolSub import ToolSub
+        :param attr:            name of the app attribute that holds the Plugin
+        :param module:          name of the module in the appPlugins package
+        :param class_name:      name of the Plugin class in the module
+        :param name:            name of the Plugin; it is the text of the menu entry (translated)
+        :param icon:            file name of the icon, in the resource folder
+        :param pos:             dotted path, from the app, to the menu where the entry is installed
+        :param before:          dotted path, from the app, to the action before which the entry is installed
+        :param separator:       if True a separator is added after the menu entry
+        :param shortcut:        keyboard shortcut shown in the menu entry
+        :param requires:        optional packages needed by the Plugin; if one is missing the Plugin is not installed
+        """
+        self.attr = attr
+        self.module = module
+        self.class_name = class_name
+        self.name = name
+        self.icon = icon
+        self.pos = pos
+        self.before = before
+        self.separator = separator
+        self.shortcut = shortcut
+        self.requires = tuple(requires)
 
-from appPlugins.ToolTransform import ToolTransform
-from appPlugins.ToolPunchGerber import ToolPunchGerber
+    def is_available(self):
+        """
+        Check, without importing them, that the optional packages needed by the Plugin are installed.
+
+        :return:    True if the Plugin can be installed
+        """
+        for package in self.requires:
+            try:
+                if importlib.util.find_spec(package) is None:
+                    return False
+            except (ImportError, ValueError):
+                return False
+        return True
+
+
+# The Plugins in the order they are installed. The order is important as the menu entries can be installed before the
+# entry of another Plugin.
+PLUGINS = [
+    PluginSpec('distance_tool', 'ToolDistance', 'Distance', "Distance", 'distance16.png',
+               pos='ui.menuedit', before='ui.menuedit_numeric_move', separator=False, shortcut='Ctrl+M'),
+    PluginSpec('distance_min_tool', 'ToolObjectDistance', 'ObjectDistance', "Object Distance", 'distance_min16.png',
+               pos='ui.menuedit', before='ui.menuedit_numeric_move', separator=True, shortcut='Shift+M'),
+    PluginSpec('dblsidedtool', 'ToolDblSided', 'DblSidedTool', "2-Sided", 'doubleside16.png',
+               separator=False, shortcut='Alt+D'),
+    PluginSpec('align_objects_tool', 'ToolAlignObjects', 'AlignObjects', "Align Objects", 'align16.png',
+               separator=False, shortcut='Alt+A'),
+    PluginSpec('extract_tool', 'ToolExtract', 'ToolExtract', "Extract", 'extract32.png',
+               separator=True, shortcut='Alt+I'),
+    PluginSpec('panelize_tool', 'ToolPanelize', 'Panelize', "Panelization", 'panelize16.png',
+               shortcut='Alt+Z'),
+    PluginSpec('film_tool', 'ToolFilm', 'Film', "Film", 'film32.png',
+               shortcut='Alt+L'),
+    PluginSpec('paste_tool', 'ToolSolderPaste', 'SolderPaste', "SolderPaste", 'solderpastebis32.png',
+               shortcut='Alt+K'),
+    PluginSpec('calculator_tool', 'ToolCalculators', 'ToolCalculator', "Calculators", 'calculator32.png',
+               separator=True, shortcut='Alt+C'),
+    PluginSpec('sub_tool', 'ToolSub', 'ToolSub', "Subtract", 'sub32.png',
+               separator=True, shortcut='Alt+W'),
+    PluginSpec('rules_tool', 'ToolRulesCheck', 'RulesCheck', "Check Rules", 'rules32.png',
+               separator=False, shortcut='Alt+R'),
+    PluginSpec('optimal_tool', 'ToolOptimal', 'ToolOptimal', "Find Optimal", 'open_excellon32.png',
+               separator=True, shortcut='Alt+O'),
+    PluginSpec('move_tool', 'ToolMove', 'ToolMove', "Move", 'move16.png',
+               pos='ui.menuedit', before='ui.menuedit_numeric_move', separator=True, shortcut='M'),
+    PluginSpec('cutout_tool', 'ToolCutOut', 'CutOut', "Cutout", 'cut32.png',
+               before='sub_tool.menuAction', shortcut='Alt+X'),
+    PluginSpec('ncclear_tool', 'ToolNCC', 'NonCopperClear', "NCC", 'ncc32.png',
+               before='sub_tool.menuAction', separator=True, shortcut='Alt+N'),
+    PluginSpec('paint_tool', 'ToolPaint', 'ToolPaint', "Paint", 'paint32.png',
+               before='sub_tool.menuAction', separator=True, shortcut='Alt+P'),
+    PluginSpec('isolation_tool', 'ToolIsolation', 'ToolIsolation', "Isolation", 'iso_16.png',
+               before='sub_tool.menuAction', separator=True, shortcut='Alt+I'),
+    PluginSpec('follow_tool', 'ToolFollow', 'ToolFollow', "Follow", 'follow32.png',
+               before='sub_tool.menuAction', separator=True, shortcut=''),
+    PluginSpec('drilling_tool', 'ToolDrilling', 'ToolDrilling', "Drilling", 'extract_drill32.png',
+               before='sub_tool.menuAction', separator=True, shortcut='Alt+D'),
+    PluginSpec('milling_tool', 'ToolMilling', 'ToolMilling', "Milling", 'milling_tool32.png',
+               before='sub_tool.menuAction', separator=True, shortcut='Alt+M'),
+    PluginSpec('levelling_tool', 'ToolLevelling', 'ToolLevelling', "Levelling", 'level32.png',
+               pos='ui.menuoptions_experimental', separator=True, shortcut=''),
+    PluginSpec('copper_thieving_tool', 'ToolCopperThieving', 'ToolCopperThieving', "Copper Thieving",
+               'copperfill32.png', shortcut='Alt+J'),
+    PluginSpec('fiducial_tool', 'ToolFiducials', 'ToolFiducials', "Fiducials", 'fiducials_32.png',
+               shortcut='Alt+F'),
+    PluginSpec('qrcode_tool', 'ToolQRCode', 'QRCode', "QRCode", 'qrcode32.png',
+               shortcut='Alt+Q'),
+    PluginSpec('punch_tool', 'ToolPunchGerber', 'ToolPunchGerber', "Punch Gerber", 'punch32.png',
+               shortcut='Alt+H'),
+    PluginSpec('invert_tool', 'ToolInvertGerber', 'ToolInvertGerber', "Invert Gerber", 'invert32.png',
+               shortcut='ALT+G'),
+    PluginSpec('markers_tool', 'ToolMarkers', 'ToolMarkers', "Markers", 'corners_32.png',
+               shortcut='Alt+B'),
+    PluginSpec('etch_tool', 'ToolEtchCompensation', 'ToolEtchCompensation', "Etch Compensation", 'etch_32.png',
+               shortcut=''),
+    PluginSpec('transform_tool', 'ToolTransform', 'ToolTransform', "Transformation", 'transform.png',
+               pos='ui.menuoptions', separator=True, shortcut='Alt+T'),
+    PluginSpec('report_tool', 'ToolReport', 'ObjectReport', "Object Report", 'properties32.png',
+               pos='ui.menuoptions', shortcut='P'),
+    PluginSpec('pdf_tool', 'ToolPDF', 'ToolPDF', "PDF Import Tool", 'pdf32.png',
+               pos='ui.menufileimport', separator=True, shortcut=''),
+    PluginSpec('image_tool', 'ToolImage', 'ToolImage', "Image Import", 'image32.png',
+               pos='ui.menufileimport', separator=True, requires=('rasterio', 'svgtrace', 'pyppeteer', 'lxml')),
+    PluginSpec('pcb_wizard_tool', 'ToolPcbWizard', 'PcbWizard', "PcbWizard Import", 'drill32.png',
+               pos='ui.menufileimport'),
+]
+
+
+def resolve_path(app, path):
+    """
+    Get an object from a dotted path of attributes starting from the app, like 'ui.menu_plugins'.
+
+    :param app:     the application
+    :param path:    dotted path of attributes
+    :return:        the object
+    """
+    obj = app
+    for name in path.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+class PluginLoader(QtCore.QObject):
+    """
+    Loads the Plugins in the GUI thread. A Plugin is a QWidget so it can not be made in a worker thread; when the load
+    is requested from a worker thread (e.g. by a Tcl command) it is queued in the GUI thread and the worker waits for it.
+    """
+
+    load_request = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.load_request.connect(self.on_load_request, type=QtCore.Qt.ConnectionType.BlockingQueuedConnection)
+
+    def load(self, proxy):
+        if QtCore.QThread.currentThread() is self.thread():
+            proxy.load_in_gui_thread()
+        else:
+            self.load_request.emit(proxy)
+
+    def on_load_request(self, proxy):
+        proxy.load_in_gui_thread()
+
+
+class LazyPlugin:
+    """
+    Stand-in for a Plugin that is not yet loaded. It installs the menu entry of the Plugin, like AppTool.install(),
+    and answers the attributes needed without loading: pluginName and menuAction. Any other attribute access loads the
+    Plugin, replaces the proxy in the app and is forwarded to the Plugin.
+    """
+
+    def __init__(self, app, spec, loader):
+        object.__setattr__(self, 'app', app)
+        object.__setattr__(self, 'spec', spec)
+        object.__setattr__(self, 'loader', loader)
+        object.__setattr__(self, 'plugin', None)
+        object.__setattr__(self, 'pluginName', _(spec.name))
+        object.__setattr__(self, 'menuAction', None)
+
+    def install(self):
+        """
+        Install the menu entry of the Plugin. Same as AppTool.install() but the Action is owned by the menu.
+
+        :return:    None
+        """
+        spec = self.spec
+        pos = resolve_path(self.app, spec.pos)
+        before = resolve_path(self.app, spec.before) if spec.before is not None else None
+
+        action = QtGui.QAction(pos)
+        action.setIcon(QtGui.QIcon(self.app.resource_location + '/' + spec.icon))
+        if spec.shortcut is None:
+            action.setText(self.pluginName)
+        else:
+            action.setText(self.pluginName + '\t%s' % spec.shortcut)
+
+        pos.insertAction(before, action)
+        if spec.separator is True:
+            pos.addSeparator()
+
+        action.triggered.connect(lambda: self.run(toggle=True))
+        object.__setattr__(self, 'menuAction', action)
+
+    def load(self):
+        """
+        Import the Plugin module and instantiate the Plugin, if not done already.
+
+        :return:    the Plugin or None if it failed to load
+        """
+        if self.plugin is None:
+            self.loader.load(self)
+        return self.plugin
+
+    def load_in_gui_thread(self):
+        if self.plugin is not None:
+            return
+
+        spec = self.spec
+        log.debug("Loading the %s Plugin." % spec.name)
+        try:
+            with startup_tracer.span('load %s' % spec.name):
+                mod = importlib.import_module('%s.%s' % (__name__, spec.module))
+                plugin = getattr(mod, spec.class_name)(self.app)
+        except Exception as err:
+            log.error("LazyPlugin.load() -> %s Plugin could not be loaded due of: %s" % (spec.name, str(err)))
+            self.app.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to load the plugin"), _(spec.name)))
+            return
+
+        plugin.menuAction = self.menuAction
+        object.__setattr__(self, 'plugin', plugin)
+
+        # from now on the app holds the Plugin itself
+        if getattr(self.app, spec.attr, None) is self:
+            setattr(self.app, spec.attr, plugin)
+        self.app.app_plugins = [plugin if p is self else p for p in self.app.app_plugins]
+
+    def __getattr__(self, item):
+        plugin = self.load()
+        if plugin is None:
+            raise AttributeError("The %s Plugin is not available." % self.spec.name)
+        return getattr(plugin, item)
+
+    def __setattr__(self, key, value):
+        plugin = self.load()
+        if plugin is None:
+            raise AttributeError("The %s Plugin is not available." % self.spec.name)
+        setattr(plugin, key, value)
+
+
+def is_loaded(plugin):
+    """
+    Check if a Plugin is loaded, so it can be used without the cost of loading it.
+
+    :param plugin:  a Plugin or a LazyPlugin proxy
+    :return:        True if the Plugin is loaded
+    """
+    return not isinstance(plugin, LazyPlugin) or plugin.plugin is not None
+
+
+def install_plugins(app, specs=None):
+    """
+    Install the menu entries of the Plugins and set a LazyPlugin proxy for each of them in the app.
+
+    :param app:     the application
+    :param specs:   list of PluginSpec; by default all the PLUGINS
+    :return:        list of the installed LazyPlugin proxies
+    """
+    loader = PluginLoader(app)
+    installed = []
+    for spec in (PLUGINS if specs is None else specs):
+        if not spec.is_available():
+            log.error("%s Plugin could not be started due of missing packages: %s" %
+                      (spec.name, ', '.join(spec.requires)))
+            setattr(app, spec.attr, lambda x: None)
+            continue
+
+        proxy = LazyPlugin(app, spec, loader)
+        setattr(app, spec.attr, proxy)
+        with startup_tracer.span('install %s' % spec.name):
+            proxy.install()
+        installed.append(proxy)
+    return installed
 
-from appPlugins.ToolInvertGerber import ToolInvertGerber
-from appPlugins.ToolMarkers import ToolMarkers
-from appPlugins.ToolEtchCompensation import ToolEtchCompensation
\ No newline at end of file
@@ -1,33 +1,520 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
 
-from PyQt6 import QtCore
-from multiprocessing import Pool, cpu_count
-import dill
+# Process pool service of the App. WorkerPool wraps a multiprocessing Pool, it accepts the Pool methods used until now
+# (apply_async(), map_async(), imap() ...) and adds:
+# - map_geometry(): a chunked map over a list of geometry elements. The elements are serialized only once, as WKB, in
+#   a shared memory block; each task receives the name of the block and the range of its chunk
+# - share(): an object (e.g. the subtractor geometry) stored once in shared memory; each process of the Pool unpickles
+#   it once and keeps it in a cache, no matter how many tasks use it
+# - run_tasks(): many tasks with only a limited number of them in the Pool at one time (back-pressure)
+# - progress and abort across the processes: the tasks of map_geometry() and run_tasks() stop when the job is aborted
+#   and map_geometry() counts the processed elements while the chunks are still running
+# - resize() and recycle(): a new Pool replaces the current one while the tasks already in the old Pool finish
 
+import os
+import math
+import time
+import pickle
+import logging
+import threading
+from collections import OrderedDict, deque
+from multiprocessing import Pool, Array
+from multiprocessing import shared_memory, resource_tracker
 
-def run_dill_encoded(what):
-    fun, args = dill.loads(what)
-    print("load", fun, args)
-    return fun(*args)
+import numpy as np
+import shapely
 
+log = logging.getLogger('base')
 
-def apply_async(pool, fun, args):
-    print("...", fun, args)
-    print("dumps", dill.dumps((fun, args)))
-    return pool.map_async(run_dill_encoded, (dill.dumps((fun, args)),))
+# number of jobs (map_geometry() or run_tasks() calls) that can report the progress and be aborted at the same time
+JOB_SLOTS = 64
+# number of shared objects kept unpickled in each process of the Pool
+WORKER_CACHE_SIZE = 16
+# time to wait for the running tasks of an aborted job to stop, in seconds
+ABORT_WAIT = 2.0
+# time between two checks of the task that is waited for, in seconds
+POLL_INTERVAL = 0.05
 
+# #####################################################################################################################
+# State of the processes of the Pool, set by the Pool initializer
+# #####################################################################################################################
+# counter of the processed elements and abort flag for each job slot; shared by all the processes
+_job_progress = None
+_job_abort = None
+# the slot of the job whose task is run now by this process; -1 if none
+_job_slot = -1
+# the unpickled shared objects, by the name of their shared memory block
+_worker_cache = OrderedDict()
 
-def func1():
-    print("func")
+_MISSING = object()
 
 
-class WorkerPool(QtCore.QObject):
+def _init_worker(progress_array, abort_array):
+    global _job_progress, _job_abort
+    _job_progress = progress_array
+    _job_abort = abort_array
 
-    def __init__(self):
-        super(WorkerPool, self).__init__()
-        self.pool = Pool(int(cpu_count() / 4))
 
-    def add_task(self, task):
-        print("adding task", task)
-        # task['fcn'](*task['params'])
-        # print self.pool.map(task['fcn'], task['params'])
-        apply_async(self.pool, func1, ())
+def worker_abort_requested() -> bool:
+    """
+    Used by the functions that run in the Pool.
+
+    :return:    True if the job of the task run now by this process was aborted; False outside the WorkerPool tasks
+    """
+    if _job_slot < 0 or _job_abort is None:
+        return False
+    return bool(_job_abort[_job_slot])
+
+
+def worker_progress(n=1):
+    """
+    Used by the functions that run in the Pool to report processed elements.
+
+    :param n:   number of elements processed
+    :return:    None
+    """
+    if _job_slot >= 0 and _job_progress is not None:
+        with _job_progress.get_lock():
+            _job_progress[_job_slot] += n
+
+
+def _read_shared(name: str, start: int, stop: int) -> bytes:
+    # copy a part of a shared memory block; the block is attached only for the copy
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf[start:stop]
+        try:
+            return bytes(view)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+class SharedObject:
+    """
+    An object stored, pickled, in a shared memory block. Sending it to the Pool sends only the name of the block; in
+    the processes of the Pool resolve() returns the object, unpickled once in each process.
+    In the main process it is a context manager: the shared memory block is freed at the exit.
+    """
+
+    def __init__(self, obj):
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        self.size = len(data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, self.size))
+        self._shm.buf[:self.size] = data
+        self.name = self._shm.name
+
+    def __getstate__(self):
+        return {'name': self.name, 'size': self.size}
+
+    def __setstate__(self, state):
+        self.name = state['name']
+        self.size = state['size']
+        self._shm = None
+
+    def resolve(self):
+        """
+        :return:    the shared object
+        """
+        obj = _worker_cache.get(self.name, _MISSING)
+        if obj is _MISSING:
+            obj = pickle.loads(_read_shared(self.name, 0, self.size))
+            _worker_cache[self.name] = obj
+            while len(_worker_cache) > WORKER_CACHE_SIZE:
+                _worker_cache.popitem(last=False)
+        else:
+            _worker_cache.move_to_end(self.name)
+        return obj
+
+    def release(self):
+        """
+        Free the shared memory block. Only the process that created the object can do it.
+
+        :return:    None
+        """
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+class GeometryBlock:
+    """
+    A list of geometry elements stored once, as WKB, in a shared memory block. The block starts with the offsets of
+    the elements (count + 1 int64 values) followed by the WKB of the elements.
+    """
+
+    def __init__(self, geometries):
+        geo_arr = np.empty(len(geometries), dtype=object)
+        geo_arr[:] = list(geometries)
+        wkb = shapely.to_wkb(geo_arr)
+
+        self.count = len(wkb)
+        offsets = np.zeros(self.count + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(w) for w in wkb), dtype=np.int64, count=self.count), out=offsets[1:])
+        self.header = offsets.nbytes
+        size = self.header + int(offsets[-1])
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self._shm.buf[:self.header] = offsets.tobytes()
+        self._shm.buf[self.header:size] = b''.join(wkb)
+        self.name = self._shm.name
+
+    def __getstate__(self):
+        return {'name': self.name, 'count': self.count, 'header': self.header}
+
+    def __setstate__(self, state):
+        self.name = state['name']
+        self.count = state['count']
+        self.header = state['header']
+        self._shm = None
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        :param start:   index of the first element
+        :param stop:    index after the last element
+        :return:        Numpy array with the geometry elements in the range
+        """
+        offsets = np.frombuffer(_read_shared(self.name, start * 8, (stop + 1) * 8), dtype=np.int64)
+        data = _read_shared(self.name, self.header + int(offsets[0]), self.header + int(offsets[-1]))
+        offsets = offsets - offsets[0]
+        wkb = np.empty(stop - start, dtype=object)
+        wkb[:] = [data[offsets[i]:offsets[i + 1]] for i in range(stop - start)]
+        return shapely.from_wkb(wkb)
+
+    def release(self):
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+
+
+def _resolve(args) -> tuple:
+    return tuple(arg.resolve() if isinstance(arg, SharedObject) else arg for arg in args)
+
+
+def _run_task(func, args, kwds, slot):
+    # runs in a process of the Pool
+    global _job_slot
+    _job_slot = slot
+    try:
+        if worker_abort_requested():
+            return None
+        return func(*_resolve(args), **(kwds if kwds else {}))
+    finally:
+        _job_slot = -1
+
+
+def _run_geometry_chunk(func, block, start, stop, args, slot):
+    # runs in a process of the Pool
+    global _job_slot
+    _job_slot = slot
+    try:
+        args = _resolve(args)
+        results = []
+        for geo in block.read(start, stop):
+            if worker_abort_requested():
+                # the main process discards the results of an aborted job
+                break
+            results.append(func(geo, *args))
+            worker_progress()
+        return results
+    finally:
+        _job_slot = -1
+
+
+class WorkerPool:
+    """
+    The multiprocessing Pool of the App.
+    """
+
+    def __init__(self, processes=None):
+        """
+        :param processes:   number of processes; by default a quarter of the CPU count
+        """
+        self.processes = max(1, int(processes)) if processes else max(1, (os.cpu_count() or 1) // 4)
+
+        self.progress_array = Array('q', JOB_SLOTS)
+        self.abort_array = Array('b', JOB_SLOTS, lock=False)
+        self.free_slots = list(range(JOB_SLOTS))
+        self.lock = threading.Lock()
+
+        # the replaced Pools, finishing their tasks: list of (Pool, joining thread)
+        self.retired = []
+        self.pool = self._new_pool(self.processes)
+
+    def _new_pool(self, processes):
+        if os.name == 'posix':
+            # the processes of the Pool must use the resource tracker of the App; a process with its own tracker would
+            # unlink the shared memory blocks it attached to when it exits
+            resource_tracker.ensure_running()
+        return Pool(processes=processes, initializer=_init_worker, initargs=(self.progress_array, self.abort_array))
+
+    def __getattr__(self, item):
+        # the other methods and attributes of the multiprocessing Pool
+        if item == 'pool':
+            raise AttributeError(item)
+        return getattr(self.pool, item)
+
+    # #################################################################################################################
+    # Methods of the multiprocessing Pool
+    # #################################################################################################################
+    def apply_async(self, func, args=(), kwds=None, callback=None, error_callback=None):
+        """
+        Same as Pool.apply_async(); the SharedObject arguments are resolved in the process of the Pool.
+        """
+        return self.pool.apply_async(_run_task, (func, tuple(args), kwds, -1), callback=callback,
+                                     error_callback=error_callback)
+
+    def map_async(self, func, iterable, chunksize=None, callback=None, error_callback=None):
+        return self.pool.map_async(func, iterable, chunksize=chunksize, callback=callback,
+                                   error_callback=error_callback)
+
+    def map(self, func, iterable, chunksize=None):
+        return self.pool.map(func, iterable, chunksize=chunksize)
+
+    def imap(self, func, iterable, chunksize=1):
+        return self.pool.imap(func, iterable, chunksize=chunksize)
+
+    # #################################################################################################################
+    # Jobs
+    # #################################################################################################################
+    def share(self, obj) -> SharedObject:
+        """
+        Store an object in shared memory, to be used by many tasks. Use the result as a context manager so the shared
+        memory is freed when the tasks are done:
+
+            with app.pool.share(geometry) as shared_geo:
+                app.pool.run_tasks(func, [(shared_geo, x) for x in values])
+
+        :param obj:     a picklable object
+        :return:        SharedObject; as a task argument it is replaced by the object
+        """
+        return SharedObject(obj)
+
+    def call(self, func, args=(), kwds=None, progress=None):
+        """
+        Run one task in the Pool and wait for its result. The wait ends with a GracefulException if the progress
+        context reports an abort; the task itself runs to its end.
+
+        :param func:        a picklable function
+        :param args:        tuple of positional arguments
+        :param kwds:        dict of keyword arguments
+        :param progress:    ProgressContext of the operation or None
+        :return:            the result of the function
+        """
+        async_res = self.apply_async(func, args, kwds)
+        self._wait(async_res, progress)
+        return async_res.get()
+
+    def run_tasks(self, func, args_list, max_pending=None, progress=None, return_exceptions=False):
+        """
+        Run func(*args) in the Pool for each args in args_list. Only max_pending tasks are in the Pool at one time
+        so an abort is honored quickly and the Pool stays available to the other jobs.
+        If the progress context reports an abort (or the results are not consumed to the end) the tasks not started
+        yet are skipped.
+
+        :param func:                a picklable function
+        :param args_list:           iterable of tuples of positional arguments
+        :param max_pending:         maximum number of tasks in the Pool; by default twice the number of processes
+        :param progress:            ProgressContext of the operation or None; it is ticked for each finished task
+        :param return_exceptions:   if True the exception of a failed task is yielded instead of being raised
+        :return:                    generator of the results, in the order of args_list
+        """
+        max_pending = max_pending if max_pending else self.processes * 2
+        slot = self._acquire_slot()
+        pending = deque()
+        args_iter = iter(args_list)
+        try:
+            while True:
+                while len(pending) < max_pending:
+                    args = next(args_iter, _MISSING)
+                    if args is _MISSING:
+                        break
+                    pending.append(self.pool.apply_async(_run_task, (func, tuple(args), None, slot)))
+                if not pending:
+                    return
+
+                async_res = pending.popleft()
+                self._wait(async_res, progress)
+                try:
+                    result = async_res.get()
+                except Exception as err:
+                    if not return_exceptions:
+                        raise
+                    result = err
+                if progress is not None:
+                    progress.tick()
+                yield result
+        except BaseException:
+            self._abort(slot, pending)
+            raise
+        finally:
+            self._release_slot(slot)
+
+    def map_geometry(self, func, geometries, args=(), chunk_size=None, max_pending=None, progress=None) -> list:
+        """
+        Call func(element, *args) in the Pool for each geometry element. The elements are stored once, as WKB, in a
+        shared memory block and each task reads its chunk from it.
+
+        :param func:        a picklable function; its first parameter is a geometry element
+        :param geometries:  list of Shapely geometry elements
+        :param args:        tuple of more arguments for the function; SharedObject arguments are resolved
+        :param chunk_size:  number of elements for each task; by default there are about 4 tasks for each process
+        :param max_pending: maximum number of tasks in the Pool; by default twice the number of processes
+        :param progress:    ProgressContext of the operation or None; it is ticked for each processed element
+        :return:            list of results, in the order of the elements
+        """
+        count = len(geometries)
+        if count == 0:
+            return []
+        chunk_size = chunk_size if chunk_size else max(1, math.ceil(count / (self.processes * 4)))
+        max_pending = max_pending if max_pending else self.processes * 2
+
+        block = GeometryBlock(geometries)
+        slot = self._acquire_slot()
+        pending = deque()
+        starts = iter(range(0, count, chunk_size))
+        counted = 0
+        results = []
+        try:
+            while True:
+                while len(pending) < max_pending:
+                    start = next(starts, None)
+                    if start is None:
+                        break
+                    stop = min(start + chunk_size, count)
+                    pending.append(
+                        self.pool.apply_async(_run_geometry_chunk, (func, block, start, stop, tuple(args), slot)))
+                if not pending:
+                    break
+
+                async_res = pending.popleft()
+                counted = self._wait(async_res, progress, slot, counted)
+                chunk_results = async_res.get()
+                if slot < 0 and progress is not None:
+                    progress.tick(len(chunk_results))
+                results += chunk_results
+            return results
+        except BaseException:
+            self._abort(slot, pending)
+            raise
+        finally:
+            self._release_slot(slot)
+            block.release()
+
+    def _wait(self, async_res, progress, slot=None, counted=0):
+        # wait for a task while checking for an abort; with a slot the processed elements are counted
+        while True:
+            ready = async_res.ready()
+            if progress is not None:
+                if slot is not None and slot >= 0:
+                    done = self.progress_array[slot]
+                    progress.tick(done - counted)
+                    counted = done
+                else:
+                    progress.tick(0)
+            if ready:
+                return counted
+            async_res.wait(POLL_INTERVAL)
+
+    def _acquire_slot(self):
+        with self.lock:
+            if not self.free_slots:
+                return -1
+            slot = self.free_slots.pop()
+        self.progress_array[slot] = 0
+        self.abort_array[slot] = 0
+        return slot
+
+    def _release_slot(self, slot):
+        if slot < 0:
+            return
+        with self.lock:
+            self.free_slots.append(slot)
+
+    def _abort(self, slot, pending):
+        # signal the running tasks of the job to stop and give them some time to do it before the slot is reused
+        if slot >= 0:
+            self.abort_array[slot] = 1
+        deadline = time.monotonic() + ABORT_WAIT
+        for async_res in pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log.debug("WorkerPool -> the tasks of an aborted job are still running.")
+                break
+            async_res.wait(remaining)
+
+    # #################################################################################################################
+    # Size and life cycle
+    # #################################################################################################################
+    def resize(self, processes):
+        """
+        Change the number of processes. A new Pool takes the new tasks while the tasks already in the old Pool
+        finish; then the processes of the old Pool exit.
+
+        :param processes:   number of processes
+        :return:            None
+        """
+        processes = max(1, int(processes))
+        if processes == self.processes:
+            return
+        self.replace_pool(processes)
+
+    def recycle(self):
+        """
+        Replace the processes with new ones, e.g. to free the memory held by the old processes. The running tasks are
+        not interrupted.
+
+        :return:    None
+        """
+        self.replace_pool(self.processes)
+
+    def replace_pool(self, processes):
+        with self.lock:
+            old_pool = self.pool
+            self.processes = processes
+            self.pool = self._new_pool(processes)
+            self.retired = [(p, t) for p, t in self.retired if t.is_alive()]
+
+        old_pool.close()
+        join_thread = threading.Thread(target=old_pool.join, daemon=True)
+        join_thread.start()
+        with self.lock:
+            self.retired.append((old_pool, join_thread))
+        log.debug("WorkerPool -> new Pool with %d processes." % processes)
+
+    def close(self):
+        self.pool.close()
+
+    def join(self):
+        self.pool.join()
+        for __, join_thread in self.retired:
+            join_thread.join()
+
+    def terminate(self):
+        self.pool.terminate()
+        for old_pool, __ in self.retired:
+            old_pool.terminate()
@@ -7,6 +7,8 @@
 # ##########################################################
 
 from appGUI.GUIElements import FlatCAMActivityView
+from camlib import ProgressContext, process_gui_events
+from appWorkerStack import current_task
 from PyQt6 import QtCore
 import weakref
 
@@ -130,6 +132,8 @@ class FCVisibleProcessContainer(QtCore.QObject, FCProcessContainer):
     something_changed = QtCore.pyqtSignal()
     # this will signal that the application is IDLE
     idle_flag = QtCore.pyqtSignal()
+    # the progress text of the current process; emitted from the worker threads, so it is delivered queued
+    view_text_changed = QtCore.pyqtSignal(str)
 
     def __init__(self, view):
         assert isinstance(view, FlatCAMActivityView), \
@@ -144,6 +148,7 @@ class FCVisibleProcessContainer(QtCore.QObject, FCProcessContainer):
         self.new_text = ' '
 
         self.something_changed.connect(self.update_view)
+        self.view_text_changed.connect(self.update_view_text)
 
     def on_done(self, proc):
         # self.app.log.debug("FCVisibleProcessContainer.on_done()")
@@ -179,3 +184,33 @@ class FCVisibleProcessContainer(QtCore.QObject, FCProcessContainer):
                 self.view.set_busy(self.text_to_display_in_activity + self.new_text, no_movie=True)
             else:
                 self.view.set_busy(self.new_text, no_movie=True)
+
+
+class FCProgress(ProgressContext):
+    """
+    Progress of a long operation of the App. The progress text reaches the activity view through a signal so the
+    worker threads never touch the GUI. The GUI events are processed, at the same limited rate as the progress
+    updates, only when the operation runs in the main thread (e.g. started from the Tcl Shell without threading).
+    Besides the abort flag of the App, the cancellation of the Worker task that runs the operation is checked.
+    """
+
+    def __init__(self, app, total=0, interval=None):
+        super().__init__(app, total=total, interval=interval)
+        # the TaskHandle of the Worker task that runs the operation; None outside the Workers
+        self.task = current_task()
+
+    def check_abort(self):
+        super().check_abort()
+        if self.task is not None:
+            self.task.check_cancel()
+
+    def update(self):
+        if self.task is not None:
+            self.task.check_cancel()
+        super().update()
+
+    def publish(self, text: str):
+        self.app.proc_container.view_text_changed.emit(text)
+
+    def service_events(self):
+        process_gui_events()
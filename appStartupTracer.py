@@ -0,0 +1,309 @@
+# ##########################################################
+# FlatCAM Evo: 2D Post-processing for Manufacturing        #
+# MIT Licence                                              #
+# ##########################################################
+
+# Startup tracer. Enabled by the --startup_trace=<json|chrome> command line option it records the wall and CPU time of
+# the App initialization phases, of the Plugins install and load and of each imported module. The trace is saved in the
+# data folder when the startup is finished, either as a JSON report or in the Chrome trace format that can be opened
+# in chrome://tracing or https://ui.perfetto.dev
+
+import sys
+import os
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from importlib.abc import MetaPathFinder, Loader
+
+log = logging.getLogger('base')
+
+TRACE_FORMATS = ('json', 'chrome')
+
+
+class _TimedLoader(Loader):
+    """
+    Wraps the loader of a module and times the execution of the module (the import, without finding the module).
+    """
+
+    def __init__(self, loader, tracer):
+        self.loader = loader
+        self.tracer = tracer
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self.tracer.span(module.__name__, category='import'):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, item):
+        if item == 'loader':
+            raise AttributeError(item)
+        # loaders have optional methods (get_code, get_source, is_package ...) used by pkgutil, inspect, multiprocessing
+        return getattr(self.loader, item)
+
+
+class _ImportTimer(MetaPathFinder):
+    """
+    Meta path finder that finds nothing by itself; it asks the other finders and wraps the loader they return.
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self.tracer)
+                return spec
+        return None
+
+
+class StartupTracer:
+    """
+    Records the durations of the startup. Disabled by default, in which case its methods do nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_format = 'json'
+        self.events = []
+        self.origin_wall = time.perf_counter()
+        self.origin_cpu = time.process_time()
+
+        # the current phase, set by begin()
+        self.phase = None
+        self.import_timer = None
+        self.thread_local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self, trace_format='json'):
+        """
+        Enable the tracer and time the imports from now on.
+
+        :param trace_format:    'json' or 'chrome'
+        :return:                None
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self.trace_format = trace_format if trace_format in TRACE_FORMATS else 'json'
+        self.origin_wall = time.perf_counter()
+        self.origin_cpu = time.process_time()
+
+        self.import_timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self.import_timer)
+
+    def start_from_argv(self, argv):
+        """
+        Enable the tracer if the --startup_trace option is in the command line arguments. The arguments are checked here
+        and not by the App because the imports done before the App is created have to be timed.
+
+        :param argv:    the command line arguments
+        :return:        None
+        """
+        for idx, arg in enumerate(argv[1:], start=1):
+            if arg.startswith('--startup_trace='):
+                self.start(arg.partition('=')[2].strip().lower())
+            elif arg == '--startup_trace' and idx + 1 < len(argv):
+                # getopt also accepts the value as the next argument
+                self.start(argv[idx + 1].strip().lower())
+
+    def stop(self):
+        """
+        Stop timing the imports and close the current phase.
+
+        :return: None
+        """
+        self.end()
+        if self.import_timer is not None:
+            try:
+                sys.meta_path.remove(self.import_timer)
+            except ValueError:
+                pass
+            self.import_timer = None
+
+    def record(self, name, category, start_wall, start_cpu, depth=0):
+        """
+        Add an event that started at the given times and ends now.
+
+        :param name:        name of the event
+        :param category:    'phase', 'plugin' or 'import'
+        :param start_wall:  wall time at the start, from time.perf_counter()
+        :param start_cpu:   CPU time at the start, from time.process_time()
+        :param depth:       nesting level of the event
+        :return:            None
+        """
+        event = {
+            'name': name,
+            'cat': category,
+            'start': start_wall - self.origin_wall,
+            'wall': time.perf_counter() - start_wall,
+            # CPU time of the process; it includes what other threads do at the same time
+            'cpu': time.process_time() - start_cpu,
+            'tid': threading.get_ident(),
+            'depth': depth
+        }
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, category='plugin'):
+        """
+        Time a block of code.
+
+        :param name:        name of the event
+        :param category:    category of the event
+        :return:            context manager
+        """
+        if not self.enabled:
+            yield
+            return
+
+        local = self._local()
+        depth = local.depth
+        local.depth += 1
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            local.depth -= 1
+            self.record(name, category, start_wall, start_cpu, depth)
+
+    def begin(self, name):
+        """
+        Start an initialization phase. The previous phase, if any, ends here.
+
+        :param name:    name of the phase
+        :return:        None
+        """
+        if not self.enabled:
+            return
+        self.end()
+        self.phase = (name, time.perf_counter(), time.process_time())
+
+    def end(self):
+        """
+        End the current initialization phase.
+
+        :return: None
+        """
+        if not self.enabled or self.phase is None:
+            return
+        name, start_wall, start_cpu = self.phase
+        self.phase = None
+        self.record(name, 'phase', start_wall, start_cpu)
+
+    def _local(self):
+        # the nesting depth is kept per thread
+        local = self.thread_local
+        if not hasattr(local, 'depth'):
+            local.depth = 1
+        return local
+
+    def summary(self):
+        """
+        :return:    the trace as a dictionary: the phases, the Plugins and the imports, each sorted by the start time,
+                    with the durations in milliseconds
+        """
+        report = {
+            'date': str(datetime.now()),
+            'python': sys.version,
+            'platform': sys.platform,
+            'total_wall_ms': round((time.perf_counter() - self.origin_wall) * 1000, 3),
+            'total_cpu_ms': round((time.process_time() - self.origin_cpu) * 1000, 3),
+            'phase': [],
+            'plugin': [],
+            'import': []
+        }
+        events = sorted(self.events, key=lambda e: (e['start'], e['depth']))
+
+        # the time spent in the nested spans (e.g. the imports done by an imported module) is subtracted to get the
+        # self time of each span
+        nested = {}
+        stacks = {}
+        for idx, ev in enumerate(events):
+            if ev['cat'] == 'phase':
+                continue
+            stack = stacks.setdefault(ev['tid'], [])
+            while stack and events[stack[-1]]['start'] + events[stack[-1]]['wall'] <= ev['start']:
+                stack.pop()
+            if stack and events[stack[-1]]['depth'] == ev['depth'] - 1:
+                nested[stack[-1]] = nested.get(stack[-1], 0.0) + ev['wall']
+            stack.append(idx)
+
+        for idx, ev in enumerate(events):
+            entry = {
+                'name': ev['name'],
+                'start_ms': round(ev['start'] * 1000, 3),
+                'wall_ms': round(ev['wall'] * 1000, 3),
+                'cpu_ms': round(ev['cpu'] * 1000, 3),
+                'depth': ev['depth']
+            }
+            if ev['cat'] != 'phase':
+                entry['self_ms'] = round((ev['wall'] - nested.get(idx, 0.0)) * 1000, 3)
+            report.setdefault(ev['cat'], []).append(entry)
+        return report
+
+    def chrome_trace(self):
+        """
+        :return:    the trace in the Chrome trace event format (complete events, times in microseconds)
+        """
+        pid = os.getpid()
+        trace_events = []
+        for ev in self.events:
+            trace_events.append({
+                'name': ev['name'],
+                'cat': ev['cat'],
+                'ph': 'X',
+                'ts': round(ev['start'] * 1e6, 1),
+                'dur': round(ev['wall'] * 1e6, 1),
+                'pid': pid,
+                # the phases on their own row so they do not overlap the imports and the Plugins
+                'tid': 0 if ev['cat'] == 'phase' else ev['tid'],
+                'args': {'cpu_ms': round(ev['cpu'] * 1000, 3)}
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def save(self, data_path):
+        """
+        Stop the tracer and save the trace in the data folder.
+
+        :param data_path:   the folder where the trace file is saved
+        :return:            path of the saved file or None
+        """
+        if not self.enabled:
+            return None
+        self.stop()
+
+        date = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if self.trace_format == 'chrome':
+            filename = os.path.join(data_path, 'startup_trace_%s.trace.json' % date)
+            content = self.chrome_trace()
+        else:
+            filename = os.path.join(data_path, 'startup_trace_%s.json' % date)
+            content = self.summary()
+
+        try:
+            with open(filename, 'w') as f:
+                json.dump(content, f, indent=1)
+        except (OSError, TypeError, ValueError) as err:
+            log.error("StartupTracer.save() -> %s" % str(err))
+            return None
+        finally:
+            self.enabled = False
+
+        log.debug("Startup trace saved in: %s" % filename)
+        return filename
+
+
+# the tracer used by the application
+startup_tracer = StartupTracer()
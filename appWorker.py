@@ -45,8 +45,8 @@ class Worker(QtCore.QObject):
 
         self.allow_debug()
 
-        # Tasks are queued in the event listener.
-        self.app.worker_task.connect(self.do_worker_task)
+        # Tasks are queued in the event listener. The WorkerStack connects its worker_task signal to
+        # do_worker_task() before the thread is started so no task emitted in the meantime is lost.
 
     def do_worker_task(self, task):
 
@@ -58,7 +58,12 @@ class Worker(QtCore.QObject):
                 ('worker_name' not in task and self.name is None):
 
             try:
-                task['fcn'](*task['params'])
+                handle = task.get('handle')
+                if handle is not None:
+                    # the TaskHandle records the result, the exception and the timing of the task
+                    handle.run()
+                else:
+                    task['fcn'](*task['params'])
             except Exception as e:
                 self.app.thread_exception.emit(e)
                 print(traceback.format_exc())
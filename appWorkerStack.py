@@ -1,28 +1,289 @@
 
 from PyQt6 import QtCore
 from appWorker import Worker
+from appCommon.Common import GracefulException
+
+import heapq
+import itertools
+import threading
+import time
+import logging
+
+log = logging.getLogger('base')
+
+# Priority classes of the tasks; the tasks with a lower value are started first
+# plotting and the other tasks the user is waiting for
+PRIORITY_INTERACTIVE = 0
+# CAM jobs, opening and processing of files; the default
+PRIORITY_JOB = 1
+# autosave and the other tasks nobody is waiting for
+PRIORITY_BACKGROUND = 2
+
+_local = threading.local()
+
+
+def current_task():
+    """
+    :return:    the TaskHandle of the task run in the current thread; None if the thread is not running a task
+    """
+    return getattr(_local, 'task', None)
+
+
+class TaskHandle:
+    """
+    Future like handle of a task given to the WorkerStack. It holds the priority, the cancel request, the result or the
+    exception of the task and the time it waited in the queue and it was running.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, fcn, params=None, priority=PRIORITY_JOB, name=None):
+        """
+        :param fcn:         the function run by the task
+        :param params:      list of positional parameters for the function
+        :param priority:    PRIORITY_INTERACTIVE, PRIORITY_JOB or PRIORITY_BACKGROUND
+        :param name:        name of the task, used in the log; by default the name of the function
+        """
+        self.fcn = fcn
+        self.params = list(params) if params else []
+        self.priority = priority
+        self.name = name if name else getattr(fcn, '__qualname__', str(fcn))
+
+        self.state = self.PENDING
+        # the WorkerStack that runs the task and the name of the worker, when started
+        self.stack = None
+        self.worker_name = None
+
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+
+        self._result = None
+        self._exception = None
+        self._cancel_requested = False
+        self._callbacks = []
+        self._done_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<TaskHandle %s, %s>' % (self.name, self.state)
+
+    # #################################################################################################################
+    # Cancellation
+    # #################################################################################################################
+    def cancel(self):
+        """
+        Request the cancellation of the task. A task still in the queue is not started anymore; a running task stops
+        when it checks for it: FCProgress.tick() and TaskHandle.check_cancel() raise a GracefulException.
+
+        :return:    True if the task was not finished yet
+        """
+        with self._lock:
+            if self.state in (self.FINISHED, self.CANCELLED):
+                return False
+            self._cancel_requested = True
+            pending = self.state == self.PENDING
+
+        if pending and self.stack is not None:
+            self.stack.task_cancelled.emit(self)
+        return True
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested
+
+    def check_cancel(self):
+        """
+        Raise a GracefulException if the cancellation of the task was requested.
+
+        :return:    None
+        """
+        if self._cancel_requested:
+            raise GracefulException
+
+    # #################################################################################################################
+    # State and result
+    # #################################################################################################################
+    def done(self) -> bool:
+        return self._done_event.is_set()
+
+    def running(self) -> bool:
+        return self.state == self.RUNNING
+
+    def cancelled(self) -> bool:
+        return self.state == self.CANCELLED
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Block until the task is finished. Do not call it in the main thread for a task that needs the GUI events.
+
+        :param timeout: maximum time to wait, in seconds; None to wait until the task is finished
+        :return:        True if the task is finished
+        """
+        return self._done_event.wait(timeout)
+
+    def result(self, timeout=None):
+        """
+        :param timeout: maximum time to wait, in seconds; None to wait until the task is finished
+        :return:        the value returned by the task function. A GracefulException is raised if the task was
+                        cancelled and the exception of the task function, if it raised one
+        """
+        if not self.wait(timeout):
+            raise TimeoutError("Task %s not finished in %s seconds." % (self.name, str(timeout)))
+        if self.state == self.CANCELLED:
+            raise GracefulException
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        """
+        :param timeout: maximum time to wait, in seconds; None to wait until the task is finished
+        :return:        the exception raised by the task function or None
+        """
+        if not self.wait(timeout):
+            raise TimeoutError("Task %s not finished in %s seconds." % (self.name, str(timeout)))
+        return self._exception
+
+    def add_done_callback(self, fcn):
+        """
+        Add a function called with this handle when the task is finished or cancelled. The callbacks are called in the
+        thread of the WorkerStack (the main thread); if the task is already finished the function is called now.
+
+        :param fcn: function with one parameter, the TaskHandle
+        :return:    None
+        """
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(fcn)
+                return
+        self._call(fcn)
+
+    @property
+    def wait_time(self):
+        """
+        :return:    time spent in the queue, in seconds; None if the task was not started
+        """
+        return None if self.started_at is None else self.started_at - self.queued_at
+
+    @property
+    def run_time(self):
+        """
+        :return:    time spent running, in seconds; None if the task is not finished
+        """
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    # #################################################################################################################
+    # Used by the WorkerStack and the Worker
+    # #################################################################################################################
+    def run(self):
+        """
+        Run the task function in the current thread. Called by the Worker.
+        The exceptions raised by the task function are raised again, except the GracefulException raised after the
+        cancellation of this task was requested.
+
+        :return:    None
+        """
+        with self._lock:
+            if self._cancel_requested:
+                self.state = self.CANCELLED
+            else:
+                self.state = self.RUNNING
+        self.started_at = time.perf_counter()
+        if self.state == self.CANCELLED:
+            self._set_done()
+            return
+
+        _local.task = self
+        final_state = self.FINISHED
+        try:
+            self._result = self.fcn(*self.params)
+        except GracefulException as err:
+            if not self._cancel_requested:
+                self._exception = err
+                raise
+            final_state = self.CANCELLED
+        except Exception as err:
+            self._exception = err
+            raise
+        finally:
+            _local.task = None
+            self.state = final_state
+            self._set_done()
+
+    def _set_done(self):
+        self.finished_at = time.perf_counter()
+        self._done_event.set()
+
+    def finish_cancelled(self):
+        # a task cancelled while in the queue
+        self.state = self.CANCELLED
+        self._set_done()
+        self.call_callbacks()
+
+    def call_callbacks(self):
+        with self._lock:
+            callbacks = self._callbacks
+            self._callbacks = []
+        for fcn in callbacks:
+            self._call(fcn)
+
+    def _call(self, fcn):
+        try:
+            fcn(self)
+        except Exception as err:
+            log.error("TaskHandle callback of the task %s --> %s" % (self.name, str(err)))
 
 
 class WorkerStack(QtCore.QObject):
+    """
+    A crew of Workers, each in its own thread. The tasks wait in a priority queue and each Worker gets a new task only
+    when it finished the previous one. Besides the Workers for the jobs there is one Worker that runs only the
+    interactive tasks (e.g. plotting) so a long CAM job can't delay them, whatever the number of Workers.
+    """
 
-    worker_task = QtCore.pyqtSignal(dict)               # 'worker_name', 'func', 'params'
+    worker_task = QtCore.pyqtSignal(dict)               # 'worker_name', 'fcn', 'params', 'handle'
     thread_exception = QtCore.pyqtSignal(object)
+    # a TaskHandle submitted or cancelled from any thread; handled in the thread of the WorkerStack
+    task_submitted = QtCore.pyqtSignal(object)
+    task_cancelled = QtCore.pyqtSignal(object)
 
     def __init__(self, workers_number):
+        """
+        :param workers_number:  number of Workers for the jobs; one more Worker is made for the interactive tasks
+        """
         super(WorkerStack, self).__init__()
 
         self.workers = []
         self.threads = []
         self.load = {}                                  # {'worker_name': tasks_count}
 
+        # the queue of the tasks, a heap of tuples: (priority, sequence number, TaskHandle)
+        self.queue = []
+        self.sequence = itertools.count()
+        # {'worker_name': TaskHandle} for the running tasks
+        self.running = {}
+
+        self.task_submitted.connect(self.enqueue)
+        self.task_cancelled.connect(self.on_task_cancelled)
+
+        # the name of the Worker kept for the interactive tasks; it is the last one
+        self.interactive_worker = 'Slogger-' + str(workers_number)
+
         # Create workers crew
-        for i in range(0, workers_number):
+        for i in range(0, workers_number + 1):
             worker = Worker(self, 'Slogger-' + str(i))
             thread = QtCore.QThread()
 
             worker.moveToThread(thread)
             # worker.connect(thread, QtCore.SIGNAL("started()"), worker.run)
             thread.started.connect(worker.run)
+            self.worker_task.connect(worker.do_worker_task)
             worker.task_completed.connect(self.on_task_completed)
 
             thread.start(QtCore.QThread.Priority.NormalPriority)
@@ -35,13 +296,96 @@ class WorkerStack(QtCore.QObject):
         for thread in self.threads:
             thread.terminate()
 
+    def submit(self, fcn, params=None, priority=PRIORITY_JOB, name=None):
+        """
+        Queue a task. It can be called from any thread.
+
+        :param fcn:         the function run by the task
+        :param params:      list of positional parameters for the function
+        :param priority:    PRIORITY_INTERACTIVE, PRIORITY_JOB or PRIORITY_BACKGROUND
+        :param name:        name of the task, used in the log
+        :return:            TaskHandle
+        """
+        handle = TaskHandle(fcn, params, priority=priority, name=name)
+        handle.stack = self
+        self.task_submitted.emit(handle)
+        return handle
+
     def add_task(self, task):
-        worker_name = min(self.load, key=self.load.get)
-        self.load[worker_name] += 1
-        self.worker_task.emit({'worker_name': worker_name, 'fcn': task['fcn'], 'params': task['params']})
+        """
+        Slot of the App.worker_task signal.
+
+        :param task:    dict with the keys: 'fcn' and 'params' and optionally 'priority' and 'name'
+        :return:        TaskHandle
+        """
+        handle = TaskHandle(task['fcn'], task['params'], priority=task.get('priority', PRIORITY_JOB),
+                            name=task.get('name'))
+        handle.stack = self
+        self.enqueue(handle)
+        return handle
+
+    def enqueue(self, handle):
+        if handle.cancel_requested:
+            handle.finish_cancelled()
+            return
+        heapq.heappush(self.queue, (handle.priority, next(self.sequence), handle))
+        self.dispatch()
+
+    def dispatch(self):
+        """
+        Give the queued tasks to the idle Workers, in the order of their priority.
+
+        :return:    None
+        """
+        while self.queue:
+            idle = [w.name for w in self.workers if w.name not in self.running]
+            if not idle:
+                return
+
+            priority, __, handle = self.queue[0]
+            if handle.state != TaskHandle.PENDING:
+                # cancelled while in the queue
+                heapq.heappop(self.queue)
+                continue
+
+            if priority > PRIORITY_INTERACTIVE:
+                # the Worker of the interactive tasks does not run the other tasks
+                idle = [name for name in idle if name != self.interactive_worker]
+                if not idle:
+                    return
+            elif self.interactive_worker in idle:
+                # the interactive tasks go first to their Worker so the others stay free for the jobs
+                idle = [self.interactive_worker]
+
+            heapq.heappop(self.queue)
+            worker_name = idle[0]
+            handle.worker_name = worker_name
+            self.running[worker_name] = handle
+            self.load[worker_name] += 1
+            self.worker_task.emit({
+                'worker_name': worker_name, 'fcn': handle.fcn, 'params': handle.params, 'handle': handle})
+
+    def on_task_cancelled(self, handle):
+        # a task still in the queue is finished now; it is removed from the queue by dispatch()
+        if handle.worker_name is None and handle.state == TaskHandle.PENDING:
+            handle.finish_cancelled()
 
     def on_task_completed(self, worker_name):
-        self.load[str(worker_name)] -= 1
+        worker_name = str(worker_name)
+        self.load[worker_name] -= 1
+        handle = self.running.pop(worker_name, None)
+        if handle is not None:
+            if handle.wait_time is not None and handle.run_time is not None:
+                log.debug("WorkerStack -> task %s %s in %.3f sec, after %.3f sec in the queue." % (
+                    handle.name, handle.state, handle.run_time, handle.wait_time))
+            handle.call_callbacks()
+        self.dispatch()
+
+    def pending_tasks(self):
+        """
+        :return:    list of the TaskHandles in the queue, in the order they will start
+        """
+        return [entry[2] for entry in sorted(self.queue) if entry[2].state == TaskHandle.PENDING]
 
     def quit(self):
         for thread in self.threads:
@@ -9,6 +9,8 @@ import shapely
 from PyQt6 import QtWidgets
 
 from appCommon.Common import GracefulException as grace
+from appPool import worker_abort_requested
+from appCommon.TextSegments import TextSegments
 
 # from scipy.spatial import KDTree, Delaunay
 # from scipy.spatial import Delaunay
@@ -18,12 +20,21 @@ from appParsers.ParseDXF import getdxfgeo
 
 from numpy.linalg import solve
 
+import os
+import sys
 import platform
 import traceback
+from contextlib import contextmanager
+from datetime import datetime as dt
 from decimal import Decimal
 from copy import deepcopy
 from collections.abc import Iterable
+from collections import OrderedDict
 from copy import copy
+import hashlib
+import threading
+import time
+import weakref
 
 from rtree import index as rtindex
 from lxml import etree as ET
@@ -43,6 +54,7 @@ from shapely.wkt import loads as sloads
 from shapely.wkt import dumps as sdumps
 from shapely.geometry.base import BaseGeometry
 from shapely import union, difference
+from shapely.strtree import STRtree
 
 # ---------------------------------------
 # NEEDED for Legacy mode
@@ -85,6 +97,145 @@ class ParseError(Exception):
     pass
 
 
+class ValidationError(Exception):
+    def __init__(self, message, errors):
+        super().__init__(message)
+
+        self.errors = errors
+
+
+# Set to False in the processes of the multiprocessing Pool where there is no GUI event loop to service; a forked
+# process shares the connection to the display server with the main process, so it must not touch it.
+GUI_EVENTS = True
+
+
+def process_gui_events():
+    """
+    Provide the app with a way to process the GUI events when in a blocking loop.
+    It does nothing when running inside a process of the multiprocessing Pool or in a worker thread; the event loop
+    belongs to the main thread.
+
+    :return:    None
+    """
+    if GUI_EVENTS and threading.current_thread() is threading.main_thread():
+        QtWidgets.QApplication.processEvents()
+
+
+def set_gui_events(enabled: bool):
+    """
+    Enable or disable the GUI events processing done by process_gui_events(). It is disabled by the headless core
+    where there is no GUI event loop.
+
+    :param enabled: True to process the GUI events when in a blocking loop
+    :return:        None
+    """
+    global GUI_EVENTS
+    GUI_EVENTS = bool(enabled)
+
+
+class ProgressContext:
+    """
+    Progress and cancellation of a long operation, passed to the loops of the operation.
+    The loops call tick() for each processed element. The abort flag of the App is checked on each call but the
+    progress is published at most once every INTERVAL seconds, so the loops do not pay for the GUI updates.
+
+    This implementation does not use Qt: the progress goes to the process container of the App, if there is one,
+    and no GUI events are processed. It is used by the headless core and in the processes of the multiprocessing Pool;
+    the App provides its own implementation through its new_progress() method.
+    """
+
+    # minimum time between two progress updates, in seconds
+    INTERVAL = 0.1
+
+    def __init__(self, app=None, total=0, interval=None):
+        """
+        :param app:         the App (or a stand-in with the abort_flag and proc_container attributes); can be None
+        :param total:       number of elements to be processed; 0 if not known, then no percentage is published
+        :param interval:    minimum time between two progress updates, in seconds
+        """
+        self.app = app
+        self.total = total
+        self.done = 0
+        self.percent = 0
+        self.interval = self.INTERVAL if interval is None else interval
+        self._next_update = time.monotonic() + self.interval
+
+    def set_total(self, total: int):
+        """
+        Start counting again, for a new stage of the operation.
+
+        :param total:   number of elements to be processed
+        :return:        None
+        """
+        self.total = total
+        self.done = 0
+        self.percent = 0
+
+    def check_abort(self):
+        """
+        Raise a GracefulException if the user requested an abort.
+
+        :return:    None
+        """
+        if self.app is not None and self.app.abort_flag:
+            # graceful abort requested by the user
+            raise grace
+
+    def tick(self, n=1):
+        """
+        Record processed elements and check for an abort. Called in the inner loops so it has to be cheap.
+
+        :param n:   number of elements processed since the last call; 0 for a loop that can't count its work
+        :return:    None
+        """
+        self.done += n
+        if self.app is not None and self.app.abort_flag:
+            # graceful abort requested by the user
+            raise grace
+
+        now = time.monotonic()
+        if now >= self._next_update:
+            self._next_update = now + self.interval
+            self.update()
+
+    def update(self):
+        """
+        Publish the progress, if it changed, and service the GUI events.
+
+        :return:    None
+        """
+        if self.total > 0:
+            percent = min(100, int(self.done * 100 / self.total))
+            if percent != self.percent:
+                self.percent = percent
+                self.publish(' %d%%' % percent)
+        self.service_events()
+
+    def publish(self, text: str):
+        """
+        :param text:    the progress text, added to the description of the current process
+        :return:        None
+        """
+        container = getattr(self.app, 'proc_container', None)
+        if container is not None:
+            container.update_view_text(text)
+
+    def service_events(self):
+        pass
+
+
+def progress_for(app, total=0):
+    """
+    :param app:     the App or a stand-in (the headless core, the context of a Pool process)
+    :param total:   number of elements to be processed; 0 if not known
+    :return:        a progress context for a long operation; the one made by the App if it has a new_progress() method
+    """
+    factory = getattr(app, 'new_progress', None)
+    if factory is not None:
+        return factory(total)
+    return ProgressContext(app, total)
+
+
 class ApertureMacro:
     """
     Syntax of aperture macros.
@@ -539,6 +690,10 @@ class Geometry(object):
         # "geo_steps_per_circle": 128
     }
 
+    # True if an offset, a scale or a mirror maps the bounds on the bounds of the transformed geometry; False if the
+    # bounds have a term that is not transformed with the geometry
+    affine_bounds = True
+
     def __init__(self, geo_steps_per_circle=None):
         # Units (in or mm)
         self.units = self.app.app_units
@@ -556,6 +711,13 @@ class Geometry(object):
         # Flattened geometry (list of paths only)
         self.flat_geometry = []
 
+        # Instanced panel: the geometry is stored once and it is used at each of these (x, y) offsets.
+        # The copies are made only when needed, in expand_instances()
+        self.instance_offsets = []
+
+        # the bounds of the geometry are cached until the geometry changes; see bounds() and invalidate_bounds()
+        self._bounds_cache = None
+
         # this is the calculated conversion factor when the file units are different than the ones in the app
         self.file_units_factor = 1
 
@@ -569,14 +731,17 @@ class Geometry(object):
         self.old_disp_number = 0
         self.el_count = 0
 
-        if self.app.use_3d_engine:
+        if self.app.plotcanvas is None:
+            # headless core, nothing to plot on
+            self.temp_shapes = NullShapeCollection()
+        elif self.app.use_3d_engine:
             self.temp_shapes = self.app.plotcanvas.new_shape_collection(layers=1)
         else:
             from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
             self.temp_shapes = ShapeCollectionLegacy(obj=self, app=self.app, name='camlib.geometry')
 
         # Attributes to be included in serialization
-        self.ser_attrs = ["units", 'solid_geometry', 'follow_geometry', 'tools']
+        self.ser_attrs = ["units", 'solid_geometry', 'follow_geometry', 'tools', 'instance_offsets']
 
     def plot_temp_shapes(self, element, color='red'):
 
@@ -763,7 +928,184 @@ class Geometry(object):
     def bounds(self, flatten=False):
         """
         Returns coordinates of rectangular bounds
-        of geometry: (xmin, ymin, xmax, ymax).
+        of geometry: (xmin, ymin, xmax, ymax). For an instanced panel the bounds hold all the instances.
+        The result is cached until the geometry changes (see bounds_key()) or it is transformed (invalidate_bounds()).
+        :param flatten: will flatten the solid_geometry if True
+        :return:
+        """
+        key = self.bounds_key()
+        cache = getattr(self, '_bounds_cache', None)
+        if not flatten and cache is not None and cache[0] == key:
+            return cache[1]
+
+        xmin, ymin, xmax, ymax = self.geometry_bounds(flatten=flatten)
+
+        offsets = getattr(self, 'instance_offsets', None)
+        if offsets is not None and len(offsets) > 0:
+            offsets = np.asarray(offsets, dtype=float)
+            xmin, ymin = xmin + offsets[:, 0].min(), ymin + offsets[:, 1].min()
+            xmax, ymax = xmax + offsets[:, 0].max(), ymax + offsets[:, 1].max()
+
+        self._bounds_cache = (key, (xmin, ymin, xmax, ymax))
+        return xmin, ymin, xmax, ymax
+
+    def bounds_sources(self) -> list:
+        """
+        The containers read by geometry_bounds(): the solid geometry or, for a multi-geometry object, the solid geometry
+        of the tools. The classes that override geometry_bounds() override this method too.
+
+        :return:    list of the values (geometry, lists, drills arrays, flags) that the bounds depend on
+        :rtype:     list
+        """
+        if getattr(self, 'multigeo', None) is True:
+            tools = getattr(self, 'tools', None) or {}
+            return [True] + [tool_dict.get('solid_geometry') for tool_dict in tools.values()
+                             if isinstance(tool_dict, dict)]
+        return [False, self.solid_geometry]
+
+    def bounds_key(self):
+        """
+        A fingerprint of the content used to find the bounds, to validate the cached bounds: the elements of the
+        containers that geometry_bounds() reads (see bounds_sources()) and the values of the instance offsets.
+        The key holds weak references to the Shapely elements, which are immutable, and to the drills arrays together
+        with their version, which changes when an array is changed in place. A weak reference to an element that was
+        deleted is not equal to any other, so no new element can take the place of one in the key.
+        It catches the geometry replaced and the lists and the drills arrays changed in place.
+
+        :return:    a tuple that changes when the content measured by bounds() changes
+        :rtype:     tuple
+        """
+        key = []
+
+        def collect(source):
+            if isinstance(source, (list, tuple)):
+                key.append(len(source))
+                for sub_source in source:
+                    collect(sub_source)
+            elif isinstance(source, dict):
+                for sub_source in source.values():
+                    collect(sub_source)
+            elif isinstance(source, DrillArray):
+                key.append((weakref.ref(source), source.version))
+            elif isinstance(source, BaseGeometry):
+                key.append(weakref.ref(source))
+            else:
+                key.append(source)
+
+        collect(self.bounds_sources())
+
+        offsets = getattr(self, 'instance_offsets', None)
+        offsets_key = np.asarray(offsets, dtype=float).tobytes() if offsets is not None and len(offsets) > 0 else b''
+        return tuple(key), offsets_key
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the key of the cached bounds holds weak references, which can't be pickled
+        state['_bounds_cache'] = None
+        return state
+
+    def invalidate_bounds(self):
+        """
+        Drop the cached bounds. Called by the methods that change the geometry in place (offset, scale, mirror,
+        rotate, skew, buffer) and when an editor saves its content in the object.
+
+        :return:    None
+        """
+        self._bounds_cache = None
+
+    def expand_instances(self):
+        """
+        Replace the instanced panel geometry with the actual copies of the geometry, one for each instance offset.
+        It is done before the geometry is used for anything else than plotting, like export or GCode generation.
+
+        :return:    None
+        """
+        offsets = getattr(self, 'instance_offsets', None)
+        if offsets is None or len(offsets) == 0:
+            return
+
+        self.app.log.debug("camlib.Geometry.expand_instances() -> %d instances" % len(offsets))
+        offsets = np.asarray(offsets, dtype=float)
+
+        if self.solid_geometry is not None:
+            self.solid_geometry = panelize_geometry(self.solid_geometry, offsets)
+        if self.follow_geometry is not None:
+            self.follow_geometry = panelize_geometry(self.follow_geometry, offsets)
+
+        for tool_dict in (getattr(self, 'tools', None) or {}).values():
+            if tool_dict.get('solid_geometry'):
+                tool_dict['solid_geometry'] = panelize_geometry(tool_dict['solid_geometry'], offsets)
+            if tool_dict.get('geometry'):
+                tool_dict['geometry'] = panelize_apertures(tool_dict['geometry'], offsets)
+            if tool_dict.get('drills'):
+                tool_dict['drills'] = panelize_points(tool_dict['drills'], offsets)
+            if tool_dict.get('slots'):
+                tool_dict['slots'] = panelize_slots(tool_dict['slots'], offsets)
+
+        self.instance_offsets = []
+        self.invalidate_bounds()
+
+    def transform_geometry(self, matrix):
+        """
+        Apply an affine transformation to all the geometry of the object: the solid geometry and, for a multi-geometry
+        object, the solid geometry of each tool. All the elements are transformed in one vectorized operation,
+        see affine_transform().
+
+        :param matrix:  3x3 affine matrix, see translation_matrix(), scale_matrix(), rotation_matrix() ...
+        :return:        None
+        """
+        self.invalidate_bounds()
+
+        containers = []
+        if getattr(self, 'multigeo', False) is True:
+            containers = [tool_dict for tool_dict in self.tools.values() if 'solid_geometry' in tool_dict]
+
+        structures = [self.solid_geometry] + [tool_dict['solid_geometry'] for tool_dict in containers]
+        transformed = affine_transform(structures, matrix)
+
+        self.solid_geometry = transformed[0]
+        for tool_dict, geo in zip(containers, transformed[1:]):
+            tool_dict['solid_geometry'] = geo
+
+        self.transform_instances(matrix)
+
+    def transformed_bounds(self, bounds, matrix):
+        """
+        Find the bounds of the geometry transformed by a matrix from the bounds before the transformation, without
+        transforming the geometry. An offset, a scale or a mirror maps the bounding box on the new bounding box, but
+        only if the bounds are made of transformed coordinates alone (see affine_bounds).
+
+        :param bounds:  (xmin, ymin, xmax, ymax) before the transformation
+        :param matrix:  3x3 affine matrix
+        :return:        (xmin, ymin, xmax, ymax) after the transformation or None if they can't be found this way
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        if bounds is None or not self.affine_bounds or matrix[0, 1] != 0 or matrix[1, 0] != 0:
+            return None
+
+        xs = np.array(bounds[0::2], dtype=float) * matrix[0, 0] + matrix[0, 2]
+        ys = np.array(bounds[1::2], dtype=float) * matrix[1, 1] + matrix[1, 2]
+        return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+    def transform_instances(self, matrix):
+        """
+        Keep an instanced panel consistent with a transformation of its stored geometry. An instance is the geometry
+        translated by its offset so after the transformation it is the transformed geometry translated by the
+        transformed offset, without the translation part of the matrix.
+
+        :param matrix:  3x3 affine matrix
+        :return:        None
+        """
+        offsets = getattr(self, 'instance_offsets', None)
+        if offsets is None or len(offsets) == 0:
+            return
+        linear = np.asarray(matrix, dtype=float)[:2, :2]
+        self.instance_offsets = (np.asarray(offsets, dtype=float) @ linear.T).tolist()
+
+    def geometry_bounds(self, flatten=False):
+        """
+        Returns coordinates of rectangular bounds
+        of geometry: (xmin, ymin, xmax, ymax), not taking into account the instances of a panel.
         :param flatten: will flatten the solid_geometry if True
         :return:
         """
@@ -1131,26 +1473,26 @@ class Geometry(object):
 
         working_geo_shp = flatten_shapely_geometry(working_geo)
         geo_len = len(working_geo_shp)
+        corner_type = 1 if corner is None else corner
 
         old_disp_number = 0
-        pol_nr = 0
-        # yet, it can be done by issuing an unary_union in the end, thus getting rid of the overlapping geo
-        for pol in working_geo_shp:
+        # the polygons are buffered in chunks with the vectorized shapely.buffer(); the overlapping geometry is
+        # merged by the unary_union done in the end
+        chunk_size = 500
+        for start in range(0, geo_len, chunk_size):
             if self.app.abort_flag:
                 # graceful abort requested by the user
                 raise grace
+
+            chunk = working_geo_shp[start:start + chunk_size]
             if offset == 0:
-                temp_geo = pol
+                geo_iso += chunk
             else:
-                corner_type = 1 if corner is None else corner
-                temp_geo = pol.buffer(offset, int(self.geo_steps_per_circle), join_style=corner_type)
-
-            geo_iso.append(temp_geo)
-
-            pol_nr += 1
+                geo_iso += list(shapely.buffer(chunk, offset, quad_segs=int(self.geo_steps_per_circle),
+                                               join_style=corner_type))
 
             # activity view update
-            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
+            disp_number = int(np.interp(start + len(chunk), [0, geo_len], [0, 100]))
             if old_disp_number < disp_number <= 100:
                 self.app.proc_container.update_view_text(' %s %d: %d%%' %
                                                          (_("Pass"), int(passes + 1), int(disp_number)))
@@ -1404,13 +1746,13 @@ class Geometry(object):
         return boundary.difference(self.solid_geometry)
 
     def clear_polygon_shrink(self, polygon, tooldia, steps_per_circle, overlap=0.15, connect=True, contour=True,
-                             prog_plot=False):
+                             prog_plot=False, progress=None):
         """
         Creates geometry inside a polygon for a tool to cover
         the whole area.
 
         This algorithm shrinks the edges of the polygon and takes
-        the resulting edges as toolpaths.
+        the resulting edges as toolpaths. See shrink_clearing_paths().
 
         :param polygon:             Polygon to clear.
         :param tooldia:             Diameter of the tool.
@@ -1421,91 +1763,18 @@ class Geometry(object):
         :param contour:             Paint around the edges. Inconsequential in
                                     this painting method.
         :param prog_plot:           boolean; if Ture use the progressive plotting
+        :param progress:            ProgressContext of the operation; if None a new one is made
         :return:
         """
 
         # log.debug("camlib.clear_polygon_shrink()")
+        if progress is None:
+            progress = progress_for(self.app)
 
-        # The toolpaths
-        # Index first and last points in paths
-        def get_pts(o):
-            return [o.coords[0], o.coords[-1]]
-
-        geoms = AppRTreeStorage()
-        geoms.get_points = get_pts
-
-        # Can only result in a Polygon or MultiPolygon
-        # NOTE: The resulting polygon can be "empty".
-        current = polygon.buffer((-tooldia / 2), int(steps_per_circle))
-        current = flatten_shapely_geometry(current)
-
-        for p in current:
-            geoms.insert(p.exterior)
-            for i in p.interiors:
-                geoms.insert(i)
-
-        for cl_pol in current:
-            while True:
-                if self.app.abort_flag:
-                    # graceful abort requested by the user
-                    raise grace
-                # provide the app with a way to process the GUI events when in a blocking loop
-                QtWidgets.QApplication.processEvents()
-
-                cl_pol = cl_pol.buffer(-tooldia * (1 - overlap), int(steps_per_circle))
-                cl_pol_list = flatten_shapely_geometry(cl_pol)
-
-                added_flag = False
-                for tiny_pol in cl_pol_list:
-                    if tiny_pol.area > 0:
-                        added_flag = True
-                        geoms.insert(tiny_pol.exterior)
-                        if prog_plot:
-                            self.plot_temp_shapes(tiny_pol.exterior)
-
-                        for i in tiny_pol.interiors:
-                            geoms.insert(i)
-                            if prog_plot:
-                                self.plot_temp_shapes(i)
-                if added_flag is False:
-                    break
-
-                cl_pol = unary_union(cl_pol_list)
-
-                # if isinstance(cl_pol, MultiPolygon):
-                #     cl_pol = flatten_shapely_geometry(cl_pol)
-                #
-                #     added_flag = False
-                #     for tiny_pol in cl_pol:
-                #         if tiny_pol.area > 0:
-                #             added_flag = True
-                #             geoms.insert(tiny_pol.exterior)
-                #             if prog_plot:
-                #                 self.plot_temp_shapes(tiny_pol.exterior)
-                #
-                #             for i in tiny_pol.interiors:
-                #                 geoms.insert(i)
-                #                 if prog_plot:
-                #                     self.plot_temp_shapes(i)
-                #     if added_flag is False:
-                #         break
-                #
-                #     cl_pol = MultiPolygon(cl_pol)
-                # else:
-                #     if cl_pol.area > 0:
-                #         geoms.insert(cl_pol.exterior)
-                #         if prog_plot:
-                #             self.plot_temp_shapes(cl_pol.exterior)
-                #
-                #         for i in cl_pol.interiors:
-                #             geoms.insert(i)
-                #             if prog_plot:
-                #                 self.plot_temp_shapes(i)
-                #     else:
-                #         break
-
-        if not geoms.objects:
-            self.app.log.debug("camlib.Geometry.clear_polygon_shrink() --> Current Area is zero")
+        geoms = shrink_clearing_paths(polygon, tooldia, steps_per_circle, overlap=overlap,
+                                      pool=getattr(self.app, 'pool', None), progress=progress,
+                                      plot=self.plot_temp_shapes if prog_plot else None)
+        if geoms is None:
             return
 
         if prog_plot:
@@ -1521,7 +1790,7 @@ class Geometry(object):
         return geoms
 
     def clear_polygon_seed(self, polygon_to_clear, tooldia, steps_per_circle, seedpoint=None, overlap=0.15,
-                           connect=True, contour=True, simplify_tol=0.0, prog_plot=False):
+                           connect=True, contour=True, simplify_tol=0.0, prog_plot=False, progress=None):
         """
         Creates geometry inside a polygon for a tool to cover
         the whole area.
@@ -1529,7 +1798,7 @@ class Geometry(object):
         This algorithm starts with a seed point inside the polygon
         and draws circles around it. Arcs inside the polygons are
         valid cuts. Finalizes by cutting around the inside edge of
-        the polygon.
+        the polygon. See seed_clearing_paths().
 
         :param polygon_to_clear:    Shapely.geometry.Polygon
         :param steps_per_circle:    how many linear segments to use to approximate a circle
@@ -1539,83 +1808,22 @@ class Geometry(object):
         :param connect:             Connect disjoint segment to minimize tool lifts
         :param contour:             Cut contour inside the polygon.
         :param prog_plot:           boolean; if True use the progressive plotting
+        :param progress:            ProgressContext of the operation; if None a new one is made
         :return:                    List of toolpaths covering polygon.
         :rtype:                     AppRTreeStorage | None
         """
 
         # log.debug("camlib.clear_polygon_seed()")
-
-        # Current buffer radius
-        radius = tooldia / 2 * (1 - overlap)
-
-        # ## The toolpaths
-        # Index first and last points in paths
-        def get_pts(o):
-            return [o.coords[0], o.coords[-1]]
-
-        geom_elems = AppRTreeStorage()
-        geom_elems.get_points = get_pts
-
-        # Path margin
-        path_margin = polygon_to_clear.buffer(-tooldia / 2, int(steps_per_circle))
-        path_margin = flatten_shapely_geometry(path_margin, simplify_tolerance=simplify_tol)
-        path_margin = MultiPolygon(path_margin)
-
-        if path_margin.is_empty or path_margin is None:
+        if progress is None:
+            progress = progress_for(self.app)
+
+        geom_elems = seed_clearing_paths(polygon_to_clear, tooldia, steps_per_circle, seedpoint=seedpoint,
+                                         overlap=overlap, contour=contour, simplify_tol=simplify_tol,
+                                         progress=progress, plot=self.plot_temp_shapes if prog_plot else None,
+                                         redraw=self.temp_shapes.redraw if prog_plot else None)
+        if geom_elems is None:
             return None
 
-        # Estimate good seedpoint if not provided.
-        if seedpoint is None:
-            seedpoint = path_margin.representative_point()
-
-        # Grow from seed until outside the box. The polygons will
-        # never have an interior, so take the exterior LinearRing.
-        while True:
-            if self.app.abort_flag:
-                # graceful abort requested by the user
-                raise grace
-
-            # provide the app with a way to process the GUI events when in a blocking loop
-            QtWidgets.QApplication.processEvents()
-
-            path = Point(seedpoint).buffer(radius, int(steps_per_circle)).exterior
-            path = path.simplify(simplify_tol)
-            path = path.intersection(path_margin)
-
-            # Touches polygon?
-            if path.is_empty:
-                break
-
-            # path can be a collection of paths.
-            path_geometry = flatten_shapely_geometry(path, simplify_tolerance=simplify_tol)
-            for p in path_geometry:
-                geom_elems.insert(p)
-                if prog_plot:
-                    self.plot_temp_shapes(p)
-
-            if prog_plot:
-                self.temp_shapes.redraw()
-
-            radius += tooldia * (1 - overlap)
-
-        # Clean inside edges (contours) of the original polygon
-        if contour:
-            buffered_poly = autolist(polygon_to_clear.buffer(-tooldia / 2, int(steps_per_circle)))
-            buffered_poly = [x.simplify(simplify_tol) for x in buffered_poly]
-            outer_edges = [x.exterior for x in buffered_poly]
-
-            inner_edges = []
-            # Over resulting polygons
-            for x in buffered_poly:
-                for y in x.interiors:  # Over interiors of each polygon
-                    inner_edges.append(y)
-
-            for g in outer_edges + inner_edges:
-                if g and not g.is_empty:
-                    geom_elems.insert(g)
-                    if prog_plot:
-                        self.plot_temp_shapes(g)
-
         if prog_plot:
             self.temp_shapes.redraw()
 
@@ -1635,12 +1843,12 @@ class Geometry(object):
         return geom_elems
 
     def clear_polygon_lines(self, polygon, tooldia, steps_per_circle, overlap=0.15, connect=True, contour=True,
-                            simplify_tol=0.0, prog_plot=False):
+                            simplify_tol=0.0, prog_plot=False, progress=None):
         """
         Creates geometry inside a polygon for a tool to cover
         the whole area.
 
-        This algorithm draws horizontal lines inside the polygon.
+        This algorithm draws horizontal lines inside the polygon. See lines_clearing_paths().
 
         :param polygon:             The polygon being painted.
         :type polygon:              shapely.geometry.Polygon
@@ -1650,131 +1858,21 @@ class Geometry(object):
         :param connect:             Connect lines to avoid tool lifts.
         :param contour:             Paint around the edges.
         :param prog_plot:           boolean; if to use the progressive plotting
+        :param progress:            ProgressContext of the operation; if None a new one is made
         :return:
         """
 
         # log.debug("camlib.clear_polygon_lines()")
-        if not isinstance(polygon, Polygon):
-            self.app.log.debug("camlib.Geometry.clear_polygon_lines() --> Not a Polygon but %s" % str(type(polygon)))
-            return None
-
-        # The toolpaths
-        # Index first and last points in paths
-        def get_pts(o):
-            return [o.coords[0], o.coords[-1]]
-
-        geoms = AppRTreeStorage()
-        geoms.get_points = get_pts
-
-        lines_trimmed = []
-
-        # Bounding box
-        left, bot, right, top = polygon.bounds
-
-        try:
-            margin_poly = polygon.buffer(-tooldia / 1.99999999, (int(steps_per_circle)))
-            margin_poly = margin_poly.simplify(simplify_tol)
-        except Exception:
-            self.app.log.debug("camlib.Geometry.clear_polygon_lines() --> Could not buffer the Polygon")
+        if progress is None:
+            progress = progress_for(self.app)
+
+        geoms = lines_clearing_paths(polygon, tooldia, steps_per_circle, overlap=overlap, contour=contour,
+                                     simplify_tol=simplify_tol, progress=progress,
+                                     plot=self.plot_temp_shapes if prog_plot else None,
+                                     redraw=self.temp_shapes.redraw if prog_plot else None)
+        if geoms is None:
             return None
 
-        # decide the direction of the lines
-        if abs(left - right) >= abs(top - bot):
-            # First line
-            try:
-                y = top - tooldia / 1.99999999
-                while y > bot + tooldia / 1.999999999:
-                    if self.app.abort_flag:
-                        # graceful abort requested by the user
-                        raise grace
-
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
-
-                    line = LineString([(left, y), (right, y)])
-                    line = line.intersection(margin_poly)
-                    line = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
-                    lines_trimmed += line
-                    y -= tooldia * (1 - overlap)
-                    if prog_plot:
-                        self.plot_temp_shapes(line)
-                        self.temp_shapes.redraw()
-
-                # Last line
-                y = bot + tooldia / 2
-                line = LineString([(left, y), (right, y)])
-                line = line.intersection(margin_poly)
-
-                lines_geometry = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
-                for ll in lines_geometry:
-                    lines_trimmed.append(ll)
-                    if prog_plot:
-                        self.plot_temp_shapes(ll)
-            except Exception as e:
-                self.app.log.error('camlib.Geometry.clear_polygon_lines() Processing poly --> %s' % str(e))
-                return None
-        else:
-            # First line
-            try:
-                x = left + tooldia / 1.99999999
-                while x < right - tooldia / 1.999999999:
-                    if self.app.abort_flag:
-                        # graceful abort requested by the user
-                        raise grace
-
-                    # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
-
-                    line = LineString([(x, top), (x, bot)])
-                    line = line.intersection(margin_poly)
-                    line = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
-                    lines_trimmed += line
-                    x += tooldia * (1 - overlap)
-                    if prog_plot:
-                        self.plot_temp_shapes(line)
-                        self.temp_shapes.redraw()
-
-                # Last line
-                x = right + tooldia / 2
-                line = LineString([(x, top), (x, bot)])
-                line = line.intersection(margin_poly)
-
-                lines_geometry = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
-                for ll in lines_geometry:
-                    lines_trimmed.append(ll)
-                    if prog_plot:
-                        self.plot_temp_shapes(ll)
-            except Exception as e:
-                self.app.log.error('camlib.Geometry.clear_polygon_lines() Processing poly --> %s' % str(e))
-                return None
-
-        if prog_plot:
-            self.temp_shapes.redraw()
-
-        lines_trimmed = unary_union(lines_trimmed)
-
-        # Add lines to storage
-        lines_t_geo = flatten_shapely_geometry(lines_trimmed, simplify_tolerance=simplify_tol)
-        for line in lines_t_geo:
-            if isinstance(line, LineString) or isinstance(line, LinearRing):
-                if not line.is_empty:
-                    geoms.insert(line)
-            else:
-                self.app.log.debug("camlib.Geometry.clear_polygon_lines(). Not a line: %s" % str(type(line)))
-
-        # Add margin (contour) to storage
-        if contour:
-            margin_poly_geo = flatten_shapely_geometry(margin_poly, simplify_tolerance=simplify_tol)
-            for poly in margin_poly_geo:
-                if isinstance(poly, Polygon) and not poly.is_empty:
-                    geoms.insert(poly.exterior)
-                    if prog_plot:
-                        self.plot_temp_shapes(poly.exterior)
-                    for ints in poly.interiors:
-                        geoms.insert(ints)
-                        if prog_plot:
-                            self.plot_temp_shapes(ints)
-
         if prog_plot:
             self.temp_shapes.redraw()
 
@@ -1790,7 +1888,7 @@ class Geometry(object):
         return geoms
 
     def fill_with_lines(self, line, aperture_size, tooldia, steps_per_circle, overlap=0.15, connect=True, contour=True,
-                        prog_plot=False):
+                        prog_plot=False, progress=None):
         """
         Creates geometry of lines inside a polygon for a tool to cover
         the whole area.
@@ -1806,6 +1904,7 @@ class Geometry(object):
         :param connect:             Connect lines to avoid tool lifts.
         :param contour:             Paint around the edges.
         :param prog_plot:           boolean; if to use the progressive plotting
+        :param progress:            ProgressContext of the operation; if None a new one is made
         :return:
         """
 
@@ -1899,16 +1998,15 @@ class Geometry(object):
                 "camlib.Geometry.fill_with_lines() --> Could not buffer the Polygon, tool diameter too high")
             return None
 
+        if progress is None:
+            progress = progress_for(self.app)
+
         # First line
         try:
             delta = 0
             while delta < aperture_size / 2:
-                if self.app.abort_flag:
-                    # graceful abort requested by the user
-                    raise grace
-
-                # provide the app with a way to process the GUI events when in a blocking loop
-                QtWidgets.QApplication.processEvents()
+                # check for an abort and publish the progress
+                progress.tick(0)
 
                 new_line = prepared_line.parallel_offset(distance=delta, side='left', resolution=int(steps_per_circle))
                 new_line = new_line.intersection(margin_poly)
@@ -2019,21 +2117,175 @@ class Geometry(object):
 
         return geoms
 
-    def scale(self, xfactor, yfactor, point=None):
-        """
-        Scales all the object's geometry by a given factor. Override
-        this method.
-        :param xfactor: Number by which to scale on X axis.
-        :type xfactor: float
-        :param yfactor: Number by which to scale on Y axis.
-        :type yfactor: float
-        :param point: point to be used as reference for scaling; a tuple
-        :return: None
-        :rtype: None
+    def generatecncjob(self, outname=None, dia=None, offset=None, z_cut=None, z_move=None, feedrate=None,
+                       feedrate_z=None, feedrate_rapid=None, spindlespeed=None, dwell=None, dwelltime=None,
+                       las_min_pwr=0.0,
+                       multidepth=None, dpp=None, toolchange=None, toolchangez=None, toolchangexy=None,
+                       extracut=None, extracut_length=None, startz=None, endz=None, endxy=None, pp=None,
+                       seg_x=None, seg_y=None, use_thread=True, plot=True, **args):
         """
-        return
+        Used by the TCL Command Cncjob and by the headless core.
+        Creates a CNCJob out of this Geometry object. The actual
+        work is done by the target camlib.CNCjob
+        `generate_from_geometry_2()` method.
 
-    def offset(self, vect):
+        :param outname:         Name of the new object
+        :param dia:             Tool diameter
+        :param offset:
+        :param z_cut:           Cut depth (negative value)
+        :param z_move:          Height of the tool when travelling (not cutting)
+        :param feedrate:        Feed rate while cutting on X - Y plane
+        :param feedrate_z:      Feed rate while cutting on Z plane
+        :param feedrate_rapid:  Feed rate while moving with rapids
+        :param spindlespeed:    Spindle speed (RPM)
+        :param dwell:
+        :param dwelltime:
+        :param las_min_pwr:     Float. Set the power for a laser (when used due of a preprocessor) when not cutting
+        :param multidepth:      Bool: If True use the `dpp` parameter
+        :param dpp:             Depth for each pass when multidepth parameter is True. Positive value.
+        :param toolchange:
+        :param toolchangez:
+        :param toolchangexy:    A sequence ox X,Y coordinates: a 2-length tuple or a string.
+                                Coordinates in X,Y plane for the Toolchange event
+        :param extracut:
+        :param extracut_length:
+        :param startz:
+        :param endz:
+        :param endxy:           A sequence ox X,Y coordinates: a 2-length tuple or a string.
+                                Coordinates in X, Y plane for the last move after ending the job.
+        :param pp:              Name of the preprocessor
+        :param seg_x:
+        :param seg_y:
+        :param use_thread:
+        :param plot:
+        :return: None
+        """
+
+        self.app.log.debug("FlatCAMGeometry.GeometryObject.generatecncjob()")
+
+        tooldia = dia if dia else float(self.obj_options["tools_mill_tooldia"])
+        outname = outname if outname is not None else self.obj_options["name"]
+
+        z_cut = z_cut if z_cut is not None else float(self.obj_options["tools_mill_cutz"])
+        z_move = z_move if z_move is not None else float(self.obj_options["tools_mill_travelz"])
+
+        feedrate = feedrate if feedrate is not None else float(self.obj_options["tools_mill_feedrate"])
+        feedrate_z = feedrate_z if feedrate_z is not None else float(self.obj_options["tools_mill_feedrate_z"])
+        feedrate_rapid = feedrate_rapid if feedrate_rapid is not None else float(self.obj_options[
+                                                                                     "tools_mill_feedrate_rapid"])
+
+        multidepth = multidepth if multidepth is not None else self.obj_options["tools_mill_multidepth"]
+        depthperpass = dpp if dpp is not None else float(self.obj_options["tools_mill_depthperpass"])
+
+        seg_x = seg_x if seg_x is not None else float(self.app.options['geometry_seg_x'])
+        seg_y = seg_y if seg_y is not None else float(self.app.options['geometry_seg_y'])
+
+        extracut = extracut if extracut is not None else float(self.obj_options["tools_mill_extracut"])
+        extracut_length = extracut_length if extracut_length is not None else float(self.obj_options[
+                                                                                        "tools_mill_extracut_length"])
+
+        startz = startz if startz is not None else self.obj_options["tools_mill_startz"]
+        endz = endz if endz is not None else float(self.obj_options["tools_mill_endz"])
+
+        endxy = endxy if endxy else self.obj_options["tools_mill_endxy"]
+        if isinstance(endxy, str):
+            endxy = re.sub(r'[()\[\]]', '', endxy)
+            if endxy and endxy != '':
+                endxy = [float(eval(a)) for a in endxy.split(",")]
+
+        toolchangez = toolchangez if toolchangez else float(self.obj_options["tools_mill_toolchangez"])
+
+        toolchangexy = toolchangexy if toolchangexy else self.obj_options["tools_mill_toolchangexy"]
+        if isinstance(toolchangexy, str):
+            toolchangexy = re.sub(r'[()\[\]]', '', toolchangexy)
+            if toolchangexy and toolchangexy != '':
+                toolchangexy = [float(eval(a)) for a in toolchangexy.split(",")]
+
+        toolchange = toolchange if toolchange else self.obj_options["tools_mill_toolchange"]
+
+        offset = offset if offset else 0.0
+
+        # int or None.
+        spindlespeed = spindlespeed if spindlespeed else self.obj_options['tools_mill_spindlespeed']
+        las_min_pwr = las_min_pwr if las_min_pwr else self.obj_options['tools_mill_min_power']
+        dwell = dwell if dwell else self.obj_options["tools_mill_dwell"]
+        dwelltime = dwelltime if dwelltime else float(self.obj_options["tools_mill_dwelltime"])
+
+        ppname_g = pp if pp else self.obj_options["tools_mill_ppname_g"]
+
+        # Object initialization function for app.app_obj.new_object()
+        # RUNNING ON SEPARATE THREAD!
+        def job_init(job_obj, app_obj):
+            assert job_obj.kind == 'cncjob', "Initializer expected a CNCJobObject, got %s" % type(job_obj)
+
+            # Propagate options
+            job_obj.obj_options["tooldia"] = tooldia
+            job_obj.obj_options["tools_mill_tooldia"] = tooldia
+
+            job_obj.coords_decimals = self.app.options["cncjob_coords_decimals"]
+            job_obj.fr_decimals = self.app.options["cncjob_fr_decimals"]
+
+            job_obj.obj_options['type'] = 'Geometry'
+            job_obj.obj_options['tool_dia'] = tooldia
+
+            job_obj.seg_x = seg_x
+            job_obj.seg_y = seg_y
+
+            job_obj.z_p_depth = float(self.obj_options["tools_mill_z_p_depth"])
+            job_obj.feedrate_probe = float(self.obj_options["tools_mill_feedrate_probe"])
+
+            job_obj.obj_options['xmin'] = self.obj_options['xmin']
+            job_obj.obj_options['ymin'] = self.obj_options['ymin']
+            job_obj.obj_options['xmax'] = self.obj_options['xmax']
+            job_obj.obj_options['ymax'] = self.obj_options['ymax']
+
+            # it seems that the tolerance needs to be a lot lower value than 0.01, and it was hardcoded initially
+            # to a value of 0.0005 which is 20 times less than 0.01
+            tol = float(self.app.options['global_tolerance']) / 20
+            res, start_gcode = job_obj.generate_from_geometry_2(
+                self, tooldia=tooldia, offset=offset, tolerance=tol, z_cut=z_cut, z_move=z_move, feedrate=feedrate,
+                feedrate_z=feedrate_z, feedrate_rapid=feedrate_rapid, spindlespeed=spindlespeed, dwell=dwell,
+                dwelltime=dwelltime, laser_min_power=las_min_pwr, multidepth=multidepth, depthpercut=depthperpass,
+                toolchange=toolchange,
+                toolchangez=toolchangez, toolchangexy=toolchangexy, extracut=extracut, extracut_length=extracut_length,
+                startz=startz, endz=endz, endxy=endxy, pp_geometry_name=ppname_g, is_first=True)
+
+            if start_gcode != '':
+                job_obj.gc_start = start_gcode
+
+            job_obj.source_file = start_gcode + res
+            job_obj.gcode_parse()
+            app_obj.inform.emit('[success] %s...' % _("Finished G-Code processing"))
+
+        if use_thread:
+            # To be run in separate thread
+            def job_thread(app_obj):
+                with self.app.proc_container.new('%s...' % _("Generating")):
+                    app_obj.app_obj.new_object("cncjob", outname, job_init, plot=plot)
+                    app_obj.inform.emit('[success] %s: %s' % (_("CNCjob created"), outname))
+
+            # Create a promise with the name
+            self.app.collection.promise(outname)
+            # Send to worker
+            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app]})
+        else:
+            self.app.app_obj.new_object("cncjob", outname, job_init, plot=plot)
+
+    def scale(self, xfactor, yfactor, point=None):
+        """
+        Scales all the object's geometry by a given factor. Override
+        this method.
+        :param xfactor: Number by which to scale on X axis.
+        :type xfactor: float
+        :param yfactor: Number by which to scale on Y axis.
+        :type yfactor: float
+        :param point: point to be used as reference for scaling; a tuple
+        :return: None
+        :rtype: None
+        """
+        return
+
+    def offset(self, vect):
         """
         Offset the geometry by the given vector. Override this method.
 
@@ -2445,51 +2697,8 @@ class Geometry(object):
         """
         self.app.log.debug("camlib.Geometry.mirror()")
 
-        px, py = point
-        xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
-
-        def mirror_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(mirror_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.scale(obj, xscale, yscale, origin=(px, py))
-                except AttributeError:
-                    return obj
-
         try:
-            if self.multigeo is True:
-                for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
-                    try:
-                        self.geo_len = len(self.tools[tool]['solid_geometry'])
-                    except TypeError:
-                        self.geo_len = 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    self.tools[tool]['solid_geometry'] = mirror_geom(self.tools[tool]['solid_geometry'])
-            else:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.solid_geometry)
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.solid_geometry = mirror_geom(self.solid_geometry)
+            self.transform_geometry(mirror_matrix(axis, point))
             self.app.inform.emit('[success] %s...' % _('Object was mirrored'))
         except AttributeError:
             self.app.inform.emit('[ERROR_NOTCL] %s %s' % (_("Failed."), _("No object is selected.")))
@@ -2513,56 +2722,8 @@ class Geometry(object):
         """
         self.app.log.debug("camlib.Geometry.rotate()")
 
-        px, py = point
-
-        def rotate_geom(obj):
-            try:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(rotate_geom(g))
-                return new_obj
-            except TypeError:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.rotate(obj, angle, origin=(px, py))
-                except AttributeError:
-                    return obj
-
         try:
-            if self.multigeo is True:
-                for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
-                    try:
-                        work_geo = self.tools[tool]['solid_geometry']
-                        self.geo_len = len(
-                            work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString)) else work_geo
-                        )
-                    except TypeError:
-                        self.geo_len = 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    self.tools[tool]['solid_geometry'] = rotate_geom(self.tools[tool]['solid_geometry'])
-            else:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    work_geo = self.solid_geometry
-                    self.geo_len = len(
-                        work_geo.geoms if isinstance(work_geo, (MultiPolygon, MultiLineString)) else work_geo
-                    )
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.solid_geometry = rotate_geom(self.solid_geometry)
+            self.transform_geometry(rotation_matrix(angle, point))
             self.app.inform.emit('[success] %s...' % _('Object was rotated'))
         except AttributeError:
             self.app.inform.emit('[ERROR_NOTCL] %s %s' % (_("Failed."), _("No object is selected.")))
@@ -2587,50 +2748,8 @@ class Geometry(object):
         """
         self.app.log.debug("camlib.Geometry.skew()")
 
-        px, py = point
-
-        def skew_geom(obj):
-            try:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(skew_geom(g))
-                return new_obj
-            except TypeError:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.skew(obj, angle_x, angle_y, origin=(px, py))
-                except AttributeError:
-                    return obj
-
         try:
-            if self.multigeo is True:
-                for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
-                    try:
-                        self.geo_len = len(self.tools[tool]['solid_geometry'])
-                    except TypeError:
-                        self.geo_len = 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    self.tools[tool]['solid_geometry'] = skew_geom(self.tools[tool]['solid_geometry'])
-            else:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.solid_geometry)
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.solid_geometry = skew_geom(self.solid_geometry)
+            self.transform_geometry(skew_matrix(angle_x, angle_y, point))
             self.app.inform.emit('[success] %s...' % _('Object was skewed'))
         except AttributeError:
             self.app.inform.emit('[ERROR_NOTCL] %s %s' % (_("Failed."), _("No object is selected.")))
@@ -2656,6 +2775,7 @@ class Geometry(object):
         """
 
         self.app.log.debug("camlib.Geometry.buffer()")
+        self.invalidate_bounds()
 
         if distance == 0:
             return
@@ -2740,6 +2860,9 @@ class CNCjob(Geometry):
         "excellon_optimization_type": "B",
     }
 
+    # a GCode word like 'X12.345'; used by codes_split()
+    gcode_word_re = re.compile(r'\s*([A-Z])\s*([\+\-\.\d\s]+)')
+
     def __init__(self,
                  units="in", kind="generic", tooldia=0.0,
                  z_cut=-0.002, z_move=0.1,
@@ -2877,6 +3000,20 @@ class CNCjob(Geometry):
         # search for toolchange code: M6
         self.re_toolchange = re.compile(r'^\s*(M6)$')
 
+        # the tools of the job; for a multi-tool job each tool holds its machine code in 'gcode'
+        self.tools = {}
+        # if the job was made with more than one tool
+        self.multitool = False
+
+        # the machine code is kept as a TextSegments object, see the source_file property
+        self.source_segments = TextSegments()
+
+        self.prepend_snippet = ''
+        self.append_snippet = ''
+        self.gc_header = ''
+        self.gc_start = ''
+        self.gc_end = ''
+
         # Attributes to be included in serialization
         # Always append to it because it carries contents
         # from Geometry.
@@ -2894,6 +3031,401 @@ class CNCjob(Geometry):
         """
         return self.__dict__
 
+    @property
+    def source_file(self):
+        """
+        The machine code as one string. The code is stored in self.source_segments, in segments that may be in a
+        temporary file when the code is large; use self.source_segments to write it or read it chunk by chunk.
+
+        :return:    string
+        """
+        try:
+            return self.source_segments.getvalue()
+        except AttributeError:
+            return ''
+
+    @source_file.setter
+    def source_file(self, value):
+        """
+        :param value:   a string, a StringIO or a TextSegments object
+        :return:        None
+        """
+        # the temporary file of the replaced segments, if any, is deleted when they are garbage collected
+        self.source_segments = TextSegments.from_value(value)
+
+    def make_source_file(self, loaded_from_project=False):
+        """
+        Make the machine code of a new job, kept in source_file: the header, the snippets set in Preferences and the
+        code made by the job.
+
+        :param loaded_from_project: if True the header and the snippets are the ones loaded with the project
+        :return:                    None
+        """
+        if loaded_from_project is False:
+            self.prepend_snippet = self.app.options['cncjob_prepend']
+            self.append_snippet = self.app.options['cncjob_append']
+            self.gc_header = self.gcode_header()
+
+        # gc is a TextSegments object
+        gc = self.export_gcode(preamble=self.prepend_snippet, postamble=self.append_snippet, to_file=True,
+                               s_code=self.gc_start)
+        self.source_file = gc
+
+    def gcode_header(self, comment_start_symbol=None, comment_stop_symbol=None):
+        """
+        Will create a header to be added to all GCode files generated by FlatCAM
+
+        :param comment_start_symbol:    A symbol to be used as the first symbol in a comment
+        :param comment_stop_symbol:     A symbol to be used as the last symbol in a comment
+        :return:                        A string with a GCode header
+        """
+
+        self.app.log.debug("FlatCAMCNCJob.gcode_header()")
+        time_str = "{:%A, %d %B %Y at %H:%M}".format(dt.now())
+        marlin = False
+        hpgl = False
+        probe_pp = False
+        nccad_pp = False
+
+        gcode = ''
+
+        start_comment = comment_start_symbol if comment_start_symbol is not None else '('
+        stop_comment = comment_stop_symbol if comment_stop_symbol is not None else ')'
+
+        if self.obj_options['type'].lower() == 'geometry':
+            try:
+                for key in self.tools:
+                    try:
+                        ppg = self.tools[key]['data']['tools_mill_ppname_g']
+                    except KeyError:
+                        # for older loaded projects
+                        ppg = self.app.options['tools_mill_ppname_g']
+
+                    if 'marlin' in ppg.lower() or 'repetier' in ppg.lower():
+                        marlin = True
+                        break
+                    if ppg == 'hpgl':
+                        hpgl = True
+                        break
+                    if "toolchange_probe" in ppg.lower():
+                        probe_pp = True
+                        break
+                    if "nccad" in ppg.lower():
+                        nccad_pp = True
+            except Exception as e:
+                self.app.log.debug("FlatCAMCNCJob.gcode_header() error: --> %s" % str(e))
+                pass
+
+        try:
+            if 'marlin' in self.obj_options['tools_drill_ppname_e'].lower() or \
+                    'repetier' in self.obj_options['tools_drill_ppname_e'].lower():
+                marlin = True
+        except KeyError:
+            # self.app.log.debug("FlatCAMCNCJob.gcode_header(): --> There is no such self.option: %s" % str(e))
+            pass
+
+        try:
+            if "toolchange_probe" in self.obj_options['tools_drill_ppname_e'].lower():
+                probe_pp = True
+        except KeyError:
+            # self.app.log.debug("FlatCAMCNCJob.gcode_header(): --> There is no such self.option: %s" % str(e))
+            pass
+
+        try:
+            if 'nccad' in self.obj_options['tools_drill_ppname_e'].lower():
+                nccad_pp = True
+        except KeyError:
+            pass
+
+        if marlin is True:
+            gcode += ';Marlin(Repetier) G-code generated by FlatCAM Evo v%s - Version Date:    %s\n' % \
+                     (str(self.app.version), str(self.app.version_date)) + '\n'
+
+            gcode += ';Name: ' + str(self.obj_options['name']) + '\n'
+            gcode += ';Type: ' + "G-code from " + str(self.obj_options['type']) + '\n'
+
+            gcode += ';Units: ' + self.units.upper() + '\n' + "\n"
+            gcode += ';Created on ' + time_str + '\n' + '\n'
+        elif hpgl is True:
+            gcode += 'CO "HPGL code generated by FlatCAM Evo v%s - Version Date:    %s' % \
+                     (str(self.app.version), str(self.app.version_date)) + '";\n'
+
+            gcode += 'CO "Name: ' + str(self.obj_options['name']) + '";\n'
+            gcode += 'CO "Type: ' + "HPGL code from " + str(self.obj_options['type']) + '";\n'
+
+            gcode += 'CO "Units: ' + self.units.upper() + '";\n'
+            gcode += 'CO "Created on ' + time_str + '";\n'
+        elif probe_pp is True:
+            gcode += '(G-code generated by FlatCAM Evo v%s - Version Date: %s)\n' % \
+                     (str(self.app.version), str(self.app.version_date)) + '\n'
+
+            gcode += '(This GCode tool change is done by using a Probe.)\n' \
+                     '(Make sure that before you start the job you first do a rough zero for Z axis.)\n' \
+                     '(This means that you need to zero the CNC axis and then jog to the toolchange X, Y location,)\n' \
+                     '(mount the probe and adjust the Z so more or less the probe tip touch the plate. ' \
+                     'Then zero the Z axis.)\n' + '\n'
+
+            gcode += '(Name: ' + str(self.obj_options['name']) + ')\n'
+            gcode += '(Type: ' + "G-code from " + str(self.obj_options['type']) + ')\n'
+
+            gcode += '(Units: ' + self.units.upper() + ')\n' + "\n"
+            gcode += '(Created on ' + time_str + ')\n' + '\n'
+        elif nccad_pp is True:
+            gcode += ';NCCAD9 G-code generated by FlatCAM Evo v%s - Version Date:    %s\n' % \
+                     (str(self.app.version), str(self.app.version_date)) + '\n'
+
+            gcode += ';Name: ' + str(self.obj_options['name']) + '\n'
+            gcode += ';Type: ' + "G-code from " + str(self.obj_options['type']) + '\n'
+
+            gcode += ';Units: ' + self.units.upper() + '\n' + "\n"
+            gcode += ';Created on ' + time_str + '\n' + '\n'
+        else:
+            gcode += '%sG-code generated by FlatCAM Evo v%s - Version Date: %s%s\n' % \
+                     (start_comment, str(self.app.version), str(self.app.version_date), stop_comment) + '\n'
+
+            gcode += '%sName: ' % start_comment + str(self.obj_options['name']) + '%s\n' % stop_comment
+            gcode += '%sType: ' % start_comment + "G-code from " + str(self.obj_options['type']) + '%s\n' % stop_comment
+
+            gcode += '%sUnits: ' % start_comment + self.units.upper() + '%s\n' % stop_comment + "\n"
+            gcode += '%sCreated on ' % start_comment + time_str + '%s\n' % stop_comment + '\n'
+
+        return gcode
+
+    @staticmethod
+    def gcode_footer(end_command=None):
+        """
+        Will add the M02 to the end of GCode, if requested.
+
+        :param end_command: 'M02' or 'M30' - String
+        :return:
+        """
+        if end_command:
+            return end_command
+        else:
+            return 'M02'
+
+    def export_gcode(self, filename=None, preamble='', postamble='', to_file=False, from_tcl=False, glob_gcode='',
+                     s_code=''):
+        """
+        This will save the GCode from the Gcode object to a file on the OS filesystem
+
+        :param filename:    filename for the GCode file
+        :param preamble:    a custom Gcode block to be added at the beginning of the Gcode file
+        :param postamble:   a custom Gcode block to be added at the end of the Gcode file
+        :param to_file:     if False then no actual file is saved but the app will know that a file was created
+        :param from_tcl:    True if run from Tcl Shell
+        :param glob_gcode:  Passing an object attribute that is used to hold GCode; string
+        :return:            None, 'fail' or, when to_file is True and no filename is given, the machine code as a
+                            TextSegments object
+        """
+
+        global_gcode = self.gcode if glob_gcode == '' else glob_gcode
+        start_code = self.gc_start if s_code == '' else s_code
+        include_header = True
+
+        if preamble == '':
+            preamble = self.app.options["cncjob_prepend"]
+        if postamble == '':
+            postamble = self.app.options["cncjob_append"]
+
+        # try:
+        #     if self.special_group:
+        #         self.app.inform.emit('[WARNING_NOTCL] %s %s %s.' %
+        #                              (_("This CNCJob object can't be processed because it is a"),
+        #                               str(self.special_group),
+        #                               _("CNCJob object")))
+        #         return 'fail'
+        # except AttributeError:
+        #     pass
+
+        # if this dict is not empty then the object is a Geometry object
+        if self.obj_options['type'].lower() == 'geometry':
+            # for the case that self.tools is empty: old projects
+            try:
+                first_key = list(self.tools.keys())[0]
+                try:
+                    include_header = self.app.preprocessors[self.tools[first_key]['data']['tools_mill_ppname_g']]
+                except KeyError:
+                    try:
+                        # for older loaded projects
+                        self.app.log.debug(
+                            "CNCJobObject.export_gcode() --> old project detected. Results are unreliable.")
+                        include_header = self.app.preprocessors[self.app.options['ppname_g']]
+                    except KeyError:
+                        # for older loaded projects
+                        self.app.log.debug(
+                            "CNCJobObject.export_gcode() --> old project detected. Results are unreliable.")
+                        include_header = self.app.preprocessors[self.app.options['tools_mill_ppname_g']]
+
+                include_header = include_header.include_header
+            except (TypeError, IndexError):
+                include_header = self.app.preprocessors['default'].include_header
+
+        # if this dict is not empty then the object is an Excellon object
+        if self.obj_options['type'].lower() == 'excellon':
+            # for the case that self.tools is empty: old projects
+            try:
+                first_key = list(self.tools.keys())[0]
+                try:
+                    include_header = self.app.preprocessors[
+                        self.tools[first_key]['data']['tools_drill_ppname_e']
+                    ].include_header
+                except KeyError:
+                    # for older loaded projects
+                    try:
+                        include_header = self.app.preprocessors[
+                            self.tools[first_key]['data']['ppname_e']
+                        ].include_header
+                    except KeyError:
+                        self.app.log.debug(
+                            "CNCJobObject.export_gcode() --> old project detected. Results are unreliable.")
+                        # for older loaded projects
+                        include_header = self.app.preprocessors[
+                            self.app.options['tools_drill_ppname_e']
+                        ].include_header
+            except TypeError:
+                # when self.tools is empty - old projects
+                include_header = self.app.preprocessors['default'].include_header
+
+        # the body of the machine code, one segment for each tool; the segments are not concatenated
+        body = []
+
+        if include_header is False:
+            # detect if using multi-tool and make the Gcode summation correctly for each case
+            if self.multitool is True:
+                try:
+                    if self.obj_options['type'].lower() == 'geometry':
+                        for tooluid_key in self.tools:
+                            for key, value in self.tools[tooluid_key].items():
+                                if key == 'gcode':
+                                    body.append(value)
+                                    break
+                except TypeError:
+                    pass
+            else:
+                body.append(global_gcode)
+
+            end_gcode = self.gcode_footer() if self.app.options['cncjob_footer'] is True else ''
+
+            # g = start_code + '\n' + preamble + '\n' + gcode + '\n' + postamble + '\n' + end_gcode
+            g = TextSegments([start_code, '\n'])
+            if preamble != '':
+                g.extend([preamble, '\n'])
+            g.extend(body)
+            g.append('\n')
+            if postamble != '':
+                g.extend([postamble, '\n'])
+            g.append(end_gcode)
+        else:
+            # detect if using multi-tool and make the Gcode summation correctly for each case
+            if self.multitool is True:
+                # for the case that self.tools is empty: old projects
+                try:
+                    if self.obj_options['type'].lower() == 'excellon':
+                        for tooluid_key in self.tools:
+                            for key, value in self.tools[tooluid_key].items():
+                                if key == 'gcode' and value:
+                                    body.append(value)
+                                    break
+                    else:
+                        # it's made from a Geometry object
+                        for tooluid_key in self.tools:
+                            for key, value in self.tools[tooluid_key].items():
+                                if key == 'gcode' and value:
+                                    body.append(value)
+                                    break
+                except TypeError:
+                    pass
+            else:
+                body.append(global_gcode)
+
+            end_gcode = self.gcode_footer() if self.app.options['cncjob_footer'] is True else ''
+
+            # detect if using a HPGL preprocessor
+            hpgl = False
+            # for the case that self.tools is empty: old projects
+            try:
+                if self.obj_options['type'].lower() == 'geometry':
+                    for key in self.tools:
+                        if 'tools_mill_ppname_g' in self.tools[key]['data']:
+                            if 'hpgl' in self.tools[key]['data']['tools_mill_ppname_g']:
+                                hpgl = True
+                                break
+                elif self.obj_options['type'].lower() == 'excellon':
+                    for key in self.tools:
+                        if 'ppname_e' in self.tools[key]['data']:
+                            if 'hpgl' in self.tools[key]['data']['ppname_e']:
+                                hpgl = True
+                                break
+            except TypeError:
+                hpgl = False
+
+            if hpgl:
+                pa_re = re.compile(r"^PA\s*(-?\d+\.\d*),?\s*(-?\d+\.\d*)*;?$")
+
+                # process body gcode
+                processed_body_gcode = []
+                for gline in ''.join(body).splitlines():
+                    match = pa_re.search(gline)
+                    if match:
+                        x_int = int(float(match.group(1)))
+                        y_int = int(float(match.group(2)))
+                        processed_body_gcode.append('PA%d,%d;\n' % (x_int, y_int))
+                    else:
+                        processed_body_gcode.append(gline + '\n')
+
+                g = TextSegments([self.gc_header, '\n', start_code, '\n', preamble, '\n'])
+                g.append(''.join(processed_body_gcode))
+                g.extend(['\n', postamble, end_gcode])
+            else:
+                g = TextSegments([self.gc_header, start_code, '\n'])
+                if preamble != '':
+                    g.extend([preamble, '\n'])
+                g.extend(body)
+                g.append('\n')
+                if postamble != '':
+                    g.extend([postamble, '\n'])
+                g.append(end_gcode)
+
+        # Write
+        if filename is not None:
+            try:
+                self.write_gcode_file(filename, g)
+            except FileNotFoundError:
+                self.app.inform.emit('[WARNING_NOTCL] %s' % _("No such file or directory"))
+                return
+            except PermissionError:
+                self.app.inform.emit(
+                    '[WARNING] %s' % _("Permission denied, saving not possible.\n"
+                                       "Most likely another app is holding the file open and not accessible.")
+                )
+                return 'fail'
+        elif to_file is False:
+            # Just for adding it to the recent files list.
+            if self.app.options["global_open_style"] is False:
+                self.app.file_opened.emit("cncjob", filename)
+            self.app.file_saved.emit("cncjob", filename)
+
+            self.app.inform.emit('[success] %s: %s' % (_("Saved to"), filename))
+        else:
+            return g
+
+    def write_gcode_file(self, filename, code):
+        """
+        Write the machine code to a file, chunk by chunk, with the line endings set in Preferences.
+
+        :param filename:    path of the file
+        :param code:        TextSegments object with the machine code
+        :return:            None
+        """
+        force_windows_line_endings = self.app.options['cncjob_line_ending']
+        if force_windows_line_endings and sys.platform != 'win32':
+            with open(filename, 'w', newline='\r\n') as f:
+                code.write_to(f)
+        else:
+            with open(filename, 'w') as f:
+                code.write_to(f)
+
     def convert_units(self, units):
         """
         Will convert the parameters in the class that are relevant, from metric to imperial and reverse
@@ -4241,18 +4773,14 @@ class CNCjob(Geometry):
                     drill_no = 0
                     if 'drills' in exobj.tools[to_ol]:
                         drill_no = len(exobj.tools[to_ol]['drills'])
-                        for drill in exobj.tools[to_ol]['drills']:
-                            sol_geo.append(drill.buffer((it[1] / 2.0), resolution=self.geo_steps_per_circle))
+                        sol_geo += drill_polygons(exobj.tools[to_ol]['drills'], it[1] / 2.0,
+                                                  self.geo_steps_per_circle)
 
                     slot_no = 0
                     if 'slots' in exobj.tools[to_ol]:
                         slot_no = len(exobj.tools[to_ol]['slots'])
-                        for slot in exobj.tools[to_ol]['slots']:
-                            start = (slot[0].x, slot[0].y)
-                            stop = (slot[1].x, slot[1].y)
-                            sol_geo.append(
-                                LineString([start, stop]).buffer((it[1] / 2.0), resolution=self.geo_steps_per_circle)
-                            )
+                        sol_geo += slot_polygons(exobj.tools[to_ol]['slots'], it[1] / 2.0,
+                                                 self.geo_steps_per_circle)
 
                     z_off = 0
 
@@ -6104,11 +6632,10 @@ class CNCjob(Geometry):
                     command['X'] = float(match_paste.group(1).replace(" ", ""))
                     command['Y'] = float(match_paste.group(2).replace(" ", ""))
         else:
-            match = re.search(r'^\s*([A-Z])\s*([\+\-\.\d\s]+)', gline)
+            match = self.gcode_word_re.match(gline)
             while match:
                 command[match.group(1)] = float(match.group(2).replace(" ", ""))
-                gline = gline[match.end():]
-                match = re.search(r'^\s*([A-Z])\s*([\+\-\.\d\s]+)', gline)
+                match = self.gcode_word_re.match(gline, match.end())
         return command
 
     def gcode_parse(self, force_parsing=None, tool_data=None):
@@ -6140,6 +6667,9 @@ class CNCjob(Geometry):
         # Last known instruction
         current = {'X': 0.0, 'Y': 0.0, 'Z': 0.0, 'G': 0}
 
+        # for the Excellon objects: the drill diameter by drill coordinates, built when needed
+        drill_dias = None
+
         if tool_data is None:
             toolchange_xy_mill = self.app.options["tools_mill_toolchangexy"]
             toolchange_xy_drill = self.app.options["tools_drill_toolchangexy"]
@@ -6233,27 +6763,27 @@ class CNCjob(Geometry):
                         )
 
                         # find the drill diameter knowing the drill coordinates
-                        break_loop = False
-                        for tool, tool_dict in self.exc_tools.items():
-                            if 'drills' in tool_dict:
-                                for drill_pt in tool_dict['drills']:
-                                    point_in_dict_coords = (
-                                        float('%.*f' % (self.decimals, drill_pt.x)),
-                                        float('%.*f' % (self.decimals, drill_pt.y))
-                                    )
-                                    if point_in_dict_coords == current_drill_point_coords:
-                                        dia = self.exc_tools[tool]['tooldia']
-                                        kind = ['C', 'F']
-                                        geometry.append(
-                                            {
-                                                "geom": Point(current_drill_point_coords).buffer(dia / 2.0).exterior,
-                                                "kind": kind
-                                            }
+                        if drill_dias is None:
+                            # lookup table built once from the drill arrays: rounded coordinates -> tool diameter
+                            drill_dias = {}
+                            for tool, tool_dict in self.exc_tools.items():
+                                if 'drills' in tool_dict:
+                                    for d_x, d_y in drill_coords(tool_dict['drills']).tolist():
+                                        point_in_dict_coords = (
+                                            float('%.*f' % (self.decimals, d_x)),
+                                            float('%.*f' % (self.decimals, d_y))
                                         )
-                                        break_loop = True
-                                        break
-                                if break_loop:
-                                    break
+                                        drill_dias.setdefault(point_in_dict_coords, tool_dict['tooldia'])
+
+                        dia = drill_dias.get(current_drill_point_coords)
+                        if dia is not None:
+                            kind = ['C', 'F']
+                            geometry.append(
+                                {
+                                    "geom": Point(current_drill_point_coords).buffer(dia / 2.0).exterior,
+                                    "kind": kind
+                                }
+                            )
 
             if 'G' in gobj:
                 current['G'] = int(gobj['G'])
@@ -7314,9 +7844,22 @@ class CNCjob(Geometry):
 
         return svg_elem
 
-    def bounds(self, flatten=None):
+    def bounds_sources(self) -> list:
+        """
+        The values read by geometry_bounds(): the solid geometry or, for a multi-tool object, the kind of the source
+        object and the solid geometry of the tools.
+
+        :return:    list of the values that the bounds depend on
+        :rtype:     list
+        """
+        if self.multitool is False:
+            return [False, self.solid_geometry]
+        return [True, self.obj_options['type'].lower()] + [v.get('solid_geometry') for v in self.tools.values()]
+
+    def geometry_bounds(self, flatten=None):
         """
-        Returns coordinates of rectangular bounds of geometry: (xmin, ymin, xmax, ymax).
+        Returns coordinates of rectangular bounds of geometry: (xmin, ymin, xmax, ymax). The base class bounds() caches
+        the result.
 
         :param flatten:     Not used, it is here for compatibility with base class method
         :type flatten:      bool
@@ -7416,6 +7959,19 @@ class CNCjob(Geometry):
         return bounds_coords
 
     # TODO This function should be replaced at some point with a "real" function. Until then it's an ugly hack ...
+    @staticmethod
+    def transform_gcode_parsed(gcode_parsed, matrix):
+        """
+        Apply an affine transformation to the geometry of the parsed GCode, in place, in one vectorized operation.
+
+        :param gcode_parsed:    list of dicts, each with the 'geom' key holding a Shapely geometry
+        :param matrix:          3x3 affine matrix
+        :return:                None
+        """
+        transformed = affine_transform([g['geom'] for g in gcode_parsed], matrix)
+        for g, geo in zip(gcode_parsed, transformed):
+            g['geom'] = geo
+
     def scale(self, xfactor, yfactor=None, point=None):
         """
         Scales all the geometry on the XY plane in the object by the
@@ -7430,15 +7986,14 @@ class CNCjob(Geometry):
         :return:        None
         """
         self.app.log.debug("camlib.CNCJob.scale()")
+        self.invalidate_bounds()
 
         if yfactor is None:
             yfactor = xfactor
 
         if point is None:
-            px = 0
-            py = 0
-        else:
-            px, py = point
+            point = (0, 0)
+        matrix = scale_matrix(xfactor, yfactor, origin=point)
 
         def scale_g(g):
             """
@@ -7547,27 +8102,7 @@ class CNCjob(Geometry):
             # offset Gcode
             self.gcode = scale_g(self.gcode)
 
-            # variables to display the percentage of work done
-            self.geo_len = 0
-            try:
-                self.geo_len = len(self.gcode_parsed)
-            except TypeError:
-                self.geo_len = 1
-            self.old_disp_number = 0
-            self.el_count = 0
-
-            # scale geometry
-            for g in self.gcode_parsed:
-                try:
-                    g['geom'] = affinity.scale(g['geom'], xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return g['geom']
-
-                self.el_count += 1
-                disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                if self.old_disp_number < disp_number <= 100:
-                    self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                    self.old_disp_number = disp_number
+            self.transform_gcode_parsed(self.gcode_parsed, matrix)
 
             self.create_geometry()
         else:
@@ -7576,27 +8111,7 @@ class CNCjob(Geometry):
                 # scale Gcode
                 v['gcode'] = scale_g(v['gcode'])
 
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(v['gcode_parsed'])
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                # scale gcode_parsed
-                for g in v['gcode_parsed']:
-                    try:
-                        g['geom'] = affinity.scale(g['geom'], xfactor, yfactor, origin=(px, py))
-                    except AttributeError:
-                        return g['geom']
-
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
+                self.transform_gcode_parsed(v['gcode_parsed'], matrix)
 
                 v['solid_geometry'] = unary_union([geo['geom'] for geo in v['gcode_parsed']])
         self.create_geometry()
@@ -7616,8 +8131,10 @@ class CNCjob(Geometry):
         :return:        None
         """
         self.app.log.debug("camlib.CNCJob.offset()")
+        self.invalidate_bounds()
 
         dx, dy = vect
+        matrix = translation_matrix(dx, dy)
 
         def offset_g(g):
             """
@@ -7656,27 +8173,7 @@ class CNCjob(Geometry):
             # offset Gcode
             self.gcode = offset_g(self.gcode)
 
-            # variables to display the percentage of work done
-            self.geo_len = 0
-            try:
-                self.geo_len = len(self.gcode_parsed)
-            except TypeError:
-                self.geo_len = 1
-            self.old_disp_number = 0
-            self.el_count = 0
-
-            # offset geometry
-            for g in self.gcode_parsed:
-                try:
-                    g['geom'] = affinity.translate(g['geom'], xoff=dx, yoff=dy)
-                except AttributeError:
-                    return g['geom']
-
-                self.el_count += 1
-                disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                if self.old_disp_number < disp_number <= 100:
-                    self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                    self.old_disp_number = disp_number
+            self.transform_gcode_parsed(self.gcode_parsed, matrix)
 
             self.create_geometry()
         else:
@@ -7685,27 +8182,7 @@ class CNCjob(Geometry):
                 # offset Gcode
                 v['gcode'] = offset_g(v['gcode'])
 
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(v['gcode_parsed'])
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                # offset gcode_parsed
-                for g in v['gcode_parsed']:
-                    try:
-                        g['geom'] = affinity.translate(g['geom'], xoff=dx, yoff=dy)
-                    except AttributeError:
-                        return g['geom']
-
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
+                self.transform_gcode_parsed(v['gcode_parsed'], matrix)
 
                 # for the bounding box
                 v['solid_geometry'] = unary_union([geo['geom'] for geo in v['gcode_parsed']])
@@ -7721,30 +8198,9 @@ class CNCjob(Geometry):
         :return:
         """
         self.app.log.debug("camlib.CNCJob.mirror()")
+        self.invalidate_bounds()
 
-        px, py = point
-        xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.gcode_parsed)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for g in self.gcode_parsed:
-            try:
-                g['geom'] = affinity.scale(g['geom'], xscale, yscale, origin=(px, py))
-            except AttributeError:
-                return g['geom']
-
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+        self.transform_gcode_parsed(self.gcode_parsed, mirror_matrix(axis, point))
 
         self.create_geometry()
         self.app.proc_container.new_text = ''
@@ -7765,29 +8221,9 @@ class CNCjob(Geometry):
         See shapely manual for more information: http://toblerity.org/shapely/manual.html#affine-transformations
         """
         self.app.log.debug("camlib.CNCJob.skew()")
+        self.invalidate_bounds()
 
-        px, py = point
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.gcode_parsed)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for g in self.gcode_parsed:
-            try:
-                g['geom'] = affinity.skew(g['geom'], angle_x, angle_y, origin=(px, py))
-            except AttributeError:
-                return g['geom']
-
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+        self.transform_gcode_parsed(self.gcode_parsed, skew_matrix(angle_x, angle_y, origin=point))
 
         self.create_geometry()
         self.app.proc_container.new_text = ''
@@ -7801,32 +8237,124 @@ class CNCjob(Geometry):
         :return:
         """
         self.app.log.debug("camlib.CNCJob.rotate()")
+        self.invalidate_bounds()
 
-        px, py = point
+        self.transform_gcode_parsed(self.gcode_parsed, rotation_matrix(angle, origin=point))
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.gcode_parsed)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
+        self.create_geometry()
+        self.app.proc_container.new_text = ''
 
-        for g in self.gcode_parsed:
-            try:
-                g['geom'] = affinity.rotate(g['geom'], angle, origin=(px, py))
-            except AttributeError:
-                return g['geom']
 
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+def translation_matrix(dx: float, dy: float) -> np.ndarray:
+    """
+    :param dx:  offset on the X axis
+    :param dy:  offset on the Y axis
+    :return:    3x3 affine matrix of the translation
+    """
+    return np.array([[1.0, 0.0, dx], [0.0, 1.0, dy], [0.0, 0.0, 1.0]])
+
+
+def scale_matrix(xfactor: float, yfactor: float, origin=(0, 0)) -> np.ndarray:
+    """
+    :param xfactor: scale factor on the X axis
+    :param yfactor: scale factor on the Y axis
+    :param origin:  (x, y) point that does not move
+    :return:        3x3 affine matrix of the scaling
+    """
+    x0, y0 = origin
+    return np.array([[xfactor, 0.0, x0 - x0 * xfactor], [0.0, yfactor, y0 - y0 * yfactor], [0.0, 0.0, 1.0]])
+
+
+def mirror_matrix(axis: str, point) -> np.ndarray:
+    """
+    :param axis:    "X" or "Y": the axis parallel to the mirror line
+    :param point:   (x, y) point of the mirror line
+    :return:        3x3 affine matrix of the mirroring
+    """
+    xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
+    return scale_matrix(xscale, yscale, origin=point)
 
-        self.create_geometry()
-        self.app.proc_container.new_text = ''
+
+def rotation_matrix(angle: float, origin=(0, 0)) -> np.ndarray:
+    """
+    :param angle:   rotation angle in degrees; positive angles are counter-clockwise
+    :param origin:  (x, y) center of the rotation
+    :return:        3x3 affine matrix of the rotation
+    """
+    x0, y0 = origin
+    rad = np.radians(angle)
+    cos_a, sin_a = np.cos(rad), np.sin(rad)
+    return np.array([[cos_a, -sin_a, x0 - x0 * cos_a + y0 * sin_a],
+                     [sin_a, cos_a, y0 - x0 * sin_a - y0 * cos_a],
+                     [0.0, 0.0, 1.0]])
+
+
+def skew_matrix(angle_x: float, angle_y: float, origin=(0, 0)) -> np.ndarray:
+    """
+    :param angle_x: shear angle for the X axis, in degrees
+    :param angle_y: shear angle for the Y axis, in degrees
+    :param origin:  (x, y) point that does not move
+    :return:        3x3 affine matrix of the skewing
+    """
+    x0, y0 = origin
+    tan_x, tan_y = np.tan(np.radians(angle_x)), np.tan(np.radians(angle_y))
+    return np.array([[1.0, tan_x, -y0 * tan_x], [tan_y, 1.0, -x0 * tan_y], [0.0, 0.0, 1.0]])
+
+
+def is_rigid_matrix(matrix: np.ndarray) -> bool:
+    """
+    :param matrix:  3x3 affine matrix
+    :return:        True if the matrix keeps the distances: a combination of translations, rotations and mirroring
+    """
+    linear = matrix[:2, :2]
+    return bool(np.allclose(linear @ linear.T, np.eye(2)))
+
+
+def affine_transform(structures: list, matrix: np.ndarray) -> list:
+    """
+    Transform all the geometry elements found in the given structures with one affine matrix. The elements are
+    gathered in one array and transformed in a single operation on their concatenated coordinates; then they are put
+    back in structures nested like the originals.
+
+    :param structures:  list of structures: Shapely geometry elements or lists and tuples (nested at will) of them;
+                        anything else is kept as it is
+    :param matrix:      3x3 affine matrix
+    :return:            list with the transformed structures, in the same order
+    """
+    leaves = []
+    # an element found in more than one structure (e.g. the Excellon holes, both in the tools and in the object
+    # solid_geometry) is transformed once and stays shared
+    leaf_index = {}
+
+    def gather(obj):
+        if isinstance(obj, (list, tuple)):
+            for el in obj:
+                gather(el)
+        elif isinstance(obj, BaseGeometry) and id(obj) not in leaf_index:
+            leaf_index[id(obj)] = len(leaves)
+            leaves.append(obj)
+
+    for struct in structures:
+        gather(struct)
+    if not leaves:
+        return list(structures)
+
+    geo_arr = np.empty(len(leaves), dtype=object)
+    geo_arr[:] = leaves
+    linear = np.asarray(matrix, dtype=float)[:2, :2].T
+    translation = np.asarray(matrix, dtype=float)[:2, 2]
+    transformed = shapely.transform(geo_arr, lambda coords: coords @ linear + translation)
+
+    def scatter(obj):
+        if isinstance(obj, list):
+            return [scatter(el) for el in obj]
+        if isinstance(obj, tuple):
+            return tuple(scatter(el) for el in obj)
+        if isinstance(obj, BaseGeometry):
+            return transformed[leaf_index[id(obj)]]
+        return obj
+
+    return [scatter(struct) for struct in structures]
 
 
 def flatten_shapely_geometry(geometry, simplify_tolerance: float = 0.0) -> list:
@@ -7880,6 +8408,1416 @@ def get_bounds(geometry_list: list) -> list:
     return [xmin, ymin, xmax, ymax]
 
 
+# Cache for the inward offsets of polygons calculated by offset_rings()
+# key: (hash of the polygon WKB, absolute offset distance, steps per circle); value: tuple of LinearRings
+# The offsets are keyed on the absolute distance from the edge of the polygon, not on the tool that asked for them,
+# so the tools that clear the same polygon share the offsets found at the same distance: e.g. a 1.0 tool with 50%
+# overlap (offsets at 0.5, 1.0, 1.5 ...) reuses all the offsets of a 0.5 tool with 50% overlap (0.25, 0.5, 0.75 ...).
+# Tools whose offsets fall at different distances only share the cache when the same tool is used again.
+offset_rings_cache = OrderedDict()
+offset_rings_lock = threading.Lock()
+OFFSET_RINGS_CACHE_SIZE = 4096
+
+
+def offset_rings_key(geo_hash: bytes, distance: float, steps_per_circle: int) -> tuple:
+    """
+    Will return the key under which an inward offset of a polygon is stored in the offset rings cache.
+
+    :param geo_hash:            the hash of the polygon, see polygon_hash()
+    :param distance:            the absolute offset distance, from the edge of the polygon
+    :param steps_per_circle:    number of linear segments used to approximate a circle
+    :return:                    a tuple to be used as a dictionary key
+    """
+    return geo_hash, round(float(distance), 9), int(steps_per_circle)
+
+
+def polygon_hash(polygon) -> bytes:
+    """
+    :param polygon:     Shapely Polygon or MultiPolygon
+    :return:            a hash of the polygon content
+    """
+    return hashlib.blake2b(polygon.wkb, digest_size=16).digest()
+
+
+def calculate_offset_rings(polygon, distance: float, steps_per_circle: int) -> tuple:
+    """
+    Will shrink the polygon with the 'distance' and return the edges of the shrunk polygon. Shrinking a polygon by
+    a distance and then by another one gives the polygon shrunk by the sum of the distances, so each offset is made
+    directly from the polygon and the offsets are independent of each other.
+    It does not use the cache therefore it is suitable to run in the multiprocessing Pool.
+
+    :param polygon:             Shapely Polygon or MultiPolygon to be shrunk
+    :param distance:            the absolute offset distance, from the edge of the polygon
+    :param steps_per_circle:    number of linear segments used to approximate a circle
+    :return:                    tuple of LinearRings (exterior followed by the interiors of each shrunk polygon);
+                                empty if nothing is left of the polygon
+    """
+    rings = []
+    for tiny_pol in flatten_shapely_geometry(polygon.buffer(-distance, int(steps_per_circle))):
+        if tiny_pol.area > 0:
+            rings.append(tiny_pol.exterior)
+            rings += list(tiny_pol.interiors)
+    return tuple(rings)
+
+
+def offset_rings_mp(polygon, distance: float, steps_per_circle: int) -> tuple:
+    """
+    Wrapper over calculate_offset_rings() to be run in the multiprocessing Pool, with the polygon from shared memory.
+
+    :return:        tuple of LinearRings
+    """
+    return calculate_offset_rings(polygon, distance, steps_per_circle)
+
+
+def store_offset_rings(key: tuple, rings: tuple):
+    with offset_rings_lock:
+        offset_rings_cache[key] = rings
+        offset_rings_cache.move_to_end(key)
+        while len(offset_rings_cache) > OFFSET_RINGS_CACHE_SIZE:
+            offset_rings_cache.popitem(last=False)
+
+
+def cached_offset_rings(key: tuple):
+    with offset_rings_lock:
+        rings = offset_rings_cache.get(key)
+        if rings is not None:
+            offset_rings_cache.move_to_end(key)
+        return rings
+
+
+def offset_rings(polygon, distance: float, steps_per_circle: int) -> tuple:
+    """
+    Will return the edges of the inward offset of a polygon. The offset is calculated only once for each
+    (polygon, distance) pair, the following requests are served from the cache.
+
+    :param polygon:             Shapely Polygon or MultiPolygon to be shrunk
+    :param distance:            the absolute offset distance, from the edge of the polygon
+    :param steps_per_circle:    number of linear segments used to approximate a circle
+    :return:                    tuple of LinearRings
+    """
+    key = offset_rings_key(polygon_hash(polygon), distance, steps_per_circle)
+    rings = cached_offset_rings(key)
+    if rings is None:
+        rings = calculate_offset_rings(polygon, distance, steps_per_circle)
+        store_offset_rings(key, rings)
+    return rings
+
+
+def iter_offset_rings(polygon, start: float, step: float, steps_per_circle: int, pool=None, progress=None):
+    """
+    Generator that yields, in order, the edges of the inward offsets of the polygon at the distances start,
+    start + step, start + 2 * step ... until nothing is left of the polygon.
+    The offsets that are not already in the cache are processed in parallel in the Pool, if one is provided.
+
+    :param polygon:             Shapely Polygon or MultiPolygon
+    :param start:               the distance of the first offset, from the edge of the polygon
+    :param step:                distance between two successive offsets
+    :param steps_per_circle:    number of linear segments used to approximate a circle
+    :param pool:                the WorkerPool of the App or None; if None the offsets are calculated serially
+    :param progress:            ProgressContext of the operation or None; the abort is checked for each offset
+    :return:                    for each offset distance a tuple of LinearRings, never empty
+    """
+    if progress is None:
+        progress = ProgressContext()
+    if polygon.is_empty or step <= 0:
+        return
+
+    # nothing is left of the polygon after it is shrunk by the radius of its largest inscribed circle
+    xmin, ymin, xmax, ymax = polygon.bounds
+    tolerance = max(xmax - xmin, ymax - ymin) / 1000
+    radius = shapely.maximum_inscribed_circle(polygon, tolerance).length + tolerance
+    count = max(1, int(math.floor((radius - start) / step)) + 2)
+    distances = [start + i * step for i in range(count)]
+
+    geo_hash = polygon_hash(polygon)
+    keys = [offset_rings_key(geo_hash, dist, steps_per_circle) for dist in distances]
+    results = [cached_offset_rings(k) for k in keys]
+    missing = [idx for idx, res in enumerate(results) if res is None]
+
+    computed = None
+    shared_pol = None
+    # it makes sense to use the Pool only if there is more than one offset to calculate
+    if pool is not None and len(missing) > 1:
+        shared_pol = pool.share(polygon)
+        computed = pool.run_tasks(offset_rings_mp, [(shared_pol, distances[idx], steps_per_circle) for idx in missing],
+                                  progress=progress)
+
+    try:
+        for idx, rings in enumerate(results):
+            # check for an abort and publish the progress
+            progress.tick(0)
+
+            if rings is None:
+                # run_tasks() keeps the order of the tasks so the results come in the order of the missing indexes
+                if computed is not None:
+                    rings = next(computed)
+                else:
+                    rings = calculate_offset_rings(polygon, distances[idx], steps_per_circle)
+                store_offset_rings(keys[idx], rings)
+            if not rings:
+                break
+            yield rings
+    finally:
+        if computed is not None:
+            computed.close()
+        if shared_pol is not None:
+            shared_pol.release()
+
+
+class NullShapeCollection:
+    """
+    Takes the place of the temporary shapes collection of a Geometry object when there is no plot canvas, like in the
+    headless core. The shapes are discarded.
+    """
+
+    def add(self, *args, **kwargs):
+        pass
+
+    def clear(self, *args, **kwargs):
+        pass
+
+    def redraw(self, *args, **kwargs):
+        pass
+
+
+class PoolJobState:
+    """
+    Takes the place of the App for a ProgressContext used inside a process of the multiprocessing Pool: the abort
+    flag is the one of the WorkerPool job of the current task and there is no process container to show the progress.
+    """
+
+    proc_container = None
+
+    @property
+    def abort_flag(self):
+        # set when the WorkerPool job of the current task is aborted in the App
+        return worker_abort_requested()
+
+
+def clearing_storage():
+    """
+    :return:    an empty AppRTreeStorage for the paths of a polygon clearing, indexed by their first and last points
+    """
+    def get_pts(o):
+        return [o.coords[0], o.coords[-1]]
+
+    storage = AppRTreeStorage()
+    storage.get_points = get_pts
+    return storage
+
+
+def shrink_clearing_paths(polygon, tooldia, steps_per_circle, overlap=0.15, pool=None, progress=None, plot=None):
+    """
+    Creates the paths for a tool to cover the whole area of a polygon by shrinking the edges of the polygon and taking
+    the resulting edges as toolpaths. The paths are not connected, see Geometry.paint_connect().
+
+    :param polygon:             Polygon to clear.
+    :param tooldia:             Diameter of the tool.
+    :param steps_per_circle:    number of linear segments to be used to approximate a circle
+    :param overlap:             Overlap of toolpasses.
+    :param pool:                the WorkerPool used to calculate the offsets in parallel or None
+    :param progress:            ProgressContext of the operation or None; the abort is checked for each offset
+    :param plot:                None or a function called with each path, for the progressive plotting
+    :return:                    the toolpaths; None if the area to be cleared is zero
+    :rtype:                     AppRTreeStorage | None
+    """
+    geoms = clearing_storage()
+
+    # The first offset is at the tool radius from the edges of the polygon, the next ones follow at the step
+    # distance. Nothing is left of the polygon after the last one.
+    # The offsets are independent of each other so they are calculated in parallel by the multiprocessing Pool;
+    # they are cached by their distance from the polygon edges so other tools clearing the same polygon reuse them
+    step = tooldia * (1 - overlap)
+    for rings in iter_offset_rings(polygon, tooldia / 2, step, int(steps_per_circle), pool=pool, progress=progress):
+        for ring in rings:
+            geoms.insert(ring)
+            if plot is not None:
+                plot(ring)
+
+    if not geoms.objects:
+        log.debug("camlib.shrink_clearing_paths() --> Current Area is zero")
+        return None
+    return geoms
+
+
+def seed_clearing_paths(polygon_to_clear, tooldia, steps_per_circle, seedpoint=None, overlap=0.15, contour=True,
+                        simplify_tol=0.0, progress=None, plot=None, redraw=None):
+    """
+    Creates the paths for a tool to cover the whole area of a polygon starting with a seed point inside the polygon
+    and drawing circles around it. Arcs inside the polygons are valid cuts. Finalizes by cutting around the inside
+    edge of the polygon. The paths are not connected, see Geometry.paint_connect().
+
+    :param polygon_to_clear:    Shapely.geometry.Polygon
+    :param tooldia:             Diameter of the tool
+    :param steps_per_circle:    how many linear segments to use to approximate a circle
+    :param seedpoint:           Shapely.geometry.Point or None
+    :param overlap:             Tool fraction overlap between passes
+    :param contour:             Cut contour inside the polygon.
+    :param simplify_tol:        tolerance used to simplify the paths
+    :param progress:            ProgressContext of the operation or None; the abort is checked for each circle
+    :param plot:                None or a function called with each path, for the progressive plotting
+    :param redraw:              None or a function called after each circle, for the progressive plotting
+    :return:                    the toolpaths; None if the polygon is smaller than the tool
+    :rtype:                     AppRTreeStorage | None
+    """
+    if progress is None:
+        progress = ProgressContext()
+
+    # Current buffer radius
+    radius = tooldia / 2 * (1 - overlap)
+
+    geom_elems = clearing_storage()
+
+    # Path margin
+    path_margin = polygon_to_clear.buffer(-tooldia / 2, int(steps_per_circle))
+    path_margin = flatten_shapely_geometry(path_margin, simplify_tolerance=simplify_tol)
+    path_margin = MultiPolygon(path_margin)
+
+    if path_margin.is_empty or path_margin is None:
+        return None
+
+    # Estimate good seedpoint if not provided.
+    if seedpoint is None:
+        seedpoint = path_margin.representative_point()
+
+    # Grow from seed until outside the box. The polygons will
+    # never have an interior, so take the exterior LinearRing.
+    while True:
+        # check for an abort and publish the progress
+        progress.tick(0)
+
+        path = Point(seedpoint).buffer(radius, int(steps_per_circle)).exterior
+        path = path.simplify(simplify_tol)
+        path = path.intersection(path_margin)
+
+        # Touches polygon?
+        if path.is_empty:
+            break
+
+        # path can be a collection of paths.
+        path_geometry = flatten_shapely_geometry(path, simplify_tolerance=simplify_tol)
+        for p in path_geometry:
+            geom_elems.insert(p)
+            if plot is not None:
+                plot(p)
+
+        if redraw is not None:
+            redraw()
+
+        radius += tooldia * (1 - overlap)
+
+    # Clean inside edges (contours) of the original polygon
+    if contour:
+        buffered_poly = autolist(polygon_to_clear.buffer(-tooldia / 2, int(steps_per_circle)))
+        buffered_poly = [x.simplify(simplify_tol) for x in buffered_poly]
+        outer_edges = [x.exterior for x in buffered_poly]
+
+        inner_edges = []
+        # Over resulting polygons
+        for x in buffered_poly:
+            for y in x.interiors:  # Over interiors of each polygon
+                inner_edges.append(y)
+
+        for g in outer_edges + inner_edges:
+            if g and not g.is_empty:
+                geom_elems.insert(g)
+                if plot is not None:
+                    plot(g)
+
+    return geom_elems
+
+
+def lines_clearing_paths(polygon, tooldia, steps_per_circle, overlap=0.15, contour=True, simplify_tol=0.0,
+                         progress=None, plot=None, redraw=None):
+    """
+    Creates the paths for a tool to cover the whole area of a polygon by drawing parallel lines inside the polygon,
+    along its longest side. The paths are not connected, see Geometry.paint_connect().
+
+    :param polygon:             The polygon being painted.
+    :type polygon:              shapely.geometry.Polygon
+    :param tooldia:             Tool diameter.
+    :param steps_per_circle:    how many linear segments to use to approximate a circle
+    :param overlap:             Tool path overlap percentage.
+    :param contour:             Paint around the edges.
+    :param simplify_tol:        tolerance used to simplify the paths
+    :param progress:            ProgressContext of the operation or None; the abort is checked for each line
+    :param plot:                None or a function called with each path, for the progressive plotting
+    :param redraw:              None or a function called after each line, for the progressive plotting
+    :return:                    the toolpaths; None if the polygon could not be cleared
+    :rtype:                     AppRTreeStorage | None
+    """
+    if not isinstance(polygon, Polygon):
+        log.debug("camlib.lines_clearing_paths() --> Not a Polygon but %s" % str(type(polygon)))
+        return None
+
+    geoms = clearing_storage()
+
+    lines_trimmed = []
+
+    # Bounding box
+    left, bot, right, top = polygon.bounds
+
+    try:
+        margin_poly = polygon.buffer(-tooldia / 1.99999999, (int(steps_per_circle)))
+        margin_poly = margin_poly.simplify(simplify_tol)
+    except Exception:
+        log.debug("camlib.lines_clearing_paths() --> Could not buffer the Polygon")
+        return None
+
+    if progress is None:
+        progress = ProgressContext()
+
+    # decide the direction of the lines
+    if abs(left - right) >= abs(top - bot):
+        # First line
+        try:
+            y = top - tooldia / 1.99999999
+            while y > bot + tooldia / 1.999999999:
+                # check for an abort and publish the progress
+                progress.tick(0)
+
+                line = LineString([(left, y), (right, y)])
+                line = line.intersection(margin_poly)
+                line = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
+                lines_trimmed += line
+                y -= tooldia * (1 - overlap)
+                if plot is not None:
+                    plot(line)
+                if redraw is not None:
+                    redraw()
+
+            # Last line
+            y = bot + tooldia / 2
+            line = LineString([(left, y), (right, y)])
+            line = line.intersection(margin_poly)
+
+            lines_geometry = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
+            for ll in lines_geometry:
+                lines_trimmed.append(ll)
+                if plot is not None:
+                    plot(ll)
+        except grace:
+            raise
+        except Exception as e:
+            log.error('camlib.lines_clearing_paths() Processing poly --> %s' % str(e))
+            return None
+    else:
+        # First line
+        try:
+            x = left + tooldia / 1.99999999
+            while x < right - tooldia / 1.999999999:
+                # check for an abort and publish the progress
+                progress.tick(0)
+
+                line = LineString([(x, top), (x, bot)])
+                line = line.intersection(margin_poly)
+                line = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
+                lines_trimmed += line
+                x += tooldia * (1 - overlap)
+                if plot is not None:
+                    plot(line)
+                if redraw is not None:
+                    redraw()
+
+            # Last line
+            x = right + tooldia / 2
+            line = LineString([(x, top), (x, bot)])
+            line = line.intersection(margin_poly)
+
+            lines_geometry = flatten_shapely_geometry(line, simplify_tolerance=simplify_tol)
+            for ll in lines_geometry:
+                lines_trimmed.append(ll)
+                if plot is not None:
+                    plot(ll)
+        except grace:
+            raise
+        except Exception as e:
+            log.error('camlib.lines_clearing_paths() Processing poly --> %s' % str(e))
+            return None
+
+    lines_trimmed = unary_union(lines_trimmed)
+
+    # Add lines to storage
+    lines_t_geo = flatten_shapely_geometry(lines_trimmed, simplify_tolerance=simplify_tol)
+    for line in lines_t_geo:
+        if isinstance(line, LineString) or isinstance(line, LinearRing):
+            if not line.is_empty:
+                geoms.insert(line)
+        else:
+            log.debug("camlib.lines_clearing_paths(). Not a line: %s" % str(type(line)))
+
+    # Add margin (contour) to storage
+    if contour:
+        margin_poly_geo = flatten_shapely_geometry(margin_poly, simplify_tolerance=simplify_tol)
+        for poly in margin_poly_geo:
+            if isinstance(poly, Polygon) and not poly.is_empty:
+                geoms.insert(poly.exterior)
+                if plot is not None:
+                    plot(poly.exterior)
+                for ints in poly.interiors:
+                    geoms.insert(ints)
+                    if plot is not None:
+                        plot(ints)
+
+    return geoms
+
+
+def clear_polygon_mp(pol, tooldia: float, method: int, steps_per_circle: int, overlap: float, connect: bool,
+                     contour: bool, simplify_tol: float = 0.0):
+    """
+    Will clear a single polygon inside a process of the multiprocessing Pool. Used with WorkerPool.map_geometry()
+    which delivers the polygons from the shared memory.
+
+    :param pol:                 the Shapely polygon to be cleared
+    :param tooldia:             the tool diameter
+    :param method:              0 = standard, 1 = seed, 2 = lines, 3 = combo (lines, then seed, then standard)
+    :param steps_per_circle:    number of segments used to approximate a circle
+    :param overlap:             the overlap of the passes, a fraction of the tool diameter
+    :param connect:             connect the passes
+    :param contour:             add a contour pass
+    :param simplify_tol:        if above zero the resulting geometry is simplified with this tolerance
+    :return:                    list of the cleared geometry elements; None if the polygon could not be cleared or
+                                the job was aborted
+    """
+    global GUI_EVENTS
+    GUI_EVENTS = False
+
+    progress = ProgressContext(PoolJobState())
+
+    def shrink():
+        return shrink_clearing_paths(pol, tooldia, steps_per_circle, overlap=overlap, progress=progress)
+
+    def seed():
+        return seed_clearing_paths(pol, tooldia, steps_per_circle, overlap=overlap, contour=contour,
+                                   progress=progress)
+
+    def lines():
+        return lines_clearing_paths(pol, tooldia, steps_per_circle, overlap=overlap, contour=contour,
+                                    progress=progress)
+
+    if method == 0:
+        methods = [shrink]
+    elif method == 1:
+        methods = [seed]
+    elif method == 2:
+        methods = [lines]
+    else:
+        methods = [lines, seed, shrink]
+
+    cp = None
+    for clear_method in methods:
+        try:
+            cp = clear_method()
+            if cp and cp.objects and connect:
+                cp = Geometry.paint_connect(cp, pol, tooldia, int(steps_per_circle)) or cp
+        except grace:
+            return None
+        except Exception as err:
+            log.error("camlib.clear_polygon_mp() --> %s" % str(err))
+            cp = None
+        if cp and cp.objects:
+            break
+
+    if not cp or not cp.objects:
+        return None
+
+    if simplify_tol > 0.0:
+        return [x.simplify(simplify_tol) for x in cp.get_objects()]
+    return list(cp.get_objects())
+
+
+def isolation_rings(geometry, iso_type: int = 2):
+    """
+    Will extract from the buffered geometry the paths used for isolation.
+
+    :param geometry:    Shapely geometry or a list of such
+    :param iso_type:    type of isolation, can be 0 = exteriors or 1 = interiors or 2 = both (complete)
+    :return:            list of geometry elements; for the interiors there is a list of interiors for each polygon.
+                        None if the type of isolation is not supported
+    :rtype:             list
+    """
+    w_geo = flatten_shapely_geometry(geometry)
+    if iso_type == 2:
+        return w_geo
+    if iso_type == 0:
+        return [geo.exterior for geo in w_geo if isinstance(geo, Polygon)]
+    if iso_type == 1:
+        return [list(geo.interiors) for geo in w_geo if isinstance(geo, Polygon)]
+    return None
+
+
+def isolation_passes_mp(geometry: list, offsets: list, steps: int, iso_type: int = 2, corner: int = 1) -> list:
+    """
+    Will do the isolation passes of one tool inside a process of the multiprocessing Pool. All the pass offsets of
+    all the polygons are buffered in one vectorized operation.
+
+    :param geometry:    list of Shapely geometry elements to be isolated
+    :param offsets:     list of offset distances, one for each pass
+    :param steps:       number of segments used to approximate a quarter of circle
+    :param iso_type:    type of isolation, can be 0 = exteriors or 1 = interiors or 2 = both (complete)
+    :param corner:      the join style of the buffer
+    :return:            list with the isolation geometry of each pass, in the order of the offsets; None for a pass
+                        if the type of isolation is not supported
+    :rtype:             list
+    """
+    geo_list = flatten_shapely_geometry(geometry)
+    geo_arr = np.empty(len(geo_list), dtype=object)
+    geo_arr[:] = geo_list
+    off_arr = np.asarray(offsets, dtype=float)
+
+    # one row of buffered polygons for each pass
+    buffered = shapely.buffer(geo_arr[np.newaxis, :], off_arr[:, np.newaxis], quad_segs=int(steps),
+                              join_style=corner)
+
+    passes_geo = []
+    for offset, pass_row in zip(off_arr, buffered):
+        pass_geo = geo_arr if offset == 0 else pass_row
+        passes_geo.append(isolation_rings(shapely.union_all(pass_geo), iso_type))
+    return passes_geo
+
+
+def find_min_clearances(geometries: list, k: int = 1, decimals: int = 4, progress=None) -> dict:
+    """
+    Will find the smallest distances (clearances) between the geometry elements in the given list and the locations
+    where they happen. Instead of evaluating every pair of elements, a STRtree is used to find only the pairs of
+    elements closer than a limit distance. The limit starts at the k-th smallest nearest neighbour distance and it is
+    doubled until the pairs within it hold k distinct distances (or it covers the extent of all the elements): all
+    the pairs closer than the limit are found, so their smallest k distances are the smallest k overall.
+
+    :param geometries:  list of Shapely geometry elements
+    :param k:           how many of the smallest (distinct, after rounding) distances to return
+    :param decimals:    the distances and the locations are rounded to this number of decimals
+    :param progress:    ProgressContext of the operation or None; it is ticked for each element on each search
+    :return:            dictionary having as keys the distances, in ascending order, and as values a list of
+                        locations where each distance happens: ((x1, y1), (x2, y2)); empty if there are less than
+                        two geometry elements
+    :rtype:             dict
+    """
+    geo_arr = np.empty(len(geometries), dtype=object)
+    geo_arr[:] = list(geometries)
+    if len(geo_arr) < 2:
+        return {}
+    if progress is None:
+        progress = ProgressContext()
+
+    tree = STRtree(geo_arr)
+
+    # the distance to the nearest neighbour of each element; the k-th smallest is where the search starts
+    nearest_dist = []
+    for geo in geo_arr:
+        # check for an abort and publish the progress
+        progress.tick()
+        __, dist = tree.query_nearest(geo, exclusive=True, all_matches=False, return_distance=True)
+        if len(dist):
+            nearest_dist.append(dist[0])
+    if not nearest_dist:
+        return {}
+    nearest_dist = np.unique(np.round(nearest_dist, decimals))
+    limit = nearest_dist[min(k, len(nearest_dist)) - 1] + 10 ** -decimals
+
+    # no two elements are farther apart than the diagonal of their extent
+    xmin, ymin, xmax, ymax = shapely.total_bounds(geo_arr)
+    max_limit = math.hypot(xmax - xmin, ymax - ymin) + 10 ** -decimals
+
+    def pairs_within(distance):
+        # all the pairs of elements that are within the distance, each pair once
+        src = []
+        dst = []
+        pair_d = []
+        for idx, geo in enumerate(geo_arr):
+            # check for an abort and publish the progress
+            progress.tick()
+            neighbours = tree.query(geo, predicate='dwithin', distance=distance)
+            neighbours = neighbours[neighbours > idx]
+            if len(neighbours):
+                src.append(np.full(len(neighbours), idx))
+                dst.append(neighbours)
+                pair_d.append(np.round(shapely.distance(geo, geo_arr[neighbours]), decimals))
+        if not pair_d:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+        return np.concatenate(src), np.concatenate(dst), np.concatenate(pair_d)
+
+    while True:
+        src_idx, dst_idx, pair_dist = pairs_within(limit)
+        if len(np.unique(pair_dist)) >= k or limit >= max_limit:
+            break
+        limit = min(limit * 2, max_limit)
+    if not len(pair_dist):
+        return {}
+
+    selected_dist = np.unique(pair_dist)[:k]
+    mask = np.isin(pair_dist, selected_dist)
+    src_idx = src_idx[mask]
+    dst_idx = dst_idx[mask]
+    pair_dist = pair_dist[mask]
+
+    lines = shapely.shortest_line(geo_arr[src_idx], geo_arr[dst_idx])
+    line_coords = np.round(shapely.get_coordinates(lines), decimals).reshape(-1, 2, 2)
+
+    min_dict = {}
+    for dist in selected_dist:
+        min_dict[float(dist)] = []
+    for dist, coords in zip(pair_dist, line_coords):
+        min_dict[float(dist)].append(
+            ((float(coords[0][0]), float(coords[0][1])), (float(coords[1][0]), float(coords[1][1])))
+        )
+    return min_dict
+
+
+# above this number of geometry elements a rule is split in spatial tiles that are checked in parallel in the Pool
+DRC_TILE_THRESHOLD = 2000
+# in how many spatial tiles (approximately) a rule is split
+DRC_TILES_NUMBER = 16
+
+# Cache for the violations found in each tile, so a rule that is run again only recomputes the tiles whose geometry
+# changed. key: hash of (rule kind, size, content of the geometry elements of both sets in the tile); the order and
+# the position of the elements in the objects are not part of the key. value: list of locations
+drc_cache = OrderedDict()
+drc_cache_lock = threading.Lock()
+DRC_CACHE_SIZE = 4096
+
+
+def as_geo_array(geometry) -> np.ndarray:
+    """
+    Flatten the geometry into a Numpy array of Shapely geometry elements, as required by the vectorized
+    Shapely functions and by the STRtree.
+
+    :param geometry:    a Shapely geometry or an iterable of Shapely geometries
+    :return:            a Numpy array (dtype=object) of Shapely geometry elements
+    """
+    geo_list = flatten_shapely_geometry(geometry)
+    geo_arr = np.empty(len(geo_list), dtype=object)
+    geo_arr[:] = geo_list
+    return geo_arr
+
+
+def violation_locations(geo_a, geo_b, size, id_a=None, id_b=None, index_a=None, index_b=None,
+                        kind='clearance') -> list:
+    """
+    Find the pairs made of an element from geo_a and an element from geo_b that are closer than 'size'.
+    The candidate pairs are found with a STRtree query with the 'dwithin' predicate, so only the elements that are
+    close to each other are measured.
+
+    :param geo_a:   Numpy array of Shapely geometry elements
+    :param geo_b:   Numpy array of Shapely geometry elements
+    :param size:    the minimum distance allowed between the elements
+    :param id_a:    content ids of the geo_a elements (see content_ids()); used when geo_a and geo_b are parts
+                    of the same set
+    :param id_b:    content ids of the geo_b elements; a pair is evaluated only if its id_a is less than its id_b or,
+                    for identical elements, if its index_a is less than its index_b
+    :param index_a: indexes of the geo_a elements in the set; used together with id_a
+    :param index_b: indexes of the geo_b elements in the set; used together with id_b
+    :param kind:    'clearance': the location is the middle of the shortest line between the elements;
+                    'ring': geo_a are pad edges and geo_b are holes; the holes that touch the pad edge are located by
+                    a point inside the hole and the other holes by the middle of the shortest line
+    :return:        list of violation locations as (x, y) tuples
+    """
+    if len(geo_a) == 0 or len(geo_b) == 0:
+        return []
+
+    tree = STRtree(geo_b)
+    a_idx, b_idx = tree.query(geo_a, predicate='dwithin', distance=size)
+    if id_a is not None and id_b is not None:
+        # the elements are ordered by their content id and then by their index in the set, so each pair is evaluated
+        # once, from its lower element, and an element is not paired with itself
+        pair_id_a = id_a[a_idx]
+        pair_id_b = id_b[b_idx]
+        mask = (pair_id_a < pair_id_b) | ((pair_id_a == pair_id_b) & (index_a[a_idx] < index_b[b_idx]))
+        a_idx = a_idx[mask]
+        b_idx = b_idx[mask]
+    if len(a_idx) == 0:
+        return []
+
+    pairs_a = geo_a[a_idx]
+    pairs_b = geo_b[b_idx]
+    dist = shapely.distance(pairs_a, pairs_b)
+
+    if kind == 'ring':
+        touching = dist == 0
+        inside_pts = shapely.get_coordinates(shapely.point_on_surface(pairs_b[touching]))
+        locations = [(float(x), float(y)) for x, y in inside_pts]
+        mask = (dist > 0) & (dist < size)
+    else:
+        locations = []
+        mask = dist < size
+
+    lines = shapely.shortest_line(pairs_a[mask], pairs_b[mask])
+    coords = shapely.get_coordinates(lines).reshape(-1, 2, 2)
+    p1 = coords[:, 0, :]
+    p2 = coords[:, 1, :]
+    mid = np.minimum(p1, p2) + (np.abs(p1 - p2) / 2)
+    locations += [(float(x), float(y)) for x, y in mid]
+
+    return locations
+
+
+def violation_locations_mp(args: tuple) -> list:
+    """
+    Wrapper over violation_locations() to be used in the Pool. The geometry is shipped as WKB.
+
+    :param args:    tuple: (geo_a WKB array, id_a, index_a, geo_b WKB array, id_b, index_b, size, kind)
+    :return:        list of violation locations as (x, y) tuples
+    """
+    geo_a_wkb, id_a, index_a, geo_b_wkb, id_b, index_b, size, kind = args
+    return violation_locations(shapely.from_wkb(geo_a_wkb), shapely.from_wkb(geo_b_wkb), size,
+                               id_a=id_a, id_b=id_b, index_a=index_a, index_b=index_b, kind=kind)
+
+
+def spatial_tiles(geo_arr, tiles_number) -> list:
+    """
+    Split the geometry elements in groups according to the position of the center of their bounding box on a grid.
+    The grid is anchored in origin and the cell size is a power of 2 so the tiles stay the same when some elements
+    are edited, which is what makes the tiles cache effective.
+
+    :param geo_arr:         Numpy array of Shapely geometry elements
+    :param tiles_number:    approximate number of tiles
+    :return:                list of Numpy arrays with the (ascending) indexes of the elements in each non-empty tile
+    """
+    bounds = shapely.bounds(geo_arr)
+    cx = (bounds[:, 0] + bounds[:, 2]) / 2
+    cy = (bounds[:, 1] + bounds[:, 3]) / 2
+
+    per_axis = max(1, int(math.ceil(math.sqrt(tiles_number))))
+    extent = max(cx.max() - cx.min(), cy.max() - cy.min(), 1e-9)
+    cell = 2.0 ** math.ceil(math.log2(extent / per_axis))
+
+    cell_x = np.floor(cx / cell).astype(np.int64)
+    cell_y = np.floor(cy / cell).astype(np.int64)
+    order = np.lexsort((cell_y, cell_x))
+    cell_x = cell_x[order]
+    cell_y = cell_y[order]
+    split_at = np.flatnonzero((np.diff(cell_x) != 0) | (np.diff(cell_y) != 0)) + 1
+    return [np.sort(tile) for tile in np.split(order, split_at)]
+
+
+def element_digests(wkb_arr) -> np.ndarray:
+    """
+    :param wkb_arr:     Numpy array with the WKB of geometry elements
+    :return:            Numpy array with a 16 bytes content digest for each element
+    """
+    return np.array([hashlib.blake2b(wkb, digest_size=16).digest() for wkb in wkb_arr], dtype='V16')
+
+
+def content_ids(digests) -> np.ndarray:
+    """
+    :param digests:     Numpy array of element digests, as made by element_digests()
+    :return:            Numpy array of uint64 ids derived from the content of the elements
+    """
+    return np.frombuffer(digests.tobytes(), dtype='>u8')[::2].astype(np.uint64)
+
+
+def drc_tile_key(kind, size, same_set, digests_a, digests_b) -> bytes:
+    """
+    Content hash of a rule tile; it changes if any of the geometry elements involved in the tile changes. It does not
+    depend on the order of the elements nor on their indexes in the objects.
+
+    :param kind:        the kind of rule, see violation_locations()
+    :param size:        the minimum distance allowed between the elements
+    :param same_set:    True if the elements of geo_a are checked against each other
+    :param digests_a:   Numpy array with the digests of the geo_a elements in the tile, made by element_digests()
+    :param digests_b:   Numpy array with the digests of the geo_b elements in the tile
+    :return:            a digest to be used as key in the tiles cache
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(('%s;%.12g;%d' % (kind, size, int(same_set))).encode())
+    for digests in (digests_a, digests_b):
+        hasher.update(b'|')
+        hasher.update(np.sort(digests).tobytes())
+    return hasher.digest()
+
+
+def cached_violations(key):
+    with drc_cache_lock:
+        locations = drc_cache.get(key)
+        if locations is not None:
+            drc_cache.move_to_end(key)
+        return locations
+
+
+def store_violations(key, locations):
+    with drc_cache_lock:
+        drc_cache[key] = locations
+        drc_cache.move_to_end(key)
+        while len(drc_cache) > DRC_CACHE_SIZE:
+            drc_cache.popitem(last=False)
+
+
+def find_violations(geo_a, geo_b, size, kind='clearance', pool=None, callback=None) -> list:
+    """
+    Find the locations where the elements of geo_a are closer than 'size' to the elements of geo_b. If geo_b is None
+    then the elements of geo_a are checked against each other.
+    Large sets are split in spatial tiles that are checked in parallel in the Pool, if one is provided. The result of
+    each tile is cached, keyed by the content of the tile, so running the rule again after some of the objects were
+    edited recomputes only the tiles that changed.
+
+    :param geo_a:       Numpy array of Shapely geometry elements
+    :param geo_b:       Numpy array of Shapely geometry elements or None
+    :param size:        the minimum distance allowed between the elements
+    :param kind:        'clearance' or 'ring'; see violation_locations()
+    :param pool:        the WorkerPool of the App or None
+    :param callback:    function called with the list of violation locations as soon as they are found in a tile
+    :return:            list of violation locations as (x, y) tuples
+    """
+    same_set = geo_b is None
+    if same_set:
+        geo_b = geo_a
+    if len(geo_a) == 0 or len(geo_b) == 0:
+        return []
+
+    geo_a_wkb = shapely.to_wkb(geo_a)
+    geo_b_wkb = geo_a_wkb if same_set else shapely.to_wkb(geo_b)
+    digests_a = element_digests(geo_a_wkb)
+    digests_b = digests_a if same_set else element_digests(geo_b_wkb)
+    # when the elements are checked against each other the pairs are selected by the content ids of the elements
+    # and, for identical elements, by their indexes
+    ids = content_ids(digests_a) if same_set else None
+    indexes = np.arange(len(geo_a)) if same_set else None
+
+    # build the tiles as tuples: (geo_a WKB, id_a, index_a, geo_b WKB, id_b, index_b) and their keys
+    tiles = []
+    keys = []
+    if len(geo_a) + len(geo_b) < DRC_TILE_THRESHOLD:
+        tiles.append((geo_a_wkb, ids, indexes, geo_b_wkb, ids, indexes))
+        keys.append(drc_tile_key(kind, size, same_set, digests_a, digests_b))
+    else:
+        tree_b = STRtree(geo_b)
+        for tile_idx in spatial_tiles(geo_a, DRC_TILES_NUMBER):
+            xmin, ymin, xmax, ymax = shapely.total_bounds(geo_a[tile_idx])
+            # the elements of geo_b that can be closer than 'size' to the elements in the tile
+            b_idx = np.sort(tree_b.query(shapely.box(xmin - size, ymin - size, xmax + size, ymax + size)))
+            if len(b_idx) == 0:
+                continue
+            tiles.append((geo_a_wkb[tile_idx], ids[tile_idx] if same_set else None, tile_idx if same_set else None,
+                          geo_b_wkb[b_idx], ids[b_idx] if same_set else None, b_idx if same_set else None))
+            keys.append(drc_tile_key(kind, size, same_set, digests_a[tile_idx], digests_b[b_idx]))
+
+    results = [cached_violations(key) for key in keys]
+
+    missing = [idx for idx, res in enumerate(results) if res is None]
+    if pool is not None and len(missing) > 1:
+        # only a few tiles are in the Pool at one time; the results come in the order of the tiles
+        found = pool.run_tasks(violation_locations_mp, [(tiles[idx] + (size, kind),) for idx in missing])
+    else:
+        found = (violation_locations_mp(tiles[idx] + (size, kind)) for idx in missing)
+
+    locations = []
+    for key, res in zip(keys, results):
+        if res is None:
+            res = next(found)
+            store_violations(key, res)
+        if callback is not None and res:
+            callback(res)
+        locations += res
+    return locations
+
+
+def panel_offsets(rows: int, columns: int, spacing_x: float, spacing_y: float) -> np.ndarray:
+    """
+    The offsets of the cells in a panel, row by row.
+
+    :param rows:        number of rows
+    :param columns:     number of columns
+    :param spacing_x:   distance between the origins of two neighbouring columns
+    :param spacing_y:   distance between the origins of two neighbouring rows
+    :return:            Numpy array of shape (rows * columns, 2)
+    """
+    off_y, off_x = np.meshgrid(np.arange(rows) * spacing_y, np.arange(columns) * spacing_x, indexing='ij')
+    return np.column_stack((off_x.ravel(), off_y.ravel()))
+
+
+def linear_array_offsets(size: int, pitch: float, axis: str, angle: float = 0.0) -> np.ndarray:
+    """
+    The offsets of the elements of a linear array, relative to the first element.
+
+    :param size:    number of elements in the array
+    :param pitch:   distance between two neighbouring elements
+    :param axis:    'X', 'Y' or 'A' for an array at an angle
+    :param angle:   the angle of the array, in degrees, used when the axis is 'A'
+    :return:        Numpy array of shape (size, 2)
+    """
+    if axis == 'X':
+        direction = (1.0, 0.0)
+    elif axis == 'Y':
+        direction = (0.0, 1.0)
+    else:
+        direction = (math.cos(math.radians(angle)), math.sin(math.radians(angle)))
+    return np.outer(np.arange(int(size)) * pitch, direction)
+
+
+def flatten_geometry_list(geometry) -> list:
+    """
+    Flatten the nested lists of geometry elements and the multi-geometries, keeping the empty elements out.
+
+    :param geometry:    a Shapely geometry or a (nested) list of Shapely geometries
+    :return:            list of Shapely geometries
+    """
+    if geometry is None:
+        return []
+    if isinstance(geometry, (list, tuple)):
+        flat_list = []
+        for geo in geometry:
+            flat_list += flatten_geometry_list(geo)
+        return flat_list
+    if isinstance(geometry, (MultiPolygon, MultiLineString, MultiPoint)):
+        return [geo for geo in geometry.geoms if not geo.is_empty]
+    return [] if geometry.is_empty else [geometry]
+
+
+def translate_copies(geo_arr, offsets, callback=None) -> np.ndarray:
+    """
+    Make a translated copy of all the geometry elements for each of the offsets. All the coordinates of a copy are
+    translated at once with shapely.transform().
+
+    :param geo_arr:     Numpy array of Shapely geometries (None elements are allowed)
+    :param offsets:     Numpy array of shape (N, 2)
+    :param callback:    function called with the number of copies made so far; it can raise an exception to abort
+    :return:            Numpy array of shape (N, len(geo_arr)) with the translated geometries
+    """
+    copies = np.empty((len(offsets), len(geo_arr)), dtype=object)
+    for idx, offset in enumerate(np.asarray(offsets, dtype=float)):
+        copies[idx] = shapely.transform(geo_arr, lambda coords, off=offset: coords + off)
+        if callback is not None:
+            callback(idx + 1)
+    return copies
+
+
+def panelize_geometry(geometry, offsets, callback=None) -> list:
+    """
+    Copies of the geometry for each of the offsets.
+
+    :param geometry:    a Shapely geometry or a (nested) list of Shapely geometries
+    :param offsets:     Numpy array of shape (N, 2)
+    :param callback:    see translate_copies()
+    :return:            flat list of the translated geometries, copy by copy
+    """
+    flat_geo = flatten_geometry_list(geometry)
+    geo_arr = np.empty(len(flat_geo), dtype=object)
+    geo_arr[:] = flat_geo
+    return translate_copies(geo_arr, offsets, callback=callback).ravel().tolist()
+
+
+class DrillArray:
+    """
+    Columnar storage of the drills of an Excellon tool: the coordinates of all the holes are kept in one Numpy array
+    of shape (N, 2). It behaves like the list of Shapely Points it replaces; a Point is created only when a drill is
+    read as an element, while the transformations, the bounds and the copies of a panel work on the array.
+    The version is increased on each change so the cached bounds of the object can tell the array was changed.
+    """
+
+    # number of coordinates of an element
+    width = 2
+
+    def __init__(self, items=None):
+        """
+        :param items:   None, another array of the same kind, a Numpy array or a list of elements (Shapely Points or
+                        (x, y) tuples)
+        """
+        self.coords = self.as_coords(items)
+        self.version = 0
+
+    @classmethod
+    def as_coords(cls, items) -> np.ndarray:
+        """
+        :param items:   same as for the constructor
+        :return:        a new float64 Numpy array of shape (N, width)
+        """
+        if items is None:
+            return np.empty((0, cls.width))
+        if isinstance(items, cls):
+            return items.coords.copy()
+        if isinstance(items, np.ndarray):
+            return np.array(items, dtype=float).reshape(-1, cls.width)
+        items = list(items)
+        if items and all(isinstance(el, Point) for el in items):
+            # vectorized for the lists of Shapely Points
+            return shapely.get_coordinates(items).reshape(-1, cls.width)
+        return np.array([cls.element_coords(el) for el in items], dtype=float).reshape(-1, cls.width)
+
+    @staticmethod
+    def element_coords(element) -> tuple:
+        """
+        :param element: a Shapely Point or a (x, y) tuple
+        :return:        (x, y)
+        """
+        if isinstance(element, Point):
+            return element.x, element.y
+        return float(element[0]), float(element[1])
+
+    @staticmethod
+    def make_elements(coords: np.ndarray) -> list:
+        """
+        :param coords:  Numpy array of shape (N, width)
+        :return:        list of N elements (Shapely Points)
+        """
+        return shapely.points(coords).tolist()
+
+    def elements(self) -> list:
+        """
+        :return:    all the elements as a list (of Shapely Points)
+        """
+        return self.make_elements(self.coords)
+
+    def transform(self, matrix: np.ndarray):
+        """
+        Apply an affine transformation to the coordinates, in place.
+
+        :param matrix:  3x3 affine matrix
+        :return:        None
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        xy = self.coords.reshape(-1, 2)
+        self.coords = (xy @ matrix[:2, :2].T + matrix[:2, 2]).reshape(-1, self.width)
+        self.version += 1
+
+    def bounds(self, radius: float = 0.0):
+        """
+        :param radius:  the radius of the tool, added on each side
+        :return:        (xmin, ymin, xmax, ymax) or None if there are no elements
+        """
+        if len(self.coords) == 0:
+            return None
+        xy = self.coords.reshape(-1, 2)
+        xmin, ymin = xy.min(axis=0) - radius
+        xmax, ymax = xy.max(axis=0) + radius
+        return float(xmin), float(ymin), float(xmax), float(ymax)
+
+    def copy(self):
+        return type(self)(self)
+
+    def append(self, element):
+        self.coords = np.vstack((self.coords, np.asarray(self.element_coords(element), dtype=float)))
+        self.version += 1
+
+    def extend(self, items):
+        self.coords = np.vstack((self.coords, self.as_coords(items)))
+        self.version += 1
+
+    def insert(self, index, element):
+        self.coords = np.insert(self.coords, index, self.element_coords(element), axis=0)
+        self.version += 1
+
+    def pop(self, index=-1):
+        element = self[index]
+        self.coords = np.delete(self.coords, index, axis=0)
+        self.version += 1
+        return element
+
+    def index(self, element):
+        found = np.flatnonzero(np.all(self.coords == np.asarray(self.element_coords(element)), axis=1))
+        if len(found) == 0:
+            raise ValueError("%s is not in the drills" % str(element))
+        return int(found[0])
+
+    def remove(self, element):
+        self.coords = np.delete(self.coords, self.index(element), axis=0)
+        self.version += 1
+
+    def __contains__(self, element):
+        try:
+            self.index(element)
+        except (ValueError, TypeError, IndexError):
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __bool__(self):
+        return len(self.coords) > 0
+
+    def __iter__(self):
+        return iter(self.elements())
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return type(self)(self.coords[item])
+        return self.make_elements(self.coords[item][None, :])[0]
+
+    def __setitem__(self, item, value):
+        if isinstance(item, slice):
+            self.coords[item] = self.as_coords(value)
+        else:
+            self.coords[item] = self.element_coords(value)
+        self.version += 1
+
+    def __delitem__(self, item):
+        self.coords = np.delete(self.coords, item, axis=0)
+        self.version += 1
+
+    def __add__(self, other):
+        return type(self)(np.vstack((self.coords, self.as_coords(other))))
+
+    def __radd__(self, other):
+        return type(self)(np.vstack((self.as_coords(other), self.coords)))
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __eq__(self, other):
+        try:
+            other_coords = self.as_coords(other)
+        except (TypeError, ValueError, IndexError):
+            return NotImplemented
+        return self.coords.shape == other_coords.shape and bool(np.all(self.coords == other_coords))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%d)" % (type(self).__name__, len(self.coords))
+
+
+class SlotArray(DrillArray):
+    """
+    Columnar storage of the slots of an Excellon tool: a Numpy array of shape (N, 4) with the start and the stop
+    coordinates of each slot. It behaves like the list of (start Point, stop Point) tuples it replaces.
+    """
+
+    width = 4
+
+    @classmethod
+    def as_coords(cls, items) -> np.ndarray:
+        if isinstance(items, (list, tuple)) and items and \
+                all(isinstance(el, tuple) and len(el) == 2 and isinstance(el[0], Point) and isinstance(el[1], Point)
+                    for el in items):
+            return shapely.get_coordinates([pt for el in items for pt in el]).reshape(-1, cls.width)
+        return super().as_coords(items)
+
+    @staticmethod
+    def element_coords(element) -> tuple:
+        """
+        :param element: a (start, stop) tuple, where start and stop are Shapely Points or (x, y) tuples, or a
+                        (x_start, y_start, x_stop, y_stop) tuple
+        :return:        (x_start, y_start, x_stop, y_stop)
+        """
+        if len(element) == 4:
+            return tuple(float(val) for val in element)
+        return DrillArray.element_coords(element[0]) + DrillArray.element_coords(element[1])
+
+    @staticmethod
+    def make_elements(coords: np.ndarray) -> list:
+        """
+        :param coords:  Numpy array of shape (N, 4)
+        :return:        list of N (start Point, stop Point) tuples
+        """
+        pts = shapely.points(coords.reshape(-1, 2))
+        return list(zip(pts[0::2].tolist(), pts[1::2].tolist()))
+
+    def linestrings(self) -> np.ndarray:
+        """
+        :return:    Numpy array of the slots as Shapely LineStrings
+        """
+        return shapely.linestrings(self.coords.reshape(-1, 2, 2))
+
+
+def drill_coords(drills) -> np.ndarray:
+    """
+    :param drills:  the drills of an Excellon tool: a DrillArray or a list of Shapely Points
+    :return:        Numpy array of shape (N, 2)
+    """
+    if isinstance(drills, DrillArray) and not isinstance(drills, SlotArray):
+        return drills.coords
+    return DrillArray.as_coords(drills)
+
+
+def slot_coords(slots) -> np.ndarray:
+    """
+    :param slots:   the slots of an Excellon tool: a SlotArray or a list of (start Point, stop Point) tuples
+    :return:        Numpy array of shape (N, 4)
+    """
+    if isinstance(slots, SlotArray):
+        return slots.coords
+    return SlotArray.as_coords(slots)
+
+
+def drill_polygons(drills, radius: float, steps_per_circle: int) -> list:
+    """
+    :param drills:              the drills of an Excellon tool: a DrillArray or a list of Shapely Points
+    :param radius:              radius of the tool
+    :param steps_per_circle:    number of segments used to approximate a circle
+    :return:                    list of the holes as Shapely Polygons, created in one vectorized operation
+    """
+    coords = drill_coords(drills)
+    if len(coords) == 0:
+        return []
+    return shapely.buffer(shapely.points(coords), radius, quad_segs=int(steps_per_circle)).tolist()
+
+
+def slot_polygons(slots, radius: float, steps_per_circle: int) -> list:
+    """
+    :param slots:               the slots of an Excellon tool: a SlotArray or a list of (start, stop) tuples
+    :param radius:              radius of the tool
+    :param steps_per_circle:    number of segments used to approximate a circle
+    :return:                    list of the slots as Shapely Polygons, created in one vectorized operation
+    """
+    coords = slot_coords(slots)
+    if len(coords) == 0:
+        return []
+    lines = shapely.linestrings(coords.reshape(-1, 2, 2))
+    return shapely.buffer(lines, radius, quad_segs=int(steps_per_circle)).tolist()
+
+
+def panelize_points(points_list, offsets) -> DrillArray:
+    """
+    Copies of the drills of an Excellon tool for each of the offsets.
+
+    :param points_list: DrillArray or list of Shapely Points
+    :param offsets:     Numpy array of shape (N, 2)
+    :return:            DrillArray with the drills, copy by copy
+    """
+    coords = drill_coords(points_list)
+    offsets = np.asarray(offsets, dtype=float).reshape(-1, 2)
+    return DrillArray((coords[None, :, :] + offsets[:, None, :]).reshape(-1, 2))
+
+
+def panelize_slots(slots_list, offsets) -> SlotArray:
+    """
+    Copies of the slots of an Excellon tool for each of the offsets.
+
+    :param slots_list:  SlotArray or list of (start Point, stop Point) tuples
+    :param offsets:     Numpy array of shape (N, 2)
+    :return:            SlotArray with the slots, copy by copy
+    """
+    coords = slot_coords(slots_list)
+    offsets = np.tile(np.asarray(offsets, dtype=float).reshape(-1, 2), 2)
+    return SlotArray((coords[None, :, :] + offsets[:, None, :]).reshape(-1, 4))
+
+
+def panelize_apertures(geometry_list: list, offsets, callback=None) -> list:
+    """
+    Copies of the geometry of a Gerber aperture for each of the offsets.
+
+    :param geometry_list:   list of dicts with the 'solid', 'clear' and 'follow' keys
+    :param offsets:         Numpy array of shape (N, 2)
+    :param callback:        see translate_copies()
+    :return:                list of dicts, copy by copy
+    """
+    if not geometry_list:
+        return []
+
+    keys = ('solid', 'clear', 'follow')
+    geo_arr = np.empty(len(geometry_list) * len(keys), dtype=object)
+    geo_arr[:] = [el.get(key) for el in geometry_list for key in keys]
+    copies = translate_copies(geo_arr, offsets, callback=callback).reshape(len(offsets), len(geometry_list), len(keys))
+
+    new_list = []
+    for cell_copies in copies:
+        for el, el_copies in zip(geometry_list, cell_copies):
+            new_list.append({key: geo for key, geo in zip(keys, el_copies) if key in el})
+    return new_list
+
+
+@contextmanager
+def atomic_file(filename: str, mode='w'):
+    """
+    Open a file for writing through a temporary file in the same folder. The temporary file takes the place of the
+    file only when the writing ends without an error, so a failed or aborted export does not leave a truncated file
+    and does not destroy the file that was there.
+
+    :param filename:    path of the file
+    :param mode:        the mode in which the temporary file is open: 'w' or 'wb'
+    :return:            the open temporary file
+    """
+    tmp_filename = '%s.%d.tmp' % (filename, os.getpid())
+    try:
+        with open(tmp_filename, mode) as f:
+            yield f
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        try:
+            os.remove(tmp_filename)
+        except OSError:
+            pass
+        raise
+
+
+class ChunkedWriter:
+    """
+    Collects the text of an exported file. With a file handle the text is written to it in chunks, each time the
+    buffered text reaches chunk_size characters, so a large file is never held whole in memory. Without a file handle
+    the text is kept and returned by getvalue().
+    """
+
+    def __init__(self, file_handle=None, chunk_size=1 << 20):
+        """
+        :param file_handle: an open text file or None
+        :param chunk_size:  number of characters buffered before they are written to the file
+        """
+        self.file_handle = file_handle
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.buffered = 0
+
+    def write(self, text: str):
+        self.chunks.append(text)
+        if self.file_handle is not None:
+            self.buffered += len(text)
+            if self.buffered >= self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        if self.file_handle is not None and self.chunks:
+            self.file_handle.write(''.join(self.chunks))
+            self.chunks = []
+            self.buffered = 0
+
+    def getvalue(self) -> str:
+        """
+        :return:    the text that was not written to a file handle
+        """
+        return ''.join(self.chunks)
+
+
+def format_coords(coords, template: str, fract: int, whole=None, decimal_point=False, factor=1.0, offset=None,
+                  chunk_rows=20000):
+    """
+    Format the rows of a coordinates array as lines of text, in bulk: the scaling, the rounding and the zero
+    padding are done for a whole block of rows and the block is formatted with a single string operation.
+
+    :param coords:          array like of shape (N, K): one row for each line of text
+    :param template:        the text of one line, with a '%s' for each of the K coordinates, e.g. "X%sY%sD01*\n";
+                            it must not hold other '%' or '.' characters
+    :param fract:           number of decimals
+    :param whole:           if not None, the whole part of the numbers is padded with leading zeros to this number of
+                            digits (the sign is not counted); the sign comes before the padding zeros, e.g. -0.00006
+                            with whole=2 and fract=6 is written as '-00000060' and -3 as '-03000000'. A value that
+                            rounds to zero has no sign.
+    :param decimal_point:   if False the decimal point is removed
+    :param factor:          the coordinates are multiplied by this factor
+    :param offset:          None or (dx, dy) added to each (x, y) pair of a row, before the scaling
+    :param chunk_rows:      number of rows formatted at once
+    :return:                generator of text chunks
+    """
+    coords = np.asarray(coords, dtype=float)
+    if coords.ndim == 1:
+        coords = coords.reshape(1, -1)
+    n_cols = coords.shape[1]
+
+    if whole is None:
+        field = '%%.%df' % fract
+    else:
+        # the sign is a separate field so the zero padding does not count it
+        field = '%%s%%0%d.%df' % (whole + fract + 1, fract)
+    line = template % ((field,) * n_cols)
+    if offset is not None:
+        offset = np.tile(np.asarray(offset, dtype=float), n_cols // 2)
+
+    for start in range(0, len(coords), chunk_rows):
+        block = coords[start:start + chunk_rows]
+        if offset is not None:
+            block = block + offset
+        block = block * factor
+        if whole is None:
+            values = block.ravel().tolist()
+        else:
+            fields = np.empty((block.shape[0], 2 * n_cols), dtype=object)
+            fields[:, 0::2] = np.where(np.round(block, fract) < 0, '-', '')
+            fields[:, 1::2] = np.abs(block)
+            values = fields.ravel().tolist()
+        text = (line * block.shape[0]) % tuple(values)
+        yield text if decimal_point else text.replace('.', '')
+
+
 def arc(center, radius, start, stop, direction, steps_per_circ):
     """
     Creates a list of point along the specified arc.
@@ -7971,6 +9909,7 @@ def to_dict(obj):
 
     * ApertureMacro
     * BaseGeometry
+    * DrillArray and SlotArray (the Excellon drills and slots)
 
     :param obj:     Shapely geometry.
     :type obj:      BaseGeometry
@@ -7987,6 +9926,11 @@ def to_dict(obj):
             "__class__": "Shply",
             "__inst__": sdumps(obj)
         }
+    if isinstance(obj, DrillArray):
+        return {
+            "__class__": type(obj).__name__,
+            "__inst__": obj.coords.tolist()
+        }
     return obj
 
 
@@ -8005,6 +9949,10 @@ def dict2obj(d):
             am = ApertureMacro()
             am.from_dict(d['__inst__'])
             return am
+        if d['__class__'] == "DrillArray":
+            return DrillArray(np.array(d['__inst__'], dtype=float))
+        if d['__class__'] == "SlotArray":
+            return SlotArray(np.array(d['__inst__'], dtype=float))
         return d
     else:
         return d
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import the application modules the way the App does, from the application folder
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
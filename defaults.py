@@ -93,6 +93,7 @@ class AppDefaults:
         "global_worker_number": int((os.cpu_count()) / 2) if os.cpu_count() > 4 else 1,
         "global_process_number": int((os.cpu_count()) / 4) if os.cpu_count() > 4 else 1,
         "global_tolerance": 0.005,
+        "global_large_text_lines": 200000,
 
         "global_save_compressed": True,
         "global_compression_level": 3,
@@ -622,6 +623,7 @@ class AppDefaults:
         "tools_panelize_columns": 1,
         "tools_panelize_rows": 1,
         "tools_panelize_optimization": True,
+        "tools_panelize_instanced": False,
         "tools_panelize_constrain": False,
         "tools_panelize_constrainx": 200.0,
         "tools_panelize_constrainy": 290.0,
@@ -704,6 +706,7 @@ class AppDefaults:
 
         # Optimal Tool
         "tools_opt_precision": 4,
+        "tools_opt_max_distances": 100,
 
         # Check Rules Tool
         "tools_cr_trace_size": True,
@@ -4,9 +4,15 @@ import os
 import traceback
 from datetime import datetime
 
+# started before the other imports so they are timed too
+from appStartupTracer import startup_tracer
+startup_tracer.start_from_argv(sys.argv)
+startup_tracer.begin("Imports")
+
 from PyQt6 import QtWidgets, QtGui
 from PyQt6.QtCore import QSettings, QTimer
 from appMain import App
+from appHeadless import run_headless
 from appGUI import VisPyPatches
 
 from appGUI.GUIElements import FCMessageBox
@@ -35,6 +41,7 @@ if __name__ == '__main__':
     freeze_support()
 
     portable = False
+    headless = App.cmd_line_headless == 1
     # Folder for user settings.
     if sys.platform == 'win32':
         # #######################################################################################################
@@ -56,6 +63,9 @@ if __name__ == '__main__':
                         portable = eval(param[2])
                     except NameError:
                         portable = False
+                if param[0] == 'headless':
+                    if param[2].lower() == 'true':
+                        headless = True
 
         if portable is False:
             # data_path = shell.SHGetFolderPath(0, shellcon.CSIDL_APPDATA, None, 0) + '\\FlatCAM'
@@ -99,6 +109,11 @@ if __name__ == '__main__':
         #     sys.exit(0)
         sys.exit(0)
 
+    # no GUI: run the Tcl script and/or the batch server on the core of the application
+    if headless:
+        sys.exit(run_headless(data_path, shellfile=App.cmd_line_shellfile, shellvar=App.cmd_line_shellvar,
+                              batch_server=App.cmd_line_batch_server == 1))
+
     debug_trace()
     VisPyPatches.apply_patches()
 
@@ -150,6 +165,7 @@ if __name__ == '__main__':
 
     sys.excepthook = excepthook
 
+    startup_tracer.begin("QApplication")
     app = QtWidgets.QApplication(sys.argv)
 
     # apply style
@@ -173,6 +189,10 @@ if __name__ == '__main__':
 
     fc = App(qapp=app)
 
+    # the startup ends when the event loop processes the first events (e.g. the first paint of the GUI)
+    startup_tracer.begin("First events")
+    QTimer.singleShot(0, lambda: startup_tracer.save(fc.data_path))
+
     # interrupt the Qt loop such that Python events have a chance to be responsive
     timer = QTimer()
     timer.timeout.connect(lambda: None)
@@ -47,6 +47,12 @@ class TclCommandExportExcellon(TclCommand):
         :param unnamed_args:
         :return:
         """
-        if 'filename' not in args:
-            args['filename'] = self.app.options["global_last_save_folder"] + '/' + args['name']
-        self.app.f_handlers.export_excellon(use_thread=False, **args)
+        obj_name = args['name']
+        if 'filename' in args:
+            filename = args['filename']
+        else:
+            folder = self.app.options["global_last_save_folder"] or self.app.options["global_last_folder"]
+            filename = folder + '/' + obj_name if folder else obj_name
+
+        if self.app.f_handlers.export_excellon(obj_name, filename, use_thread=False) == 'fail':
+            self.raise_tcl_error('%s: %s' % ("Could not export", obj_name))
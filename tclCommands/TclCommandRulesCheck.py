@@ -0,0 +1,141 @@
+from tclCommands.TclCommand import TclCommand
+
+import collections
+import json
+import logging
+
+import gettext
+import appTranslation as fcTranslate
+import builtins
+
+fcTranslate.apply_language('strings')
+if '_' not in builtins.__dict__:
+    _ = gettext.gettext
+
+log = logging.getLogger('base')
+
+
+class TclCommandRulesCheck(TclCommand):
+    """
+    Tcl shell command to check a set of objects against PCB design rules, without using the GUI.
+
+    example:
+        rules_check -copper_top board.GTL -outline board.GKO -copper2copper 0.2 -copper2outline 0.3 -filename drc.json
+    """
+
+    # Array of all command aliases, to be able use old names for backward compatibility (add_poly, add_polygon)
+    aliases = ['rules_check', 'drc']
+
+    description = '%s %s' % ("--", "Check objects against PCB design rules and report the violations in JSON format.")
+
+    # dictionary of types from Tcl command, needs to be ordered
+    arg_names = collections.OrderedDict([
+    ])
+
+    # dictionary of types from Tcl command, needs to be ordered , this  is  for options  like -optionname value
+    option_types = collections.OrderedDict([
+        ('copper_top', str),
+        ('copper_bottom', str),
+        ('sm_top', str),
+        ('sm_bottom', str),
+        ('silk_top', str),
+        ('silk_bottom', str),
+        ('outline', str),
+        ('drills_1', str),
+        ('drills_2', str),
+        ('trace_size', float),
+        ('copper2copper', float),
+        ('copper2outline', float),
+        ('silk2silk', float),
+        ('silk2sm', float),
+        ('silk2outline', float),
+        ('sm2sm', float),
+        ('annular_ring', float),
+        ('hole2hole', float),
+        ('hole_size', float),
+        ('filename', str),
+    ])
+
+    # array of mandatory options for current Tcl command: required = {'name','outname'}
+    required = []
+
+    layer_keys = ['copper_top', 'copper_bottom', 'sm_top', 'sm_bottom', 'silk_top', 'silk_bottom', 'outline',
+                  'drills_1', 'drills_2']
+    rule_keys = ['trace_size', 'copper2copper', 'copper2outline', 'silk2silk', 'silk2sm', 'silk2outline', 'sm2sm',
+                 'annular_ring', 'hole2hole', 'hole_size']
+
+    # structured help for current command, args needs to be ordered
+    help = {
+        'main': "Check the objects against the design rules. Only the rules that have a value are checked.\n"
+                "The report is a JSON list with an entry for each rule and object, having the keys: "
+                "'rule', 'objects', 'status' ('passed', 'failed' or 'error') and 'points' or 'diameters' "
+                "with the location of the violations.\n"
+                "Running the command again after editing the objects will recheck only the areas that changed.",
+        'args': collections.OrderedDict([
+            ('copper_top', 'Name of the Top copper Gerber object. String.'),
+            ('copper_bottom', 'Name of the Bottom copper Gerber object. String.'),
+            ('sm_top', 'Name of the Top solder mask Gerber object. String.'),
+            ('sm_bottom', 'Name of the Bottom solder mask Gerber object. String.'),
+            ('silk_top', 'Name of the Top silkscreen Gerber object. String.'),
+            ('silk_bottom', 'Name of the Bottom silkscreen Gerber object. String.'),
+            ('outline', 'Name of the board outline Gerber object. String.'),
+            ('drills_1', 'Name of the first Excellon object. String.'),
+            ('drills_2', 'Name of the second Excellon object. String.'),
+            ('trace_size', 'Minimum trace size. Float number.'),
+            ('copper2copper', 'Minimum clearance between copper features. Float number.'),
+            ('copper2outline', 'Minimum clearance between copper features and the outline. Float number.'),
+            ('silk2silk', 'Minimum clearance between silkscreen features. Float number.'),
+            ('silk2sm', 'Minimum clearance between silkscreen and solder mask features. Float number.'),
+            ('silk2outline', 'Minimum clearance between silkscreen features and the outline. Float number.'),
+            ('sm2sm', 'Minimum solder mask sliver. Float number.'),
+            ('annular_ring', 'Minimum annular ring. Float number.'),
+            ('hole2hole', 'Minimum clearance between holes. Float number.'),
+            ('hole_size', 'Minimum hole size. Float number.'),
+            ('filename', 'Path to the file where to save the JSON report. '
+                         'If not used, the report is returned in the Tcl Shell.'),
+        ]),
+        'examples': ['rules_check -copper_top board.GTL -outline board.GKO -copper2copper 0.2 -copper2outline 0.3',
+                     'drc -drills_1 board.DRL -hole2hole 0.25 -hole_size 0.3 -filename /home/user/drc.json']
+    }
+
+    def execute(self, args, unnamed_args):
+        """
+        execute current TCL shell command
+
+        :param args: array of known named arguments and options
+        :param unnamed_args: array of other values which were passed into command
+            without -somename and  we do not have them in known arg_names
+        :return: None or exception
+        """
+
+        layers = {key: str(args[key]) for key in self.layer_keys if key in args}
+        rules = {key: float(args[key]) for key in self.rule_keys if key in args}
+
+        if not layers:
+            self.raise_tcl_error('%s' % _("At least one object has to be selected."))
+            return 'fail'
+        if not rules:
+            self.raise_tcl_error('%s' % _("At least one rule has to be selected."))
+            return 'fail'
+
+        try:
+            results = self.app.rules_tool.run_rules(layers, rules, pool=self.app.pool)
+        except ValueError as e:
+            self.raise_tcl_error(str(e))
+            return 'fail'
+
+        report = json.dumps(self.app.rules_tool.rules_report(results), indent=2)
+
+        if 'filename' in args:
+            filename = str(args['filename'])
+            try:
+                with open(filename, 'w') as f:
+                    f.write(report)
+            except Exception as e:
+                log.error("TclCommandRulesCheck.execute() --> %s" % str(e))
+                self.raise_tcl_error('%s: %s' % (_("Failed to write"), filename))
+                return 'fail'
+            self.app.inform.emit('[success] %s: %s' % (_("Rules check report saved to"), filename))
+            return
+
+        return report
@@ -1,128 +1,202 @@
-
 import pkgutil
 import importlib
 import sys
+import os
+import ast
+import builtins
+import collections
+import gettext
+import logging
 
-# allowed command modules (please append them alphabetically ordered)
-import tclCommands.TclCommandAddAperture
-import tclCommands.TclCommandAddCircle
-import tclCommands.TclCommandAddDrill
-import tclCommands.TclCommandAddPolygon
-import tclCommands.TclCommandAddPolyline
-import tclCommands.TclCommandAddRectangle
-import tclCommands.TclCommandAddSlot
-import tclCommands.TclCommandAlignDrill
-import tclCommands.TclCommandAlignDrillGrid
-import tclCommands.TclCommandBbox
-import tclCommands.TclCommandBounds
-import tclCommands.TclCommandBuffer
-import tclCommands.TclCommandClearShell
-import tclCommands.TclCommandCncjob
-import tclCommands.TclCommandCopperClear
-import tclCommands.TclCommandCutout
-import tclCommands.TclCommandDelete
-import tclCommands.TclCommandDrillcncjob
-import tclCommands.TclCommandExportDXF
-import tclCommands.TclCommandExportExcellon
-import tclCommands.TclCommandExportGerber
-import tclCommands.TclCommandExportGcode
-import tclCommands.TclCommandExportSVG
-import tclCommands.TclCommandExteriors
-import tclCommands.TclCommandFollow
-import tclCommands.TclCommandGeoCutout
-import tclCommands.TclCommandGeoUnion
-import tclCommands.TclCommandGetActive
-import tclCommands.TclCommandGetNames
-import tclCommands.TclCommandGetPath
-import tclCommands.TclCommandGetSys
-import tclCommands.TclCommandHelp
-import tclCommands.TclCommandInteriors
-import tclCommands.TclCommandIsolate
-import tclCommands.TclCommandJoinExcellon
-import tclCommands.TclCommandJoinGeometry
-import tclCommands.TclCommandListSys
-import tclCommands.TclCommandListPP
-import tclCommands.TclCommandMillDrills
-import tclCommands.TclCommandMillSlots
-import tclCommands.TclCommandMirror
-import tclCommands.TclCommandNew
-import tclCommands.TclCommandNregions
-import tclCommands.TclCommandNewExcellon
-import tclCommands.TclCommandNewGeometry
-import tclCommands.TclCommandNewGerber
-import tclCommands.TclCommandOffset
-import tclCommands.TclCommandOpenDXF
-import tclCommands.TclCommandOpenExcellon
-import tclCommands.TclCommandOpenFolder
-import tclCommands.TclCommandOpenGCode
-import tclCommands.TclCommandOpenGerber
-import tclCommands.TclCommandOpenProject
-import tclCommands.TclCommandOpenSVG
-import tclCommands.TclCommandOptions
-import tclCommands.TclCommandPaint
-import tclCommands.TclCommandPanelize
-import tclCommands.TclCommandPlotAll
-import tclCommands.TclCommandPlotObjects
-import tclCommands.TclCommandQuit
-import tclCommands.TclCommandSaveProject
-import tclCommands.TclCommandSaveSys
-import tclCommands.TclCommandScale
-import tclCommands.TclCommandSetActive
-import tclCommands.TclCommandSetOrigin
-import tclCommands.TclCommandSetPath
-import tclCommands.TclCommandSetSys
-import tclCommands.TclCommandSkew
-import tclCommands.TclCommandSplitGeometry
-import tclCommands.TclCommandSubtractPoly
-import tclCommands.TclCommandSubtractRectangle
-import tclCommands.TclCommandVersion
-import tclCommands.TclCommandWriteGCode
-
-
-__all__ = []
-
-# for loader, name, is_pkg in pkgutil.walk_packages(__path__):
-#     module = loader.find_module(name).load_module(name)
-#     __all__.append(name)
-
-for loader, name, is_pkg in pkgutil.walk_packages(__path__):
-    module = importlib.import_module(f"{__name__}.{name}")
-    __all__.append(name)
+from tclCommands.TclCommand import TclCommand, TclCommandSignaled
 
+log = logging.getLogger('base')
 
-def register_all_commands(app, commands):
+# The command modules are not imported at startup. Each module is named like the command class it holds and the
+# metadata used for registration and help (aliases, description, args, help) is read from the module source. The module
+# and its dependencies are imported the first time one of its commands is run.
+__all__ = [name for loader, name, is_pkg in pkgutil.iter_modules(__path__)
+           if name.startswith('TclCommand') and name != 'TclCommand']
+
+# the class attributes that make the command metadata
+METADATA_ATTRIBUTES = ('aliases', 'description', 'arg_names', 'option_types', 'required', 'help')
+
+# names that can be used in the class attributes that make the command metadata
+METADATA_NAMES = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'list': list,
+    'tuple': tuple,
+    'dict': dict,
+    'None': None,
+    'True': True,
+    'False': False,
+}
+
+
+def _evaluate(node):
+    """
+    Evaluate a node from the class body of a Tcl command. Only literals, the type names, string formatting and
+    concatenation, OrderedDict() and the translation function are allowed.
+
+    :param node:    an AST expression node
+    :return:        the value of the expression
+    """
+
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.List):
+        return [_evaluate(elt) for elt in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(_evaluate(elt) for elt in node.elts)
+    if isinstance(node, ast.Set):
+        return {_evaluate(elt) for elt in node.elts}
+    if isinstance(node, ast.Dict):
+        if None in node.keys:
+            raise ValueError("Dictionary unpacking is not supported.")
+        return {_evaluate(k): _evaluate(v) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, ast.Name) and node.id in METADATA_NAMES:
+        return METADATA_NAMES[node.id]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mod, ast.Add)):
+        left = _evaluate(node.left)
+        right = _evaluate(node.right)
+        return left % right if isinstance(node.op, ast.Mod) else left + right
+    if isinstance(node, ast.Call) and not node.keywords:
+        func = node.func
+        args = [_evaluate(arg) for arg in node.args]
+        if isinstance(func, ast.Name) and func.id == '_':
+            translate = builtins.__dict__.get('_', gettext.gettext)
+            return translate(*args)
+        if isinstance(func, ast.Attribute) and func.attr == 'OrderedDict' and \
+                isinstance(func.value, ast.Name) and func.value.id == 'collections':
+            return collections.OrderedDict(*args)
+        if isinstance(func, ast.Name) and func.id == 'OrderedDict':
+            return collections.OrderedDict(*args)
+    raise ValueError("Unsupported expression: %s" % ast.dump(node))
+
+
+def read_command_metadata(module_name):
+    """
+    Read the metadata of a Tcl command from the source of its module, without importing it.
+
+    :param module_name: name of the module in this package; the command class has the same name
+    :return:            a TclCommand subclass holding only the metadata or None if the metadata could not be read
+    """
+
+    path = os.path.join(__path__[0], module_name + '.py')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError) as err:
+        log.debug("tclCommands.read_command_metadata() -> %s" % str(err))
+        return None
+
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or node.name != module_name:
+            continue
+
+        bases = [b.id if isinstance(b, ast.Name) else getattr(b, 'attr', '') for b in node.bases]
+        if 'TclCommandSignaled' in bases:
+            base = TclCommandSignaled
+        elif 'TclCommand' in bases:
+            base = TclCommand
+        else:
+            return None
+
+        attributes = {}
+        for stmt in node.body:
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name):
+                attr_name = stmt.targets[0].id
+                if attr_name in METADATA_ATTRIBUTES:
+                    try:
+                        attributes[attr_name] = _evaluate(stmt.value)
+                    except (ValueError, TypeError, KeyError) as err:
+                        log.debug("tclCommands.read_command_metadata() -> %s.%s: %s" %
+                                  (module_name, attr_name, str(err)))
+                        return None
+        return type(module_name, (base,), attributes)
+    return None
+
+
+def load_command_class(module_name):
+    """
+    Import a Tcl command module and return the command class.
+
+    :param module_name: name of the module in this package; the command class has the same name
+    :return:            the command class
+    """
+
+    mod = importlib.import_module('%s.%s' % (__name__, module_name))
+    return getattr(mod, module_name)
+
+
+class LazyTclCommand:
     """
-    Static method which registers all known commands.
+    Callable registered in the Tcl interpreter in place of the bound execute_wrapper() of a command instance.
+    The command module is imported and the command instance is made on the first call.
+    """
+
+    def __init__(self, app, module_name):
+        self.app = app
+        self.module_name = module_name
+        self.command = None
+
+    def load(self):
+        """
+        Import the command module, if not already done, and make the command instance.
+
+        :return:    the command instance
+        """
+
+        if self.command is None:
+            self.command = load_command_class(self.module_name)(self.app)
+        return self.command
 
-    Command should  be for now in directory tclCommands and module should start with TCLCommand
-    Class  have to follow same  name as module.
+    def __call__(self, *args):
+        return self.load().execute_wrapper(*args)
 
-    we need import all  modules  in top section:
-    import tclCommands.TclCommandExteriors
-    at this stage we can include only wanted  commands  with this, auto loading may be implemented in future
-    I have no enough knowledge about python's anatomy. Would be nice to include all classes which are descendant etc.
 
-    :param app: FlatCAMApp
-    :param commands: List of commands being updated
-    :return: None
+def register_all_commands(app, commands):
     """
+    Register all known commands.
 
-    tcl_modules = {k: v for k, v in list(
-        sys.modules.items()) if k.startswith('tclCommands.TclCommand')}
+    Commands are the modules in the tclCommands directory whose name starts with TclCommand. The class has to have
+    the same name as the module. The modules are not imported here: the help and the description are made from the
+    metadata in the module source and the module is imported on the first use of the command. A module whose metadata
+    can not be read statically is imported right away.
 
-    for key, mod in list(tcl_modules.items()):
-        if key != 'tclCommands.TclCommand':
-            class_name = key.split('.')[1]
-            class_type = getattr(mod, class_name)
-            command_instance = class_type(app)
+    :param app:         FlatCAMApp
+    :param commands:    Dictionary of commands being updated
+    :return:            None
+    """
 
-            for alias in command_instance.aliases:
+    for module_name in __all__:
+        key = '%s.%s' % (__name__, module_name)
+        if key in sys.modules:
+            class_type = getattr(sys.modules[key], module_name)
+        else:
+            class_type = read_command_metadata(module_name)
+            if class_type is None:
                 try:
-                    description = command_instance.description
-                except AttributeError:
-                    description = ''
-                commands[alias] = {
-                    'fcn': command_instance.execute_wrapper,
-                    'help': command_instance.get_decorated_help(),
-                    'description': description
-                }
+                    class_type = load_command_class(module_name)
+                except Exception as err:
+                    log.error("tclCommands.register_all_commands() -> %s: %s" % (module_name, str(err)))
+                    continue
+
+        # an instance made without __init__() only holds the class attributes, enough to decorate the help
+        metadata = object.__new__(class_type)
+        fcn = LazyTclCommand(app, module_name)
+        try:
+            description = class_type.description
+        except AttributeError:
+            description = ''
+        help_text = metadata.get_decorated_help()
+
+        for alias in class_type.aliases:
+            commands[alias] = {
+                'fcn': fcn,
+                'help': help_text,
+                'description': description
+            }
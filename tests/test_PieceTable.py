@@ -0,0 +1,79 @@
+import numpy as np
+
+from appCommon.PieceTable import PieceTable, newline_index
+
+
+def make_table():
+    # the lines are split between the chunks on purpose
+    return PieceTable(['G00 X0\nG01', ' X1\nG01 X2\n', 'M02'])
+
+
+def test_newline_index():
+    assert newline_index('a\nb\n').tolist() == [1, 3]
+    assert newline_index('é\nü').tolist() == [1]
+    assert isinstance(newline_index(''), np.ndarray)
+
+
+def test_load_from_a_generator():
+    table = PieceTable(chunk for chunk in ['a\n', '', 'b'])
+    assert table.text() == 'a\nb'
+    assert table.line_count() == 2
+
+
+def test_lines():
+    table = make_table()
+    assert len(table) == len('G00 X0\nG01 X1\nG01 X2\nM02')
+    assert table.line_count() == 4
+    assert table.line(1) == 'G01 X1'
+    assert table.lines(1, 2) == ['G01 X1', 'G01 X2']
+    assert table.lines(3, 10) == ['M02']
+    assert table.line_start(2) == 14
+    assert table.line_end(0) == 6
+    assert table.line_of(14) == 2
+    assert table.line_of(13) == 1
+
+
+def test_text_ending_with_newline_has_an_empty_last_line():
+    table = PieceTable(['a\n'])
+    assert table.line_count() == 2
+    assert table.line(1) == ''
+
+
+def test_find_across_chunks():
+    table = make_table()
+    assert table.find('G01 X1') == 7
+    assert table.find('g01', case_sensitive=False) == 7
+    assert table.rfind('G01') == 14
+    assert table.find('G02') == -1
+
+
+def test_edit_undo_redo():
+    table = make_table()
+    table.insert(0, '(start)\n')
+    assert table.line(0) == '(start)'
+    assert table.modified
+    table.delete(0, 8)
+    assert table.text() == 'G00 X0\nG01 X1\nG01 X2\nM02'
+    table.replace(4, 2, 'X5')
+    assert table.line(0) == 'G00 X5'
+
+    assert table.undo()
+    assert table.line(0) == 'G00 X0'
+    assert table.redo()
+    assert table.line(0) == 'G00 X5'
+
+
+def test_typing_extends_the_same_buffer():
+    table = PieceTable(['G00\n'])
+    for pos, char in enumerate('M02', start=4):
+        table.insert(pos, char)
+    assert table.text() == 'G00\nM02'
+    assert len(table.buffers) == 2
+
+
+def test_replace_all():
+    table = make_table()
+    assert table.replace_all('g01', 'G00', case_sensitive=False) == 2
+    assert table.text() == 'G00 X0\nG00 X1\nG00 X2\nM02'
+    assert table.undo()
+    assert table.line(1) == 'G01 X1'
@@ -0,0 +1,66 @@
+import pickle
+
+from appCommon.TextSegments import TextSegments
+
+
+def test_text_in_memory():
+    text = TextSegments(['G00 X0\n', 'G01 X1\n'], spill_size=None)
+    assert len(text) == 14
+    assert text.getvalue() == 'G00 X0\nG01 X1\n'
+    assert not text.spilled
+
+
+def test_spill_to_file_keeps_the_order():
+    text = TextSegments(spill_size=10, chunk_size=4)
+    text.extend(['a' * 8, 'b' * 5, 'c' * 3])
+    assert text.spilled
+    assert len(text) == 16
+    assert text.getvalue() == 'a' * 8 + 'b' * 5 + 'c' * 3
+    # the file is read in chunks of chunk_size characters
+    assert max(len(chunk) for chunk in text.chunks()) <= 8
+
+
+def test_chunks_is_a_snapshot():
+    text = TextSegments(spill_size=10, chunk_size=4)
+    text.extend(['a' * 8, 'b' * 5])
+    chunks = text.chunks()
+    first = next(chunks)
+
+    # this append spills to the file while the text is read
+    text.append('c' * 12)
+    assert first + ''.join(chunks) == 'a' * 8 + 'b' * 5
+
+    assert text.getvalue() == 'a' * 8 + 'b' * 5 + 'c' * 12
+
+
+def test_chunks_snapshot_of_the_segments_in_memory():
+    text = TextSegments(['x'], spill_size=None)
+    chunks = text.chunks()
+    first = next(chunks)
+    text.append('y')
+    assert first + ''.join(chunks) == 'x'
+
+
+def test_write_to(tmp_path):
+    text = TextSegments(spill_size=4, chunk_size=3)
+    text.extend(['G00\n', 'G01\n', 'M02\n'])
+    path = tmp_path / 'job.nc'
+    with open(path, 'w', newline='') as f:
+        text.write_to(f)
+    assert path.read_text() == 'G00\nG01\nM02\n'
+
+
+def test_from_value():
+    text = TextSegments.from_value('abc')
+    assert text.getvalue() == 'abc'
+    assert TextSegments.from_value(text) is text
+    assert not TextSegments.from_value(None)
+
+
+def test_pickle():
+    text = TextSegments(spill_size=4)
+    text.extend(['abc', 'def'])
+    copy = pickle.loads(pickle.dumps(text))
+    assert copy.getvalue() == 'abcdef'
+    text.close()
+    assert len(text) == 0
@@ -0,0 +1,134 @@
+import pytest
+
+from appCore import AppCore, CoreShell, shellvar_commands, unique_object_name
+from appHeadless import gerber_to_gcode, excellon_to_gcode
+
+GERBER = """%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,1.0*%
+%ADD11R,2.0X2.0*%
+D10*
+X0Y0D02*
+X100000Y0D01*
+D11*
+X200000Y0D03*
+X200000Y50000D03*
+M02*
+"""
+
+EXCELLON = """M48
+METRIC
+T1C0.8
+T2C1.2
+%
+T1
+X5.0Y5.0
+X10.0Y5.0
+T2
+X20.0Y10.0
+M30
+"""
+
+
+@pytest.fixture(scope='module')
+def core(tmp_path_factory):
+    core = AppCore(data_path=str(tmp_path_factory.mktemp('data')), user_defaults=False)
+    yield core
+    core.close()
+
+
+def test_unique_object_name():
+    assert unique_object_name('board', []) == 'board'
+    assert unique_object_name('board', ['board']) == 'board_1'
+    assert unique_object_name('board_1', ['board_1', 'board_2']) == 'board_3'
+
+
+def test_shellvar_commands():
+    assert shellvar_commands("1,'path',2.5") == ['set shellvar_0 "1"', 'set shellvar_1 "path"',
+                                                 'set shellvar_2 "2.5"']
+
+
+def test_excellon_to_gcode(core, tmp_path):
+    drl_file = tmp_path / 'board.drl'
+    drl_file.write_text(EXCELLON)
+    gcode_file = tmp_path / 'board_drl.nc'
+
+    job = excellon_to_gcode(core, str(drl_file), str(gcode_file), drillz=-1.7)
+
+    assert job.kind == 'cncjob'
+    assert core.collection.get_by_name(job.obj_options['name']) is job
+    moves = [line for line in gcode_file.read_text().splitlines() if line.startswith('G00 X')]
+    # the drills and then the end move
+    assert moves == ['G00 X5.0000 Y5.0000', 'G00 X10.0000 Y5.0000', 'G00 X20.0000 Y10.0000', 'G00 X0.0 Y0.0']
+    assert gcode_file.read_text().count('G01 Z-1.7000') == 3
+
+
+def test_gerber_to_gcode(core, tmp_path):
+    gbr_file = tmp_path / 'board.gbr'
+    gbr_file.write_text(GERBER)
+    gcode_file = tmp_path / 'board.nc'
+
+    gerber_to_gcode(core, str(gbr_file), str(gcode_file), tooldia=0.1, passes=2, z_cut=-0.05)
+
+    gcode = gcode_file.read_text()
+    assert '(Type: G-code from Geometry)' in gcode
+    # 3 copper features, 2 passes each; a pass can be traced as more than one path
+    assert gcode.count('G01 Z-0.0500') >= 6
+    # the isolation goes around the features, outside of their bounds
+    xs = [float(line.split()[1][1:]) for line in gcode.splitlines() if line.startswith('G01 X')]
+    assert min(xs) < -0.5 and max(xs) > 21.0
+
+
+def test_exec_command_raises_the_error_of_the_failed_command(core, tmp_path):
+    with pytest.raises(ValueError, match='Open Gerber failed'):
+        core.exec_command('open_gerber %s' % (tmp_path / 'missing.gbr').as_posix())
+
+    with pytest.raises(CoreShell.TclErrorException, match='Object not found'):
+        core.exec_command('isolate no_such_object -dia 0.1')
+
+    # the text of the error is the Tcl error message, for the scripts that catch it
+    assert core.exec_command('catch {isolate no_such_object -dia 0.1} msg; set msg') == \
+        'Object not found: no_such_object'
+
+
+def test_export_gerber_command(core, tmp_path, monkeypatch):
+    monkeypatch.setitem(core.options, "gerber_exp_units", 'MM')
+    gbr_file = tmp_path / 'board.gbr'
+    gbr_file.write_text(GERBER)
+    out_file = tmp_path / 'exported.gbr'
+
+    core.exec_command('open_gerber %s -outname exp_grb; export_gerber exp_grb %s' %
+                      (gbr_file.as_posix(), out_file.as_posix()))
+
+    code = out_file.read_text()
+    assert code.startswith('G04*') and code.rstrip().endswith('M02*')
+    assert '%ADD10C,1.0*%' in code and '%ADD11R,2.0X2.0*%' in code
+
+    # the exported file opens as the same Gerber
+    core.exec_command('open_gerber %s -outname exp_grb_again' % out_file.as_posix())
+    bounds = core.collection.get_by_name('exp_grb').bounds()
+    assert core.collection.get_by_name('exp_grb_again').bounds() == pytest.approx(bounds)
+
+
+def test_export_excellon_command(core, tmp_path, monkeypatch):
+    monkeypatch.setitem(core.options, "excellon_exp_units", 'METRIC')
+    drl_file = tmp_path / 'board.drl'
+    drl_file.write_text(EXCELLON)
+    out_file = tmp_path / 'exported.drl'
+
+    core.exec_command('open_excellon %s -outname exp_drl; export_excellon exp_drl %s' %
+                      (drl_file.as_posix(), out_file.as_posix()))
+
+    code = out_file.read_text()
+    assert code.startswith('M48') and code.rstrip().endswith('M30')
+
+    core.exec_command('open_excellon %s -outname exp_drl_again' % out_file.as_posix())
+    drills = {tool['tooldia']: len(tool['drills'])
+              for tool in core.collection.get_by_name('exp_drl_again').tools.values()}
+    assert drills == {0.8: 2, 1.2: 1}
+
+
+def test_export_command_of_a_missing_object_fails(core, tmp_path):
+    with pytest.raises(CoreShell.TclErrorException, match='Could not export'):
+        core.exec_command('export_gerber no_such_object %s' % (tmp_path / 'missing.gbr').as_posix())
+    assert not (tmp_path / 'missing.gbr').exists()
@@ -0,0 +1,100 @@
+from multiprocessing import shared_memory
+
+import pytest
+from shapely import Point
+
+from appCommon.Common import GracefulException
+from appPool import WorkerPool
+
+
+def add_length(obj, value):
+    return len(obj) + value
+
+
+def divide(a, b):
+    return a / b
+
+
+def area(geo, factor):
+    return geo.area * factor
+
+
+class AbortAfter:
+    """
+    Progress context that reports an abort after a number of finished tasks.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.ticks = 0
+
+    def tick(self, n=1):
+        self.ticks += n
+        if self.ticks >= self.count:
+            raise GracefulException
+
+
+@pytest.fixture(scope='module')
+def pool():
+    worker_pool = WorkerPool(processes=2)
+    yield worker_pool
+    worker_pool.close()
+    worker_pool.join()
+
+
+def test_share_resolves_the_object_in_the_processes(pool):
+    with pool.share(list(range(1000))) as shared:
+        results = list(pool.run_tasks(add_length, [(shared, x) for x in range(5)]))
+        name = shared.name
+    assert results == [1000, 1001, 1002, 1003, 1004]
+
+    # the shared memory block is freed at the exit of the context
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_run_tasks_keeps_the_order(pool):
+    results = list(pool.run_tasks(divide, [(x, 2) for x in range(20)], max_pending=3))
+    assert results == [x / 2 for x in range(20)]
+
+
+def test_run_tasks_exceptions(pool):
+    with pytest.raises(ZeroDivisionError):
+        list(pool.run_tasks(divide, [(1, 1), (1, 0)]))
+
+    results = list(pool.run_tasks(divide, [(1, 1), (1, 0), (4, 2)], return_exceptions=True))
+    assert results[0] == 1
+    assert isinstance(results[1], ZeroDivisionError)
+    assert results[2] == 2
+
+
+def test_run_tasks_abort(pool):
+    results = []
+    with pytest.raises(GracefulException):
+        for result in pool.run_tasks(divide, [(x, 1) for x in range(100)], max_pending=2, progress=AbortAfter(3)):
+            results.append(result)
+    assert results == [0, 1]
+    # the slot of the aborted job is free again
+    assert len(pool.free_slots) == 64
+
+
+def test_call(pool):
+    assert pool.call(divide, (9, 3)) == 3
+
+
+def test_map_geometry(pool):
+    geometries = [Point(0, 0).buffer(r, quad_segs=4) for r in range(1, 11)]
+    results = pool.map_geometry(area, geometries, args=(2,), chunk_size=3)
+    assert results == pytest.approx([geo.area * 2 for geo in geometries])
+    assert pool.map_geometry(area, [], args=(2,)) == []
+
+
+def test_resize():
+    worker_pool = WorkerPool(processes=1)
+    try:
+        worker_pool.resize(2)
+        assert worker_pool.processes == 2
+        assert list(worker_pool.run_tasks(divide, [(4, 2)])) == [2]
+    finally:
+        worker_pool.close()
+        worker_pool.join()
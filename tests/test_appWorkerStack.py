@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+from PyQt6 import QtCore
+
+from appCommon.Common import GracefulException
+from appWorkerStack import WorkerStack, TaskHandle, PRIORITY_INTERACTIVE, PRIORITY_JOB, PRIORITY_BACKGROUND, \
+    current_task
+
+
+@pytest.fixture(scope='module')
+def qt_app():
+    app = QtCore.QCoreApplication.instance()
+    if app is None:
+        app = QtCore.QCoreApplication([])
+    return app
+
+
+@pytest.fixture
+def stack(qt_app):
+    # one Worker for the jobs and the one for the interactive tasks
+    workers = WorkerStack(workers_number=1)
+    yield workers
+    workers.quit()
+
+
+def process_until(condition, timeout=5.0):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            raise TimeoutError
+        QtCore.QCoreApplication.processEvents()
+        time.sleep(0.001)
+
+
+def test_interactive_task_is_not_delayed_by_a_job(stack):
+    release = threading.Event()
+    job = stack.submit(release.wait, [5], name='long job')
+    plot = stack.submit(lambda: 'plotted', priority=PRIORITY_INTERACTIVE)
+
+    process_until(plot.done)
+    assert plot.result() == 'plotted'
+    assert plot.worker_name == stack.interactive_worker
+    assert not job.done()
+
+    release.set()
+    process_until(job.done)
+    assert job.result() is True
+
+
+def test_jobs_do_not_run_on_the_interactive_worker(stack):
+    release = threading.Event()
+    first = stack.submit(release.wait, [5])
+    second = stack.submit(lambda: None)
+
+    process_until(lambda: first.running())
+    QtCore.QCoreApplication.processEvents()
+    assert second.state == TaskHandle.PENDING
+
+    release.set()
+    process_until(second.done)
+    assert first.worker_name == second.worker_name != stack.interactive_worker
+
+
+def test_queue_order_follows_the_priority(stack):
+    release = threading.Event()
+    order = []
+    blocker = stack.submit(release.wait, [5])
+    process_until(blocker.running)
+
+    handles = [
+        stack.submit(order.append, ['background'], priority=PRIORITY_BACKGROUND),
+        stack.submit(order.append, ['job 1'], priority=PRIORITY_JOB),
+        stack.submit(order.append, ['job 2'], priority=PRIORITY_JOB),
+    ]
+    assert [h.params[0] for h in stack.pending_tasks()] == ['job 1', 'job 2', 'background']
+
+    release.set()
+    process_until(lambda: all(h.done() for h in handles))
+    assert order == ['job 1', 'job 2', 'background']
+
+
+def test_cancel_a_queued_task(stack):
+    release = threading.Event()
+    blocker = stack.submit(release.wait, [5])
+    process_until(blocker.running)
+
+    queued = stack.submit(lambda: 'never')
+    called = []
+    queued.add_done_callback(called.append)
+    assert queued.cancel()
+    process_until(queued.done)
+    assert queued.cancelled()
+    assert called == [queued]
+    with pytest.raises(GracefulException):
+        queued.result()
+
+    release.set()
+    process_until(blocker.done)
+    assert not queued.cancel()
+
+
+def test_cancel_a_running_task(stack):
+    started = threading.Event()
+
+    def cancellable():
+        started.set()
+        while True:
+            current_task().check_cancel()
+            time.sleep(0.001)
+
+    handle = stack.submit(cancellable)
+    process_until(started.is_set)
+    handle.cancel()
+    process_until(handle.done)
+    assert handle.cancelled()
+    assert handle.exception() is None
+
+
+def test_exception_and_add_task(stack):
+    def fail():
+        raise ValueError('bad')
+
+    errors = []
+    stack.thread_exception.connect(errors.append)
+    handle = stack.add_task({'fcn': fail, 'params': []})
+    process_until(lambda: handle.done() and errors)
+    assert isinstance(handle.exception(), ValueError)
+    with pytest.raises(ValueError):
+        handle.result()
+    assert handle.run_time is not None and handle.wait_time is not None
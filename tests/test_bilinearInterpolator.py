@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from appCommon.bilinearInterpolator import bilinearInterpolator
+
+
+def plane(x, y):
+    return 0.5 + 0.1 * x - 0.2 * y
+
+
+def grid_points(jitter=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    points = [(x, y, plane(x, y)) for x in np.linspace(0, 30, 4) for y in np.linspace(-5, 15, 3)]
+    points = np.asarray(points)
+    points[:, :2] += rng.uniform(-jitter, jitter, size=(len(points), 2))
+    # the probing order is not the grid order
+    return points[rng.permutation(len(points))]
+
+
+def test_grid_alignment():
+    interp = bilinearInterpolator(grid_points())
+    assert (interp.xCount, interp.yCount) == (4, 3)
+    assert interp.xSpacing == pytest.approx(10)
+    assert interp.ySpacing == pytest.approx(10)
+    grid = interp.probedGrid
+    assert not np.isnan(grid).any()
+    assert grid[2, 1, 0] == pytest.approx(20)
+    assert grid[2, 1, 1] == pytest.approx(5)
+
+
+def test_interpolate_many_inside_the_grid():
+    interp = bilinearInterpolator(grid_points(jitter=1e-9))
+    points = np.array([(0, -5), (3.3, 2.2), (15, 5), (29.9, 14.9), (10, 0)])
+    assert interp.interpolate_many(points) == pytest.approx(plane(points[:, 0], points[:, 1]), abs=1e-6)
+
+
+def test_interpolate_many_outside_the_grid():
+    interp = bilinearInterpolator(grid_points())
+    z = interp.interpolate_many([(-10, -20), (40, 30), (15, -20), (-10, 5)])
+    # both axes outside: the closest corner; one axis outside: the border of the grid
+    assert z == pytest.approx([plane(0, -5), plane(30, 15), plane(15, -5), plane(0, 5)])
+
+
+def test_interpolate_matches_interpolate_many():
+    interp = bilinearInterpolator(grid_points())
+    rng = np.random.default_rng(1)
+    points = rng.uniform((-5, -10), (35, 20), size=(50, 2))
+    many = interp.interpolate_many(points)
+    assert [interp.Interpolate(p) for p in points] == pytest.approx(many)
+
+
+def test_irregular_grid_fills_the_missing_nodes():
+    points = grid_points()
+    # drop the probe of one node
+    keep = ~((np.isclose(points[:, 0], 10)) & (np.isclose(points[:, 1], 5)))
+    interp = bilinearInterpolator(points[keep])
+    assert not np.isnan(interp.probedGrid).any()
+
+
+def test_load_from_csv(tmp_path):
+    path = tmp_path / 'heights.csv'
+    np.savetxt(path, grid_points(), delimiter=',')
+    interp = bilinearInterpolator(str(path))
+    assert interp.Interpolate((12, 3)) == pytest.approx(plane(12, 3))
@@ -0,0 +1,412 @@
+import os
+
+import pytest
+
+from camlib import ChunkedWriter, atomic_file, format_coords
+
+
+def test_format_coords_tz_negative_sign_before_padding():
+    # the sign used to be padded with the whole part: 'X0-000060'
+    text = ''.join(format_coords([(-0.00006, 1.5)], "X%sY%sD01*\n", 6, whole=2))
+    assert text == "X-00000060Y01500000D01*\n"
+
+
+def test_format_coords_tz_negative_with_offset():
+    # the sign used to take the place of a padding zero: 'Y-3000000'
+    text = ''.join(format_coords([(1.0, 27.0)], "X%sY%sD02*\n", 6, whole=2, offset=(0.0, -30.0)))
+    assert text == "X01000000Y-03000000D02*\n"
+
+
+def test_format_coords_rounded_to_zero_has_no_sign():
+    text = ''.join(format_coords([(-0.0000001, 0.0)], "X%sY%s\n", 6, whole=2))
+    assert text == "X00000000Y00000000\n"
+
+
+def test_format_coords_decimal_point_and_factor():
+    text = ''.join(format_coords([(1.0, -2.5)], "X%sY%s\n", 4, decimal_point=True, factor=2.0))
+    assert text == "X2.0000Y-5.0000\n"
+
+
+def test_format_coords_chunks():
+    coords = [(i, i) for i in range(5)]
+    chunks = list(format_coords(coords, "X%sY%s\n", 1, decimal_point=True, chunk_rows=2))
+    assert len(chunks) == 3
+    assert ''.join(chunks).splitlines() == ["X%d.0Y%d.0" % (i, i) for i in range(5)]
+
+
+def test_chunked_writer_without_file_keeps_the_text():
+    writer = ChunkedWriter()
+    writer.write("G04*\n")
+    writer.write("M02*\n")
+    assert writer.getvalue() == "G04*\nM02*\n"
+
+
+def test_chunked_writer_writes_in_chunks(tmp_path):
+    path = tmp_path / 'out.gbr'
+    with open(path, 'w') as f:
+        writer = ChunkedWriter(f, chunk_size=4)
+        writer.write("ab")
+        assert writer.getvalue() == "ab"
+        writer.write("cd")
+        assert writer.getvalue() == ""
+        writer.write("e")
+        writer.flush()
+    assert path.read_text() == "abcde"
+
+
+def test_atomic_file_replaces_the_file(tmp_path):
+    path = tmp_path / 'out.gbr'
+    path.write_text("old")
+    with atomic_file(str(path)) as f:
+        f.write("new")
+        assert path.read_text() == "old"
+    assert path.read_text() == "new"
+    assert os.listdir(tmp_path) == ['out.gbr']
+
+
+def test_atomic_file_keeps_the_file_on_error(tmp_path):
+    path = tmp_path / 'out.gbr'
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_file(str(path)) as f:
+            f.write("partial")
+            raise RuntimeError("export failed")
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ['out.gbr']
+
+
+@pytest.fixture(scope='module')
+def app_core():
+    from appCore import AppCore
+
+    core = AppCore(user_defaults=False)
+    with core.app_context():
+        yield core
+    core.close()
+
+
+def make_panel(offsets):
+    from shapely import box
+    from camlib import Geometry
+
+    geo = Geometry(geo_steps_per_circle=16)
+    geo.multigeo = False
+    geo.solid_geometry = [box(0, 0, 1, 1), box(2, 0, 3, 1)]
+    geo.instance_offsets = offsets
+    return geo
+
+
+def test_instanced_panel_bounds_hold_all_the_instances(app_core):
+    geo = make_panel([(0, 0), (10, 0), (0, 5)])
+    assert geo.bounds() == (0, 0, 13, 6)
+    # the bounds do not expand the panel
+    assert len(geo.solid_geometry) == 2
+    assert len(geo.instance_offsets) == 3
+
+
+def test_expand_instances(app_core):
+    geo = make_panel([(0, 0), (10, 0), (0, 5)])
+    geo.expand_instances()
+    assert geo.instance_offsets == []
+    assert len(geo.solid_geometry) == 6
+    assert geo.solid_geometry[3].bounds == (12, 0, 13, 1)
+    assert geo.bounds() == (0, 0, 13, 6)
+
+    # a geometry without instances is left as it is
+    solid = geo.solid_geometry
+    geo.expand_instances()
+    assert geo.solid_geometry is solid
+
+
+def test_transform_keeps_the_instances(app_core):
+    from camlib import scale_matrix
+
+    geo = make_panel([(0, 0), (10, 0)])
+    geo.transform_geometry(scale_matrix(2, 2, (0, 0)))
+    assert geo.instance_offsets == [[0, 0], [20, 0]]
+    assert geo.bounds() == (0, 0, 26, 2)
+
+    geo.expand_instances()
+    assert [el.bounds for el in geo.solid_geometry] == [(0, 0, 2, 2), (4, 0, 6, 2), (20, 0, 22, 2), (24, 0, 26, 2)]
+
+
+def test_expand_instances_of_the_drills(app_core):
+    from shapely import Point
+    from appParsers.ParseExcellon import Excellon
+
+    exc = Excellon(excellon_circle_steps=16)
+    exc.tools = {1: {'tooldia': 0.8, 'drills': [Point(1, 1), Point(2, 1)], 'slots': [], 'solid_geometry': []}}
+    exc.instance_offsets = [(0, 0), (5, 5)]
+    exc.expand_instances()
+    assert [(p.x, p.y) for p in exc.tools[1]['drills']] == [(1, 1), (2, 1), (6, 6), (7, 6)]
+    assert exc.instance_offsets == []
+
+
+def test_offset_rings_are_shared_by_the_tools(monkeypatch):
+    import camlib
+    from shapely import box
+
+    camlib.offset_rings_cache.clear()
+    calls = []
+    calculate = camlib.calculate_offset_rings
+
+    def counting_calculate(polygon, distance, steps_per_circle):
+        calls.append(distance)
+        return calculate(polygon, distance, steps_per_circle)
+
+    monkeypatch.setattr(camlib, 'calculate_offset_rings', counting_calculate)
+
+    pol = box(0, 0, 10, 6)
+    # a 0.5 tool with 50% overlap: offsets at 0.25, 0.5, 0.75 ... 2.75; nothing is left at 3.0
+    small = list(camlib.iter_offset_rings(pol, 0.25, 0.25, 16))
+    assert len(small) == 11
+    assert small[0][0].bounds == (0.25, 0.25, 9.75, 5.75)
+    assert len(calls) == 12
+
+    # a 1.0 tool with 50% overlap: offsets at 0.5, 1.0 ... 2.5 are all in the cache
+    calls.clear()
+    large = list(camlib.iter_offset_rings(pol, 0.5, 0.5, 16))
+    assert calls == []
+    assert [rings[0].bounds for rings in large] == [rings[0].bounds for rings in small[1::2]]
+
+
+def test_offset_rings_match_the_successive_offsets():
+    import camlib
+    from shapely import box, Point, MultiLineString
+
+    camlib.offset_rings_cache.clear()
+    pol = box(0, 0, 20, 12).difference(Point(10, 6).buffer(2, 16))
+    rings = list(camlib.iter_offset_rings(pol, 0.4, 0.6, 16))
+
+    successive = []
+    current = pol.buffer(-0.4, 16)
+    while not current.is_empty:
+        successive.append(current)
+        current = current.buffer(-0.6, 16)
+
+    assert len(rings) == len(successive)
+    for offset_rings, shrunk in zip(rings, successive):
+        assert MultiLineString(offset_rings).bounds == pytest.approx(shrunk.bounds, abs=1e-3)
+
+
+@pytest.mark.parametrize('method', [0, 1, 2, 3])
+def test_clear_polygon_mp_matches_the_geometry_methods(app_core, method):
+    import camlib
+    from shapely import box, Point
+    from camlib import Geometry, clear_polygon_mp
+
+    pol = box(0, 0, 20, 12).difference(Point(10, 6).buffer(2, 16))
+    paths = clear_polygon_mp(pol, 1.0, method, 16, 0.15, True, True)
+    assert paths
+
+    geo = Geometry(geo_steps_per_circle=16)
+    clear = {
+        0: geo.clear_polygon_shrink,
+        1: geo.clear_polygon_seed,
+        2: geo.clear_polygon_lines,
+        3: geo.clear_polygon_lines,
+    }[method]
+    cp = clear(pol, 1.0, 16, overlap=0.15, connect=True, contour=True)
+    assert sorted(p.wkt for p in paths) == sorted(p.wkt for p in cp.get_objects())
+    assert camlib.PoolJobState().abort_flag is False
+
+
+def test_find_min_clearances_on_a_uniform_grid():
+    from shapely import box
+    from camlib import find_min_clearances
+
+    # unit squares with a pitch of 2: every nearest neighbour is at 1.0
+    squares = [box(2 * col, 2 * row, 2 * col + 1, 2 * row + 1) for row in range(5) for col in range(5)]
+    clearances = find_min_clearances(squares, k=5)
+    assert list(clearances) == [1.0, 1.4142, 3.0, 3.1623, 4.2426]
+    # 2 * 5 * 4 neighbours side by side and 2 * 4 * 4 on the diagonal
+    assert len(clearances[1.0]) == 40
+    assert len(clearances[1.4142]) == 32
+    assert ((1.0, 0.0), (2.0, 0.0)) in clearances[1.0] or ((1.0, 1.0), (2.0, 1.0)) in clearances[1.0]
+
+
+def test_find_min_clearances_with_less_distances_than_asked():
+    from shapely import Point
+    from camlib import find_min_clearances
+
+    clearances = find_min_clearances([Point(0, 0), Point(3, 4)], k=3)
+    assert clearances == {5.0: [((0.0, 0.0), (3.0, 4.0))]}
+    assert find_min_clearances([Point(0, 0)], k=3) == {}
+
+
+def test_violation_locations_with_duplicated_elements():
+    from shapely import box
+    from camlib import as_geo_array, find_violations, drc_cache
+
+    drc_cache.clear()
+    # two identical boxes are one violation; an element is never checked against itself
+    geo = as_geo_array([box(0, 0, 1, 1), box(0, 0, 1, 1), box(5, 0, 6, 1)])
+    assert len(find_violations(geo, None, 0.5)) == 1
+
+    # three identical boxes are three pairs
+    geo = as_geo_array([box(0, 0, 1, 1)] * 3 + [box(5, 0, 6, 1)])
+    assert len(find_violations(geo, None, 0.5)) == 3
+
+    # a pair that is not identical is reported once
+    geo = as_geo_array([box(0, 0, 1, 1), box(1.2, 0, 2, 1)])
+    assert find_violations(geo, None, 0.5) == [(1.1, 1.0)]
+
+
+def test_violation_locations_in_tiles(monkeypatch):
+    import camlib
+    from shapely import box
+
+    # each element violates the clearance with its right neighbour; the first element has a duplicate
+    elements = [box(2 * i, 0, 2 * i + 1.8, 1) for i in range(40)] + [box(0, 0, 1.8, 1)]
+    geo = camlib.as_geo_array(elements)
+
+    camlib.drc_cache.clear()
+    single = sorted(camlib.find_violations(geo, None, 0.5))
+    # 39 neighbours, the duplicate with the first element and with its right neighbour
+    assert len(single) == 39 + 2
+
+    monkeypatch.setattr(camlib, 'DRC_TILE_THRESHOLD', 10)
+    camlib.drc_cache.clear()
+    assert sorted(camlib.find_violations(geo, None, 0.5)) == single
+
+
+def test_bounds_follow_the_drills_changed_in_place(app_core):
+    from shapely import Point
+    from camlib import DrillArray, SlotArray
+    from appParsers.ParseExcellon import Excellon
+
+    exc = Excellon(excellon_circle_steps=16)
+    exc.solid_geometry = []
+    exc.tools = {1: {'tooldia': 1.0, 'drills': DrillArray([Point(1, 1), Point(2, 1)]), 'slots': SlotArray(),
+                     'solid_geometry': []}}
+    assert exc.bounds() == (0.5, 0.5, 2.5, 1.5)
+
+    exc.tools[1]['drills'].append(Point(100, 100))
+    assert exc.bounds() == (0.5, 0.5, 100.5, 100.5)
+
+    exc.tools[1]['drills'][2] = Point(50, 50)
+    assert exc.bounds() == (0.5, 0.5, 50.5, 50.5)
+
+    exc.tools[1]['slots'].append((Point(0, -10), Point(0, 0)))
+    assert exc.bounds() == (-0.5, -10.5, 50.5, 50.5)
+
+    exc.tools[1]['tooldia'] = 2.0
+    assert exc.bounds() == (-1.0, -11.0, 51.0, 51.0)
+
+
+def test_bounds_follow_the_geometry_changed_in_place(app_core):
+    from shapely import box
+    from camlib import Geometry
+
+    geo = Geometry(geo_steps_per_circle=16)
+    geo.multigeo = False
+    geo.solid_geometry = [box(0, 0, 1, 1)]
+    assert geo.bounds() == (0, 0, 1, 1)
+    geo.solid_geometry.append(box(5, 5, 6, 6))
+    assert geo.bounds() == (0, 0, 6, 6)
+
+    geo.multigeo = True
+    geo.tools = {1: {'solid_geometry': [box(2, 2, 3, 3)]}}
+    assert geo.bounds() == (2, 2, 3, 3)
+    geo.tools[1]['solid_geometry'][0] = box(2, 2, 4, 4)
+    assert geo.bounds() == (2, 2, 4, 4)
+
+
+def test_bounds_of_a_multitool_cncjob(app_core):
+    from shapely import box
+    from camlib import CNCjob
+
+    cnc = CNCjob()
+    cnc.obj_options = {'type': 'Geometry'}
+    cnc.multitool = False
+    cnc.solid_geometry = [box(0, 0, 1, 1)]
+    assert cnc.bounds() == (0, 0, 1, 1)
+
+    # the bounds are read from the tools as soon as the object is multi-tool
+    cnc.multitool = True
+    cnc.tools = {1: {'solid_geometry': [box(5, 5, 6, 6)]}}
+    assert cnc.bounds() == (5, 5, 6, 6)
+    cnc.tools[1]['solid_geometry'].append(box(8, 8, 9, 9))
+    assert cnc.bounds() == (5, 5, 9, 9)
+
+
+def make_transform_object(kind):
+    from shapely import Point, box
+    from camlib import Geometry, DrillArray, SlotArray
+    from appParsers.ParseGerber import Gerber
+    from appParsers.ParseExcellon import Excellon
+
+    if kind == 'gerber':
+        obj = Gerber(steps_per_circle=16)
+        obj.solid_geometry = [box(1, 2, 3, 4), Point(10, 5).buffer(0.5)]
+        obj.follow_geometry = []
+    elif kind == 'excellon':
+        obj = Excellon(excellon_circle_steps=16)
+        obj.tools = {1: {'tooldia': 1.0, 'drills': DrillArray([Point(5.828, 10.813), Point(20, 30)]),
+                         'slots': SlotArray([(Point(30, 20), Point(37.828, 34.713))]), 'solid_geometry': []}}
+        obj.solid_geometry = []
+    elif kind == 'geometry':
+        obj = Geometry(geo_steps_per_circle=16)
+        obj.multigeo = False
+        obj.solid_geometry = [box(1, 2, 3, 4)]
+    else:
+        obj = Geometry(geo_steps_per_circle=16)
+        obj.multigeo = True
+        obj.solid_geometry = []
+        obj.tools = {1: {'solid_geometry': [box(1, 2, 3, 4)]}, 2: {'solid_geometry': [box(-5, 0, -4, 1)]}}
+    return obj
+
+
+@pytest.mark.parametrize('kind', ['gerber', 'excellon', 'geometry', 'multigeo'])
+@pytest.mark.parametrize('matrix', ['scale', 'offset', 'mirror'])
+def test_transformed_bounds_match_the_transformed_geometry(app_core, kind, matrix):
+    from camlib import scale_matrix, translation_matrix
+
+    matrix = {
+        'scale': scale_matrix(2, 2, (22.078, 22.763)),
+        'offset': translation_matrix(3, -1),
+        'mirror': scale_matrix(-1, 1, (0, 0))
+    }[matrix]
+
+    obj = make_transform_object(kind)
+    deferred = obj.transformed_bounds(obj.bounds(), matrix)
+    obj.transform_geometry(matrix)
+    baked = obj.bounds()
+
+    if deferred is None:
+        # the bounds of the object are found after the transformation is applied
+        assert not obj.affine_bounds
+    else:
+        assert deferred == pytest.approx(baked)
+
+
+def test_excellon_bounds_are_not_transformed_as_a_bounding_box(app_core):
+    from camlib import scale_matrix
+
+    # the hole radius is not scaled with the drills, so the scaled bounding box is wrong by one radius
+    obj = make_transform_object('excellon')
+    assert obj.transformed_bounds(obj.bounds(), scale_matrix(2, 2, (0, 0))) is None
+
+
+def test_bounds_cache_does_not_keep_the_geometry_alive(app_core):
+    import gc
+    import pickle
+    import weakref
+    from shapely import box
+    from camlib import Geometry
+
+    geo = Geometry(geo_steps_per_circle=16)
+    geo.multigeo = False
+    element = box(0, 0, 1, 1)
+    geo.solid_geometry = [element]
+    geo.bounds()
+    element_ref = weakref.ref(element)
+
+    geo.solid_geometry = [box(0, 0, 2, 2)]
+    del element
+    gc.collect()
+    assert element_ref() is None
+    assert geo.bounds() == (0, 0, 2, 2)
+
+    # the cached bounds are not pickled
+    assert pickle.loads(pickle.dumps(geo))._bounds_cache is None